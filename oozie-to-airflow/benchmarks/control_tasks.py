@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measures worker overhead of a single control task.
+
+Compares the kill node implemented as BashOperator running ``exit 1`` with the
+in-process KillOperator. Run from the oozie-to-airflow directory:
+
+    python -m benchmarks.control_tasks --repeat 200
+"""
+import argparse
+import json
+import sys
+import timeit
+
+from airflow.exceptions import AirflowException
+from airflow.operators import bash_operator
+
+from o2a_libs import control_operators
+
+
+def run_failing_task(operator) -> None:
+    """Executes the operator the way a worker would, swallowing the expected failure."""
+    try:
+        operator.execute(context={})
+    except AirflowException:
+        pass
+
+
+def measure(operator, repeat: int) -> float:
+    """Returns average execution time of the operator in milliseconds"""
+    total = timeit.timeit(lambda: run_failing_task(operator), number=repeat)
+    return total * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker overhead per control task.")
+    parser.add_argument("--repeat", type=int, default=100, help="Number of executions of each task")
+    args = parser.parse_args()
+
+    before = bash_operator.BashOperator(task_id="kill_bash", bash_command="exit 1")
+    after = control_operators.KillOperator(task_id="kill_in_process", message="benchmark")
+
+    results = {
+        "repeat": args.repeat,
+        "bash_operator_ms": measure(before, args.repeat),
+        "kill_operator_ms": measure(after, args.repeat),
+    }
+    results["speedup"] = results["bash_operator_ms"] / results["kill_operator_ms"]
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measures how long the Airflow scheduler takes to parse the generated DAG files.
+
+Every python file of the DAGs folder is loaded with ``DagBag`` (on a temporary sqlite
+Airflow home unless AIRFLOW_HOME is set) and its parse time, number of DAGs, tasks and
+edges and size are printed as JSON. The command fails if any file fails to import or
+takes longer than the budget. Run from the oozie-to-airflow directory:
+
+    python -m benchmarks.dag_parse_time output/ --budget-ms 200
+
+Modules imported by the DAG files (sub-DAG modules, shared params) are imported once per
+process, so the parse time of the first file importing them includes their import.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import timeit
+from typing import Any, Dict, List
+
+
+def find_dag_files(dags_folder: str) -> List[str]:
+    """Returns sorted paths of the python files in the DAGs folder."""
+    return sorted(
+        os.path.join(dags_folder, file_name)
+        for file_name in os.listdir(dags_folder)
+        if file_name.endswith(".py") and not file_name.startswith("__")
+    )
+
+
+def configure_airflow_home() -> None:
+    """Points Airflow to a throw-away sqlite home, must be called before airflow is imported."""
+    if "AIRFLOW_HOME" in os.environ:
+        return
+    airflow_home = tempfile.mkdtemp(prefix="o2a_parse_time_")
+    os.environ["AIRFLOW_HOME"] = airflow_home
+    os.environ["AIRFLOW__CORE__SQL_ALCHEMY_CONN"] = f"sqlite:///{airflow_home}/airflow.db"
+    os.environ["AIRFLOW__CORE__LOAD_EXAMPLES"] = "False"
+    os.environ["AIRFLOW__CORE__UNIT_TEST_MODE"] = "True"
+
+
+def measure_file(file_path: str, repeat: int) -> Dict[str, Any]:
+    """Parses the file the way the scheduler does and returns its statistics."""
+    # pylint: disable=import-outside-toplevel
+    from airflow.models import DagBag
+
+    dag_bags = []
+
+    def parse():
+        dag_bags.append(DagBag(dag_folder=file_path, include_examples=False))
+
+    timings = [timeit.timeit(parse, number=1) * 1000 for _ in range(repeat)]
+    dag_bag = dag_bags[-1]
+    dags = list(dag_bag.dags.values())
+    return {
+        "file": os.path.basename(file_path),
+        "import_ms": statistics.median(timings),
+        "dags": len(dags),
+        "tasks": sum(len(dag.tasks) for dag in dags),
+        "edges": sum(len(task.downstream_task_ids) for dag in dags for task in dag.tasks),
+        "size_bytes": os.path.getsize(file_path),
+        "errors": list(dag_bag.import_errors.values()),
+    }
+
+
+def summarize(results: List[Dict[str, Any]], budget_ms: float = None) -> Dict[str, Any]:
+    """Returns the report with the files failing to import or exceeding the budget."""
+    return {
+        "budget_ms": budget_ms,
+        "files": results,
+        "total_import_ms": sum(result["import_ms"] for result in results),
+        "failed": [result["file"] for result in results if result["errors"]],
+        "over_budget": [
+            result["file"] for result in results if budget_ms is not None and result["import_ms"] > budget_ms
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure parse time of the generated DAG files.")
+    parser.add_argument("dags_folder", help="Directory with the generated DAG files")
+    parser.add_argument("--budget-ms", type=float, help="Maximum parse time of a single file")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of parses of each file, the median is reported"
+    )
+    args = parser.parse_args()
+
+    configure_airflow_home()
+    dags_folder = os.path.abspath(args.dags_folder)
+    # DAG files import the sub-DAG and shared modules written next to them
+    sys.path.insert(0, dags_folder)
+    results = [measure_file(file_path, args.repeat) for file_path in find_dag_files(dags_folder)]
+    report = summarize(results, args.budget_ms)
+    json.dump(report, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+    if report["failed"] or report["over_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measures the EL basic functions called by the workers against their previous implementations.
+
+Every function of o2a_libs.el_basic_functions is called with the same arguments as the previous
+implementation, which imported its modules on every call and compiled the regex of replaceAll
+on every call.
+Run from the oozie-to-airflow directory:
+
+    python -m benchmarks.el_basic_functions --number 20000
+"""
+import argparse
+import functools
+import json
+import re
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from o2a_libs import el_basic_functions
+
+# pylint: disable=import-outside-toplevel
+
+
+def previous_concat(str_one, str_two):
+    if not str_one:
+        str_one = ""
+    if not str_two:
+        str_two = ""
+    return str_one + str_two
+
+
+def previous_replace_all(src_string, regex, replacement):
+    if not regex:
+        return src_string
+    if not replacement:
+        replacement = ""
+    return re.sub(regex, replacement, src_string)
+
+
+def previous_append_all(src_str, append, delimiter):
+    if not delimiter:
+        return src_str
+    if not append:
+        append = ""
+
+    split_str = src_str.split(delimiter)
+    appended_list = []
+    for split in split_str:
+        appended_list.append(split + append)
+    return delimiter.join(appended_list)
+
+
+def previous_url_encode(src_str):
+    if not src_str:
+        return ""
+    import urllib.parse
+
+    return urllib.parse.quote(src_str, encoding="UTF-8")
+
+
+def previous_timestamp():
+    import datetime
+    import pytz
+
+    return datetime.datetime.now(pytz.utc).isoformat()
+
+
+def previous_to_json_str(py_map):
+    return json.dumps(py_map)
+
+
+# Name, previous implementation, current implementation and the arguments of the call
+FUNCTIONS: List[Tuple[str, Callable, Callable, tuple]] = [
+    ("firstNotNull", el_basic_functions.first_not_null, el_basic_functions.first_not_null, ("", "b")),
+    ("concat", previous_concat, el_basic_functions.concat, ("hdfs://nn", "/user/airflow")),
+    (
+        "replaceAll",
+        previous_replace_all,
+        el_basic_functions.replace_all,
+        ("/user/airflow/output-2019-01-01", r"output-(\d+)-(\d+)", r"out-\1\2"),
+    ),
+    ("appendAll", previous_append_all, el_basic_functions.append_all, ("/a/b/,/c/b/,/c/d/", "ADD", ",")),
+    ("trim", el_basic_functions.trim, el_basic_functions.trim, ("  /user/airflow \t",)),
+    ("urlEncode", previous_url_encode, el_basic_functions.url_encode, ("a b?c=d&e",)),
+    ("timestamp", previous_timestamp, el_basic_functions.timestamp, ()),
+    ("toJsonStr", previous_to_json_str, el_basic_functions.to_json_str, ({"a": "b", "c": ["d"]},)),
+]
+
+
+def measure_time(run: Callable[[], object], number: int) -> float:
+    """Returns the average time of a run in microseconds, the best of three series of runs"""
+    return min(timeit.repeat(run, number=number, repeat=3)) * 1e6 / number
+
+
+def compare(previous: Callable[[], object], current: Callable[[], object], number: int) -> Dict[str, float]:
+    previous_us = measure_time(previous, number)
+    current_us = measure_time(current, number)
+    return {"previous_us": previous_us, "current_us": current_us, "speedup": previous_us / current_us}
+
+
+def measure_functions(number: int) -> Dict[str, Dict[str, float]]:
+    return {
+        name: compare(functools.partial(previous, *args), functools.partial(current, *args), number)
+        for name, previous, current, args in FUNCTIONS
+    }
+
+
+def measure(number: int) -> dict:
+    return {"number": number, "functions": measure_functions(number)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the EL basic functions of o2a_libs.")
+    parser.add_argument("--number", type=int, default=20000, help="Number of calls of each function")
+    args = parser.parse_args()
+
+    results = measure(args.number)
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
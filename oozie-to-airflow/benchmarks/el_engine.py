@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compares the EL parser with the regular expressions converting the EL to Jinja.
+
+The corpus is made of the texts with EL expressions found in the workflow.xml and properties
+files of the given directories, together with a set of builtin expressions. Every pass converts
+the whole corpus with convert_el_to_jinja. The regex pass uses the regular expressions only,
+the cold pass clears the compiled-expression and conversion caches first and the warm pass
+reuses them, which is what mappers converting the same expressions on every action see. Run from the
+oozie-to-airflow directory:
+
+    python -m benchmarks.el_engine examples --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterable, List, Set
+
+from utils import el_parser, el_utils, properties_utils
+
+SAMPLE_EXPRESSIONS = [
+    "${nameNode}",
+    "${nameNode}/user/${wf:user()}/${examplesRoot}/apps/pig",
+    '${concat("ls ", "-l")}',
+    '${firstNotNull("test", "")}',
+    "${concat(nameNode, concat('/user/', queueName))}",
+    "${replaceAll(inputDir, '/raw/', '/clean/')}",
+    "${fs:fileSize(inputDir) gt 10 * GB}",
+    "${wf:errorMessage(wf:lastErrorNode())}",
+    "${retries lt 3 and not empty queueName}",
+    "${ hostname }",
+]
+
+
+def read_xml_texts(file_path: str) -> List[str]:
+    """Returns the texts and attribute values of the XML file."""
+    texts = []
+    for element in ET.parse(file_path).iter():
+        texts.append(element.text or "")
+        texts.extend(element.attrib.values())
+    return texts
+
+
+def read_properties_texts(file_path: str) -> List[str]:
+    """Returns the values of the properties file."""
+    return list(properties_utils.read_properties(file_path).values())
+
+
+def find_expressions(directories: Iterable[str]) -> List[str]:
+    """Returns the sorted distinct texts with EL expressions found in the directories and the samples."""
+    expressions: Set[str] = set(SAMPLE_EXPRESSIONS)
+    for directory in directories:
+        for dir_path, _, file_names in os.walk(directory):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+                if file_name.endswith(".xml"):
+                    texts = read_xml_texts(file_path)
+                elif file_name.endswith(".properties"):
+                    texts = read_properties_texts(file_path)
+                else:
+                    continue
+                expressions.update(text.strip() for text in texts if "${" in text)
+    return sorted(expressions)
+
+
+def convert_all(convert: Callable[[str], str], expressions: List[str]) -> None:
+    for expression in expressions:
+        try:
+            convert(expression)
+        except KeyError:
+            pass
+
+
+def count_parsed(expressions: List[str]) -> int:
+    """Returns the number of expressions understood by the EL parser."""
+    parsed = 0
+    for expression in expressions:
+        try:
+            el_parser.compile_el(expression)
+            parsed += 1
+        except el_parser.ELParserException:
+            pass
+    return parsed
+
+
+def measure(expressions: List[str], repeat: int) -> dict:
+    """Returns the average time of a pass over the corpus in milliseconds for each of the paths."""
+
+    def regex_pass():
+        convert_all(el_utils.convert_el_to_jinja_with_regex, expressions)
+
+    def cold_pass():
+        el_parser.compile_el.cache_clear()
+        el_utils._convert_el_to_jinja.cache_clear()  # pylint: disable=protected-access
+        convert_all(el_utils.convert_el_to_jinja, expressions)
+
+    def warm_pass():
+        convert_all(el_utils.convert_el_to_jinja, expressions)
+
+    results: Dict[str, float] = {
+        "expressions": len(expressions),
+        "parsed": count_parsed(expressions),
+        "repeat": repeat,
+    }
+    for name, run_pass in [("regex_ms", regex_pass), ("engine_cold_ms", cold_pass)]:
+        results[name] = timeit.timeit(run_pass, number=repeat) * 1000 / repeat
+    warm_pass()
+    results["engine_warm_ms"] = timeit.timeit(warm_pass, number=repeat) * 1000 / repeat
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the EL parser with the regex conversion.")
+    parser.add_argument("directories", nargs="*", help="Directories with the Oozie applications")
+    parser.add_argument("--repeat", type=int, default=100, help="Number of passes over the corpus")
+    args = parser.parse_args()
+
+    results = measure(find_expressions(args.directories), args.repeat)
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
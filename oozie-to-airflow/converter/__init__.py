@@ -13,4 +13,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Convert-related functions"""
-__all__ = ["mappers", "oozie_converter", "parsed_node", "parser", "subworkflow_converter"]
+__all__ = [
+    "asset_copier",
+    "batch_converter",
+    "compile_check",
+    "concurrency",
+    "corpus_profiler",
+    "critical_path",
+    "dag_packager",
+    "mappers",
+    "oozie_converter",
+    "parsed_node",
+    "parser",
+    "spec_writer",
+    "subworkflow_converter",
+]
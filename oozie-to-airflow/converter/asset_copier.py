@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Copying of the assets required by the generated DAGs - such as scripts and jars
+
+All assets of a DAG are collected before they are written: assets requested by several actions
+are written once, and assets with the same content are linked to the first copy. Files are cloned
+or hard linked from their source when the filesystem allows it and streamed in chunks otherwise.
+"""
+import hashlib
+import logging
+import os
+import shutil
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from converter.primitives import Asset
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+CHUNK_SIZE = 1024 * 1024
+# ioctl request cloning the blocks of a file on copy-on-write filesystems, from linux/fs.h
+FICLONE = 0x40049409
+CLONED = "cloned"
+LINKED = "linked"
+COPIED = "copied"
+WRITTEN = "written"
+DEDUPLICATED = "deduplicated"
+
+
+class AssetCopyException(Exception):
+    """Raised when assets with different content are written to the same file"""
+
+
+def get_source(asset: Asset) -> Tuple:
+    """
+    Returns the fields of the asset defining its content.
+    """
+    return asset.source_path, asset.header, asset.content
+
+
+def get_source_path(asset: Asset) -> str:
+    """
+    Returns the path of the file copied to the asset, for an asset without generated content.
+
+    :raises AssetCopyException: if the asset has neither a source file nor generated content.
+    """
+    if asset.source_path is None:
+        raise AssetCopyException(f"Asset {asset.destination_name} has neither a source file nor content")
+    return asset.source_path
+
+
+def get_size(asset: Asset) -> int:
+    """
+    Returns the size in bytes of the content of the asset.
+    """
+    if asset.content is not None:
+        return len(asset.content.encode())
+    return len(asset.header.encode()) + os.stat(get_source_path(asset)).st_size
+
+
+def get_digest(asset: Asset) -> str:
+    """
+    Returns the digest of the content of the asset, the source file is read in chunks.
+    """
+    digest = hashlib.sha256()
+    if asset.content is not None:
+        digest.update(asset.content.encode())
+        return digest.hexdigest()
+    digest.update(asset.header.encode())
+    with open(get_source_path(asset), "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AssetDigests:  # pylint: disable=too-few-public-methods
+    """Digests of the assets, each source is read at most once"""
+
+    def __init__(self):
+        self.digests: Dict[Tuple, str] = {}
+
+    def get(self, asset: Asset) -> str:
+        source = get_source(asset)
+        if source not in self.digests:
+            self.digests[source] = get_digest(asset)
+        return self.digests[source]
+
+
+def merge_assets(assets: Iterable[Asset], digests: AssetDigests) -> Dict[str, Asset]:
+    """
+    Returns the assets by their destination, merging the assets with the same destination.
+
+    :raises AssetCopyException: if assets with different content have the same destination.
+    """
+    merged: Dict[str, Asset] = OrderedDict()
+    for asset in assets:
+        destination_name = os.path.normpath(asset.destination_name)
+        previous = merged.get(destination_name)
+        if previous is None:
+            merged[destination_name] = asset
+        elif get_source(previous) != get_source(asset) and digests.get(previous) != digests.get(asset):
+            raise AssetCopyException(
+                f"Assets with different content are written to {destination_name}: "
+                f"{previous.source_path or 'generated'} and {asset.source_path or 'generated'}"
+            )
+    return merged
+
+
+def find_duplicates(
+    assets: Dict[str, Asset], digests: AssetDigests
+) -> Tuple[Dict[str, Asset], Dict[str, str]]:
+    """
+    Splits the assets into the ones written from their source and the ones with the same content.
+
+    Only assets of the same size are read to compare their digests.
+
+    :return: the assets written from their source by destination, and the destinations of duplicated
+        assets with the destination they are linked to.
+    """
+    by_size: Dict[int, List[str]] = OrderedDict()
+    for destination_name, asset in assets.items():
+        by_size.setdefault(get_size(asset), []).append(destination_name)
+    originals: Dict[str, Asset] = OrderedDict()
+    duplicates: Dict[str, str] = OrderedDict()
+    for destination_names in by_size.values():
+        first_by_digest: Dict[str, str] = {}
+        for destination_name in destination_names:
+            asset = assets[destination_name]
+            digest = digests.get(asset) if len(destination_names) > 1 else ""
+            if digest in first_by_digest:
+                duplicates[destination_name] = first_by_digest[digest]
+            else:
+                first_by_digest[digest] = destination_name
+                originals[destination_name] = asset
+    return originals, duplicates
+
+
+def clone_file(source_path: str, destination_path: str) -> bool:
+    """
+    Clones the file sharing its blocks with the source, on filesystems supporting it.
+
+    :return: True if the file has been cloned.
+    """
+    if fcntl is None:
+        return False
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        try:
+            fcntl.ioctl(destination.fileno(), FICLONE, source.fileno())
+            return True
+        except OSError:
+            pass
+    os.remove(destination_path)
+    return False
+
+
+def link_file(source_path: str, destination_path: str) -> bool:
+    """
+    Hard links the file to the source, if they are on the same filesystem.
+
+    :return: True if the file has been linked.
+    """
+    try:
+        os.link(source_path, destination_path)
+        return True
+    except OSError:
+        return False
+
+
+def place_file(source_path: str, destination_path: str) -> str:
+    """
+    Places a copy of the file at the destination, cloned, linked or copied in chunks.
+
+    :return: How the file has been placed.
+    """
+    if clone_file(source_path, destination_path):
+        return CLONED
+    if link_file(source_path, destination_path):
+        return LINKED
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        shutil.copyfileobj(source, destination, CHUNK_SIZE)
+    shutil.copymode(source_path, destination_path)
+    return COPIED
+
+
+def prepare_destination(source_path: Optional[str], destination_path: str) -> bool:
+    """
+    Removes the previous file at the destination, so that a file linked to its source is never written
+    through.
+
+    :return: False if the destination is the source file itself.
+    """
+    if not os.path.lexists(destination_path):
+        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        return True
+    if source_path and os.path.exists(source_path) and os.path.samefile(source_path, destination_path):
+        return False
+    os.remove(destination_path)
+    return True
+
+
+def write_asset(asset: Asset, destination_path: str) -> str:
+    """
+    Writes the asset to the destination.
+
+    :return: How the file has been written.
+    """
+    if not prepare_destination(asset.source_path, destination_path):
+        return DEDUPLICATED
+    if asset.content is None and not asset.header:
+        return place_file(get_source_path(asset), destination_path)
+    with open(destination_path, "wb") as destination:
+        if asset.content is not None:
+            destination.write(asset.content.encode())
+        else:
+            destination.write(asset.header.encode())
+            with open(get_source_path(asset), "rb") as source:
+                shutil.copyfileobj(source, destination, CHUNK_SIZE)
+    return WRITTEN
+
+
+def copy_assets(
+    assets: Iterable[Asset], output_directory_path: str, max_workers: int = None
+) -> Dict[str, int]:
+    """
+    Writes the assets to the output directory, in a pool of threads.
+
+    Assets with the same destination are written once, and assets with the same content are linked
+    to the first one written.
+
+    :param assets: The assets required by the DAG.
+    :param output_directory_path: Directory the destinations of the assets are relative to.
+    :param max_workers: Number of threads, by default the default of ThreadPoolExecutor.
+    :return: Number of assets by how they have been written.
+    """
+    if not output_directory_path:
+        raise AssetCopyException(f"The output_directory_path should be set and is {output_directory_path}")
+    digests = AssetDigests()
+    originals, duplicates = find_duplicates(merge_assets(assets, digests), digests)
+    if not originals:
+        return {}
+
+    def write(destination_name: str) -> str:
+        destination_path = os.path.join(output_directory_path, destination_name)
+        logging.info(f"Writing asset {destination_path}")
+        return write_asset(originals[destination_name], destination_path)
+
+    def link(destination_name: str) -> str:
+        destination_path = os.path.join(output_directory_path, destination_name)
+        original_path = os.path.join(output_directory_path, duplicates[destination_name])
+        if prepare_destination(original_path, destination_path):
+            logging.info(f"Linking asset {destination_path} to {original_path}")
+            place_file(original_path, destination_path)
+        return DEDUPLICATED
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        statistics = Counter(executor.map(write, originals))
+        statistics.update(executor.map(link, duplicates))
+    return dict(statistics)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Converts many Oozie workflow applications into a single Airflow DAGs folder"""
+import logging
+import os
+from typing import Dict, List, Set, Type
+from xml.etree import ElementTree as ET
+
+from converter import compile_check
+from converter.oozie_converter import OozieConverter
+from converter.primitives import ConversionOptions
+from mappers.action_mapper import ActionMapper
+from mappers.base_mapper import BaseMapper
+from utils import el_utils
+
+WORKFLOW_FILE_NAME = "workflow.xml"
+# Property of the job.properties with the path the application is deployed to
+APPLICATION_PATH_PROPERTY = "oozie.wf.application.path"
+
+
+class BatchConverterException(Exception):
+    """Raised when the applications found cannot be converted into one DAGs folder"""
+
+
+class BatchConverter:
+    """Converts all Oozie workflow apps found under the input directory.
+
+    All DAGs are written to the same output directory, which is recreated only once, so that
+    the sub-workflow modules shared by several applications are generated only once. Each DAG is
+    named after the path of its application relative to the input directory. Every application is
+    written as a DAG, unless skipping the applications only run as sub-workflows is requested.
+    """
+
+    def __init__(
+        self,
+        input_directory_path: str,
+        output_directory_path: str,
+        action_mapper: Dict[str, Type[ActionMapper]],
+        control_mapper: Dict[str, Type[BaseMapper]],
+        user: str = None,
+        start_days_ago: int = None,
+        schedule_interval: str = None,
+        options: ConversionOptions = None,
+        skip_subworkflow_apps: bool = False,
+    ):
+        """
+        :param input_directory_path: Directory containing Oozie workflow applications.
+        :param output_directory_path: Desired output directory.
+        :param user: Username.
+        :param start_days_ago: Desired DAG start date, expressed as number of days ago from the present day
+        :param schedule_interval: Desired DAG schedule interval, expressed as number of days
+        :param options: Options of the conversion of all applications. The keys of the duration hints
+            can be qualified with the DAG name, the pools of all DAGs are written to one file. With
+            package, the output directory is not recreated, so that unchanged packages are kept.
+        :param skip_subworkflow_apps: Do not write DAGs of the applications which are only run as
+            sub-workflows of the other applications, see find_subworkflow_applications.
+        """
+        self.input_directory_path = input_directory_path
+        self.output_directory_path = output_directory_path
+        self.action_mapper = action_mapper
+        self.control_mapper = control_mapper
+        self.user = user
+        self.start_days_ago = start_days_ago
+        self.schedule_interval = schedule_interval
+        options = options or ConversionOptions()
+        self.options = options._replace(
+            compile_check_output=options.compile_check_output or options.write_pyc,
+            recreate_output_directory=False,
+        )
+        self.skip_subworkflow_apps = skip_subworkflow_apps
+
+    def find_applications(self) -> List[str]:
+        """
+        Returns sorted paths of all directories containing a workflow definition.
+        """
+        app_paths = []
+        for dir_path, dir_names, file_names in os.walk(self.input_directory_path):
+            dir_names.sort()
+            if WORKFLOW_FILE_NAME in file_names:
+                app_paths.append(dir_path)
+        return app_paths
+
+    def get_dag_name(self, app_path: str) -> str:
+        """
+        Returns the name of the DAG of the application, its path relative to the input directory with
+        the separators replaced with underscores.
+        """
+        relative_path = os.path.relpath(app_path, self.input_directory_path)
+        if relative_path == os.curdir:
+            return os.path.basename(os.path.abspath(app_path))
+        return relative_path.replace(os.sep, "_")
+
+    @staticmethod
+    def read_subworkflow_app_paths(app_path: str) -> List[str]:
+        """
+        Returns the app-path of all sub-workflow actions of the application, as written in the workflow.
+        """
+        tree = ET.parse(os.path.join(app_path, WORKFLOW_FILE_NAME))
+        return [node.text for node in tree.iter() if node.tag.split("}")[-1] == "app-path" and node.text]
+
+    @staticmethod
+    def normalize_app_path(app_path: str) -> str:
+        """
+        Returns the path of the application directory, an app-path may also name its workflow definition.
+        """
+        app_path = app_path.rstrip("/")
+        if app_path.endswith("/" + WORKFLOW_FILE_NAME):
+            app_path = app_path[: -len(WORKFLOW_FILE_NAME)].rstrip("/")
+        return app_path
+
+    def find_subworkflow_applications(self, converters: List[OozieConverter]) -> Set[str]:
+        """
+        Returns paths of the applications which are only run as sub-workflows of the other applications.
+
+        The app-path of a sub-workflow, with its EL resolved from the params of the parent, refers to the
+        application deployed to exactly that path, as given by its oozie.wf.application.path property.
+        The applications run from applications which are not sub-workflows are returned, so applications
+        running each other without any other parent are kept.
+        """
+        apps = {}
+        for converter in converters:
+            deployed_path = converter.params.get(APPLICATION_PATH_PROPERTY)
+            if deployed_path:
+                apps[self.normalize_app_path(deployed_path)] = converter.input_directory_path
+        children: Dict[str, Set[str]] = {}
+        for converter in converters:
+            parent_path = converter.input_directory_path
+            children[parent_path] = set()
+            for app_path in self.read_subworkflow_app_paths(parent_path):
+                resolved = el_utils.replace_el_with_var(app_path, params=converter.params, quote=False)
+                child_path = apps.get(self.normalize_app_path(resolved))
+                if child_path and child_path != parent_path:
+                    children[parent_path].add(child_path)
+        referenced = set().union(*children.values())
+        pending = [app_path for app_path in children if app_path not in referenced]
+        subworkflow_apps: Set[str] = set()
+        while pending:
+            for child_path in children[pending.pop()] - subworkflow_apps:
+                subworkflow_apps.add(child_path)
+                pending.append(child_path)
+        return subworkflow_apps
+
+    @staticmethod
+    def check_dag_names(converters: List[OozieConverter]):
+        """
+        Fails if several applications would be written to the same DAG.
+        """
+        app_paths_by_name: Dict[str, List[str]] = {}
+        for converter in converters:
+            app_paths_by_name.setdefault(converter.dag_name, []).append(converter.input_directory_path)
+        collisions = {name: paths for name, paths in app_paths_by_name.items() if len(paths) > 1}
+        if collisions:
+            raise BatchConverterException(f"Several applications have the same DAG name: {collisions}")
+
+    @staticmethod
+    def get_shared_params(converters: List[OozieConverter]) -> Dict[str, str]:
+        """
+        Returns the params having the same value in all the converted applications.
+        """
+        if len(converters) < 2:
+            return {}
+        shared_items = set(converters[0].params.items())
+        for converter in converters[1:]:
+            shared_items &= set(converter.params.items())
+        return {key: value for key, value in converters[0].params.items() if (key, value) in shared_items}
+
+    def convert(self) -> List[str]:
+        """
+        Converts all applications and returns names of the generated DAGs.
+        """
+        if self.options.package:
+            os.makedirs(self.output_directory_path, exist_ok=True)
+        else:
+            OozieConverter.recreate_directory(self.output_directory_path)
+        converters = [self.create_converter(app_path) for app_path in self.find_applications()]
+        if self.skip_subworkflow_apps:
+            subworkflow_apps = self.find_subworkflow_applications(converters)
+            for app_path in sorted(subworkflow_apps):
+                logging.warning(
+                    f"Skipping the DAG of application {app_path}, it is only run as a sub-workflow"
+                )
+            converters = [
+                converter
+                for converter in converters
+                if converter.input_directory_path not in subworkflow_apps
+            ]
+        self.check_dag_names(converters)
+        if self.options.shared_module:
+            shared_params = self.get_shared_params(converters)
+            if shared_params:
+                OozieConverter.write_shared_module(self.output_directory_path, shared_params)
+            for converter in converters:
+                converter.options = converter.options._replace(shared_params=shared_params)
+        for converter in converters:
+            logging.info(f"Converting application {converter.input_directory_path}")
+            converter.convert()
+        if self.options.compile_check_output:
+            compile_check.check_directory(self.output_directory_path, write_pyc=self.options.write_pyc)
+        return [converter.dag_name for converter in converters]
+
+    def create_converter(self, app_path: str) -> OozieConverter:
+        return OozieConverter(
+            dag_name=self.get_dag_name(app_path),
+            input_directory_path=app_path,
+            output_directory_path=self.output_directory_path,
+            action_mapper=self.action_mapper,
+            control_mapper=self.control_mapper,
+            user=self.user,
+            start_days_ago=self.start_days_ago,
+            schedule_interval=self.schedule_interval,
+            options=self.options,
+        )
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Assignment of the Dataproc jobs of parallel fork branches to a set of clusters"""
+import collections
+from typing import Any, Dict, List, Set, Tuple
+
+from converter import critical_path
+from converter.parsed_node import ParsedNode
+from mappers.prepare_mixin import PrepareMixin
+
+
+def get_reachable(nodes: Dict[str, ParsedNode], start: str) -> List[str]:
+    """
+    Returns names of the nodes reachable from the start node, including it.
+    """
+    reachable = [start]
+    seen = {start}
+    queue = collections.deque(reachable)
+    while queue:
+        for successor in critical_path.get_successors(nodes, queue.popleft()):
+            if successor not in seen:
+                seen.add(successor)
+                reachable.append(successor)
+                queue.append(successor)
+    return reachable
+
+
+def get_branches(nodes: Dict[str, ParsedNode], fork_name: str) -> List[List[str]]:
+    """
+    Returns the nodes of each branch of the fork. The nodes reachable from more than one branch,
+    starting with the join, are not part of any branch.
+    """
+    reachable = [get_reachable(nodes, start) for start in critical_path.get_successors(nodes, fork_name)]
+    counts = collections.Counter(name for names in reachable for name in names)
+    return [[name for name in names if counts[name] == 1] for names in reachable]
+
+
+def get_fork_branches(nodes: Dict[str, ParsedNode]) -> Dict[str, List[List[str]]]:
+    """
+    Returns the branches of all forks, outer forks first.
+    """
+    # The topological order lists successors first, so outer forks come first when reversed
+    return {
+        name: get_branches(nodes, name)
+        for name in reversed(critical_path.get_topological_order(nodes))
+        if nodes[name].mapper.oozie_node.tag == "fork"
+    }
+
+
+def spread_branches(
+    branches: List[List[str]], clusters: List[str], durations: Dict[str, float]
+) -> List[Tuple[List[str], str]]:
+    """
+    Returns the cluster of each branch, the longest branches assigned first to the least loaded cluster.
+    """
+    loads = {cluster: 0.0 for cluster in clusters}
+    sizes = [sum(durations[name] for name in branch) for branch in branches]
+    spread = []
+    for size, branch in sorted(zip(sizes, branches), key=lambda item: item[0], reverse=True):
+        cluster = min(clusters, key=loads.__getitem__)
+        loads[cluster] += size
+        spread.append((branch, cluster))
+    return spread
+
+
+def get_nested_names(branch: List[str], fork_branches: Dict[str, List[List[str]]]) -> Set[str]:
+    """
+    Returns the nodes of the branches of the forks nested in the branch.
+    """
+    return {
+        name
+        for fork_name in branch
+        for nested_branch in fork_branches.get(fork_name, [])
+        for name in nested_branch
+    }
+
+
+def assign_clusters(
+    nodes: Dict[str, ParsedNode], clusters: List[str], dag_name: str = None, hints: Dict[str, float] = None
+) -> Dict[str, Any]:
+    """
+    Spreads the branches of each fork across the clusters, so that parallel jobs do not queue on one
+    cluster. The longest branches are assigned first, each to the least loaded cluster, using the
+    duration hints or the number of actions as the branch size. A branch is assigned its nodes outside
+    of the forks nested in it, whose branches are spread across the clusters in turn. The jobs outside
+    of forks run on the first cluster.
+
+    :return: The Dataproc tasks assigned to each cluster, for the conversion report.
+    """
+    if not clusters:
+        raise Exception("At least one Dataproc cluster is required")
+    durations = critical_path.get_durations(nodes, dag_name, hints)
+    fork_branches = get_fork_branches(nodes)
+    assigned: Dict[str, str] = {}
+    for branches in fork_branches.values():
+        for branch, cluster in spread_branches(branches, clusters, durations):
+            nested = get_nested_names(branch, fork_branches)
+            for name in branch:
+                if name not in nested:
+                    assigned[name] = cluster
+
+    report: Dict[str, List[str]] = {cluster: [] for cluster in clusters}
+    for name, node in nodes.items():
+        if isinstance(node.mapper, PrepareMixin):
+            node.mapper.dataproc_cluster = assigned.get(name, clusters[0])
+            report[node.mapper.dataproc_cluster].append(name)
+    return {"dataproc_clusters": report}
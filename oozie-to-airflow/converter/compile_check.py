@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Syntax check and precompilation of the generated DAG files"""
+import concurrent.futures
+import logging
+import os
+import py_compile
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from converter.primitives import SnippetLocation
+
+# Locations of the snippets written by mappers, for each generated file
+SOURCE_MAPS: Dict[str, List[SnippetLocation]] = {}
+
+
+class CompileError(NamedTuple):
+    """Syntax error found in a generated file"""
+
+    file_path: str
+    line: int
+    message: str
+
+
+class CompileCheckException(Exception):
+    """Raised when some of the generated files do not compile"""
+
+
+def register_source_map(file_path: str, locations: List[SnippetLocation]) -> None:
+    SOURCE_MAPS[os.path.abspath(file_path)] = locations
+
+
+def find_snippet(file_path: str, line: int) -> Optional[SnippetLocation]:
+    """
+    Returns the location of the snippet containing the line of the generated file, if known.
+    """
+    for location in SOURCE_MAPS.get(os.path.abspath(file_path), []):
+        if location.first_line <= line <= location.last_line:
+            return location
+    return None
+
+
+def describe_error(error: CompileError) -> str:
+    description = f"{error.file_path}:{error.line}: {error.message}"
+    location = find_snippet(error.file_path, error.line)
+    if location:
+        description += f" (in task {location.task_id} generated by {location.mapper_name})"
+    return description
+
+
+def compile_file(file_path: str, write_pyc: bool = False) -> Optional[CompileError]:
+    """
+    Compiles the file and optionally writes its .pyc file to __pycache__.
+
+    Runs in a worker process, so it has to be a module-level function.
+    """
+    with open(file_path, "rb") as file:
+        source = file.read()
+    try:
+        compile(source, file_path, "exec", dont_inherit=True)
+    except SyntaxError as error:
+        return CompileError(file_path=file_path, line=error.lineno or 0, message=error.msg)
+    if write_pyc:
+        py_compile.compile(file_path, doraise=True)
+    return None
+
+
+def check_files(
+    file_paths: Iterable[str], write_pyc: bool = False, max_workers: int = None
+) -> List[CompileError]:
+    """
+    Compiles the files on a process pool and returns the errors found.
+
+    With a single worker the files are compiled in the current process.
+    """
+    file_paths = list(file_paths)
+    if max_workers == 1:
+        return [error for error in (compile_file(path, write_pyc) for path in file_paths) if error]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(compile_file, file_paths, [write_pyc] * len(file_paths))
+        return [error for error in results if error]
+
+
+def check_directory(directory_path: str, write_pyc: bool = False, max_workers: int = None) -> None:
+    """
+    Compiles all python files in the output directory.
+
+    :raises CompileCheckException: if any of the files does not compile
+    """
+    file_paths = sorted(
+        os.path.join(directory_path, file_name)
+        for file_name in os.listdir(directory_path)
+        if file_name.endswith(".py")
+    )
+    logging.info(f"Compiling {len(file_paths)} files in {directory_path}")
+    errors = check_files(file_paths, write_pyc=write_pyc, max_workers=max_workers)
+    if errors:
+        descriptions = [describe_error(error) for error in errors]
+        for description in descriptions:
+            logging.error(description)
+        raise CompileCheckException("Generated files do not compile:\n" + "\n".join(descriptions))
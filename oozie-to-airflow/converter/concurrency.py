@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Concurrency limits and pools derived from the width of the parsed workflow graph"""
+import collections
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from converter import critical_path
+from converter.parsed_node import ParsedNode
+
+# Actions submitting jobs to the Dataproc cluster
+DATAPROC_ACTION_TAGS = {"pig", "shell"}
+# Connection used by the generated SparkSubmitOperator tasks
+SPARK_CONNECTION_ID = "spark_default"
+POOL_PREFIX = "o2a_"
+POOLS_FILE_NAME = "o2a_pools.json"
+
+
+def get_cluster(node: ParsedNode) -> Optional[str]:
+    """
+    Returns the name of the cluster running the jobs of the node, None for nodes not submitting jobs.
+    """
+    tag = node.mapper.oozie_node.tag
+    if tag in DATAPROC_ACTION_TAGS:
+        cluster: Optional[str] = getattr(node.mapper, "dataproc_cluster", None)
+        return cluster or node.mapper.params.get("dataproc_cluster")
+    if tag == "spark":
+        return SPARK_CONNECTION_ID
+    return None
+
+
+def get_pool_name(cluster: str) -> str:
+    return POOL_PREFIX + re.sub(r"\W", "_", cluster)
+
+
+def get_depths(nodes: Dict[str, ParsedNode]) -> Dict[str, int]:
+    """
+    Returns for every node the length of the longest path leading to it.
+    """
+    depths = {name: 0 for name in nodes}
+    for name in reversed(critical_path.get_topological_order(nodes)):
+        for successor in critical_path.get_successors(nodes, name):
+            depths[successor] = max(depths[successor], depths[name] + 1)
+    return depths
+
+
+def get_width(depths: Dict[str, int], names: Iterable[str]) -> int:
+    """
+    Returns the estimated number of the nodes which can run at the same time: the largest number
+    of them at the same depth of the graph, which is the width of the widest fork.
+    """
+    counter = collections.Counter(depths[name] for name in names)
+    return max(counter.values(), default=0)
+
+
+def assign_pools(nodes: Dict[str, ParsedNode], pool_slots: int = None) -> Dict[str, Any]:
+    """
+    Assigns tasks submitting jobs to a cluster to the pool of the cluster, sized by the widest fork
+    of those tasks unless the number of slots is given.
+
+    :return: The widest fork of the actions and the pools with their slots, for the conversion report.
+    """
+    depths = get_depths(nodes)
+    control_node_tags = critical_path.CONTROL_NODE_TAGS
+    actions = [name for name, node in nodes.items() if node.mapper.oozie_node.tag not in control_node_tags]
+    clusters: Dict[str, List[str]] = collections.defaultdict(list)
+    for name, node in nodes.items():
+        cluster = get_cluster(node)
+        if cluster:
+            node.mapper.pool = get_pool_name(cluster)
+            clusters[cluster].append(name)
+    pools = {
+        get_pool_name(cluster): pool_slots or max(1, get_width(depths, names))
+        for cluster, names in sorted(clusters.items())
+    }
+    return {"max_fork_width": get_width(depths, actions), "pools": pools}
+
+
+def write_pools_file(file_path: str, pools: Dict[str, int]) -> None:
+    """
+    Writes the pools in the format of `airflow pool --import`. Pools already in the file are kept,
+    a pool in both keeps the larger number of slots.
+    """
+    content: Dict[str, Dict[str, Any]] = {}
+    if os.path.isfile(file_path):
+        with open(file_path) as file:
+            content = json.load(file)
+    for pool, slots in pools.items():
+        previous_slots = content.get(pool, {}).get("slots", 0)
+        content[pool] = {
+            "description": "Jobs submitted by the converted workflows",
+            "slots": max(slots, previous_slots),
+        }
+    with open(file_path, "w") as file:
+        json.dump(content, file, indent=4, sort_keys=True)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Resolution of the decision nodes whose predicates are constant at conversion time"""
+import collections
+from typing import Dict, Iterable, Set
+
+from converter.parsed_node import ParsedNode
+from mappers.decision_mapper import DecisionMapper
+
+
+def _get_transitions(node: ParsedNode) -> Iterable[str]:
+    yield from node.get_downstreams()
+    error_name = node.get_error_downstream_name()
+    if error_name:
+        yield error_name
+
+
+def _find_reachable(nodes: Dict[str, ParsedNode], roots: Iterable[str]) -> Set[str]:
+    reachable = set()
+    queue = collections.deque(roots)
+    while queue:
+        name = queue.popleft()
+        if name in reachable or name not in nodes:
+            continue
+        reachable.add(name)
+        queue.extend(_get_transitions(nodes[name]))
+    return reachable
+
+
+def resolve_decisions(nodes: Dict[str, ParsedNode]) -> Dict[str, str]:
+    """
+    Removes the decision nodes whose transition is known at conversion time, see
+    DecisionMapper.resolved_transition. Their upstream nodes transition directly to the chosen node
+    and the nodes which were only reachable through the other transitions are removed as well,
+    so neither the branch task nor the skipped branches are written to the DAG.
+
+    :return: The transition taken by each removed decision node.
+    """
+    transitions = {
+        name: node.mapper.resolved_transition
+        for name, node in nodes.items()
+        if isinstance(node.mapper, DecisionMapper) and node.mapper.resolved_transition
+    }
+
+    def follow(name: str) -> str:
+        seen = set()
+        while name in transitions and name not in seen:
+            seen.add(name)
+            name = transitions[name]
+        return name
+
+    # Decisions transitioning to each other in a loop are left alone
+    resolved = {name: follow(name) for name in transitions if follow(name) not in transitions}
+    if not resolved:
+        return {}
+
+    def resolve(name: str) -> str:
+        return resolved.get(name, name)
+
+    inbound = {name for node in nodes.values() for name in _get_transitions(node)}
+    roots = [name for name in nodes if name not in inbound]
+    reachable_before = _find_reachable(nodes, roots)
+
+    for name in resolved:
+        del nodes[name]
+    for node in nodes.values():
+        node.downstream_names = list(collections.OrderedDict.fromkeys(map(resolve, node.get_downstreams())))
+        error_name = node.get_error_downstream_name()
+        if error_name:
+            node.set_error_node_name(resolve(error_name))
+
+    reachable = _find_reachable(nodes, map(resolve, roots))
+    for name in list(nodes):
+        if name in reachable_before and name not in reachable:
+            del nodes[name]
+    return resolved
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Profile of the actions and EL functions used by a corpus of workflows
+
+Scans every workflow.xml under a directory without converting it: the files are streamed with
+iterparse and only counted, so large corpora are profiled quickly, on a process pool.
+The profile tells which action types, mappers and EL functions are used and how often, and which
+of them the converter does not support: actions falling back to the DummyMapper, EL functions
+without a python mapping and expressions the EL parser does not understand.
+"""
+import collections
+import concurrent.futures
+import json
+import logging
+import os
+from typing import Any, Counter, Dict, Iterable, List
+from xml.etree import ElementTree as ET
+
+from converter.mappers import ACTION_MAP
+from utils import el_parser, el_utils
+
+WORKFLOW_FILE_NAME = "workflow.xml"
+PROFILE_FILE_NAME = "o2a_profile.json"
+CONTROL_NODES = frozenset({"start", "end", "kill", "decision", "fork", "join"})
+# Elements of an action which are transitions, not its type
+TRANSITION_TAGS = frozenset({"ok", "error"})
+# Number of workflows sent at once to a worker process
+CHUNK_SIZE = 16
+
+COUNTER_KEYS = ["action_tags", "mappers", "control_nodes", "el_functions", "node_counts", "fork_widths"]
+UNMAPPED_KEYS = ["action_tags", "el_functions", "el_expressions"]
+
+
+def find_workflows(input_directory_path: str) -> List[str]:
+    """Returns sorted paths of all workflow definitions under the directory."""
+    file_paths = []
+    for dir_path, dir_names, file_names in os.walk(input_directory_path):
+        dir_names.sort()
+        if WORKFLOW_FILE_NAME in file_names:
+            file_paths.append(os.path.join(dir_path, WORKFLOW_FILE_NAME))
+    return file_paths
+
+
+def _strip_namespace(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _create_profile() -> Dict[str, Any]:
+    profile: Dict[str, Any] = {key: collections.Counter() for key in COUNTER_KEYS}
+    profile["unmapped"] = {key: collections.Counter() for key in UNMAPPED_KEYS}
+    profile["workflows"] = 0
+    profile["errors"] = {}
+    return profile
+
+
+def _count_el(text: str, profile: Dict[str, Any]) -> None:
+    try:
+        compiled_el = el_parser.compile_el(text)
+    except el_parser.ELParserException:
+        profile["unmapped"]["el_expressions"][text] += 1
+        return
+    for expression in compiled_el.expressions:
+        for node in el_parser.walk(expression.body):
+            if isinstance(node, el_parser.FunctionCall):
+                profile["el_functions"][node.name] += 1
+                if el_utils.EL_FUNCTIONS.get(node.name) is None:
+                    profile["unmapped"]["el_functions"][node.name] += 1
+
+
+def _count_node(element: ET.Element, profile: Dict[str, Any]) -> bool:
+    """Counts the node of the workflow, returns false for other elements, e.g. global or parameters."""
+    tag = _strip_namespace(element.tag)
+    if tag in CONTROL_NODES:
+        profile["control_nodes"][tag] += 1
+        if tag == "fork":
+            width = sum(1 for child in element if _strip_namespace(child.tag) == "path")
+            profile["fork_widths"][width] += 1
+    elif tag == "action":
+        action_tags = [_strip_namespace(child.tag) for child in element]
+        action_tag = next((name for name in action_tags if name not in TRANSITION_TAGS), "unknown")
+        profile["action_tags"][action_tag] += 1
+        mapper = ACTION_MAP.get(action_tag)
+        if mapper is None:
+            profile["unmapped"]["action_tags"][action_tag] += 1
+            mapper = ACTION_MAP["unknown"]
+        profile["mappers"][mapper.__name__] += 1
+    else:
+        return False
+    return True
+
+
+def profile_workflow(file_path: str) -> Dict[str, Any]:
+    """
+    Returns the profile of a single workflow, streamed with iterparse. The nodes are cleared
+    once counted, so the whole document is never held in memory.
+
+    Runs in a worker process, so it has to be a module-level function.
+    """
+    profile = _create_profile()
+    depth = 0
+    nodes = 0
+    try:
+        for event, element in ET.iterparse(file_path, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            for text in [element.text or "", *element.attrib.values()]:
+                if "${" in text:
+                    _count_el(text.strip(), profile)
+            if depth == 1:
+                if _count_node(element, profile):
+                    nodes += 1
+                element.clear()
+    except ET.ParseError as error:
+        profile["errors"][file_path] = str(error)
+        return profile
+    profile["workflows"] = 1
+    profile["node_counts"][nodes] += 1
+    return profile
+
+
+def merge_profiles(profiles: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = _create_profile()
+    for profile in profiles:
+        merged["workflows"] += profile["workflows"]
+        merged["errors"].update(profile["errors"])
+        for key in COUNTER_KEYS:
+            merged[key].update(profile[key])
+        for key in UNMAPPED_KEYS:
+            merged["unmapped"][key].update(profile["unmapped"][key])
+    return merged
+
+
+def _to_histogram(counter: Counter) -> Dict[str, int]:
+    """Most common first, the sizes of the node counts and fork widths in ascending order."""
+    if all(isinstance(key, int) for key in counter):
+        return {str(key): counter[key] for key in sorted(counter)}
+    return dict(counter.most_common())
+
+
+def to_json(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the profile with its counters as histograms, in the form written to the JSON file."""
+    result: Dict[str, Any] = {"workflows": profile["workflows"]}
+    result.update({key: _to_histogram(profile[key]) for key in COUNTER_KEYS})
+    result["unmapped"] = {key: _to_histogram(profile["unmapped"][key]) for key in UNMAPPED_KEYS}
+    result["errors"] = profile["errors"]
+    return result
+
+
+def profile_workflows(file_paths: Iterable[str], max_workers: int = None) -> Dict[str, Any]:
+    """
+    Profiles the workflows on a process pool and returns the merged profile.
+
+    With a single worker, or fewer workflows than sent at once to a worker, the workflows
+    are profiled in the current process.
+    """
+    file_paths = list(file_paths)
+    if max_workers == 1 or len(file_paths) <= CHUNK_SIZE:
+        return merge_profiles(profile_workflow(path) for path in file_paths)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return merge_profiles(executor.map(profile_workflow, file_paths, chunksize=CHUNK_SIZE))
+
+
+def profile_directory(
+    input_directory_path: str, output_file_path: str = None, max_workers: int = None
+) -> Dict[str, Any]:
+    """
+    Profiles all workflows under the directory and writes the profile as JSON.
+
+    :param output_file_path: JSON file the profile is written to, not written if not given.
+    :return: The profile in the form written to the file.
+    """
+    file_paths = find_workflows(input_directory_path)
+    logging.info(f"Profiling {len(file_paths)} workflows in {input_directory_path}")
+    result = to_json(profile_workflows(file_paths, max_workers=max_workers))
+    for file_path, error in result["errors"].items():
+        logging.warning(f"Could not parse {file_path}: {error}")
+    if output_file_path:
+        os.makedirs(os.path.dirname(os.path.abspath(output_file_path)), exist_ok=True)
+        with open(output_file_path, "w") as file:
+            json.dump(result, file, indent=4)
+        logging.info(f"Wrote the profile to {output_file_path}")
+    return result
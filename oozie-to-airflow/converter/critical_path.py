@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Critical path analysis of the parsed workflow graph"""
+import json
+import math
+from typing import Any, Dict, List
+
+from converter.parsed_node import ParsedNode
+
+# Duration assumed for an action without a hint. Control nodes take no time.
+DEFAULT_ACTION_DURATION = 1.0
+CONTROL_NODE_TAGS = {"start", "end", "kill", "fork", "join", "decision"}
+
+
+def load_duration_hints(hints_file: str) -> Dict[str, float]:
+    """
+    Loads the duration hints file - a JSON object mapping action names to their expected durations.
+
+    Keys can be qualified with the DAG name (`<dag_name>.<action_name>`) when one file is used for many DAGs.
+    """
+    with open(hints_file) as file:
+        hints = json.load(file)
+    if not isinstance(hints, dict):
+        raise Exception(f"Duration hints file {hints_file} should contain a JSON object")
+    return {name: float(duration) for name, duration in hints.items()}
+
+
+def get_durations(
+    nodes: Dict[str, ParsedNode], dag_name: str = None, hints: Dict[str, float] = None
+) -> Dict[str, float]:
+    """
+    Returns the expected duration of each node, taken from the hints or assumed by the node type.
+    """
+    hints = hints or {}
+    durations = {}
+    for name, node in nodes.items():
+        default = 0.0 if node.mapper.oozie_node.tag in CONTROL_NODE_TAGS else DEFAULT_ACTION_DURATION
+        durations[name] = hints.get(f"{dag_name}.{name}", hints.get(name, default))
+    return durations
+
+
+def get_successors(nodes: Dict[str, ParsedNode], name: str) -> List[str]:
+    # Only the "ok" transitions are followed, the error ones are taken on failure only
+    return [downstream for downstream in nodes[name].get_downstreams() if downstream in nodes]
+
+
+def get_topological_order(nodes: Dict[str, ParsedNode]) -> List[str]:
+    """
+    Returns node names ordered so that every node follows all of its successors.
+    """
+    order: List[str] = []
+    visited: Dict[str, bool] = {}  # False while the node is on the stack, True once finished
+    for root in nodes:
+        if root in visited:
+            continue
+        visited[root] = False
+        stack = [(root, iter(get_successors(nodes, root)))]
+        while stack:
+            name, successors = stack[-1]
+            successor = next(successors, None)
+            if successor is None:
+                stack.pop()
+                visited[name] = True
+                order.append(name)
+            elif successor not in visited:
+                visited[successor] = False
+                stack.append((successor, iter(get_successors(nodes, successor))))
+            elif not visited[successor]:
+                raise Exception(f"The workflow contains a cycle through the node {successor}")
+    return order
+
+
+def get_remaining_durations(nodes: Dict[str, ParsedNode], durations: Dict[str, float]) -> Dict[str, float]:
+    """
+    Returns for every node the duration of the longest path starting at the node.
+    """
+    remaining: Dict[str, float] = {}
+    for name in get_topological_order(nodes):
+        successors = [remaining[successor] for successor in get_successors(nodes, name)]
+        remaining[name] = durations[name] + max(successors, default=0.0)
+    return remaining
+
+
+def get_critical_path(nodes: Dict[str, ParsedNode], remaining: Dict[str, float]) -> List[str]:
+    """
+    Returns the names of the nodes on the longest path of the workflow.
+    """
+    if not remaining:
+        return []
+    name = max(remaining, key=lambda name: remaining[name])
+    path = [name]
+    successors = get_successors(nodes, name)
+    while successors:
+        name = max(successors, key=lambda name: remaining[name])
+        path.append(name)
+        successors = get_successors(nodes, name)
+    return path
+
+
+def assign_priority_weights(
+    nodes: Dict[str, ParsedNode], dag_name: str = None, hints: Dict[str, float] = None
+) -> Dict[str, Any]:
+    """
+    Sets priority weights of the mappers to the length of the longest path starting at the task,
+    so that the scheduler runs tasks on the critical path first.
+
+    :return: The critical path (names of the nodes taking time) and its duration, for the conversion report.
+    """
+    durations = get_durations(nodes, dag_name, hints)
+    remaining = get_remaining_durations(nodes, durations)
+    for name, node in nodes.items():
+        node.mapper.priority_weight = max(1, math.ceil(remaining[name]))
+    path = get_critical_path(nodes, remaining)
+    return {
+        "critical_path": [name for name in path if durations[name] > 0],
+        "critical_path_duration": remaining[path[0]] if path else 0.0,
+    }
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Packaging of a converted DAG with its modules into a single zip file
+
+Airflow loads a zip file in the DAGs folder as a packaged DAG: python modules at the root of the
+archive are importable by the DAG file, so sub-DAG modules can be shipped together with it. Assets
+are read by the jobs from the DAGs folder by their URI, so they are kept next to the archive.
+"""
+import functools
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, Optional
+
+CHUNK_SIZE = 1024 * 1024
+# Fixed modification time of the archived files, so that the same content gives the same archive
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+DIGEST_PREFIX = b"o2a-sha256:"
+
+
+def is_module(name: str) -> bool:
+    """
+    Returns true if the file is a python module, which is packaged.
+    """
+    return name.endswith(".py")
+
+
+def find_files(directory_path: str) -> Dict[str, str]:
+    """
+    Returns paths of all files in the directory by their path in the archive.
+    """
+    files = {}
+    for dir_path, dir_names, file_names in os.walk(directory_path):
+        dir_names[:] = sorted(name for name in dir_names if name != "__pycache__")
+        for file_name in file_names:
+            file_path = os.path.join(dir_path, file_name)
+            files[os.path.relpath(file_path, directory_path).replace(os.sep, "/")] = file_path
+    return files
+
+
+def get_digest(files: Dict[str, str]) -> bytes:
+    """
+    Returns the digest of names and contents of the files, read in chunks.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(name.encode() + b"\0")
+        with open(files[name], "rb") as file:
+            for chunk in iter(functools.partial(file.read, CHUNK_SIZE), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return DIGEST_PREFIX + digest.hexdigest().encode()
+
+
+def read_digest(zip_path: str) -> Optional[bytes]:
+    """
+    Returns the digest stored in the comment of an existing archive, if any.
+    """
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            return archive.comment
+    except (OSError, zipfile.BadZipFile):
+        return None
+
+
+def package_files(zip_path: str, files: Dict[str, str]) -> bool:
+    """
+    Writes the files to the zip file, unless it already contains the same content.
+
+    The files are streamed into a temporary archive, which then replaces the previous one, so
+    the scheduler never reads a partially written archive.
+
+    :return: True if the archive has been written.
+    """
+    digest = get_digest(files)
+    if read_digest(zip_path) == digest:
+        logging.info(f"Package {zip_path} is up to date")
+        return False
+    file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(zip_path)))
+    try:
+        with os.fdopen(file_descriptor, "wb") as temp_file:
+            with zipfile.ZipFile(temp_file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for name in sorted(files):
+                    info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    info.external_attr = 0o644 << 16
+                    with open(files[name], "rb") as source, archive.open(info, "w") as target:
+                        shutil.copyfileobj(source, target, CHUNK_SIZE)
+                archive.comment = digest
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, zip_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    logging.info(f"Saving package to file: {zip_path}")
+    return True
+
+
+def package_directory(zip_path: str, directory_path: str) -> bool:
+    """
+    Writes the python modules of the directory to the zip file, unless it already contains the same content.
+
+    Other files, such as scripts read by the jobs from the DAGs folder, have to stay next to the package.
+    """
+    files = find_files(directory_path)
+    return package_files(zip_path, {name: path for name, path in files.items() if is_module(name)})
+
+
+def move_assets(directory_path: str, target_directory_path: str) -> None:
+    """
+    Moves the files of the directory other than python modules to the target directory, keeping their
+    paths relative to the directory.
+    """
+    for name, path in find_files(directory_path).items():
+        if is_module(name):
+            continue
+        target_path = os.path.join(target_directory_path, *name.split("/"))
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        # Replaced rather than written through, it may be linked to the source of the asset
+        if os.path.lexists(target_path):
+            os.remove(target_path)
+        logging.info(f"Moving asset to {target_path}")
+        shutil.move(path, target_path)
@@ -14,8 +14,11 @@
 # limitations under the License.
 """Converts Oozie application workflow into Airflow's DAG
 """
+import io
+import re
 import shutil
-from typing import Dict, TextIO, Type, Set
+import tempfile
+from typing import Any, Dict, List, Optional, TextIO, Tuple, Type, Set
 
 import os
 import json
@@ -23,18 +26,41 @@ import json
 import textwrap
 import logging
 
-from converter import parser
+from converter import (
+    asset_copier,
+    cluster_assignment,
+    compile_check,
+    concurrency,
+    critical_path,
+    dag_packager,
+    parser,
+    spec_writer,
+)
 from converter.parsed_node import ParsedNode
-from converter.primitives import Relation
+from converter.primitives import ConversionOptions, Relation, SnippetLocation
 from mappers.action_mapper import ActionMapper
 from mappers.base_mapper import BaseMapper
-from utils import el_utils
+from mappers.pig_chain_mapper import PigChainMapper
+from mappers.prepare_mixin import PrepareMixin
+from utils import el_utils, params_utils
 from utils.template_utils import render_template
 
 INDENT = 4
+# Module with params and helpers shared by all DAGs converted in one batch
+SHARED_MODULE_NAME = "o2a_shared"
+# Module building DAGs from all the specs in the DAGs folder, written with the "spec" output format
+SPEC_LOADER_MODULE_NAME = "o2a_spec_dags"
+OUTPUT_FORMATS = ["py", "spec"]
+# Calls of the Jinja macros of the wf: EL functions in the templated fields of the tasks
+WF_MACRO_MATCH = re.compile(r"{{[^}]*(?<![\w.])wf_\w+\(")
+WF_MACROS_IMPORT = "from o2a_libs import el_wf_functions"
+# Calls of the functions of the EL operators, in the python code and in the templated fields of the tasks
+OPERATORS_MATCH = re.compile(r"(?<![\w.])el_operators\.")
+OPERATORS_MACRO_MATCH = re.compile(r"{{[^}]*(?<![\w.])el_operators\.")
+OPERATORS_IMPORT = "from o2a_libs import el_operators"
 
 
-class OozieConverter:
+class OozieConverter:  # pylint: disable=too-many-public-methods
     """Converts Oozie Workflow app to Airflow's DAG
     """
 
@@ -48,6 +74,7 @@ class OozieConverter:
         user: str = None,
         start_days_ago: int = None,
         schedule_interval: str = None,
+        options: ConversionOptions = None,
     ):
         """
         :param input_directory_path: Oozie workflow directory.
@@ -56,6 +83,9 @@ class OozieConverter:
         :param start_days_ago: Desired DAG start date, expressed as number of days ago from the present day
         :param schedule_interval: Desired DAG schedule interval, expressed as number of days
         :param dag_name: Desired output DAG name.
+        :param options: Options of the conversion. With package, the DAG and its sub-DAG modules are
+            written into a single <dag_name>.zip file, rewritten only when its content changes, and the
+            assets are written next to it. The output directory is then not recreated.
         """
         # Each OozieParser class corresponds to one workflow, where one can get
         # the workflow's required dependencies (imports), operator relations,
@@ -65,9 +95,26 @@ class OozieConverter:
         self.start_days_ago = start_days_ago
         self.schedule_interval = schedule_interval
         self.dag_name = dag_name
-        self.configuration_properties_file = os.path.join(input_directory_path, "configuration.properties")
-        self.job_properties_file = os.path.join(input_directory_path, "job.properties")
-        self.output_dag_name = os.path.join(output_directory_path, self.dag_name) + ".py"
+        options = options or ConversionOptions()
+        if options.output_format not in OUTPUT_FORMATS:
+            raise Exception(
+                f"Unknown output format {options.output_format}, should be one of {OUTPUT_FORMATS}"
+            )
+        if options.package and options.output_format != "py":
+            raise Exception("Only python DAG files can be packaged")
+        self.options = options._replace(
+            priority_weights=options.priority_weights or bool(options.duration_hints_file),
+            concurrency_limits=options.concurrency_limits
+            or bool(options.dag_concurrency)
+            or bool(options.pool_slots),
+        )
+        self.report: Dict[str, Any] = {}
+        # Directory the DAG, its report and pools are written to. With package, the files of the DAG are
+        # written to a staging directory first, then the modules are bundled into the package.
+        self.target_directory_path = output_directory_path
+        if options.package:
+            output_directory_path = tempfile.mkdtemp(prefix=f"o2a-{dag_name}-")
+            self.output_directory_path = output_directory_path
         params = {"user.name": user or os.environ["USER"]}
         params = self.add_properties_to_params(params)
         params = el_utils.parse_els(self.configuration_properties_file, params)
@@ -79,22 +126,254 @@ class OozieConverter:
             dag_name=dag_name,
             action_mapper=action_mapper,
             control_mapper=control_mapper,
+            merge_pig_chains=options.merge_pig_chains,
+        )
+
+    @property
+    def configuration_properties_file(self) -> str:
+        return os.path.join(self.input_directory_path, "configuration.properties")
+
+    @property
+    def job_properties_file(self) -> str:
+        return os.path.join(self.input_directory_path, "job.properties")
+
+    @property
+    def output_dag_name(self) -> str:
+        return os.path.join(self.output_directory_path, self.dag_name) + ".py"
+
+    @property
+    def output_spec_name(self) -> str:
+        return os.path.join(self.output_directory_path, self.dag_name) + ".spec.json"
+
+    @property
+    def output_package_name(self) -> str:
+        return os.path.join(self.target_directory_path, self.dag_name) + ".zip"
+
+    @property
+    def output_report_name(self) -> str:
+        return os.path.join(self.target_directory_path, self.dag_name) + ".report.json"
+
+    @property
+    def output_pools_name(self) -> str:
+        return self.options.pools_file or os.path.join(
+            self.target_directory_path, concurrency.POOLS_FILE_NAME
         )
 
+    @property
+    def concurrency_limit(self) -> Optional[int]:
+        """Concurrency of the DAG, set by assign_concurrency_limits"""
+        limit: Optional[int] = self.report.get("concurrency", {}).get("dag_concurrency")
+        return limit
+
+    @property
+    def pools(self) -> Dict[str, int]:
+        pools: Dict[str, int] = self.report.get("concurrency", {}).get("pools", {})
+        return pools
+
     def convert(self):
+        """
+        Parses the workflow, runs the optional analyses of its graph, then writes the assets, the DAG
+        file (or spec, or package), the pools and the conversion report.
+        """
+        folded_before = el_utils.FOLDING_STATISTICS["folded"]
         self.parser.parse_workflow()
+        if self.parser.resolved_decisions:
+            self.report["resolved_decisions"] = self.parser.resolved_decisions
         relations = self.parser.get_relations()
         depends = self.parser.get_dependencies()
         nodes = self.parser.get_nodes()
         self.parser.update_trigger_rules()
-        self._recreate_output_directory()
-        self.create_dag_file(nodes, depends, relations)
+        if self.options.merge_pig_chains:
+            self.report_pig_chains(nodes)
+        if self.options.batch_prepare:
+            self.enable_batch_prepare(nodes)
+        if self.options.priority_weights:
+            self.assign_priority_weights(nodes)
+        if self.options.dataproc_clusters:
+            self.assign_dataproc_clusters(nodes)
+        if self.options.concurrency_limits:
+            self.assign_concurrency_limits(nodes)
+        self.report_inlined_subworkflows(nodes)
+        self.configure_subworkflows(nodes)
+        if self.options.package:
+            os.makedirs(self.target_directory_path, exist_ok=True)
+        if self.options.recreate_output_directory:
+            self._recreate_output_directory()
+        else:
+            os.makedirs(self.output_directory_path, exist_ok=True)
+        try:
+            self.copy_assets(nodes)
+            self.create_dag_file(nodes, depends, relations)
+            if self.options.package:
+                self.write_package()
+        finally:
+            if self.options.package:
+                shutil.rmtree(self.output_directory_path, ignore_errors=True)
+        self.write_pools()
+        self.report_folded_expressions(folded_before)
+        self.write_report()
+
+    def copy_assets(self, nodes: Dict[str, ParsedNode]):
+        """
+        Writes the assets required by all tasks of the DAG to the output directory, then generates
+        the other files of the mappers - such as sub-DAG modules. Done before the DAG file is written,
+        so that no DAG referencing missing files is left behind when it fails.
+        """
+        assets = [
+            asset for node in nodes.values() for asset in node.mapper.get_assets(self.input_directory_path)
+        ]
+        statistics = asset_copier.copy_assets(assets, self.output_directory_path)
+        if statistics:
+            logging.info(f"Wrote assets: {statistics}")
+        for node in nodes.values():
+            node.mapper.copy_extra_assets(
+                input_directory_path=self.input_directory_path,
+                output_directory_path=self.output_directory_path,
+            )
 
     def _recreate_output_directory(self):
-        shutil.rmtree(self.output_directory_path, ignore_errors=True)
-        os.makedirs(self.output_directory_path, exist_ok=True)
+        self.recreate_directory(self.output_directory_path)
+
+    @staticmethod
+    def recreate_directory(directory_path: str):
+        shutil.rmtree(directory_path, ignore_errors=True)
+        os.makedirs(directory_path, exist_ok=True)
+
+    def write_package(self):
+        """
+        Bundles the staged python modules of the DAG into the package, after checking that they compile.
+
+        The other staged files, such as Pig scripts, are read by the jobs from gcp_uri_prefix - the DAGs
+        folder - so they are moved next to the package.
+        """
+        compile_check.check_directory(self.output_directory_path, max_workers=1)
+        dag_packager.package_directory(self.output_package_name, self.output_directory_path)
+        dag_packager.move_assets(self.output_directory_path, self.target_directory_path)
+
+    @staticmethod
+    def enable_batch_prepare(nodes: Dict[str, ParsedNode]):
+        """
+        Switches all mappers supporting prepare nodes to the batched prepare mode.
+        """
+        for node in nodes.values():
+            if isinstance(node.mapper, PrepareMixin):
+                node.mapper.batch_prepare = True
+
+    def get_subworkflow_converter_options(self) -> ConversionOptions:
+        """
+        Returns the conversion options which apply to the sub-workflows as well. The sub-DAGs are written
+        as python modules next to the DAG, and their pools to the pools file of the DAG.
+        """
+        return self.options._replace(
+            recreate_output_directory=False,
+            output_format="py",
+            package=False,
+            max_active_runs=None,
+            pools_file=self.output_pools_name,
+        )
+
+    def configure_subworkflows(self, nodes: Dict[str, ParsedNode]):
+        """
+        Passes the conversion options to mappers converting sub-workflows.
+        """
+        for node in nodes.values():
+            if hasattr(node.mapper, "converter_options"):
+                node.mapper.converter_options = self.get_subworkflow_converter_options()
+
+    def report_inlined_subworkflows(self, nodes: Dict[str, ParsedNode]):
+        """
+        Lists the inlined sub-workflows with the options of the parent graph their tasks are left out of.
+        """
+        skipped = [
+            option
+            for option, enabled in [
+                ("priority_weights", self.options.priority_weights),
+                ("concurrency_limits", self.options.concurrency_limits),
+                ("dataproc_clusters", bool(self.options.dataproc_clusters)),
+                ("merge_pig_chains", self.options.merge_pig_chains),
+            ]
+            if enabled
+        ]
+        inlined = {
+            name: {"tasks": len(node.mapper.sub_parser.get_nodes()), "not_applied": skipped}
+            for name, node in nodes.items()
+            if hasattr(node.mapper, "sub_parser")
+        }
+        if inlined and skipped:
+            self.report["inlined_subworkflows"] = inlined
+
+    def report_pig_chains(self, nodes: Dict[str, ParsedNode]):
+        """
+        Lists the Pig actions run by each merged Pig job, in the order of their steps.
+        """
+        chains = {
+            name: node.mapper.step_names
+            for name, node in nodes.items()
+            if isinstance(node.mapper, PigChainMapper)
+        }
+        if chains:
+            self.report["pig_chains"] = chains
+
+    def report_folded_expressions(self, folded_before: int):
+        """Reports the number of the EL expressions evaluated at conversion time, sub-workflows included."""
+        folded = el_utils.FOLDING_STATISTICS["folded"] - folded_before
+        if folded:
+            self.report["folded_el_expressions"] = folded
+
+    def assign_priority_weights(self, nodes: Dict[str, ParsedNode]):
+        """
+        Sets priority weights of the tasks so that the critical path of the workflow is scheduled first.
+        """
+        hints = self.load_duration_hints()
+        self.report.update(critical_path.assign_priority_weights(nodes, dag_name=self.dag_name, hints=hints))
+
+    def assign_dataproc_clusters(self, nodes: Dict[str, ParsedNode]):
+        """
+        Spreads the Dataproc jobs of parallel fork branches across the clusters.
+        """
+        hints = self.load_duration_hints()
+        self.report.update(
+            cluster_assignment.assign_clusters(
+                nodes, self.options.dataproc_clusters or [], dag_name=self.dag_name, hints=hints
+            )
+        )
+
+    def load_duration_hints(self) -> Optional[Dict[str, float]]:
+        if not self.options.duration_hints_file:
+            return None
+        return critical_path.load_duration_hints(self.options.duration_hints_file)
+
+    def assign_concurrency_limits(self, nodes: Dict[str, ParsedNode]):
+        """
+        Assigns the cluster pools to the tasks and sets the concurrency of the DAG from the widest fork.
+        Each of the active runs may run its widest fork, so the concurrency is only computed when the
+        number of active runs is limited, otherwise the concurrency of Airflow is kept.
+        """
+        report = concurrency.assign_pools(nodes, pool_slots=self.options.pool_slots)
+        dag_concurrency = self.options.dag_concurrency
+        if not dag_concurrency and self.options.max_active_runs:
+            dag_concurrency = max(1, report["max_fork_width"]) * self.options.max_active_runs
+        if dag_concurrency:
+            report["dag_concurrency"] = dag_concurrency
+        self.report["concurrency"] = report
 
-    def add_properties_to_params(self, params: Dict[str, str]):
+    def write_pools(self):
+        if not self.pools:
+            return
+        logging.info(f"Saving pools to file: {self.output_pools_name}")
+        concurrency.write_pools_file(self.output_pools_name, self.pools)
+
+    def write_report(self):
+        """
+        Writes the conversion report, if any of the enabled conversion steps reported something.
+        """
+        if not self.report:
+            return
+        with open(self.output_report_name, "w") as file:
+            logging.info(f"Saving conversion report to file: {self.output_report_name}")
+            json.dump(self.report, file, indent=INDENT)
+
+    def add_properties_to_params(self, params: Dict[str, str]) -> Dict[str, str]:
         """
         Template method, can be overridden.
         """
@@ -110,38 +389,179 @@ class OozieConverter:
         :param relations: A list of Relation corresponding to operator relations
         """
         file_name = self.output_dag_name
+        content = io.StringIO()
+        snippets = self.write_dag(depends, content, nodes, relations)
+        if self.options.output_format == "spec":
+            try:
+                spec = spec_writer.dag_code_to_spec(content.getvalue())
+            except spec_writer.UnsupportedExpressionException as ex:
+                logging.warning(
+                    f"The DAG {self.dag_name} cannot be described by a spec ({ex}), writing it as code."
+                )
+            else:
+                logging.info(f"Saving spec to file: {self.output_spec_name}")
+                spec_writer.write_spec(self.output_spec_name, spec)
+                self.write_spec_loader(self.output_directory_path)
+                return
         with open(file_name, "w") as file:
             logging.info(f"Saving to file: {file_name}")
-            self.write_dag(depends, file, nodes, relations)
+            file.write(content.getvalue())
+        compile_check.register_source_map(file_name, self.get_source_map(content.getvalue(), snippets))
+
+    @staticmethod
+    def get_source_map(content: str, snippets: List[Tuple[BaseMapper, str]]) -> List[SnippetLocation]:
+        """
+        Returns lines of the generated file written by each mapper.
+
+        :param snippets: The mappers with the code they wrote, as returned by write_nodes.
+        """
+        locations = []
+        position = 0
+        for mapper, snippet in snippets:
+            index = content.find(snippet, position)
+            if index < 0 or not snippet:
+                continue
+            first_line = content.count("\n", 0, index) + 1
+            locations.append(
+                SnippetLocation(
+                    first_line=first_line,
+                    last_line=first_line + snippet.rstrip("\n").count("\n"),
+                    task_id=mapper.name,
+                    mapper_name=type(mapper).__name__,
+                )
+            )
+            position = index + len(snippet)
+        return locations
 
     def write_dag(
         self, depends: Set[str], file: TextIO, nodes: Dict[str, ParsedNode], relations: Set[Relation]
-    ):
+    ) -> List[Tuple[BaseMapper, str]]:
         """
-        Template method, can be overridden.
+        Template method, can be overridden. Returns the snippets written by write_nodes.
         """
-        self.write_dependencies(file, depends)
-        file.write("PARAMS = " + json.dumps(self.params, indent=INDENT) + "\n\n")
-        self.write_dag_header(file, self.dag_name, self.schedule_interval, self.start_days_ago)
-        self.write_nodes(file, nodes)
+        nodes_file = io.StringIO()
+        snippets = self.write_nodes(nodes_file, nodes)
+        nodes_text = nodes_file.getvalue()
+        self.write_dependencies(file, sorted(self.get_dag_dependencies(depends, nodes_text)))
+        self.write_params(file, self.get_dag_params(nodes_text))
+        self.write_dag_header(
+            file,
+            self.dag_name,
+            self.schedule_interval,
+            self.start_days_ago,
+            dag_concurrency=self.concurrency_limit,
+            max_active_runs=self.options.max_active_runs,
+            user_defined_macros=self.get_user_defined_macros(nodes_text),
+        )
+        file.write(nodes_text)
         file.write("\n\n")
-        self.write_relations(file, relations)
+        self.write_relations(file, sorted(relations))
+        return snippets
 
-    def write_nodes(self, file: TextIO, nodes: Dict[str, ParsedNode], indent: int = INDENT):
+    def get_dag_params(self, nodes_text: str) -> Dict[str, str]:
+        """
+        Returns the params written to the DAG - all of them, or the referenced ones if pruning is enabled.
+
+        :param nodes_text: The generated code of all tasks of the DAG.
+        """
+        if not self.options.prune_params:
+            return self.params
+        referenced = params_utils.find_referenced_params(nodes_text, self.params)
+        if referenced is None:
+            logging.warning(f"PARAMS of {self.dag_name} are used as a whole, they will not be pruned.")
+            referenced = set(self.params)
+        dag_params = {key: value for key, value in self.params.items() if key in referenced}
+        self.report["params"] = {"total": len(self.params), "emitted": len(dag_params)}
+        return dag_params
+
+    def uses_shared_params(self) -> bool:
+        """
+        Returns whether the DAG takes params from the shared module - only if it has all of the shared params.
+        """
+        shared_params = self.options.shared_params
+        if not shared_params:
+            return False
+        return all(self.params.get(key) == value for key, value in shared_params.items())
+
+    def get_dag_dependencies(self, depends: Set[str], nodes_text: str = "") -> Set[str]:
+        if WF_MACRO_MATCH.search(nodes_text):
+            depends = {*depends, WF_MACROS_IMPORT}
+        if OPERATORS_MATCH.search(nodes_text):
+            depends = {*depends, OPERATORS_IMPORT}
+        if self.uses_shared_params():
+            return {*depends, f"import {SHARED_MODULE_NAME}"}
+        return depends
+
+    @staticmethod
+    def get_user_defined_macros(nodes_text: str) -> Optional[str]:
+        """
+        Returns the code of the Jinja macros of the DAG - the wf: EL functions and the module of the EL
+        operators if the templated fields of the tasks call them, None otherwise.
+
+        :param nodes_text: The generated code of all tasks of the DAG.
+        """
+        wf_macros = WF_MACRO_MATCH.search(nodes_text)
+        if not OPERATORS_MACRO_MATCH.search(nodes_text):
+            return "el_wf_functions.MACROS" if wf_macros else None
+        if wf_macros:
+            return "dict(el_wf_functions.MACROS, el_operators=el_operators)"
+        return "dict(el_operators=el_operators)"
+
+    def write_params(self, file: TextIO, params: Dict[str, str]):
+        if not self.uses_shared_params():
+            file.write("PARAMS = " + json.dumps(params, indent=INDENT) + "\n\n")
+            return
+        shared_params = self.options.shared_params or {}
+        local_params = {key: value for key, value in params.items() if key not in shared_params}
+        file.write(
+            f"PARAMS = {SHARED_MODULE_NAME}.merge_params("
+            + json.dumps(local_params, indent=INDENT)
+            + ")\n\n"
+        )
+
+    @staticmethod
+    def write_spec_loader(output_directory_path: str):
+        """
+        Writes the module building DAGs from the specs in the output directory.
+        """
+        file_name = os.path.join(output_directory_path, SPEC_LOADER_MODULE_NAME + ".py")
+        with open(file_name, "w") as file:
+            file.write(render_template(template_name="spec_dags.tpl") + "\n")
+
+    @staticmethod
+    def write_shared_module(output_directory_path: str, shared_params: Dict[str, str]):
+        """
+        Writes the module with params and helpers shared by all DAGs in the output directory.
+        """
+        file_name = os.path.join(output_directory_path, SHARED_MODULE_NAME + ".py")
+        with open(file_name, "w") as file:
+            logging.info(f"Saving shared module to file: {file_name}")
+            file.write(
+                render_template(
+                    template_name="shared_module.tpl", shared_params=json.dumps(shared_params, indent=INDENT)
+                )
+                + "\n"
+            )
+
+    @staticmethod
+    def write_nodes(
+        file: TextIO, nodes: Dict[str, ParsedNode], indent: int = INDENT
+    ) -> List[Tuple[BaseMapper, str]]:
         """
         Writes the Airflow tasks to the given opened file object.
 
         :param file: The file pointer to write to.
         :param nodes: Dictionary of {'task_id', ParsedNode}
         :param indent: integer of how many spaces to indent entire operator
+        :return: The mappers with the code they wrote, used to build the source map of the file.
         """
+        snippets = []
         for node in nodes.values():
-            file.write(textwrap.indent(node.mapper.convert_to_text(), indent * " "))
+            snippet = textwrap.indent(node.mapper.convert_to_text(), indent * " ")
+            snippets.append((node.mapper, snippet))
+            file.write(snippet)
             logging.info(f"Wrote tasks corresponding to the action named: {node.mapper.name}")
-            node.mapper.copy_extra_assets(
-                input_directory_path=self.input_directory_path,
-                output_directory_path=self.output_directory_path,
-            )
+        return snippets
 
     @staticmethod
     def write_relations(file, relations, indent=INDENT):
@@ -166,7 +586,16 @@ class OozieConverter:
         file.write("\n\n")
 
     @staticmethod
-    def write_dag_header(file, dag_name, schedule_interval, start_days_ago, template="dag.tpl"):
+    def write_dag_header(
+        file,
+        dag_name,
+        schedule_interval,
+        start_days_ago,
+        template="dag.tpl",
+        dag_concurrency=None,
+        max_active_runs=None,
+        user_defined_macros=None,
+    ):
         """
         Write the DAG header to the open file specified in the file pointer
         :param file: Opened file to write to.
@@ -174,6 +603,9 @@ class OozieConverter:
         :param schedule_interval: Desired DAG schedule interval, expressed as number of days
         :param start_days_ago: Desired DAG start date, expressed as number of days ago from the present day
         :param template: Desired template to use when creating the DAG header.
+        :param dag_concurrency: Maximum number of running tasks of the DAG, not limited if not set.
+        :param max_active_runs: Maximum number of active DAG runs, not limited if not set.
+        :param user_defined_macros: Code of the dictionary of the Jinja macros of the DAG, if any.
         """
 
         file.write(
@@ -182,6 +614,9 @@ class OozieConverter:
                 dag_name=dag_name,
                 schedule_interval=schedule_interval,
                 start_days_ago=start_days_ago,
+                concurrency=dag_concurrency,
+                max_active_runs=max_active_runs,
+                user_defined_macros=user_defined_macros,
             )
         )
         logging.info("Wrote DAG header.")
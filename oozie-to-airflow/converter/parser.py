@@ -26,8 +26,9 @@ from typing import Type, Dict, Set
 
 from airflow.utils.trigger_rule import TriggerRule
 import utils.xml_utils
+from converter import constant_decisions, pig_chains
 from converter.parsed_node import ParsedNode
-from converter.primitives import Relation, Workflow
+from converter.primitives import BASE_DEPENDENCIES, Relation, Workflow
 from mappers.action_mapper import ActionMapper
 from mappers.base_mapper import BaseMapper
 
@@ -48,7 +49,14 @@ class OozieParser:
         action_mapper: Dict[str, Type[ActionMapper]],
         control_mapper: Dict[str, Type[BaseMapper]],
         dag_name: str = None,
+        task_id_prefix: str = "",
+        merge_pig_chains: bool = False,
     ):
+        """
+        :param task_id_prefix: Prefix added to names of all nodes, so that the tasks of the workflow
+            can be embedded in another DAG without task_id conflicts.
+        :param merge_pig_chains: Run each linear chain of Pig actions as a single Pig job.
+        """
         self.workflow = Workflow(
             dag_name=dag_name,
             input_directory_path=input_directory_path,
@@ -58,6 +66,10 @@ class OozieParser:
         self.params = params
         self.action_map = action_mapper
         self.control_map = control_mapper
+        self.task_id_prefix = task_id_prefix
+        self.merge_pig_chains = merge_pig_chains
+        # Transitions of the decision nodes resolved at conversion time, see constant_decisions
+        self.resolved_decisions: Dict[str, str] = {}
 
     def parse_kill_node(self, kill_node: ET.Element):
         """
@@ -66,7 +78,10 @@ class OozieParser:
         """
         map_class = self.control_map["kill"]
         mapper = map_class(
-            oozie_node=kill_node, name=kill_node.attrib["name"], trigger_rule=TriggerRule.ONE_FAILED
+            oozie_node=kill_node,
+            name=kill_node.attrib["name"],
+            trigger_rule=TriggerRule.ONE_FAILED,
+            params=self.params,
         )
         p_node = ParsedNode(mapper)
 
@@ -174,7 +189,7 @@ class OozieParser:
         </decision>
         """
         map_class = self.control_map["decision"]
-        mapper = map_class(oozie_node=decision_node, name=decision_node.attrib["name"])
+        mapper = map_class(oozie_node=decision_node, name=decision_node.attrib["name"], params=self.params)
 
         p_node = ParsedNode(mapper)
         for cases in decision_node[0]:
@@ -209,6 +224,8 @@ class OozieParser:
             dag_name=self.workflow.dag_name,
             input_directory_path=self.workflow.input_directory_path,
             output_directory_path=self.workflow.output_directory_path,
+            action_mapper=self.action_map,
+            control_mapper=self.control_map,
         )
 
         p_node = ParsedNode(mapper)
@@ -240,7 +257,7 @@ class OozieParser:
         """
         map_class = self.control_map["start"]
         # Theoretically this could cause conflicts, but it is very unlikely
-        start_name = "start_node_" + str(uuid.uuid4())[:4]
+        start_name = self.task_id_prefix + "start_node_" + str(uuid.uuid4())[:4]
         mapper = map_class(oozie_node=start_node, name=start_name)
 
         p_node = ParsedNode(mapper)
@@ -285,14 +302,9 @@ class OozieParser:
             node.tag = node.tag.split("}")[1][0:]
 
             # Change names to python syntax
-            if "name" in node.attrib:
-                node.attrib["name"] = node.attrib["name"].replace("-", "_")
-            if "to" in node.attrib:
-                node.attrib["to"] = node.attrib["to"].replace("-", "_")
-            if "error" in node.attrib:
-                node.attrib["error"] = node.attrib["error"].replace("-", "_")
-            if "start" in node.attrib:
-                node.attrib["start"] = node.attrib["start"].replace("-", "_")
+            for attribute in ("name", "to", "error", "start"):
+                if attribute in node.attrib:
+                    node.attrib[attribute] = self.task_id_prefix + node.attrib[attribute].replace("-", "_")
 
         logging.info("Stripped namespaces, and replaced invalid characters.")
 
@@ -300,6 +312,18 @@ class OozieParser:
             logging.debug(f"Parsing node: {node}")
             self.parse_node(root, node)
 
+        self.resolved_decisions = constant_decisions.resolve_decisions(self.workflow.nodes)
+        for name, transition in self.resolved_decisions.items():
+            logging.info(f"Decision {name} always transitions to {transition}, removed it.")
+        if self.resolved_decisions:
+            # The imports of the removed nodes are not needed anymore
+            self.workflow.dependencies = set(BASE_DEPENDENCIES).union(
+                *(node.mapper.required_imports() for node in self.workflow.nodes.values())
+            )
+
+        if self.merge_pig_chains:
+            pig_chains.merge_chains(self.workflow.nodes)
+
         self.create_relations()
 
         for node in self.workflow.nodes.values():
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Merging of linear chains of Pig actions into single Pig jobs"""
+import collections
+from typing import Dict, List, Optional, cast
+
+from converter.parsed_node import ParsedNode
+from mappers.pig_chain_mapper import PigChainMapper
+from mappers.pig_mapper import PigMapper
+
+
+def _get_mergeable_mapper(node: ParsedNode) -> Optional[PigMapper]:
+    mapper = node.mapper
+    # Subclasses may render differently. Files and archives are set up for the whole job,
+    # so steps using them are not merged.
+    is_pig = type(mapper) is PigMapper  # pylint: disable=unidiomatic-typecheck
+    if not is_pig or not isinstance(mapper, PigMapper) or mapper.files or mapper.archives:
+        return None
+    return mapper
+
+
+def _is_mergeable(node: ParsedNode) -> bool:
+    return _get_mergeable_mapper(node) is not None
+
+
+def _can_follow(node: ParsedNode, next_node: ParsedNode, inbound: Dict[str, int]) -> bool:
+    mapper = _get_mergeable_mapper(node)
+    next_mapper = _get_mergeable_mapper(next_node)
+    return (
+        mapper is not None
+        and next_mapper is not None
+        and inbound[next_mapper.name] == 1
+        and node.get_error_downstream_name() == next_node.get_error_downstream_name()
+        and mapper.properties == next_mapper.properties
+        and mapper.dataproc_cluster == next_mapper.dataproc_cluster
+    )
+
+
+def find_chains(nodes: Dict[str, ParsedNode]) -> List[List[str]]:
+    """
+    Returns the names of the nodes of each chain of at least two Pig actions, where every action
+    is the only "ok" downstream of the previous one and has no other upstream. The actions of a chain
+    share the error transition, the configuration and the cluster.
+    """
+    inbound: Dict[str, int] = collections.Counter()
+    for node in nodes.values():
+        for name in node.get_downstreams():
+            inbound[name] += 1
+        error_name = node.get_error_downstream_name()
+        if error_name:
+            inbound[error_name] += 1
+
+    def get_next(name: str):
+        downstreams = nodes[name].get_downstreams()
+        if len(downstreams) == 1 and downstreams[0] in nodes:
+            if _can_follow(nodes[name], nodes[downstreams[0]], inbound):
+                return downstreams[0]
+        return None
+
+    followers = {get_next(name) for name in nodes if _is_mergeable(nodes[name])}
+    chains = []
+    for name, node in nodes.items():
+        if not _is_mergeable(node) or name in followers:
+            continue
+        chain = [name]
+        next_name = get_next(name)
+        while next_name and next_name not in chain:
+            chain.append(next_name)
+            next_name = get_next(next_name)
+        if len(chain) > 1:
+            chains.append(chain)
+    return chains
+
+
+def merge_chains(nodes: Dict[str, ParsedNode]) -> List[List[str]]:
+    """
+    Replaces each chain of Pig actions with a single node running all of them, named after the first
+    action of the chain, so that the transitions to the chain stay valid.
+
+    :return: The merged chains.
+    """
+    chains = find_chains(nodes)
+    merged: Dict[str, ParsedNode] = {}
+    removed = set()
+    for chain in chains:
+        last_node = nodes[chain[-1]]
+        # All actions of a chain are mergeable, so they are mapped by PigMapper
+        steps = [cast(PigMapper, nodes[name].mapper) for name in chain]
+        node = ParsedNode(PigChainMapper(steps=steps))
+        for downstream_name in last_node.get_downstreams():
+            node.add_downstream_node_name(downstream_name)
+        error_name = last_node.get_error_downstream_name()
+        if error_name:
+            node.set_error_node_name(error_name)
+        merged[chain[0]] = node
+        removed.update(chain[1:])
+    for name in list(nodes):
+        node = nodes.pop(name)
+        if name not in removed:
+            nodes[name] = merged.get(name, node)
+    return chains
@@ -14,7 +14,7 @@
 # limitations under the License.
 """Class for Airflow relation"""
 from collections import OrderedDict
-from typing import Set, Optional, Dict, NamedTuple
+from typing import Set, Optional, Dict, List, NamedTuple
 
 # Pylint and flake8 does not understand forward references
 # https://www.python.org/dev/peps/pep-0484/#forward-references
@@ -28,6 +28,74 @@ class Relation(NamedTuple):
     to_task_id: str
 
 
+class SnippetLocation(NamedTuple):
+    """Lines of the generated file written by a single mapper"""
+
+    first_line: int
+    last_line: int
+    task_id: str
+    mapper_name: str
+
+
+class Asset(NamedTuple):
+    """File required by the generated DAG, written to the output directory"""
+
+    # Path of the file relative to the output directory
+    destination_name: str
+    # File copied, after the header
+    source_path: Optional[str] = None
+    header: str = ""
+    # Generated content of the file, written instead of a source file
+    content: Optional[str] = None
+
+
+class ConversionOptions(NamedTuple):
+    """Options of the conversion, shared by the converters of a batch and of the sub-workflows"""
+
+    # Run all prepare steps of an action as a single Dataproc job
+    batch_prepare: bool = False
+    # Remove the content of the output directory before writing the DAG
+    recreate_output_directory: bool = True
+    # Set priority weights of tasks from the critical path analysis
+    priority_weights: bool = False
+    # JSON file with expected durations of actions, implies priority_weights
+    duration_hints_file: Optional[str] = None
+    # Write to PARAMS only the keys referenced by the generated tasks
+    prune_params: bool = False
+    # Write the params shared by all applications of a batch to a common module imported by the DAGs
+    shared_module: bool = False
+    # Params defined in the shared module, the DAG writes only its other params
+    shared_params: Optional[Dict[str, str]] = None
+    # Compile all generated files and fail if any does not compile
+    compile_check_output: bool = False
+    # Write the compiled files to __pycache__, implies compile_check_output
+    write_pyc: bool = False
+    # "py" for python DAG files, "spec" for DAG specs built by a loader module
+    output_format: str = "py"
+    # Write the python modules of each DAG into a single zip file
+    package: bool = False
+    # Limit the concurrency of the DAG and run the cluster jobs in pools sized by the widest forks
+    concurrency_limits: bool = False
+    # Concurrency of the DAG replacing the computed one, implies concurrency_limits
+    dag_concurrency: Optional[int] = None
+    # Maximum number of active DAG runs
+    max_active_runs: Optional[int] = None
+    # Cluster pool slots replacing the computed ones, implies concurrency_limits
+    pool_slots: Optional[int] = None
+    # File the pools are written to, defaults to o2a_pools.json in the output directory
+    pools_file: Optional[str] = None
+    # Dataproc clusters the jobs of parallel fork branches are spread across
+    dataproc_clusters: Optional[List[str]] = None
+    # Run each linear chain of Pig actions as a single Pig job
+    merge_pig_chains: bool = False
+
+
+# Imports of every DAG, whatever its operators
+BASE_DEPENDENCIES = frozenset(
+    {"import datetime", "from airflow import models", "from airflow.utils.trigger_rule import TriggerRule"}
+)
+
+
 # This is a container for data, so it does not contain public methods intentionally.
 class Workflow:  # pylint: disable=too-few-public-methods
     """Class for Workflow"""
@@ -49,8 +117,4 @@ class Workflow:  # pylint: disable=too-few-public-methods
         self.nodes = OrderedDict()
         # These are the general dependencies required that every operator
         # requires.
-        self.dependencies = {
-            "import datetime",
-            "from airflow import models",
-            "from airflow.utils.trigger_rule import TriggerRule",
-        }
+        self.dependencies = set(BASE_DEPENDENCIES)
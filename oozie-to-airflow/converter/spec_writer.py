@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Converts the generated DAG code into a declarative DAG spec, loaded by o2a_libs.spec_loader
+
+The spec is a JSON object:
+
+    {
+        "version": 2,
+        "params": {...},
+        "dag": {"callable": ["airflow", "models", "DAG"], "args": [...], "kwargs": {...}},
+        "objects": [
+            {"name": "task", "callable": ["airflow.operators", "bash_operator", "BashOperator"], ...},
+            {"name": "task_decision", "decision": {"steps": [...], "cases": [[...], ...], "default": "..."}},
+        ],
+        "edges": [["task", "other_task"]],
+    }
+
+The callables are the paths of the objects imported by the generated code and the arguments are
+the values described in o2a_libs.spec_loader. The decision callables are described by the predicates
+of their cases. Code which cannot be described this way raises UnsupportedExpressionException.
+"""
+import ast
+import json
+from typing import Any, Dict, List, Optional
+
+from o2a_libs import spec_loader
+
+BINARY_OPERATORS = {
+    ast.Add: "+",
+    ast.Sub: "-",
+    ast.Mult: "*",
+    ast.Div: "/",
+    ast.FloorDiv: "//",
+    ast.Mod: "%",
+    ast.Pow: "**",
+}
+BOOLEAN_OPERATORS = {ast.And: "and", ast.Or: "or"}
+COMPARISON_OPERATORS = {
+    ast.Eq: "==",
+    ast.NotEq: "!=",
+    ast.Lt: "<",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.GtE: ">=",
+    ast.In: "in",
+    ast.NotIn: "not in",
+    ast.Is: "is",
+    ast.IsNot: "is not",
+}
+# Name of the keyword arguments of the decision callables, which receive the Airflow context
+CONTEXT_NAME = "context"
+
+# Paths of the objects imported by the generated code by the names they are bound to
+Imports = Dict[str, List[str]]
+
+
+class UnsupportedExpressionException(Exception):
+    """Raised for code the spec cannot describe"""
+
+
+def _is_json_literal(value: Any) -> bool:
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return True
+    if isinstance(value, list):
+        return all(_is_json_literal(element) for element in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_json_literal(element) for key, element in value.items())
+    return False
+
+
+def _contains_value_object(value: Any) -> bool:
+    if isinstance(value, list):
+        return any(_contains_value_object(element) for element in value)
+    if isinstance(value, dict):
+        return spec_loader.get_value_kind(value) is not None or any(
+            _contains_value_object(element) for element in value.values()
+        )
+    return False
+
+
+def _get_literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise UnsupportedExpressionException(f"{type(node).__name__} is not a literal")
+
+
+def _get_subscript_index(node: ast.Subscript) -> ast.AST:
+    # Python < 3.9 wraps the index in an Index node
+    index = node.slice.value if type(node.slice).__name__ == "Index" else node.slice  # type: ignore
+    if isinstance(index, ast.Slice):
+        raise UnsupportedExpressionException("Slice")
+    return index
+
+
+def add_import(statement: ast.stmt, imports: Imports) -> None:
+    """
+    Adds the names bound by the import statement, which must import from the trusted modules.
+    """
+    if isinstance(statement, ast.ImportFrom):
+        if statement.level or not statement.module:
+            raise UnsupportedExpressionException("Relative import")
+        paths = {alias.asname or alias.name: [statement.module, alias.name] for alias in statement.names}
+    else:
+        # "import a.b" binds the package a, "import a.b as c" binds the module a.b
+        paths = {}
+        for alias in statement.names:  # type: ignore
+            package = alias.name.split(".")[0]
+            paths[alias.asname or package] = [alias.name if alias.asname else package]
+    for name, path in paths.items():
+        if name == "*" or not spec_loader.is_trusted_module(path[0]):
+            raise UnsupportedExpressionException(f"Import of {'.'.join(path)}")
+        imports[name] = path
+
+
+def _describe_sequence(nodes: List[ast.expr], imports: Imports) -> List[Any]:
+    return [describe_value(node, imports) for node in nodes]
+
+
+def _describe_dict(node: ast.Dict, imports: Imports) -> Dict[str, Any]:
+    items = []
+    for key, value in zip(node.keys, node.values):
+        # The key of **mapping items of a dict display is None
+        if key is None:
+            raise UnsupportedExpressionException("Dict unpacking")
+        items.append([describe_value(key, imports), describe_value(value, imports)])
+    return {"dict": items}
+
+
+def _describe_name(node: ast.AST, imports: Imports) -> Dict[str, Any]:
+    if isinstance(node, ast.Name):
+        return {"import": imports[node.id]} if node.id in imports else {"ref": node.id}
+    if isinstance(node, ast.Attribute):
+        value = describe_value(node.value, imports)
+        if spec_loader.get_value_kind(value) == "import":
+            return {"import": value["import"] + [node.attr]}
+        return {"attr": [value, node.attr]}
+    index = _get_subscript_index(node)  # type: ignore
+    if isinstance(node.value, ast.Name) and node.value.id == "PARAMS":  # type: ignore
+        key = _get_literal(index)
+        if isinstance(key, str):
+            return {"param": key}
+    return {"item": [describe_value(node.value, imports), describe_value(index, imports)]}  # type: ignore
+
+
+def _describe_call(node: ast.Call, imports: Imports) -> Dict[str, Any]:
+    if any(isinstance(arg, ast.Starred) for arg in node.args) or any(kw.arg is None for kw in node.keywords):
+        raise UnsupportedExpressionException("Argument unpacking")
+    return {
+        "call": describe_value(node.func, imports),
+        "args": _describe_sequence(node.args, imports),
+        "kwargs": {keyword.arg: describe_value(keyword.value, imports) for keyword in node.keywords},
+    }
+
+
+def _describe_operation(node: ast.AST, imports: Imports) -> Dict[str, Any]:
+    if isinstance(node, ast.BoolOp):
+        return {BOOLEAN_OPERATORS[type(node.op)]: _describe_sequence(node.values, imports)}
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return {"not": describe_value(node.operand, imports)}
+    if isinstance(node, ast.IfExp):
+        return {"if": _describe_sequence([node.test, node.body, node.orelse], imports)}
+    if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in COMPARISON_OPERATORS:
+        operator = COMPARISON_OPERATORS[type(node.ops[0])]
+        left, right = _describe_sequence([node.left, node.comparators[0]], imports)
+        return {"compare": [left, operator, right]}
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        left, right = _describe_sequence([node.left, node.right], imports)
+        return {"binary": [left, BINARY_OPERATORS[type(node.op)], right]}
+    raise UnsupportedExpressionException(type(node).__name__)
+
+
+# pylint: disable=too-many-return-statements
+def describe_value(node: ast.AST, imports: Imports) -> Any:
+    """
+    Returns the JSON literal of the expression, or its description interpreted by the spec loader.
+    Literals looking like descriptions are wrapped in {"value": ...}.
+
+    :raises UnsupportedExpressionException: for the expressions the spec loader does not interpret.
+    """
+    try:
+        value = ast.literal_eval(node)
+    except ValueError:
+        pass
+    else:
+        if _is_json_literal(value):
+            return {"value": value} if _contains_value_object(value) else value
+    if isinstance(node, (ast.Name, ast.Attribute, ast.Subscript)):
+        return _describe_name(node, imports)
+    if isinstance(node, ast.Call):
+        return _describe_call(node, imports)
+    if isinstance(node, ast.List):
+        return {"list": _describe_sequence(node.elts, imports)}
+    if isinstance(node, ast.Tuple):
+        return {"tuple": _describe_sequence(node.elts, imports)}
+    if isinstance(node, ast.Dict):
+        return _describe_dict(node, imports)
+    return _describe_operation(node, imports)
+
+
+def _describe_callable_call(node: ast.AST, imports: Imports) -> Dict[str, Any]:
+    if not isinstance(node, ast.Call):
+        raise UnsupportedExpressionException(type(node).__name__)
+    call = _describe_call(node, imports)
+    if spec_loader.get_value_kind(call["call"]) != "import":
+        raise UnsupportedExpressionException("Call of an object which is not imported")
+    return {"callable": call["call"]["import"], "args": call["args"], "kwargs": call["kwargs"]}
+
+
+def _get_returned_task_id(statements: List[ast.stmt]) -> str:
+    if len(statements) != 1 or not isinstance(statements[0], ast.Return) or statements[0].value is None:
+        raise UnsupportedExpressionException("Decision branch not returning a task")
+    task_id = _get_literal(statements[0].value)
+    if not isinstance(task_id, str):
+        raise UnsupportedExpressionException("Decision branch not returning a task")
+    return task_id
+
+
+def describe_decision(function: ast.FunctionDef, imports: Imports) -> Dict[str, Any]:
+    """
+    Returns the description of a decision callable: the expressions evaluated first, the predicates
+    of the if/elif statements with the tasks they return, and the task returned otherwise.
+    """
+    arguments = function.args
+    kwarg = arguments.kwarg.arg if arguments.kwarg else CONTEXT_NAME
+    positional = getattr(arguments, "posonlyargs", []) + arguments.args
+    if function.decorator_list or positional or arguments.vararg or arguments.kwonlyargs:
+        raise UnsupportedExpressionException(f"Arguments of {function.name}")
+    if kwarg != CONTEXT_NAME:
+        raise UnsupportedExpressionException(f"Arguments of {function.name}")
+    statements = function.body
+    steps = []
+    while statements and isinstance(statements[0], ast.Expr):
+        steps.append(describe_value(statements[0].value, imports))
+        statements = statements[1:]
+    cases = []
+    while len(statements) == 1 and isinstance(statements[0], ast.If):
+        case = statements[0]
+        cases.append([describe_value(case.test, imports), _get_returned_task_id(case.body)])
+        statements = case.orelse
+    return {"steps": steps, "cases": cases, "default": _get_returned_task_id(statements)}
+
+
+def _get_edge(statement: ast.stmt) -> Optional[List[str]]:
+    if not isinstance(statement, ast.Expr) or not isinstance(statement.value, ast.Call):
+        return None
+    call = statement.value
+    func = call.func
+    if (
+        not isinstance(func, ast.Attribute)
+        or func.attr != "set_downstream"
+        or not isinstance(func.value, ast.Name)
+    ):
+        return None
+    if len(call.args) != 1 or not isinstance(call.args[0], ast.Name) or call.keywords:
+        return None
+    return [func.value.id, call.args[0].id]
+
+
+def _describe_object(statement: ast.stmt, imports: Imports) -> Dict[str, Any]:
+    if isinstance(statement, ast.FunctionDef):
+        return {"name": statement.name, "decision": describe_decision(statement, imports)}
+    if isinstance(statement, ast.Assign) and len(statement.targets) == 1:
+        target = statement.targets[0]
+        if isinstance(target, ast.Name):
+            return {"name": target.id, **_describe_callable_call(statement.value, imports)}
+    raise UnsupportedExpressionException(f"{type(statement).__name__} statement in the DAG")
+
+
+def _get_dag_call(statement: ast.stmt) -> Optional[ast.Call]:
+    if not isinstance(statement, ast.With) or len(statement.items) != 1:
+        return None
+    item = statement.items[0]
+    if not isinstance(item.optional_vars, ast.Name) or item.optional_vars.id != "dag":
+        return None
+    return item.context_expr if isinstance(item.context_expr, ast.Call) else None
+
+
+def dag_code_to_spec(code: str) -> Dict[str, Any]:
+    """
+    Returns the declarative spec of the DAG defined by the generated code.
+
+    :raises UnsupportedExpressionException: if the code cannot be described by a spec.
+    """
+    imports: Imports = {}
+    spec: Dict[str, Any] = {
+        "version": spec_loader.SPEC_VERSION,
+        "params": {},
+        "dag": None,
+        "objects": [],
+        "edges": [],
+    }
+    for statement in ast.parse(code).body:
+        dag_call = _get_dag_call(statement)
+        if isinstance(statement, (ast.Import, ast.ImportFrom)):
+            add_import(statement, imports)
+        elif (
+            isinstance(statement, ast.Assign)
+            and len(statement.targets) == 1
+            and isinstance(statement.targets[0], ast.Name)
+            and statement.targets[0].id == "PARAMS"
+        ):
+            spec["params"] = describe_value(statement.value, imports)
+        elif dag_call is not None and spec["dag"] is None:
+            spec["dag"] = _describe_callable_call(dag_call, imports)
+            for dag_statement in statement.body:  # type: ignore
+                edge = _get_edge(dag_statement)
+                if edge:
+                    spec["edges"].append(edge)
+                else:
+                    spec["objects"].append(_describe_object(dag_statement, imports))
+        else:
+            raise UnsupportedExpressionException(f"{type(statement).__name__} statement in the module")
+    if spec["dag"] is None:
+        raise UnsupportedExpressionException("The generated code does not define a DAG")
+    spec["edges"].sort()
+    return spec
+
+
+def write_spec(file_path: str, spec: Dict[str, Any]) -> None:
+    with open(file_path, "w") as file:
+        json.dump(spec, file, separators=(",", ":"))
+        file.write("\n")
@@ -13,13 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Converts sub-workflows of Oozie to Airflow"""
-import json
+import io
 import textwrap
-from typing import TextIO, Dict, Type, Set
+from typing import TextIO, Dict, List, Type, Set, Tuple
 
 from converter.oozie_converter import OozieConverter, INDENT
 from converter.parsed_node import ParsedNode
-from converter.primitives import Relation
+from converter.primitives import ConversionOptions, Relation
 from mappers.action_mapper import ActionMapper
 from mappers.base_mapper import BaseMapper
 
@@ -37,8 +37,16 @@ class OozieSubworkflowConverter(OozieConverter):
         control_mapper: Dict[str, Type[BaseMapper]],
         user: str = None,
         start_days_ago: int = None,
-        schedule_interval: str = None,
+        options: ConversionOptions = None,
+        properties: Dict[str, str] = None,
     ):
+        """
+        The sub-DAG is scheduled by its parent DAG, so it takes no schedule interval.
+
+        :param properties: Configuration propagated from the parent workflow, overrides job.properties.
+        """
+        self.properties = properties or {}
+        options = options or ConversionOptions()
         OozieConverter.__init__(
             self,
             dag_name=dag_name,
@@ -48,19 +56,34 @@ class OozieSubworkflowConverter(OozieConverter):
             control_mapper=control_mapper,
             user=user,
             start_days_ago=start_days_ago,
-            schedule_interval=schedule_interval,
+            options=options._replace(recreate_output_directory=False),
         )
 
+    def add_properties_to_params(self, params: Dict[str, str]):
+        params = super().add_properties_to_params(params)
+        params.update(self.properties)
+        return params
+
     def write_dag(
         self, depends: Set[str], file: TextIO, nodes: Dict[str, ParsedNode], relations: Set[Relation]
-    ) -> None:
-        self.write_dependencies(file, depends)
-        file.write("PARAMS = " + json.dumps(self.params, indent=INDENT) + "\n\n")
+    ) -> List[Tuple[BaseMapper, str]]:
+        nodes_file = io.StringIO()
+        snippets = self.write_nodes(nodes_file, nodes, indent=INDENT + 4)
+        nodes_text = nodes_file.getvalue()
+        self.write_dependencies(file, sorted(self.get_dag_dependencies(depends, nodes_text)))
+        self.write_params(file, self.get_dag_params(nodes_text))
         file.write("\ndef sub_dag(parent_dag_name, child_dag_name, start_date, schedule_interval):\n")
         self.write_dag_header(
-            file, self.dag_name, self.schedule_interval, self.start_days_ago, template="dag_subwf.tpl"
+            file,
+            self.dag_name,
+            self.schedule_interval,
+            self.start_days_ago,
+            template="dag_subwf.tpl",
+            dag_concurrency=self.concurrency_limit,
+            user_defined_macros=self.get_user_defined_macros(nodes_text),
         )
-        self.write_nodes(file, nodes, indent=INDENT + 4)
+        file.write(nodes_text)
         file.write("\n\n")
-        self.write_relations(file, relations, indent=INDENT + 4)
+        self.write_relations(file, sorted(relations), indent=INDENT + 4)
         file.write(textwrap.indent("\nreturn dag\n", INDENT * " "))
+        return snippets
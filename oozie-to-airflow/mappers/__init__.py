@@ -21,6 +21,7 @@ __all__ = [
     "decision_mapper",
     "dummy_mapper",
     "file_archive_mixins",
+    "inline_subworkflow_mapper",
     "kill_mapper",
     "null_mapper",
     "pig_mapper",
@@ -13,7 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Base mapper - it is a base class for all mappers actions, and logic alike"""
-from typing import Set
+from typing import List, Optional, Set
 from xml.etree.ElementTree import Element
 
 import airflow.utils.trigger_rule
@@ -37,6 +37,8 @@ class BaseMapper:
         self.oozie_node = oozie_node
         self.name = name
         self.trigger_rule = trigger_rule
+        self.priority_weight: Optional[int] = None
+        self.pool: Optional[str] = None
 
     def convert_to_text(self) -> str:
         """
@@ -81,10 +83,23 @@ class BaseMapper:
         This is a good time to copy additional files, or to perform additional operations on the workflow.
         """
 
+    # pylint: disable=unused-argument,no-self-use
+    def get_assets(self, input_directory_path: str) -> List:
+        """
+        Returns the files required by the generated DAG - such as script files, jars etc.
+
+        The assets of all mappers are written together once the DAG is written.
+
+        :param input_directory_path: oozie workflow application directory
+        :return: list of converter.primitives.Asset
+        """
+        return []
+
     # pylint: disable=unused-argument,no-self-use
     def copy_extra_assets(self, input_directory_path: str, output_directory_path: str) -> None:
         """
-        Copies extra assets required by the generated DAG - such as script files, jars etc.
+        Generates extra files required by the generated DAG which are not copied as assets - such as
+        sub-DAG modules.
 
         :param input_directory_path: oozie workflow application directory
         :param output_directory_path: output directory for the generated DAG and assets
@@ -14,13 +14,19 @@
 # limitations under the License.
 """Maps decision node to Airflow's DAG"""
 import collections
-from typing import Dict, Set
+from typing import Dict, List, Optional, Set
 from xml.etree.ElementTree import Element
 
 from airflow.utils.trigger_rule import TriggerRule
 
 from mappers.base_mapper import BaseMapper
-from utils.el_utils import convert_el_to_jinja
+from utils.el_utils import (
+    convert_el_to_jinja,
+    evaluate_predicate,
+    get_basic_functions,
+    get_fs_paths,
+    uses_wf_functions,
+)
 from utils.template_utils import render_template
 
 
@@ -56,6 +62,11 @@ class DecisionMapper(BaseMapper):
     trigger_rule: str
     params: Dict[str, str]
     case_dict: Dict[str, str]
+    fs_paths: List[str]
+    uses_wf_functions: bool
+    # Names of the functions of o2a_libs.el_basic_functions called by the predicates
+    basic_functions: Set[str]
+    resolved_transition: Optional[str]
 
     def __init__(
         self,
@@ -72,29 +83,68 @@ class DecisionMapper(BaseMapper):
         self.trigger_rule = trigger_rule
         self.params = params
         self._get_cases()
+        self.resolved_transition = self._resolve_transition()
 
     def _get_cases(self):
         switch_node = self.oozie_node[0]
         self.case_dict = collections.OrderedDict()
+        self.fs_paths = []
+        self.uses_wf_functions = False
+        self.basic_functions = set()
         for case in switch_node:
             if "case" in case.tag:
-                case_text = convert_el_to_jinja(case.text.strip(), quote=True)
+                predicate = self._get_predicate(case)
+                case_text = convert_el_to_jinja(predicate, quote=True, jinja_functions=False)
                 self.case_dict[case_text] = case.attrib["to"]
+                # The paths of the fs: functions of all cases are stat-ed at once
+                self.fs_paths.extend(path for path in get_fs_paths(predicate) if path not in self.fs_paths)
+                # The wf: functions read the context of the task, bound by the callable
+                self.uses_wf_functions = self.uses_wf_functions or uses_wf_functions(predicate)
+                self.basic_functions.update(get_basic_functions(predicate))
             else:  # Default return value
                 self.case_dict["default"] = case.attrib["to"]
 
+    @staticmethod
+    def _get_predicate(case: Element) -> str:
+        return case.text.strip() if case.text else ""
+
+    def _resolve_transition(self) -> Optional[str]:
+        """
+        Returns the transition taken whatever the run, if the predicates are constant once the params
+        are substituted, e.g. feature flags of job.properties, None if it is only known at run time.
+        The predicates are evaluated in order until the first true one, as Oozie does, so the ones
+        after it do not have to be constant.
+        """
+        for case in self.oozie_node[0]:
+            if "case" not in case.tag:
+                return case.attrib["to"]
+            value = evaluate_predicate(self._get_predicate(case), self.params)
+            if value is None:
+                return None
+            if value:
+                return case.attrib["to"]
+        return None
+
     def convert_to_text(self) -> str:
         return render_template(
             template_name="decision.tpl",
             task_id=self.name,
             trigger_rule=self.trigger_rule,
             case_dict=self.case_dict.items(),
+            fs_paths=self.fs_paths,
+            uses_wf_functions=self.uses_wf_functions,
+            priority_weight=self.priority_weight,
         )
 
-    @staticmethod
-    def required_imports() -> Set[str]:
-        return {
+    # The imports depend on the functions called by the predicates of the node
+    def required_imports(self) -> Set[str]:  # type: ignore  # pylint: disable=arguments-differ
+        imports = {
             "from airflow.operators import python_operator",
             "from airflow.utils import dates",
-            "from o2a_libs.el_basic_functions import first_not_null",
         }
+        imports.update(f"from o2a_libs.el_basic_functions import {name}" for name in self.basic_functions)
+        if self.fs_paths:
+            imports.add("from o2a_libs import el_fs_functions")
+        if self.uses_wf_functions:
+            imports.add("from o2a_libs import el_wf_functions")
+        return imports
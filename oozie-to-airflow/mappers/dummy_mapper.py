@@ -23,7 +23,12 @@ from utils.template_utils import render_template
 
 class DummyMapper(ActionMapper):
     def convert_to_text(self):
-        return render_template(template_name="dummy.tpl", task_id=self.name, trigger_rule=self.trigger_rule)
+        return render_template(
+            template_name="dummy.tpl",
+            task_id=self.name,
+            trigger_rule=self.trigger_rule,
+            priority_weight=self.priority_weight,
+        )
 
     @staticmethod
     def required_imports() -> Set[str]:
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Maps subworkflow of Oozie to tasks inlined in the parent Airflow's DAG"""
+import os
+from typing import Dict, List, Set
+
+from converter.parsed_node import ParsedNode
+from converter.parser import OozieParser
+from converter.primitives import Asset, Relation
+from mappers.action_mapper import ActionMapper
+from mappers.dummy_mapper import DummyMapper
+from mappers.subworkflow_mapper import SubworkflowMapper
+from utils import el_utils, params_utils
+from utils.template_utils import render_template
+
+
+class InlineSubworkflowMapper(SubworkflowMapper):
+    """
+    Converts a Sub-workflow Oozie node by splicing the tasks of the sub-workflow into the parent DAG.
+
+    Unlike SubDagOperator, this does not keep a task occupying a worker slot for the whole
+    run of the sub-workflow. All task_ids of the sub-workflow are prefixed with the name of the
+    sub-workflow action. The sub-workflow is entered through the task its start node points to and
+    left through a dummy task replacing its end node. Nested sub-workflows are inlined recursively
+    as long as the action mapper maps "sub-workflow" to this mapper.
+    """
+
+    sub_parser: OozieParser
+    # Params of the sub-workflow differing from the params of the parent, see resolve_params
+    sub_params: Dict[str, str]
+
+    @property
+    def trigger_rule(self) -> str:
+        return self._trigger_rule
+
+    @trigger_rule.setter
+    def trigger_rule(self, trigger_rule: str):
+        # The entry task is triggered by the parent workflow, so it follows the trigger rule of the action
+        self._trigger_rule = trigger_rule
+        if getattr(self, "sub_parser", None) is not None:
+            self.entry_node.mapper.trigger_rule = trigger_rule
+
+    def _parse_oozie_node(self):
+        self._parse_config()
+        self.app_path = self._get_app_path()
+        params = self._get_subworkflow_params()
+        self.sub_params = {key: value for key, value in params.items() if self.params.get(key) != value}
+        self.sub_parser = OozieParser(
+            input_directory_path=self.app_path,
+            output_directory_path=self.output_directory_path,
+            params=params,
+            dag_name=self.dag_name,
+            action_mapper=self.action_mapper,
+            control_mapper={**self.control_mapper, "end": DummyMapper},
+            task_id_prefix=self.name + "_",
+        )
+        self.sub_parser.parse_workflow()
+        self.sub_parser.update_trigger_rules()
+        self.trigger_rule = self.trigger_rule
+
+    def _get_subworkflow_params(self) -> Dict[str, str]:
+        """
+        Returns params of the sub-workflow: the parent params overridden by properties of the
+        sub-workflow application and the propagated configuration of the action.
+        """
+        params = dict(self.params)
+        params = el_utils.parse_els(os.path.join(self.app_path, "job.properties"), params)
+        params = el_utils.parse_els(os.path.join(self.app_path, "configuration.properties"), params)
+        params.update(self.get_config_properties())
+        return params
+
+    def _find_node_by_tag(self, tag: str) -> ParsedNode:
+        for node in self.sub_parser.get_nodes().values():
+            if node.mapper.oozie_node.tag == tag:
+                return node
+        raise Exception("Sub-workflow {} has no {} node".format(self.app_path, tag))
+
+    @property
+    def entry_node(self) -> ParsedNode:
+        """
+        Returns the node the start node of the sub-workflow transitions to.
+        """
+        start_node = self._find_node_by_tag("start")
+        return self.sub_parser.get_nodes()[start_node.get_downstreams()[0]]
+
+    @property
+    def first_task_id(self) -> str:
+        return self.entry_node.first_task_id
+
+    @property
+    def last_task_id(self) -> str:
+        return self._find_node_by_tag("end").last_task_id
+
+    def convert_to_text(self) -> str:
+        # The inlined tasks are written to the parent DAG, so params of the sub-workflow are resolved here
+        texts = [
+            params_utils.resolve_params(node.mapper.convert_to_text(), self.sub_params)
+            for node in self.sub_parser.get_nodes().values()
+        ]
+        texts.append(render_template(template_name="relations.tpl", relations=sorted(self.get_relations())))
+        return "".join(texts)
+
+    def get_relations(self) -> Set[Relation]:
+        return self.sub_parser.get_relations()
+
+    def on_parse_finish(self, workflow):
+        # No sub-DAG module is generated, so the import added by SubworkflowMapper is skipped
+        ActionMapper.on_parse_finish(self, workflow)
+        workflow.dependencies.update(self.sub_parser.get_dependencies())
+
+    def get_assets(self, input_directory_path: str) -> List[Asset]:
+        return [
+            asset
+            for node in self.sub_parser.get_nodes().values()
+            for asset in node.mapper.get_assets(input_directory_path=self.app_path)
+        ]
+
+    def copy_extra_assets(self, input_directory_path: str, output_directory_path: str):
+        for node in self.sub_parser.get_nodes().values():
+            node.mapper.copy_extra_assets(
+                input_directory_path=self.app_path, output_directory_path=output_directory_path
+            )
+
+    @staticmethod
+    def required_imports() -> Set[str]:
+        # Imports of the inlined tasks are added to the workflow in on_parse_finish
+        return set()
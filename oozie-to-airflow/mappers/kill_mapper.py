@@ -16,13 +16,42 @@
 from typing import Set
 
 from mappers.base_mapper import BaseMapper
+from utils import el_utils
 from utils.template_utils import render_template
 
 
 class KillMapper(BaseMapper):
+    """
+    Converts the kill node to a task failing the DAG run with the message of the node.
+    """
+
     def convert_to_text(self) -> str:
-        return render_template(template_name="kill.tpl", task_id=self.name, trigger_rule=self.trigger_rule)
+        return render_template(
+            template_name="kill.tpl",
+            task_id=self.name,
+            trigger_rule=self.trigger_rule,
+            message=self.get_message_code(),
+            priority_weight=self.priority_weight,
+        )
+
+    def get_message(self) -> str:
+        """
+        Returns the text of the <message> node of the kill node, or empty string if there is none.
+        """
+        message_node = self.oozie_node.find("message")
+        if message_node is None or not message_node.text:
+            return ""
+        return message_node.text.strip()
+
+    def get_message_code(self) -> str:
+        """
+        Returns the python code of the message. Its EL expressions are converted as in the templated
+        fields of other tasks, so the wf: functions are rendered when the kill task runs.
+        """
+        message = el_utils.fold_el(self.get_message(), self.params)
+        converted = el_utils.convert_el_to_jinja(message, quote=False)
+        return converted if el_utils.converts_to_python(message) else repr(converted)
 
     @staticmethod
     def required_imports() -> Set[str]:
-        return {"from airflow.operators import bash_operator"}
+        return {"from o2a_libs import control_operators"}
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Maps a linear chain of Oozie pig nodes to a single Dataproc Pig job"""
+import os
+import re
+from typing import Dict, List, Set
+
+from converter.primitives import Asset
+from mappers.action_mapper import ActionMapper
+from mappers.pig_mapper import PigMapper
+from mappers.prepare_mixin import PrepareMixin
+from utils.template_utils import render_template
+
+# Printed to the driver output of the job before each step, the last one printed shows the failed step
+STEP_MARKER = "o2a-step"
+PARAM_DECLARATION_REGEX = re.compile(r"%(?:declare|default)\s+(\w+)")
+
+
+def namespace_params(script: str, names: Set[str], prefix: str) -> str:
+    """
+    Prefixes the Pig params of the script, so that the scripts of several steps can be concatenated.
+    Positional references ($0, $1) are not params and are kept as they are.
+    """
+    names = names | set(PARAM_DECLARATION_REGEX.findall(script))
+    for name in sorted(names, key=len, reverse=True):
+        script = re.sub(
+            r"(\$|%declare\s+|%default\s+)" + re.escape(name) + r"(?!\w)",
+            r"\g<1>" + (prefix + name).replace("\\", r"\\"),
+            script,
+        )
+    return script
+
+
+class PigChainMapper(ActionMapper, PrepareMixin):
+    """
+    Runs the scripts of a linear chain of Pig actions as a single Pig job, instead of a prepare task
+    and a job for each of them.
+
+    The prepare steps are run as fs commands before the script of their step, and `exec` between the
+    steps makes Pig finish each step before starting the next one.
+    """
+
+    def __init__(self, steps: List[PigMapper], template_file_name: str = "pig_chain.tpl"):
+        first_step = steps[0]
+        ActionMapper.__init__(
+            self,
+            oozie_node=first_step.oozie_node,
+            name=first_step.name,
+            trigger_rule=first_step.trigger_rule,
+            params=first_step.params,
+        )
+        self.steps = steps
+        self.template = template_file_name
+        self.properties = first_step.properties
+        self.script_file_name = f"{self.name}_chain.pig"
+        self.params_dict: Dict[str, str] = {}
+        for step in steps:
+            for key, value in step.params_dict.items():
+                self.params_dict[self.get_param_prefix(step) + key] = value
+
+    @staticmethod
+    def get_param_prefix(step: PigMapper) -> str:
+        return f"{step.name}_"
+
+    @property
+    def step_names(self) -> List[str]:
+        return [step.name for step in self.steps]
+
+    def convert_to_text(self) -> str:
+        return render_template(template_name=self.template, task_id=self.name, **self.__dict__)
+
+    def get_script(self, input_directory_path: str) -> str:
+        """
+        Returns the script running all the steps.
+        """
+        parts = []
+        for index, step in enumerate(self.steps, start=1):
+            parts.append(f"sh echo {STEP_MARKER} {index}/{len(self.steps)} {step.name};\n")
+            delete_paths, mkdir_paths = self.parse_prepare_node(step.oozie_node, step.params)
+            parts.extend(f"fs -rm -r -f {path};\n" for path in delete_paths)
+            parts.extend(f"fs -mkdir -p {path};\n" for path in mkdir_paths)
+            with open(os.path.join(input_directory_path, step.script_file_name)) as script_file:
+                script = script_file.read()
+            script = namespace_params(script, set(step.params_dict), self.get_param_prefix(step))
+            parts.append(script if script.endswith("\n") else script + "\n")
+            if index < len(self.steps):
+                parts.append("exec;\n")
+        return "".join(parts)
+
+    def get_assets(self, input_directory_path: str) -> List[Asset]:
+        # pylint: disable=protected-access
+        PigMapper._validate_input_directory_path(input_directory_path)
+        return [Asset(destination_name=self.script_file_name, content=self.get_script(input_directory_path))]
+
+    @staticmethod
+    def required_imports() -> Set[str]:
+        return {"from airflow.utils import dates", "from airflow.contrib.operators import dataproc_operator"}
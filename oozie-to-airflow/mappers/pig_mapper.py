@@ -14,12 +14,12 @@
 # limitations under the License.
 """Maps Oozie pig node to Airflow's DAG"""
 import os
-from typing import Set, Dict
+from typing import Set, Dict, List
 from xml.etree.ElementTree import Element
 
 from airflow.utils.trigger_rule import TriggerRule
 
-from converter.primitives import Relation
+from converter.primitives import Asset, Relation
 from mappers.action_mapper import ActionMapper
 from mappers.file_archive_mixins import FileMixin, ArchiveMixin
 from mappers.prepare_mixin import PrepareMixin
@@ -86,37 +86,41 @@ class PigMapper(ActionMapper, PrepareMixin, ArchiveMixin, FileMixin):
             **self.__dict__,
         )
 
-    def _add_symlinks(self, destination_pig_file):
-        destination_pig_file.write("set mapred.create.symlink yes;\n")
+    def get_symlinks_header(self) -> str:
+        """
+        Returns the Pig settings shipping the files and archives of the action, prepended to the script.
+        """
+        if not self.files and not self.archives:
+            return ""
+        header = "set mapred.create.symlink yes;\n"
         if self.files:
-            destination_pig_file.write("set mapred.cache.file {};\n".format(self.hdfs_files))
+            header += "set mapred.cache.file {};\n".format(self.hdfs_files)
         if self.archives:
-            destination_pig_file.write("set mapred.cache.archives {};\n".format(self.hdfs_archives))
+            header += "set mapred.cache.archives {};\n".format(self.hdfs_archives)
+        return header
 
-    def copy_extra_assets(self, input_directory_path: str, output_directory_path: str):
-        self._validate_paths(input_directory_path, output_directory_path)
-        source_pig_file_path = os.path.join(input_directory_path, self.script_file_name)
-        destination_pig_file_path = os.path.join(output_directory_path, self.script_file_name)
-        self._copy_pig_script_with_path_injection(destination_pig_file_path, source_pig_file_path)
-
-    def _copy_pig_script_with_path_injection(self, destination_pig_file_path, source_pig_file_path):
-        with open(destination_pig_file_path, "w") as destination_pig_file:
-            with open(source_pig_file_path, "r") as source_pig_file:
-                pig_script = source_pig_file.read()
-                if self.files or self.archives:
-                    self._add_symlinks(destination_pig_file)
-                destination_pig_file.write(pig_script)
+    def get_assets(self, input_directory_path: str) -> List[Asset]:
+        self._validate_input_directory_path(input_directory_path)
+        return [
+            Asset(
+                destination_name=self.script_file_name,
+                source_path=os.path.join(input_directory_path, self.script_file_name),
+                header=self.get_symlinks_header(),
+            )
+        ]
 
     @staticmethod
-    def _validate_paths(input_directory_path, output_directory_path):
+    def _validate_input_directory_path(input_directory_path):
         if not input_directory_path:
             raise Exception("The input_directory_path should be set and is {}".format(input_directory_path))
-        if not output_directory_path:
-            raise Exception("The output_directory_path should be set and is {}".format(output_directory_path))
 
     @staticmethod
     def required_imports() -> Set[str]:
-        return {"from airflow.utils import dates", "from airflow.contrib.operators import dataproc_operator"}
+        return {
+            "from airflow.utils import dates",
+            "from airflow.contrib.operators import dataproc_operator",
+            "from airflow.operators import bash_operator",
+        }
 
     @property
     def first_task_id(self):
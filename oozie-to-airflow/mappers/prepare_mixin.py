@@ -13,7 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Prepare node mixin"""
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import xml.etree.ElementTree as ET
 
 from utils import xml_utils, el_utils
@@ -22,6 +22,11 @@ from utils import xml_utils, el_utils
 class PrepareMixin:
     """Mixin used to add Prepare node capability to a node"""
 
+    # When set, prepare.sh runs all deletes and mkdirs of the action as a single Dataproc job
+    batch_prepare: bool = False
+    # When set, the jobs of the action are submitted to this cluster instead of PARAMS['dataproc_cluster']
+    dataproc_cluster: Optional[str] = None
+
     def get_prepare_command(self, oozie_node: ET.Element, params: Dict[str, str]):
         # In BashOperator in Composer we can't read from $DAGS_FOLDER (~/dags) - permission denied.
         # However we can read from ~/data -> /home/airflow/gcs/data.
@@ -30,9 +35,10 @@ class PrepareMixin:
         if delete_paths or mkdir_paths:
             delete = " ".join(delete_paths)
             mkdir = " ".join(mkdir_paths)
-            return "$DAGS_FOLDER/../data/prepare.sh -c {0} -r {1}{2}{3}".format(
-                params["dataproc_cluster"],
+            return "$DAGS_FOLDER/../data/prepare.sh -c {0} -r {1}{2}{3}{4}".format(
+                self.dataproc_cluster or params["dataproc_cluster"],
                 params["gcp_region"],
+                " -b" if self.batch_prepare else "",
                 ' -d "{}"'.format(delete) if delete else "",
                 ' -m "{}"'.format(mkdir) if mkdir else "",
             )
@@ -57,7 +57,7 @@ class ShellMapper(ActionMapper, PrepareMixin):
         cmd_node = self.oozie_node.find("exec")
         arg_nodes = self.oozie_node.findall("argument")
         cmd = " ".join([cmd_node.text] + [x.text for x in arg_nodes])
-        self.bash_command = el_utils.convert_el_to_jinja(cmd, quote=False)
+        self.bash_command = el_utils.convert_el_to_jinja(cmd, quote=False, params=self.params)
 
     def convert_to_text(self) -> str:
         prepare_command = self.get_prepare_command(self.oozie_node, self.params)
@@ -67,4 +67,8 @@ class ShellMapper(ActionMapper, PrepareMixin):
 
     @staticmethod
     def required_imports() -> Set[str]:
-        return {"from airflow.utils import dates", "from airflow.contrib.operators import dataproc_operator"}
+        return {
+            "from airflow.utils import dates",
+            "from airflow.contrib.operators import dataproc_operator",
+            "from airflow.operators import bash_operator",
+        }
@@ -52,7 +52,7 @@ class SSHMapper(ActionMapper):
         if cmd_node is None or not cmd_node.text:
             raise Exception("Missing or empty command node in SSH action {}".format(self.oozie_node))
         cmd = " ".join([cmd_node.text] + [x.text if x.text else "" for x in arg_nodes])
-        self.command = el_utils.convert_el_to_jinja(cmd, quote=True)
+        self.command = el_utils.convert_el_to_jinja(cmd, quote=True, params=params)
         host = self.oozie_node.find("host")
         if host is None:
             raise Exception("Missing host node in SSH action: {}".format(self.oozie_node))
@@ -13,13 +13,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Maps subworkflow of Oozie to Airflow's sub-dag"""
+import hashlib
+import json
 import logging
 import os
+import re
 from typing import Set, Dict, Type
 from xml.etree.ElementTree import Element
 
 from airflow.utils.trigger_rule import TriggerRule
 
+from converter.primitives import ConversionOptions
 from converter.subworkflow_converter import OozieSubworkflowConverter
 from mappers.action_mapper import ActionMapper
 from mappers.base_mapper import BaseMapper
@@ -27,13 +31,23 @@ from tests.utils.test_paths import EXAMPLES_PATH
 from utils import el_utils, xml_utils
 from utils.template_utils import render_template
 
+# Paths of the sub-DAG modules generated so far. Each distinct sub-workflow is converted only once
+# per output directory, no matter how many parent workflows refer to it.
+GENERATED_SUBDAG_FILES: Set[str] = set()
 
+
+# pylint: disable=too-many-instance-attributes
 class SubworkflowMapper(ActionMapper):
     """
     Converts a Sub-workflow Oozie node to an Airflow task.
     """
 
     properties: Dict[str, str]
+    # Local path of the sub-workflow application and name of the module generated for it
+    app_path: str
+    subdag_module: str
+    # Options of the parent conversion passed on to the sub-workflow converter
+    converter_options = ConversionOptions()
 
     # pylint: disable=too-many-arguments
     def __init__(
@@ -66,22 +80,35 @@ class SubworkflowMapper(ActionMapper):
         self._parse_oozie_node()
 
     def _parse_oozie_node(self):
-        app_path = self.oozie_node.find("app-path").text
-        app_path = el_utils.replace_el_with_var(app_path, params=self.params, quote=False)
+        self._parse_config()
+        self.app_path = self._get_app_path()
+        self.subdag_module = self.get_subdag_module_name(self.app_path, self.get_config_properties())
+
+    @staticmethod
+    def get_subdag_module_name(app_path: str, properties: Dict[str, str]) -> str:
+        """
+        Returns the name of the python module generated for the sub-workflow application.
+
+        The name is derived from the resolved application path and the configuration passed to the
+        sub-workflow, so that all parents running the same sub-workflow share a single module.
+        """
+        app_path = os.path.realpath(app_path)
+        key = json.dumps({"app_path": app_path, "properties": properties}, sort_keys=True)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:8]
+        app_name = re.sub(r"\W", "_", os.path.basename(app_path))
+        return f"subdag_{app_name}_{digest}"
+
+    def _get_app_path(self) -> str:
+        """
+        Returns local path of the sub-workflow application directory.
+        """
+        app_path_node = self.oozie_node.find("app-path")
+        if app_path_node is None or not app_path_node.text:
+            raise Exception("Missing or empty app-path node in sub-workflow action {}".format(self.name))
+        app_path = el_utils.replace_el_with_var(app_path_node.text, params=self.params, quote=False)
         # TODO: hacky: we should calculate it deriving from input_directory_path and comparing app-path
         # TODO: but for now we assume app is in "examples"
-        app_path = os.path.join(EXAMPLES_PATH, app_path.split("examples/")[1])
-        logging.info(f"Converting subworkflow from {app_path}")
-        self._parse_config()
-        converter = OozieSubworkflowConverter(
-            input_directory_path=app_path,
-            output_directory_path=self.output_directory_path,
-            start_days_ago=0,
-            action_mapper=self.action_mapper,
-            control_mapper=self.control_mapper,
-            dag_name=f"{self.dag_name}.{self.task_id}",
-        )
-        converter.convert()
+        return os.path.join(EXAMPLES_PATH, app_path.split("examples/")[1])
 
     def get_config_properties(self):
         propagate_configuration = self.oozie_node.find("propagate-configuration")
@@ -105,11 +132,37 @@ class SubworkflowMapper(ActionMapper):
     def convert_to_text(self):
         return render_template(template_name=self.template, **self.__dict__)
 
+    def on_parse_finish(self, workflow):
+        super().on_parse_finish(workflow)
+        workflow.dependencies.add(f"import {self.subdag_module}")
+
+    def copy_extra_assets(self, input_directory_path: str, output_directory_path: str):
+        """
+        Generates the sub-DAG module next to the DAG, unless it has already been generated there.
+        """
+        subdag_file = os.path.join(output_directory_path, self.subdag_module + ".py")
+        if subdag_file in GENERATED_SUBDAG_FILES and os.path.isfile(subdag_file):
+            logging.info(f"Reusing subworkflow module {subdag_file}")
+            return
+        # Registered before the conversion so that recursive sub-workflows terminate
+        GENERATED_SUBDAG_FILES.add(subdag_file)
+        logging.info(f"Converting subworkflow from {self.app_path}")
+        converter = OozieSubworkflowConverter(
+            input_directory_path=self.app_path,
+            output_directory_path=output_directory_path,
+            start_days_ago=0,
+            action_mapper=self.action_mapper,
+            control_mapper=self.control_mapper,
+            dag_name=self.subdag_module,
+            options=self.converter_options,
+            properties=self.get_config_properties(),
+        )
+        converter.convert()
+
     @staticmethod
     def required_imports() -> Set[str]:
         return {
             "from airflow.utils import dates",
             "from airflow.contrib.operators import dataproc_operator",
             "from airflow.operators.subdag_operator import SubDagOperator",
-            "from subdag_test import sub_dag",
         }
@@ -17,8 +17,12 @@ import argparse
 import os
 import sys
 
-from converter.oozie_converter import OozieConverter
+from converter import compile_check, corpus_profiler
+from converter.batch_converter import BatchConverter
+from converter.oozie_converter import OozieConverter, OUTPUT_FORMATS
+from converter.primitives import ConversionOptions
 from converter.mappers import ACTION_MAP, CONTROL_MAP
+from mappers.inline_subworkflow_mapper import InlineSubworkflowMapper
 
 INDENT = 4
 
@@ -36,17 +40,64 @@ def main():
     if not dag_name:
         dag_name = os.path.basename(input_directory_path)
 
+    if args.scan:
+        corpus_profiler.profile_directory(
+            input_directory_path,
+            os.path.join(output_directory_path, corpus_profiler.PROFILE_FILE_NAME),
+            max_workers=args.scan_workers,
+        )
+        return
+
+    action_mapper = ACTION_MAP
+    if args.flatten_subworkflows:
+        action_mapper = {**ACTION_MAP, "sub-workflow": InlineSubworkflowMapper}
+
+    options = ConversionOptions(
+        batch_prepare=args.batch_prepare,
+        priority_weights=args.priority_weights,
+        duration_hints_file=args.duration_hints,
+        prune_params=args.prune_params,
+        shared_module=args.shared_params,
+        compile_check_output=args.compile_check,
+        write_pyc=args.write_pyc,
+        output_format=args.output_format,
+        package=args.package,
+        concurrency_limits=args.concurrency_limits,
+        dag_concurrency=args.dag_concurrency,
+        max_active_runs=args.max_active_runs,
+        pool_slots=args.pool_slots,
+        dataproc_clusters=args.dataproc_clusters,
+        merge_pig_chains=args.merge_pig_chains,
+    )
+
+    if args.batch:
+        BatchConverter(
+            input_directory_path=input_directory_path,
+            output_directory_path=output_directory_path,
+            action_mapper=action_mapper,
+            control_mapper=CONTROL_MAP,
+            user=args.user,
+            start_days_ago=start_days_ago,
+            schedule_interval=schedule_interval,
+            options=options,
+            skip_subworkflow_apps=args.skip_subworkflow_apps,
+        ).convert()
+        return
+
     converter = OozieConverter(
         dag_name=dag_name,
         input_directory_path=input_directory_path,
         output_directory_path=output_directory_path,
-        action_mapper=ACTION_MAP,
+        action_mapper=action_mapper,
         control_mapper=CONTROL_MAP,
         user=args.user,
         start_days_ago=start_days_ago,
         schedule_interval=schedule_interval,
+        options=options,
     )
     converter.convert()
+    if options.compile_check_output or options.write_pyc:
+        compile_check.check_directory(output_directory_path, write_pyc=options.write_pyc)
 
 
 def parse_args(args):
@@ -65,6 +116,102 @@ def parse_args(args):
     parser.add_argument(
         "-v", "--schedule-interval", help="Desired DAG schedule interval as number of days", default=0
     )
+    parser.add_argument(
+        "--batch-prepare",
+        action="store_true",
+        help="Run all prepare steps (delete/mkdir) of an action as a single Dataproc job",
+    )
+    parser.add_argument(
+        "--flatten-subworkflows",
+        action="store_true",
+        help="Inline tasks of sub-workflows into the parent DAG instead of using SubDagOperator",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Convert every workflow application found in the input directory into the output directory",
+    )
+    parser.add_argument(
+        "--skip-subworkflow-apps",
+        action="store_true",
+        help="With --batch, do not write DAGs of the applications only run as sub-workflows of the others, "
+        "matched by the oozie.wf.application.path of their job.properties",
+    )
+    parser.add_argument(
+        "--priority-weights",
+        action="store_true",
+        help="Set priority weights of tasks so that the critical path of the workflow is scheduled first",
+    )
+    parser.add_argument(
+        "--duration-hints",
+        help="JSON file mapping action names to their expected durations, "
+        "used to weight the critical path (implies --priority-weights)",
+    )
+    parser.add_argument(
+        "--prune-params",
+        action="store_true",
+        help="Write to PARAMS only the properties referenced by the generated tasks",
+    )
+    parser.add_argument(
+        "--shared-params",
+        action="store_true",
+        help="With --batch, write properties shared by all applications to one module imported by the DAGs",
+    )
+    parser.add_argument(
+        "--compile-check",
+        action="store_true",
+        help="Compile all generated files in parallel and fail if any of them does not compile",
+    )
+    parser.add_argument(
+        "--write-pyc",
+        action="store_true",
+        help="Write compiled generated files to __pycache__ (implies --compile-check)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="py",
+        help="Write python DAG files (py) or JSON DAG specs with a single loader module (spec)",
+    )
+    parser.add_argument(
+        "--package",
+        action="store_true",
+        help="Write each DAG with its sub-DAG modules into a single zip file, rewritten only when "
+        "its content changes. Assets are written next to it",
+    )
+    parser.add_argument(
+        "--concurrency-limits",
+        action="store_true",
+        help="Run cluster jobs in pools sized by the widest fork, with --max-active-runs also limit "
+        "concurrency of the DAGs to the widest fork times the active runs",
+    )
+    parser.add_argument(
+        "--dag-concurrency", type=int, help="Concurrency of the DAGs (implies --concurrency-limits)"
+    )
+    parser.add_argument("--max-active-runs", type=int, help="Maximum number of active runs of the DAGs")
+    parser.add_argument(
+        "--pool-slots", type=int, help="Slots of each cluster pool (implies --concurrency-limits)"
+    )
+    parser.add_argument(
+        "--dataproc-clusters",
+        type=lambda value: [cluster.strip() for cluster in value.split(",") if cluster.strip()],
+        help="Comma separated Dataproc clusters to spread the jobs of parallel fork branches across, "
+        "balanced by --duration-hints if given",
+    )
+    parser.add_argument(
+        "--merge-pig-chains",
+        action="store_true",
+        help="Run each linear chain of Pig actions as a single Pig job",
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="Only profile the actions and EL functions used by every workflow found in the input directory, "
+        f"written to {corpus_profiler.PROFILE_FILE_NAME} in the output directory",
+    )
+    parser.add_argument(
+        "--scan-workers", type=int, help="Number of processes profiling the workflows with --scan"
+    )
     return parser.parse_args(args)
 
 
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Lightweight operators for Oozie control nodes
+
+These operators are executed directly in the task process - unlike BashOperator
+they do not fork any subprocess, which makes pure control tasks cheap for the workers.
+"""
+from airflow.exceptions import AirflowException
+from airflow.models import BaseOperator
+from airflow.utils.decorators import apply_defaults
+
+
+class KillOperator(BaseOperator):  # pylint: disable=too-few-public-methods
+    """
+    Fails the task, which corresponds to reaching the Oozie kill node.
+
+    :param message: Message of the kill node, logged and used as the failure reason.
+    """
+
+    template_fields = ("message",)
+    ui_color = "#f28b82"
+
+    @apply_defaults
+    def __init__(self, *args, message: str = "", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.message = message
+
+    def execute(self, context):  # pylint: disable=unused-argument
+        self.log.error("Workflow killed: %s", self.message)
+        raise AirflowException("Workflow killed: {}".format(self.message))
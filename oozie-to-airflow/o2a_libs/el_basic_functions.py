@@ -12,8 +12,25 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""Basic EL functions of the Oozie workflow"""
+"""Basic EL functions of the Oozie workflow
+
+The functions run in the workers, in the decision callables and the rendered templates, so the
+modules they use are imported once and the regular expressions of replaceAll are compiled once.
+"""
+import datetime
+import functools
+import json
 import re
+import urllib.parse
+
+# Number of the compiled replaceAll regular expressions kept
+REGEX_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_regex(regex: str):
+    """Returns the compiled regular expression, the least recently used ones are dropped."""
+    return re.compile(regex)
 
 
 def first_not_null(str_one, str_two):
@@ -34,11 +51,7 @@ def concat(str_one, str_two):
     Returns the concatenation of 2 strings. A string
     with null value is considered as an empty string.
     """
-    if not str_one:
-        str_one = ""
-    if not str_two:
-        str_two = ""
-    return str_one + str_two
+    return (str_one or "") + (str_two or "")
 
 
 def replace_all(src_string, regex, replacement):
@@ -50,9 +63,7 @@ def replace_all(src_string, regex, replacement):
     """
     if not regex:
         return src_string
-    if not replacement:
-        replacement = ""
-    return re.sub(regex, replacement, src_string)
+    return compile_regex(regex).sub(replacement or "", src_string)
 
 
 def append_all(src_str, append, delimiter):
@@ -67,13 +78,9 @@ def append_all(src_str, append, delimiter):
     if not delimiter:
         return src_str
     if not append:
-        append = ""
-
-    split_str = src_str.split(delimiter)
-    appended_list = []
-    for split in split_str:
-        appended_list.append(split + append)
-    return delimiter.join(appended_list)
+        return src_str
+    # Every sub-string but the last one is followed by the delimiter
+    return src_str.replace(delimiter, append + delimiter) + append
 
 
 def trim(src_str):
@@ -95,8 +102,6 @@ def url_encode(src_str):
     """
     if not src_str:
         return ""
-    import urllib.parse
-
     return urllib.parse.quote(src_str, encoding="UTF-8")
 
 
@@ -106,13 +111,8 @@ def timestamp():
     in W3C format down to the second (YYYY-MM-DDThh:mm:ss.sZ).
     i.e.: 1997-07-16T19:20:30.45Z
     """
-    import datetime
-    import pytz
-
-    return datetime.datetime.now(pytz.utc).isoformat()
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
 
 
 def to_json_str(py_map):
-    import json
-
     return json.dumps(py_map)
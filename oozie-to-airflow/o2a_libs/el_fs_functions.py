@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""All FS EL functions, evaluated by the generated decision callables
+
+The decision callable gathers the paths used by all of its predicates and stats them with
+a single call to the file system before evaluating them. The statuses are cached for the
+DAG run, so evaluating several predicates, or several decisions of the same run in one
+process, does not stat the same path again.
+
+There is no default file system: the functions fail until one is set with set_file_system,
+e.g. in airflow_local_settings.py of the Airflow deployment.
+"""
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+
+class FsFunctionsException(Exception):
+    """Raised when the paths cannot be stat-ed with the file system set"""
+
+
+class FileStatus(NamedTuple):
+    is_dir: bool
+    # Size of the file, 0 for directories
+    length: int
+    block_size: int
+    # Size of the files directly in the directory, -1 for files
+    dir_size: int
+
+
+class LocalFileSystem:
+    """
+    Serves the paths from the local file system. Without a root directory only local paths and
+    file: URIs are served. With a root directory, which mirrors HDFS or GCS, the URIs of other schemes
+    are served from the directory named after their host, e.g. gs://bucket/data from
+    <root>/bucket/data, and the local paths from the root directory itself.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root
+
+    def to_local_path(self, path: str) -> str:
+        uri = urlparse(path)
+        if uri.scheme in ("", "file"):
+            local_path = uri.path
+        elif self.root:
+            local_path = os.path.join(uri.hostname or "", uri.path.lstrip("/"))
+        else:
+            raise FsFunctionsException(f"The local file system cannot stat {path}, set a root directory")
+        if self.root:
+            return os.path.join(self.root, local_path.lstrip("/"))
+        return local_path or "/"
+
+    def stat_paths(self, paths: Iterable[str]) -> Dict[str, Optional[FileStatus]]:
+        """Returns the statuses of the paths, None for the paths which do not exist."""
+        return {path: self._stat(self.to_local_path(path)) for path in paths}
+
+    @staticmethod
+    def _stat(local_path: str) -> Optional[FileStatus]:
+        try:
+            stat = os.stat(local_path)
+        except OSError:
+            return None
+        if not os.path.isdir(local_path):
+            return FileStatus(is_dir=False, length=stat.st_size, block_size=stat.st_blksize, dir_size=-1)
+        with os.scandir(local_path) as entries:
+            dir_size = sum(entry.stat().st_size for entry in entries if entry.is_file())
+        return FileStatus(is_dir=True, length=0, block_size=stat.st_blksize, dir_size=dir_size)
+
+
+class FsRuntime:
+    """Statuses of the paths of the current DAG run, fetched in batches from the file system"""
+
+    def __init__(self, file_system=None):
+        self.file_system = file_system
+        self.run_id: Optional[str] = None
+        self.statuses: Dict[str, Optional[FileStatus]] = {}
+
+    def prefetch(self, paths: Iterable[str], run_id: str = None) -> None:
+        """Stats with one call all the paths not known yet in the run."""
+        if run_id != self.run_id:
+            self.run_id = run_id
+            self.statuses = {}
+        missing: List[str] = []
+        for path in paths:
+            if path not in self.statuses and path not in missing:
+                missing.append(path)
+        if missing:
+            self.statuses.update(self.stat_paths(missing))
+
+    def get_status(self, path: str) -> Optional[FileStatus]:
+        if path not in self.statuses:
+            self.statuses.update(self.stat_paths([path]))
+        return self.statuses[path]
+
+    def stat_paths(self, paths: List[str]) -> Dict[str, Optional[FileStatus]]:
+        if self.file_system is None:
+            raise FsFunctionsException(
+                "No file system is set for the fs: EL functions, set one with el_fs_functions.set_file_system"
+            )
+        statuses: Dict[str, Optional[FileStatus]] = self.file_system.stat_paths(paths)
+        return statuses
+
+
+RUNTIME = FsRuntime()
+
+
+def set_file_system(file_system) -> None:
+    """Replaces the file system the functions read from and drops the cached statuses."""
+    RUNTIME.file_system = file_system
+    RUNTIME.run_id = None
+    RUNTIME.statuses = {}
+
+
+def prefetch(paths: Iterable[str], run_id: str = None) -> None:
+    """Stats all the paths used by the predicates of a decision in one call."""
+    RUNTIME.prefetch(paths, run_id)
+
+
+def fs_exists(path):
+    """
+    It returns true or false depending if the specified path URI exists or not.
+    """
+    return RUNTIME.get_status(path) is not None
+
+
+def fs_is_dir(path):
+    """
+    It returns true if the specified path URI exists and it is a directory,
+    otherwise it returns false.
+    """
+    status = RUNTIME.get_status(path)
+    return status is not None and status.is_dir
+
+
+def fs_dir_size(path):
+    """
+    It returns the size in bytes of all the files in the specified path.
+    If the path is not a directory, or if it does not exist it returns -1.
+    It does not work recursively, only computes the size of the files under
+    the specified path.
+    """
+    status = RUNTIME.get_status(path)
+    return status.dir_size if status is not None and status.is_dir else -1
+
+
+def fs_file_size(path):
+    """
+    It returns the size in bytes of specified file. If the path is not a file,
+    or if it does not exist it returns -1.
+    """
+    status = RUNTIME.get_status(path)
+    return status.length if status is not None and not status.is_dir else -1
+
+
+def fs_block_size(path):
+    """
+    It returns the block size in bytes of specified file. If the path is not
+    a file, or if it does not exist it returns -1.
+    """
+    status = RUNTIME.get_status(path)
+    return status.block_size if status is not None and not status.is_dir else -1
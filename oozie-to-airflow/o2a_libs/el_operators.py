@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Operators of the EL expressions, coercing their operands the way EL does
+
+The code generated for the EL expressions calls these functions instead of the python operators,
+in the decision callables and in the rendered templates, so that the strings of the params and of
+the workflow configuration compare as numbers and booleans as in Oozie: ${wf:conf('n') gt 5} is
+true for the string "6" and ${not flag} is true for the string "false". The converter evaluates
+the expressions known at conversion time with the same functions.
+"""
+import math
+from typing import Any, Tuple, Union
+
+
+def is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def to_number(value) -> Union[int, float]:
+    """Coerces the value to a number the way EL does, null and empty string are 0."""
+    if value is None or value == "":
+        return 0
+    if isinstance(value, bool):
+        raise ValueError(f"Cannot coerce {value!r} to a number")
+    if isinstance(value, (int, float)):
+        return value
+    value = str(value).strip()
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def to_boolean(value) -> bool:
+    """Coerces the value to a boolean the way EL does, only the string 'true' is true."""
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+
+def to_string(value) -> str:
+    """Coerces the value to a string the way EL does, null is an empty string."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _coerce_pair(left, right) -> Tuple[Any, Any]:
+    if is_number(left) or is_number(right):
+        return to_number(left), to_number(right)
+    if isinstance(left, bool) or isinstance(right, bool):
+        return to_boolean(left), to_boolean(right)
+    return left, right
+
+
+def equals(left, right) -> bool:
+    if left is None or right is None:
+        return left is right
+    left, right = _coerce_pair(left, right)
+    return bool(left == right)
+
+
+def not_equals(left, right) -> bool:
+    return not equals(left, right)
+
+
+def less_than(left, right) -> bool:
+    if left is None or right is None:
+        return False
+    left, right = _coerce_pair(left, right)
+    return bool(left < right)
+
+
+def greater_than(left, right) -> bool:
+    if left is None or right is None:
+        return False
+    left, right = _coerce_pair(left, right)
+    return bool(left > right)
+
+
+def less_equal(left, right) -> bool:
+    if left is None or right is None:
+        return False
+    left, right = _coerce_pair(left, right)
+    return bool(left <= right)
+
+
+def greater_equal(left, right) -> bool:
+    if left is None or right is None:
+        return False
+    left, right = _coerce_pair(left, right)
+    return bool(left >= right)
+
+
+def add(left, right) -> Union[int, float]:
+    return to_number(left) + to_number(right)
+
+
+def subtract(left, right) -> Union[int, float]:
+    return to_number(left) - to_number(right)
+
+
+def multiply(left, right) -> Union[int, float]:
+    return to_number(left) * to_number(right)
+
+
+def divide(left, right) -> float:
+    return to_number(left) / to_number(right)
+
+
+def remainder(left, right) -> Union[int, float]:
+    left, right = to_number(left), to_number(right)
+    if isinstance(left, int) and isinstance(right, int):
+        return int(math.fmod(left, right))
+    return math.fmod(left, right)
+
+
+def negate(value) -> Union[int, float]:
+    return -to_number(value)
+
+
+def logical_not(value) -> bool:
+    return not to_boolean(value)
+
+
+def is_empty(value) -> bool:
+    if value is None:
+        return True
+    try:
+        return len(value) == 0
+    except TypeError:
+        return False
@@ -12,68 +12,150 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""All WF EL functions"""
-# pylint: disable=unused-argument
+"""All WF EL functions, resolved from the context of the running Airflow task
+
+The functions read the context bound by the generated code: the decision callables call
+bind_context with their context and the Jinja macros of the templated fields bind the
+template context before calling the function. The values read from the metadata database,
+the task instances of the run and the XComs, are memoized for the DAG run, so evaluating
+several functions, or rendering several templated fields, queries each of them once.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from jinja2 import pass_context
+except ImportError:  # jinja2 < 3.0
+    from jinja2 import contextfunction as pass_context  # type: ignore
+
+# Params read by the functions without arguments, by the names of the functions
+PARAM_FUNCTIONS = {
+    "wf_app_path": "oozie.wf.application.path",
+    "wf_user": "user.name",
+    "wf_group": "group.name",
+}
+
+FAILED_STATE = "failed"
+FINISHED_STATES = frozenset({"success", "failed", "skipped", "upstream_failed"})
+
+
+class WfContextException(Exception):
+    pass
+
+
+class WfRuntime:
+    """The context of the running task and the values memoized for its DAG run"""
+
+    def __init__(self):
+        self.context = None
+        self.run_key: Optional[Tuple[Any, Any]] = None
+        self.cache: Dict[Tuple[Any, ...], Any] = {}
+
+    def bind(self, context) -> None:
+        """Binds the Airflow context, the memoized values are dropped when the DAG run changes."""
+        dag = context.get("dag")
+        run_key = (dag.dag_id if dag is not None else None, context.get("run_id"))
+        if run_key != self.run_key:
+            self.run_key = run_key
+            self.cache = {}
+        self.context = context
+
+    def get(self, name: str, default=None):
+        if self.context is None:
+            raise WfContextException("The wf: EL functions are used without the Airflow context bound")
+        value = self.context.get(name)
+        return default if value is None else value
+
+    def memoize(self, key: Tuple[Any, ...], compute: Callable[[], Any]):
+        if key not in self.cache:
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def get_param(self, name: str, default: str = "") -> Any:
+        return self.get("params", {}).get(name, default)
+
+    def get_task_instances(self) -> Dict[str, Any]:
+        """Returns the task instances of the DAG run by their task ids, queried once per run."""
+
+        def query():
+            dag_run = self.get("dag_run")
+            return {ti.task_id: ti for ti in dag_run.get_task_instances()} if dag_run else {}
+
+        task_instances: Dict[str, Any] = self.memoize(("task_instances",), query)
+        return task_instances
+
+    def get_state(self, node: str) -> Optional[str]:
+        task_instance = self.get_task_instances().get(node)
+        return task_instance.state if task_instance is not None else None
+
+    def xcom_pull(self, node: str, key: str = "return_value"):
+        """Returns the XCom pushed by the task of the node, pulled once per run."""
+        return self.memoize(("xcom", node, key), lambda: self.get("ti").xcom_pull(task_ids=node, key=key))
+
+
+RUNTIME = WfRuntime()
+
+
+def bind_context(context) -> None:
+    """Binds the context of the running task, the generated decision callables call it first."""
+    RUNTIME.bind(context)
 
 
 def wf_id():
     """
     It returns the workflow job ID for the current workflow job.
 
-    In airflow it can be found using Jinja templating for `run_id`
-    This has the effect that some parameters cannot be templated, and thus
-    this will fail.
+    In Airflow it is the id of the DAG run.
     """
-    return "{{ run_id }}"
+    return RUNTIME.get("run_id", "")
 
 
 def wf_name():
     """
     It returns the workflow application name for the current workflow job.
 
-    This has the effect that some parameters cannot be templated, and thus
-    this will fail.
-
     :return: Current DAG id.
     """
-    return "{{ dag.dag_id }}"
+    return RUNTIME.get("dag").dag_id
 
 
 def wf_app_path():
     """
     It returns the workflow application path for the current workflow job.
-    This has the effect that some parameters cannot be templated, and thus
-    this will fail.
     """
+    return RUNTIME.get_param(PARAM_FUNCTIONS["wf_app_path"])
 
 
-def wf_conf():
+def wf_conf(name):
     """
     It returns the value of the workflow job configuration property for the
     current workflow job, or an empty string if undefined.
 
-    This has the effect that some parameters cannot be templated, and thus
-    this will fail.
+    The configuration passed to the DAG run takes precedence over the params of the DAG.
     """
+    dag_run = RUNTIME.get("dag_run")
+    conf = getattr(dag_run, "conf", None) or {}
+    if name in conf:
+        return conf[name]
+    return RUNTIME.get_param(name)
 
 
 def wf_user():
     """
     Returns the user name that started the current workflow job.
-
     """
-    return "{{ params.user.name }}"
+    return RUNTIME.get_param(PARAM_FUNCTIONS["wf_user"])
 
 
 def wf_group():
     """
     It returns the group/ACL for the current workflow job.
 
-    In Airflow, I believe it uses RBAC vs ACL, need to discuss.
+    Airflow uses RBAC rather than ACLs, the group is read from the group.name param.
     """
+    return RUNTIME.get_param(PARAM_FUNCTIONS["wf_group"])
 
 
-def wf_callback(state_variable):
+def wf_callback(state_variable):  # pylint: disable=unused-argument
     """
     It returns the callback URL for the current workflow action node, stateVar
     can be a valid exit state (=OK= or ERROR ) for the action or a token to be
@@ -83,11 +165,9 @@ def wf_callback(state_variable):
     unique callback URL to the task, the task should invoke the given URL to
     notify its completion.
 
-    For cases that the task failed to invoke the callback URL for any reason
-    (i.e. a transient network failure) or when the type of task cannot invoke
-    the callback URL upon completion, Oozie has a mechanism to poll
-    computation/processing tasks for completion.
+    Airflow does not provide callback URLs to the tasks, an empty string is returned.
     """
+    return ""
 
 
 def wf_transition(node):
@@ -95,7 +175,13 @@ def wf_transition(node):
     It returns the transition taken by the specified workflow action node, or
     an empty string if the action has not being executed or it has not completed
     yet.
+
+    In Airflow it is the branch returned by the task of the node, if it is a task of the DAG run.
     """
+    if RUNTIME.get_state(node) not in FINISHED_STATES:
+        return ""
+    transition = RUNTIME.xcom_pull(node)
+    return transition if isinstance(transition, str) and transition in RUNTIME.get_task_instances() else ""
 
 
 def wf_last_error_node():
@@ -105,6 +191,14 @@ def wf_last_error_node():
     current workflow job.
     """
 
+    def find():
+        failed = [ti for ti in RUNTIME.get_task_instances().values() if ti.state == FAILED_STATE]
+        if not failed:
+            return ""
+        return max(failed, key=lambda ti: (ti.end_date is not None, ti.end_date or 0)).task_id
+
+    return RUNTIME.memoize(("last_error_node",), find)
+
 
 def wf_error_code(node):
     """
@@ -112,23 +206,35 @@ def wf_error_code(node):
     the action node has not exited with ERROR state.
 
     Each type of action node must define its complete error code list.
+    The code is read from the error_code XCom of the task, ERROR if the task has not pushed it.
     """
+    if RUNTIME.get_state(node) != FAILED_STATE:
+        return ""
+    return RUNTIME.xcom_pull(node, "error_code") or "ERROR"
 
 
-def wf_error_message(message):
+def wf_error_message(node):
     """
     It returns the error message for the specified action node, or an empty string
     if no action node has not exited with ERROR state.
 
     The error message can be useful for debugging and notification purposes.
+    The message is read from the error_message XCom of the task.
     """
+    if RUNTIME.get_state(node) != FAILED_STATE:
+        return ""
+    return RUNTIME.xcom_pull(node, "error_message") or ""
 
 
 def wf_run():
     """
     It returns the run number for the current workflow job, normally 0 unless the
     workflow job is re-run, in which case indicates the current run.
+
+    In Airflow it is the number of the retries of the current task.
     """
+    task_instance = RUNTIME.get("ti")
+    return max(task_instance.try_number - 1, 0) if task_instance is not None else 0
 
 
 def wf_action_data(node):
@@ -137,8 +243,27 @@ def wf_action_data(node):
     completion.
 
     The output data is in a Java Properties format and via this EL function it
-    is available as a Map.
+    is available as a Map. It is read from the value returned by the task of the node.
     """
+    data = RUNTIME.xcom_pull(node)
+    if isinstance(data, dict):
+        return {str(key): str(value) for key, value in data.items()}
+    if isinstance(data, str):
+        return parse_action_data(data)
+    return {}
+
+
+def parse_action_data(text: str) -> Dict[str, str]:
+    """Parses the output of an action in the simple key=value form of the properties files."""
+    data = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#!":
+            continue
+        separator = min((line.index(char) for char in "=:" if char in line), default=len(line))
+        value_start = separator + 1
+        data[line[:separator].strip()] = line[value_start:].strip()
+    return data
 
 
 def wf_action_external_id(node):
@@ -146,6 +271,7 @@ def wf_action_external_id(node):
     It returns the external Id for an action node, or an empty string if the
     action has not being executed or it has not completed yet.
     """
+    return RUNTIME.xcom_pull(node, "external_id") or ""
 
 
 def wf_action_tracker_uri(node):
@@ -153,6 +279,7 @@ def wf_action_tracker_uri(node):
     It returns the tracker URI for an action node, or an empty string if the action
     has not being executed or it has not completed yet.
     """
+    return RUNTIME.xcom_pull(node, "tracker_uri") or ""
 
 
 def wf_action_external_status(node):
@@ -160,3 +287,37 @@ def wf_action_external_status(node):
     It returns the external status for an action node, or an empty string if the
     action has not being executed or it has not completed yet.
     """
+    return RUNTIME.xcom_pull(node, "external_status") or ""
+
+
+def _to_macro(function: Callable) -> Callable:
+    @pass_context
+    def macro(context, *args):
+        bind_context(context)
+        return function(*args)
+
+    macro.__name__ = function.__name__
+    return macro
+
+
+WF_FUNCTIONS = (
+    wf_id,
+    wf_name,
+    wf_app_path,
+    wf_conf,
+    wf_user,
+    wf_group,
+    wf_callback,
+    wf_transition,
+    wf_last_error_node,
+    wf_error_code,
+    wf_error_message,
+    wf_run,
+    wf_action_data,
+    wf_action_external_id,
+    wf_action_tracker_uri,
+    wf_action_external_status,
+)
+
+# The functions as Jinja macros of the DAG, they bind the context of the rendered template
+MACROS = {function.__name__: _to_macro(function) for function in WF_FUNCTIONS}
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Builds Airflow DAGs from the declarative specs written by the converter (--output-format spec)
+
+A single loader module in the DAGs folder calls load_dags(), which builds a DAG from every
+*.spec.json file found next to it. Parsed specs are cached by file modification time, so the
+scheduler re-reads only the specs that changed since the previous parse in the same process.
+
+The specs hold no python code: the values of the arguments are JSON literals or the JSON objects
+with a single key below, which are interpreted without compiling anything. Callables and constants
+are imported only from the trusted modules: Airflow, o2a_libs and the modules generated next to
+the specs.
+
+    {"param": "key"}                           PARAMS["key"]
+    {"ref": "name"}                            PARAMS, dag, a task built before or the decision context
+    {"import": ["module", "name", ...]}        module.name..., imported as "from module import name"
+    {"attr": [value, "name"]}                  value.name
+    {"item": [value, key]}                     value[key]
+    {"call": value, "args": [], "kwargs": {}}  value(*args, **kwargs)
+    {"list": []}, {"tuple": []}, {"dict": [[key, value], ...]}
+    {"and": []}, {"or": []}, {"not": value}, {"if": [test, value, else_value]}
+    {"compare": [left, "==", right]}, {"binary": [left, "+", right]}
+    {"value": literal}                         the literal itself, for literals looking like the above
+"""
+import functools
+import glob
+import importlib
+import json
+import operator
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SPEC_VERSION = 2
+SPEC_FILE_SUFFIX = ".spec.json"
+
+# Modules the specs may import from, and the prefix of the sub-DAG modules generated next to them
+TRUSTED_MODULES = frozenset({"airflow", "o2a_libs", "datetime", "o2a_shared"})
+TRUSTED_MODULE_PREFIX = "subdag_"
+
+COMPARISON_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda left, right: left in right,
+    "not in": lambda left, right: left not in right,
+    "is": operator.is_,
+    "is not": operator.is_not,
+}
+BINARY_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "//": operator.floordiv,
+    "%": operator.mod,
+    "**": operator.pow,
+}
+
+# Keys of the single key JSON objects interpreted as values, and the keys of the calls
+VALUE_KEYS = frozenset(
+    {
+        "param",
+        "ref",
+        "import",
+        "attr",
+        "item",
+        "list",
+        "tuple",
+        "dict",
+        "and",
+        "or",
+        "not",
+        "if",
+        "compare",
+        "binary",
+        "value",
+    }
+)
+CALL_KEYS = frozenset({"call", "args", "kwargs"})
+
+# Parsed specs by path, together with the modification time of the file they were read from
+SPEC_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+
+class SpecException(Exception):
+    """Raised when a spec cannot be built into a DAG"""
+
+
+def is_trusted_module(module_name: str) -> bool:
+    """Returns true if the specs may import from the module."""
+    package = module_name.split(".")[0]
+    return package in TRUSTED_MODULES or package.startswith(TRUSTED_MODULE_PREFIX)
+
+
+def get_value_kind(value: Any) -> Optional[str]:
+    """Returns the key telling how the JSON value is interpreted, None if it is taken literally."""
+    if not isinstance(value, dict):
+        return None
+    if set(value) == CALL_KEYS:
+        return "call"
+    key = next(iter(value), None)
+    return str(key) if len(value) == 1 and key in VALUE_KEYS else None
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_import(path: Tuple[str, ...]) -> Any:
+    """
+    Returns the object imported by the path, its module followed by the names of the attributes.
+    Like "from module import name", a name missing from a package is imported as its submodule.
+
+    :raises SpecException: if the module is not trusted or the object does not exist.
+    """
+    module_name, *names = path
+    if not is_trusted_module(module_name):
+        raise SpecException(f"Importing from {module_name} is not allowed in specs")
+    value = importlib.import_module(module_name)
+    for name in names:
+        if name.startswith("_"):
+            raise SpecException(f"Private name {name} cannot be imported in specs")
+        if not hasattr(value, name) and hasattr(value, "__path__"):
+            importlib.import_module(f"{value.__name__}.{name}")
+        try:
+            value = getattr(value, name)
+        except AttributeError:
+            raise SpecException(f"Cannot import {'.'.join(path)}")
+    return value
+
+
+def load_spec(spec_path: str) -> Dict[str, Any]:
+    """
+    Returns the parsed spec, reading the file only if it changed since it was last read.
+    """
+    mtime = os.stat(spec_path).st_mtime_ns
+    cached = SPEC_CACHE.get(spec_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(spec_path) as file:
+        spec: Dict[str, Any] = json.load(file)
+    SPEC_CACHE[spec_path] = (mtime, spec)
+    return spec
+
+
+def _get_attribute(value: Any, name: str) -> Any:
+    if name.startswith("_"):
+        raise SpecException(f"Private attribute {name} cannot be read in specs")
+    return getattr(value, name)
+
+
+def _get_reference(name: str, namespace: Dict[str, Any]) -> Any:
+    if name not in namespace:
+        raise SpecException(f"Unknown name {name}")
+    return namespace[name]
+
+
+def _evaluate_all(values: List[Any], namespace: Dict[str, Any]) -> List[Any]:
+    return [evaluate(value, namespace) for value in values]
+
+
+def _evaluate_boolean(kind: str, operands: List[Any], namespace: Dict[str, Any]) -> Any:
+    # Like the python operators, the first operand deciding the result is returned
+    result = None
+    for operand in operands:
+        result = evaluate(operand, namespace)
+        if (not result) if kind == "and" else result:
+            break
+    return result
+
+
+# pylint: disable=too-many-return-statements,too-many-branches
+def evaluate(value: Any, namespace: Dict[str, Any]) -> Any:
+    """
+    Returns the value described in the spec, the names are looked up in the namespace.
+    """
+    kind = get_value_kind(value)
+    if kind is None:
+        return value
+    argument = value[kind]
+    if kind == "value":
+        return argument
+    if kind == "param":
+        return _get_reference("PARAMS", namespace)[argument]
+    if kind == "ref":
+        return _get_reference(argument, namespace)
+    if kind == "import":
+        return resolve_import(tuple(argument))
+    if kind == "attr":
+        return _get_attribute(evaluate(argument[0], namespace), argument[1])
+    if kind == "item":
+        return evaluate(argument[0], namespace)[evaluate(argument[1], namespace)]
+    if kind == "call":
+        args = _evaluate_all(value["args"], namespace)
+        kwargs = {name: evaluate(kwarg, namespace) for name, kwarg in value["kwargs"].items()}
+        return evaluate(argument, namespace)(*args, **kwargs)
+    if kind == "list":
+        return _evaluate_all(argument, namespace)
+    if kind == "tuple":
+        return tuple(_evaluate_all(argument, namespace))
+    if kind == "dict":
+        return {evaluate(key, namespace): evaluate(item, namespace) for key, item in argument}
+    if kind in ("and", "or"):
+        return _evaluate_boolean(kind, argument, namespace)
+    if kind == "not":
+        return not evaluate(argument, namespace)
+    if kind == "if":
+        test, body, orelse = argument
+        return evaluate(body if evaluate(test, namespace) else orelse, namespace)
+    left, operator_name, right = argument
+    operators = COMPARISON_OPERATORS if kind == "compare" else BINARY_OPERATORS
+    return operators[operator_name](evaluate(left, namespace), evaluate(right, namespace))
+
+
+def build_decision(name: str, description: Dict[str, Any], namespace: Dict[str, Any]) -> Callable[..., str]:
+    """
+    Returns the callable of a branch task: it evaluates the steps (e.g. binding the context to the
+    wf: functions), then returns the task of the first case whose predicate is true, else the default.
+    """
+
+    def decide(**context) -> str:
+        local_namespace = dict(namespace, context=context)
+        for step in description["steps"]:
+            evaluate(step, local_namespace)
+        for predicate, task_id in description["cases"]:
+            if evaluate(predicate, local_namespace):
+                return str(task_id)
+        return str(description["default"])
+
+    decide.__name__ = name
+    return decide
+
+
+def _call(description: Dict[str, Any], namespace: Dict[str, Any]) -> Any:
+    function = resolve_import(tuple(description["callable"]))
+    args = _evaluate_all(description["args"], namespace)
+    kwargs = {name: evaluate(kwarg, namespace) for name, kwarg in description["kwargs"].items()}
+    return function(*args, **kwargs)
+
+
+def build_dag(spec: Dict[str, Any]):
+    """
+    Builds the DAG described by the spec.
+
+    :raises SpecException: if the spec was written for another version of the loader.
+    """
+    if spec.get("version") != SPEC_VERSION:
+        raise SpecException(f"Spec version {spec.get('version')} is not supported, regenerate the spec")
+    namespace: Dict[str, Any] = {}
+    namespace["PARAMS"] = evaluate(spec["params"], namespace)
+    dag = _call(spec["dag"], namespace)
+    namespace["dag"] = dag
+    with dag:
+        for description in spec["objects"]:
+            name = description["name"]
+            if "decision" in description:
+                namespace[name] = build_decision(name, description["decision"], namespace)
+            else:
+                namespace[name] = _call(description, namespace)
+        for upstream, downstream in spec["edges"]:
+            namespace[upstream].set_downstream(namespace[downstream])
+    return dag
+
+
+def load_dags(dags_folder: str, module_globals: Dict[str, Any]) -> None:
+    """
+    Builds DAGs from all specs in the folder and puts them into the globals of the loader module,
+    where the scheduler looks for DAGs.
+
+    Every spec is built before the failures are raised together, so that a broken spec is reported
+    as an import error of the loader module.
+
+    :raises SpecException: if any of the specs fails to build.
+    """
+    failures = []
+    for spec_path in sorted(glob.glob(os.path.join(dags_folder, "*" + SPEC_FILE_SUFFIX))):
+        try:
+            dag = build_dag(load_spec(spec_path))
+        except Exception as ex:  # pylint: disable=broad-except
+            failures.append(f"{spec_path}: {type(ex).__name__}: {ex}")
+            continue
+        module_globals["dag_" + re.sub(r"\W", "_", dag.dag_id)] = dag
+    if failures:
+        raise SpecException("Failed to build DAGs from specs:\n" + "\n".join(failures))
@@ -16,12 +16,15 @@
 
 set -x
 
-while getopts ":c:r:d:m:" OPT; do
+BATCH="false"
+
+while getopts ":c:r:d:m:b" OPT; do
      case ${OPT} in
         c) CLUSTER=$OPTARG;;
         r) REGION=$OPTARG;;
         d) DEL_DIRS=$OPTARG;;
         m) MK_DIRS=$OPTARG;;
+        b) BATCH="true";;
         \?)
             echo "Invalid option: -$OPTARG" >&2
             exit 1
@@ -33,6 +36,22 @@ while getopts ":c:r:d:m:" OPT; do
      esac
 done
 
+if [[ ${BATCH} == "true" ]]; then
+    # All paths are handled by a single Pig job. 'fs -rm -r -f' does not fail when
+    # the directory is missing, so it replaces the separate 'fs -test -d' submission.
+    COMMANDS=""
+    for DEL_DIR in ${DEL_DIRS}; do
+        COMMANDS="${COMMANDS}fs -rm -r -f ${DEL_DIR};"
+    done
+    for MK_DIR in ${MK_DIRS}; do
+        COMMANDS="${COMMANDS}fs -mkdir -p ${MK_DIR};"
+    done
+    if [[ -n ${COMMANDS} ]]; then
+        gcloud dataproc jobs submit pig --cluster=${CLUSTER} --region=${REGION} --execute "${COMMANDS}"
+    fi
+    exit $?
+fi
+
 for DEL_DIR in ${DEL_DIRS}; do
     set +e
     gcloud dataproc jobs submit pig --cluster=${CLUSTER} --region=${REGION} --execute 'fs -test -d '${DEL_DIR}
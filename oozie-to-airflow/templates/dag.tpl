@@ -17,5 +17,15 @@
 with models.DAG(
     '{{ dag_name }}',
     schedule_interval={% if schedule_interval %}datetime.timedelta(days={{ schedule_interval }}){% else %}None{% endif %},  # Change to suit your needs
+{%- if concurrency %}
+    concurrency={{ concurrency }},
+{%- endif %}
+{%- if max_active_runs %}
+    max_active_runs={{ max_active_runs }},
+{%- endif %}
+    params=PARAMS,
+{%- if user_defined_macros %}
+    user_defined_macros={{ user_defined_macros }},
+{%- endif %}
     start_date=dates.days_ago({{ start_days_ago }})  # Change to suit your needs
 ) as dag:
@@ -17,5 +17,12 @@
     with models.DAG(
         '{0}.{1}'.format(parent_dag_name, child_dag_name),
         schedule_interval=schedule_interval,  # Change to suit your needs
+{%- if concurrency %}
+        concurrency={{ concurrency }},
+{%- endif %}
+        params=PARAMS,
+{%- if user_defined_macros %}
+        user_defined_macros={{ user_defined_macros }},
+{%- endif %}
         start_date=start_date  # Change to suit your needs
     ) as dag:
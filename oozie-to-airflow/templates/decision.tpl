@@ -14,7 +14,13 @@
   limitations under the License.
  #}
 
-def {{ task_id }}_decision():
+def {{ task_id }}_decision({% if fs_paths or uses_wf_functions %}**context{% endif %}):
+{%- if uses_wf_functions %}
+    el_wf_functions.bind_context(context)
+{%- endif %}
+{%- if fs_paths %}
+    el_fs_functions.prefetch([{{ fs_paths | join(", ") }}], run_id=context.get("run_id"))
+{%- endif %}
 {% for key, val in case_dict -%}
 {%- if loop.first %}
     if {{ key }}:
@@ -34,5 +40,6 @@ def {{ task_id }}_decision():
 {{ task_id }} = python_operator.BranchPythonOperator(
     python_callable={{task_id}}_decision,
     task_id='{{task_id}}',
-    trigger_rule='{{trigger_rule}}',
+    trigger_rule='{{trigger_rule}}',{% if fs_paths or uses_wf_functions %}
+    provide_context=True,{% endif %}{% include "task_args.tpl" %}
 )
@@ -14,8 +14,8 @@
   limitations under the License.
  #}
 
-{{ task_id }} = bash_operator.BashOperator(
-    bash_command='exit 1',
+{{ task_id }} = control_operators.KillOperator(
     task_id='{{ task_id }}',
-    trigger_rule='{{ trigger_rule }}',
+    trigger_rule='{{ trigger_rule }}',{% include "task_args.tpl" %}
+    message={{ message }},
 )
@@ -15,17 +15,17 @@
  #}
 
 {{ task_id }}_prepare = bash_operator.BashOperator(
-    task_id='{{ task_id }}_prepare',
+    task_id='{{ task_id }}_prepare',{% include "task_args.tpl" %}
     bash_command='{{ prepare_command }}'
 )
 
 {{ task_id }} = dataproc_operator.DataProcPigOperator(
     query_uri='{}/{}'.format(PARAMS['gcp_uri_prefix'], '{{ script_file_name }}'),
     task_id='{{ task_id }}',
-    trigger_rule='{{ trigger_rule }}',
+    trigger_rule='{{ trigger_rule }}',{% include "task_args.tpl" %}
     variables={{ params_dict }},
     dataproc_pig_properties={{ properties }},
-    cluster_name=PARAMS['dataproc_cluster'],
+    cluster_name={% if dataproc_cluster %}'{{ dataproc_cluster }}'{% else %}PARAMS['dataproc_cluster']{% endif %},
     gcp_conn_id=PARAMS['gcp_conn_id'],
     region=PARAMS['gcp_region'],
     dataproc_job_id='{{ task_id }}'
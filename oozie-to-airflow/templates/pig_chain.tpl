@@ -0,0 +1,30 @@
+{#
+  Copyright 2019 Google LLC
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+ #}
+{#-
+  Single Pig job running the scripts of all steps of a linear chain of Pig actions.
+#}
+
+{{ task_id }} = dataproc_operator.DataProcPigOperator(
+    query_uri='{}/{}'.format(PARAMS['gcp_uri_prefix'], '{{ script_file_name }}'),
+    task_id='{{ task_id }}',
+    trigger_rule='{{ trigger_rule }}',{% include "task_args.tpl" %}
+    variables={{ params_dict }},
+    dataproc_pig_properties={{ properties }},
+    cluster_name={% if dataproc_cluster %}'{{ dataproc_cluster }}'{% else %}PARAMS['dataproc_cluster']{% endif %},
+    gcp_conn_id=PARAMS['gcp_conn_id'],
+    region=PARAMS['gcp_region'],
+    dataproc_job_id='{{ task_id }}'
+)
@@ -0,0 +1,27 @@
+{#
+  Copyright 2019 Google LLC
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+ #}
+"""Properties and helpers shared by the DAGs converted from Oozie in one batch"""
+
+SHARED_PARAMS = {{ shared_params }}
+
+
+def merge_params(dag_params):
+    """
+    Returns PARAMS of a DAG - the shared properties updated with the properties of the DAG.
+    """
+    params = dict(SHARED_PARAMS)
+    params.update(dag_params)
+    return params
@@ -15,14 +15,16 @@
  #}
 
 {{ task_id }}_prepare = bash_operator.BashOperator(
-    task_id='{{ task_id }}_prepare',
+    task_id='{{ task_id }}_prepare',{% include "task_args.tpl" %}
     bash_command='{{ prepare_command }}'
 )
 
-{{ task_id }} = bash_operator.BashOperator(
-    task_id='{{ task_id }}',
-    bash_command="gcloud dataproc jobs submit pig --cluster={0} --region={1} --execute 'sh {{ bash_command }}'"
-            .format(PARAMS['dataproc_cluster'], PARAMS['gcp_region'])
+{{ task_id }} = dataproc_operator.DataProcPigOperator(
+    task_id='{{ task_id }}',{% include "task_args.tpl" %}
+    query="sh {{ bash_command }}",
+    cluster_name={% if dataproc_cluster %}'{{ dataproc_cluster }}'{% else %}PARAMS['dataproc_cluster']{% endif %},
+    gcp_conn_id=PARAMS['gcp_conn_id'],
+    region=PARAMS['gcp_region'],
 )
 
 {{ task_id }}_prepare.set_downstream({{ task_id }})
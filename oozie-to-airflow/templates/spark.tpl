@@ -17,7 +17,7 @@
 
 {{ task_id }} = spark_submit_operator.SparkSubmitOperator(
     task_id = '{{ task_id }}',
-    trigger_rule = '{{ trigger_rule }}',
+    trigger_rule = '{{ trigger_rule }}',{% include "task_args.tpl" %}
     params=PARAMS,
     # Spark specific
     name = {{ spark_name }},
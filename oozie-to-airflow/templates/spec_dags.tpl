@@ -0,0 +1,24 @@
+{#
+  Copyright 2019 Google LLC
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+ #}
+"""Airflow DAGs built from the *.spec.json files in this folder.
+
+The words "airflow" and "DAG" above make the scheduler parse this file.
+"""
+import os
+
+from o2a_libs import spec_loader
+
+spec_loader.load_dags(os.path.dirname(os.path.abspath(__file__)), globals())
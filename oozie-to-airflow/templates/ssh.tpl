@@ -23,7 +23,7 @@
 {{ task_id }} = ssh_operator.SSHOperator(
     ssh_hook={{ task_id }}_hook,
     task_id='{{ task_id }}',
-    trigger_rule='{{ trigger_rule }}',
+    trigger_rule='{{ trigger_rule }}',{% include "task_args.tpl" %}
     params=PARAMS,
     command={{ command }},
 )
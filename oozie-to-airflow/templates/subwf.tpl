@@ -15,6 +15,6 @@
  #}
 
 {{ task_id }} = SubDagOperator(
-    subdag=sub_dag(dag.dag_id, '{{ task_id }}', dag.start_date, dag.schedule_interval),
-    task_id='{{ task_id }}',
+    subdag={{ subdag_module }}.sub_dag(dag.dag_id, '{{ task_id }}', dag.start_date, dag.schedule_interval),
+    task_id='{{ task_id }}',{% include "task_args.tpl" %}
 )
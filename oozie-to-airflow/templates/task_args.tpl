@@ -0,0 +1,25 @@
+{#
+  Copyright 2019 Google LLC
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+ #}
+{#-
+  Optional arguments shared by all generated operators, included after the trigger_rule (or task_id) argument.
+#}
+{%- if priority_weight %}
+    priority_weight={{ priority_weight }},
+    weight_rule='absolute',
+{%- endif %}
+{%- if pool %}
+    pool='{{ pool }}',
+{%- endif %}
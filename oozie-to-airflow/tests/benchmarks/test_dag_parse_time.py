@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests DAG parse time benchmark"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks import dag_parse_time
+
+
+class TestDagParseTime(unittest.TestCase):
+    @staticmethod
+    def _result(file, import_ms, errors=None):
+        return {
+            "file": file,
+            "import_ms": import_ms,
+            "dags": 1,
+            "tasks": 2,
+            "edges": 1,
+            "size_bytes": 100,
+            "errors": errors or [],
+        }
+
+    def test_find_dag_files(self):
+        dags_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, dags_folder)
+        for file_name in ["b.py", "a.py", "__init__.py", "id.pig", "a.report.json"]:
+            open(os.path.join(dags_folder, file_name), "w").close()
+
+        self.assertEqual(
+            [os.path.join(dags_folder, "a.py"), os.path.join(dags_folder, "b.py")],
+            dag_parse_time.find_dag_files(dags_folder),
+        )
+
+    @mock.patch("airflow.models.DagBag")
+    def test_measure_file(self, dag_bag):
+        dags_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, dags_folder)
+        file_path = os.path.join(dags_folder, "dag.py")
+        with open(file_path, "w") as file:
+            file.write("# DAG\n")
+        tasks = [mock.Mock(downstream_task_ids={"b", "c"}), mock.Mock(downstream_task_ids=set())]
+        dag_bag.return_value.dags = {"dag": mock.Mock(tasks=tasks)}
+        dag_bag.return_value.import_errors = {}
+
+        result = dag_parse_time.measure_file(file_path, repeat=2)
+
+        self.assertEqual(2, dag_bag.call_count)
+        dag_bag.assert_called_with(dag_folder=file_path, include_examples=False)
+        self.assertEqual("dag.py", result["file"])
+        self.assertEqual(1, result["dags"])
+        self.assertEqual(2, result["tasks"])
+        self.assertEqual(2, result["edges"])
+        self.assertEqual(6, result["size_bytes"])
+        self.assertEqual([], result["errors"])
+
+    def test_summarize(self):
+        results = [self._result("a.py", 10), self._result("b.py", 30), self._result("c.py", 5, ["Error"])]
+
+        report = dag_parse_time.summarize(results, budget_ms=20)
+
+        self.assertEqual(45, report["total_import_ms"])
+        self.assertEqual(["c.py"], report["failed"])
+        self.assertEqual(["b.py"], report["over_budget"])
+
+    def test_summarize_without_budget(self):
+        report = dag_parse_time.summarize([self._result("a.py", 1000)])
+
+        self.assertEqual([], report["over_budget"])
+
+    def test_configure_airflow_home(self):
+        with mock.patch.dict(os.environ, clear=True):
+            dag_parse_time.configure_airflow_home()
+            airflow_home = os.environ["AIRFLOW_HOME"]
+            self.addCleanup(shutil.rmtree, airflow_home)
+
+            sql_alchemy_conn = os.environ["AIRFLOW__CORE__SQL_ALCHEMY_CONN"]
+            self.assertEqual(f"sqlite:///{airflow_home}/airflow.db", sql_alchemy_conn)
+            self.assertEqual("False", os.environ["AIRFLOW__CORE__LOAD_EXAMPLES"])
+
+    def test_configure_airflow_home_keeps_existing(self):
+        with mock.patch.dict(os.environ, {"AIRFLOW_HOME": "/airflow"}, clear=True):
+            dag_parse_time.configure_airflow_home()
+
+            self.assertEqual({"AIRFLOW_HOME": "/airflow"}, dict(os.environ))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests EL basic functions benchmark"""
+import unittest
+
+from parameterized import parameterized
+
+from benchmarks import el_basic_functions
+
+
+class TestElBasicFunctions(unittest.TestCase):
+    @parameterized.expand([(name,) for name, _, _, _ in el_basic_functions.FUNCTIONS if name != "timestamp"])
+    def test_previous_implementation(self, name):
+        _, previous, current, args = next(
+            function for function in el_basic_functions.FUNCTIONS if function[0] == name
+        )
+
+        self.assertEqual(previous(*args), current(*args))
+
+    def test_measure(self):
+        results = el_basic_functions.measure(number=10)
+
+        self.assertEqual({name for name, _, _, _ in el_basic_functions.FUNCTIONS}, set(results["functions"]))
+        for result in results["functions"].values():
+            self.assertGreater(result["previous_us"], 0)
+            self.assertGreater(result["current_us"], 0)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests EL engine benchmark"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks import el_engine
+
+
+class TestElEngine(unittest.TestCase):
+    def setUp(self):
+        self.app_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.app_dir)
+
+    def test_find_expressions(self):
+        with open(os.path.join(self.app_dir, "workflow.xml"), "w") as workflow_file:
+            # language=XML
+            workflow_file.write("""<workflow-app xmlns="uri:oozie:workflow:0.1" name="wf">
+    <action name="${actionName}"><pig><script>${script}</script><param>plain</param></pig></action>
+</workflow-app>""")
+        with open(os.path.join(self.app_dir, "job.properties"), "w") as properties_file:
+            properties_file.write("#comment=${ignored}\nnameNode=hdfs://\nappPath=${nameNode}/app\n")
+        with open(os.path.join(self.app_dir, "id.pig"), "w") as script_file:
+            script_file.write("A = LOAD '${INPUT}';\n")
+
+        expressions = el_engine.find_expressions([self.app_dir])
+
+        for expression in ["${actionName}", "${script}", "${nameNode}/app"]:
+            self.assertIn(expression, expressions)
+        self.assertNotIn("${ignored}", expressions)
+        self.assertNotIn("A = LOAD '${INPUT}';", expressions)
+        self.assertTrue(set(el_engine.SAMPLE_EXPRESSIONS).issubset(expressions))
+        self.assertEqual(sorted(expressions), expressions)
+
+    def test_measure(self):
+        expressions = ["${nameNode}", "${a b}", "${unknown()}"]
+
+        results = el_engine.measure(expressions, repeat=2)
+
+        self.assertEqual(3, results["expressions"])
+        self.assertEqual(2, results["parsed"])
+        for key in ["regex_ms", "engine_cold_ms", "engine_warm_ms"]:
+            self.assertGreaterEqual(results[key], 0)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests EL substitution benchmark"""
+import unittest
+
+from benchmarks import el_substitution
+
+
+class TestElSubstitution(unittest.TestCase):
+    def test_replace_with_findall(self):
+        params = {"nameNode": "hdfs://", "dir": "tmp"}
+
+        self.assertEqual(
+            "hdfs:///tmp/${wf:user()}/${unknown}",
+            el_substitution.replace_with_findall("${nameNode}/${dir}/${wf:user()}/${unknown}", params),
+        )
+
+    def test_create_texts(self):
+        params = el_substitution.create_params(properties=3)
+        texts = el_substitution.create_texts(actions=2, properties=3)
+
+        self.assertEqual(7, len(params))
+        self.assertEqual(14, len(texts))
+        self.assertIn("${property2}-${queueName}", texts)
+
+    def test_measure(self):
+        results = el_substitution.measure(actions=2, properties=2, repeat=1)
+
+        self.assertEqual(12, results["texts"])
+        for key in ["findall_replace_ms", "single_pass_regex_ms", "first_conversion_ms", "memoized_ms"]:
+            self.assertGreater(results[key], 0)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests copying of the assets of DAGs"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from converter import asset_copier
+from converter.primitives import Asset
+
+
+class TestAssetCopier(unittest.TestCase):
+    def setUp(self):
+        self.input_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.input_directory_path)
+        self.output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_directory_path)
+        self.first_path = self._write("first.pig", "A = LOAD 'x';\n")
+        self.copy_path = self._write("copy.pig", "A = LOAD 'x';\n")
+        self.second_path = self._write("second.pig", "B = LOAD 'y';\n")
+
+    def _write(self, name, content):
+        path = os.path.join(self.input_directory_path, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def _read(self, name):
+        with open(os.path.join(self.output_directory_path, name)) as file:
+            return file.read()
+
+    def test_copy_assets(self):
+        statistics = asset_copier.copy_assets(
+            [
+                Asset("first.pig", source_path=self.first_path),
+                Asset("scripts/second.pig", source_path=self.second_path, header="set x 1;\n"),
+                Asset("chain.pig", content="C = LOAD 'z';\n"),
+            ],
+            self.output_directory_path,
+        )
+
+        self.assertEqual(3, sum(statistics.values()))
+        self.assertEqual(2, statistics[asset_copier.WRITTEN])
+        self.assertEqual("A = LOAD 'x';\n", self._read("first.pig"))
+        self.assertEqual("set x 1;\nB = LOAD 'y';\n", self._read("scripts/second.pig"))
+        self.assertEqual("C = LOAD 'z';\n", self._read("chain.pig"))
+
+    def test_same_asset_is_written_once(self):
+        asset = Asset("first.pig", source_path=self.first_path)
+
+        with mock.patch("converter.asset_copier.write_asset", return_value=asset_copier.COPIED) as write:
+            statistics = asset_copier.copy_assets([asset, asset], self.output_directory_path)
+
+        write.assert_called_once_with(asset, os.path.join(self.output_directory_path, "first.pig"))
+        self.assertEqual({asset_copier.COPIED: 1}, statistics)
+
+    def test_same_content_is_deduplicated(self):
+        statistics = asset_copier.copy_assets(
+            [
+                Asset("first.pig", source_path=self.first_path),
+                Asset("copy.pig", source_path=self.copy_path),
+                Asset("second.pig", source_path=self.second_path),
+            ],
+            self.output_directory_path,
+        )
+
+        self.assertEqual(1, statistics[asset_copier.DEDUPLICATED])
+        self.assertEqual("A = LOAD 'x';\n", self._read("copy.pig"))
+        self.assertEqual("B = LOAD 'y';\n", self._read("second.pig"))
+
+    def test_different_content_with_same_destination(self):
+        with self.assertRaises(asset_copier.AssetCopyException):
+            asset_copier.copy_assets(
+                [Asset("id.pig", source_path=self.first_path), Asset("id.pig", source_path=self.second_path)],
+                self.output_directory_path,
+            )
+
+    def test_same_content_with_same_destination(self):
+        statistics = asset_copier.copy_assets(
+            [Asset("id.pig", source_path=self.first_path), Asset("id.pig", source_path=self.copy_path)],
+            self.output_directory_path,
+        )
+
+        self.assertEqual(1, sum(statistics.values()))
+
+    def test_only_assets_of_same_size_are_read(self):
+        with mock.patch("converter.asset_copier.get_digest", wraps=asset_copier.get_digest) as get_digest:
+            asset_copier.copy_assets(
+                [Asset("first.pig", source_path=self.first_path), Asset("chain.pig", content="x")],
+                self.output_directory_path,
+            )
+
+        get_digest.assert_not_called()
+
+    def test_copy_falls_back_to_streaming(self):
+        with mock.patch("converter.asset_copier.clone_file", return_value=False), mock.patch(
+            "converter.asset_copier.link_file", return_value=False
+        ):
+            statistics = asset_copier.copy_assets(
+                [Asset("first.pig", source_path=self.first_path)], self.output_directory_path
+            )
+
+        self.assertEqual({asset_copier.COPIED: 1}, statistics)
+        self.assertEqual("A = LOAD 'x';\n", self._read("first.pig"))
+
+    def test_linked_file_is_replaced_not_written_through(self):
+        destination_path = os.path.join(self.output_directory_path, "first.pig")
+        os.link(self.second_path, destination_path)
+
+        asset_copier.copy_assets([Asset("first.pig", content="new\n")], self.output_directory_path)
+
+        self.assertEqual("new\n", self._read("first.pig"))
+        with open(self.second_path) as file:
+            self.assertEqual("B = LOAD 'y';\n", file.read())
+
+    def test_source_is_destination(self):
+        statistics = asset_copier.copy_assets(
+            [Asset("first.pig", source_path=self.first_path)], self.input_directory_path
+        )
+
+        self.assertEqual({asset_copier.DEDUPLICATED: 1}, statistics)
+        with open(self.first_path) as file:
+            self.assertEqual("A = LOAD 'x';\n", file.read())
+
+    def test_no_assets(self):
+        self.assertEqual({}, asset_copier.copy_assets([], self.output_directory_path))
+
+    def test_no_output_directory(self):
+        with self.assertRaises(asset_copier.AssetCopyException):
+            asset_copier.copy_assets([Asset("first.pig", content="")], "")
+
+    def test_asset_without_source(self):
+        with self.assertRaisesRegex(asset_copier.AssetCopyException, "first.pig has neither"):
+            asset_copier.copy_assets([Asset("first.pig")], self.output_directory_path)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests Batch Converter"""
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from converter.batch_converter import BatchConverter, BatchConverterException
+from converter.mappers import CONTROL_MAP, ACTION_MAP
+from tests.utils.test_paths import EXAMPLE_SUBWORKFLOW_PATH
+
+
+class TestBatchConverter(unittest.TestCase):
+
+    params = {
+        "user.name": "test",
+        "nameNode": "hdfs://",
+        "queueName": "default",
+        "examplesRoot": "examples",
+        "dataproc_cluster": "cluster-o2a",
+        "gcp_conn_id": "google_cloud_default",
+        "gcp_region": "europe-west3",
+        "gcp_uri_prefix": "gs://test_bucket/dags",
+    }
+
+    def setUp(self):
+        self.input_directory_path = tempfile.mkdtemp()
+        self.output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.input_directory_path)
+        self.addCleanup(shutil.rmtree, self.output_directory_path)
+        # Two applications running the same sub-workflow
+        for app_name in ["app_b", "app_a"]:
+            app_path = os.path.join(self.input_directory_path, "apps", app_name)
+            shutil.copytree(EXAMPLE_SUBWORKFLOW_PATH, app_path)
+        os.makedirs(os.path.join(self.input_directory_path, "not_an_app"))
+        self.converter = BatchConverter(
+            input_directory_path=self.input_directory_path,
+            output_directory_path=self.output_directory_path,
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+        )
+
+    def test_find_applications(self):
+        apps_path = os.path.join(self.input_directory_path, "apps")
+        self.assertEqual(
+            [os.path.join(apps_path, "app_a"), os.path.join(apps_path, "app_b")],
+            self.converter.find_applications(),
+        )
+
+    def test_get_dag_name(self):
+        apps_path = os.path.join(self.input_directory_path, "apps")
+
+        self.assertEqual("apps_app_a", self.converter.get_dag_name(os.path.join(apps_path, "app_a")))
+        self.assertEqual(
+            os.path.basename(self.input_directory_path),
+            self.converter.get_dag_name(self.input_directory_path),
+        )
+
+    def test_same_dag_names_fail(self):
+        converters = [
+            mock.Mock(dag_name="team_app", input_directory_path="team/app"),
+            mock.Mock(dag_name="team_app", input_directory_path="team_app"),
+        ]
+
+        with self.assertRaisesRegex(BatchConverterException, "team_app"):
+            self.converter.check_dag_names(converters)
+
+    def _write_workflow(self, name, app_paths):
+        app_path = os.path.join(self.input_directory_path, name)
+        os.makedirs(app_path)
+        actions = "".join(
+            f'<action name="sub{index}"><sub-workflow><app-path>{path}</app-path></sub-workflow></action>'
+            for index, path in enumerate(app_paths)
+        )
+        with open(os.path.join(app_path, "workflow.xml"), "w") as file:
+            file.write(f'<workflow-app xmlns="uri:oozie:workflow:0.5" name="{name}">{actions}</workflow-app>')
+        return mock.Mock(
+            input_directory_path=app_path,
+            params={"nameNode": "hdfs://nn", "oozie.wf.application.path": f"hdfs://nn/apps/{name}/"},
+        )
+
+    def test_find_subworkflow_applications(self):
+        parent = self._write_workflow(
+            "parent", ["${nameNode}/apps/child/workflow.xml", "hdfs://nn/apps/other"]
+        )
+        child = self._write_workflow("child", ["${nameNode}/apps/grandchild"])
+        grandchild = self._write_workflow("grandchild", [])
+        # Only the exact path of an application refers to it
+        suffix = self._write_workflow("other/child", [])
+
+        self.assertEqual(
+            {child.input_directory_path, grandchild.input_directory_path},
+            self.converter.find_subworkflow_applications([parent, child, grandchild, suffix]),
+        )
+
+    def test_find_subworkflow_applications_running_each_other(self):
+        first = self._write_workflow("first", ["hdfs://nn/apps/second"])
+        second = self._write_workflow("second", ["hdfs://nn/apps/first"])
+
+        self.assertEqual(set(), self.converter.find_subworkflow_applications([first, second]))
+
+    def test_convert_skips_subworkflow_apps_on_request(self):
+        converters = [
+            self._write_workflow("parent", ["hdfs://nn/apps/child"]),
+            self._write_workflow("child", []),
+        ]
+        for converter in converters:
+            converter.dag_name = os.path.basename(converter.input_directory_path)
+        app_paths = [converter.input_directory_path for converter in converters]
+
+        find_applications = mock.patch.object(self.converter, "find_applications", return_value=app_paths)
+        create_converter = mock.patch.object(
+            self.converter, "create_converter", side_effect=dict(zip(app_paths, converters)).get
+        )
+
+        with find_applications, create_converter:
+            self.assertEqual(["parent", "child"], self.converter.convert())
+            self.converter.skip_subworkflow_apps = True
+            with self.assertLogs(level="WARNING"):
+                self.assertEqual(["parent"], self.converter.convert())
+
+    @mock.patch("utils.el_utils.parse_els")
+    def test_convert_generates_shared_subworkflow_once(self, parse_els):
+        parse_els.side_effect = lambda properties_file, params: {**self.params, **params}
+        stale_file = os.path.join(self.output_directory_path, "stale.py")
+        open(stale_file, "w").close()
+
+        with mock.patch(
+            "converter.subworkflow_converter.OozieSubworkflowConverter.convert", autospec=True
+        ) as convert:
+            convert.side_effect = lambda converter: open(converter.output_dag_name, "w").close()
+            dag_names = self.converter.convert()
+
+        self.assertEqual(["apps_app_a", "apps_app_b"], dag_names)
+        self.assertFalse(os.path.exists(stale_file))
+        convert.assert_called_once()
+        subdag_files = [name for name in os.listdir(self.output_directory_path) if name.startswith("subdag_")]
+        self.assertEqual(1, len(subdag_files))
+        subdag_module = subdag_files[0][: -len(".py")]
+        for dag_name in dag_names:
+            with open(os.path.join(self.output_directory_path, dag_name + ".py")) as file:
+                content = file.read()
+            self.assertIn(f"import {subdag_module}\n", content)
+            self.assertIn(f"subdag={subdag_module}.sub_dag(", content)
+
+    @mock.patch("converter.subworkflow_converter.OozieSubworkflowConverter.convert")
+    def test_convert_with_shared_params(self, _):
+        for app_name, cluster in [("app_a", "cluster-a"), ("app_b", "cluster-b")]:
+            app_path = os.path.join(self.input_directory_path, "apps", app_name)
+            with open(os.path.join(app_path, "configuration.properties"), "w") as file:
+                file.write(f"dataproc_cluster={cluster}\ngcp_region=europe-west3\n")
+        self.converter.user = "test"
+        self.converter.options = self.converter.options._replace(shared_module=True)
+
+        self.converter.convert()
+
+        spec = importlib.util.spec_from_file_location(
+            "o2a_shared", os.path.join(self.output_directory_path, "o2a_shared.py")
+        )
+        shared_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(shared_module)
+        self.assertEqual("europe-west3", shared_module.SHARED_PARAMS["gcp_region"])
+        self.assertEqual("test", shared_module.SHARED_PARAMS["user.name"])
+        self.assertNotIn("dataproc_cluster", shared_module.SHARED_PARAMS)
+        self.assertEqual(
+            {**shared_module.SHARED_PARAMS, "a": "b"}, shared_module.merge_params({"a": "b"})
+        )
+        with open(os.path.join(self.output_directory_path, "apps_app_a.py")) as file:
+            content = file.read()
+        self.assertIn("import o2a_shared\n", content)
+        self.assertIn('PARAMS = o2a_shared.merge_params({\n    "dataproc_cluster": "cluster-a"\n})', content)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests assignment of Dataproc jobs to clusters"""
+import unittest
+from xml.etree.ElementTree import Element
+
+from converter import cluster_assignment
+from mappers.dummy_mapper import DummyMapper
+from mappers.prepare_mixin import PrepareMixin
+from tests.utils.test_nodes import make_nodes
+
+
+class DataprocMapper(DummyMapper, PrepareMixin):
+    pass
+
+
+def create_mapper(name):
+    tag = name.rstrip("0123456789")
+    mapper_class = DataprocMapper if tag == "pig" else DummyMapper
+    return mapper_class(oozie_node=Element(tag), name=name)
+
+
+class TestClusterAssignment(unittest.TestCase):
+    def setUp(self):
+        # pig0 -> fork -> (pig1 -> pig2 -> pig3), (pig4 -> pig5), (pig6), (pig7) -> join -> end
+        self.nodes = make_nodes(
+            {
+                "pig0": ["fork"],
+                "fork": ["pig1", "pig4", "pig6", "pig7"],
+                "pig1": ["pig2"],
+                "pig2": ["pig3"],
+                "pig3": ["join"],
+                "pig4": ["pig5"],
+                "pig5": ["join"],
+                "pig6": ["join"],
+                "pig7": ["join"],
+                "join": ["end"],
+                "end": [],
+            },
+            create_mapper,
+        )
+
+    def test_get_branches(self):
+        self.assertEqual(
+            [["pig1", "pig2", "pig3"], ["pig4", "pig5"], ["pig6"], ["pig7"]],
+            cluster_assignment.get_branches(self.nodes, "fork"),
+        )
+
+    def test_assign_clusters_by_branch_size(self):
+        report = cluster_assignment.assign_clusters(self.nodes, ["a", "b"])
+
+        self.assertEqual(
+            {
+                "dataproc_clusters": {
+                    "a": ["pig0", "pig1", "pig2", "pig3", "pig7"],
+                    "b": ["pig4", "pig5", "pig6"],
+                }
+            },
+            report,
+        )
+        self.assertEqual("b", self.nodes["pig6"].mapper.dataproc_cluster)
+        self.assertFalse(hasattr(self.nodes["join"].mapper, "dataproc_cluster"))
+
+    def test_assign_clusters_by_duration_hints(self):
+        hints = {"test_dag.pig7": 10}
+
+        report = cluster_assignment.assign_clusters(
+            self.nodes, ["a", "b", "c"], dag_name="test_dag", hints=hints
+        )
+
+        self.assertEqual(
+            {"a": ["pig0", "pig7"], "b": ["pig1", "pig2", "pig3"], "c": ["pig4", "pig5", "pig6"]},
+            report["dataproc_clusters"],
+        )
+
+    def test_assign_clusters_spreads_nested_fork(self):
+        # fork1 -> (fork2 -> (pig1), (pig2) -> join2 -> pig4), (pig3) -> join1
+        nodes = make_nodes(
+            {
+                "fork1": ["fork2", "pig3"],
+                "fork2": ["pig1", "pig2"],
+                "pig1": ["join2"],
+                "pig2": ["join2"],
+                "join2": ["pig4"],
+                "pig4": ["join1"],
+                "pig3": ["join1"],
+                "join1": [],
+            },
+            create_mapper,
+        )
+
+        report = cluster_assignment.assign_clusters(nodes, ["a", "b"])
+
+        self.assertEqual({"a": ["pig1", "pig4"], "b": ["pig2", "pig3"]}, report["dataproc_clusters"])
+
+    def test_get_fork_branches_outer_fork_first(self):
+        nodes = make_nodes(
+            {
+                "fork1": ["fork2", "pig3"],
+                "fork2": ["pig1", "pig2"],
+                "pig1": ["join2"],
+                "pig2": ["join2"],
+                "join2": ["join1"],
+                "pig3": ["join1"],
+                "join1": [],
+            },
+            create_mapper,
+        )
+
+        self.assertEqual(
+            {"fork1": [["fork2", "pig1", "pig2", "join2"], ["pig3"]], "fork2": [["pig1"], ["pig2"]]},
+            cluster_assignment.get_fork_branches(nodes),
+        )
+        self.assertEqual(["fork1", "fork2"], list(cluster_assignment.get_fork_branches(nodes)))
+
+    def test_assign_clusters_requires_cluster(self):
+        with self.assertRaises(Exception):
+            cluster_assignment.assign_clusters(self.nodes, [])
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests compile check of the generated files"""
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+
+from converter import compile_check
+from converter.primitives import SnippetLocation
+
+
+class TestCompileCheck(unittest.TestCase):
+    def setUp(self):
+        self.directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory_path)
+        self.good_file = self._write("good.py", "x = 1\n")
+        self.bad_file = self._write("bad.py", "x = 1\n\ny = op(\n    task_id='y',,\n)\n")
+
+    def _write(self, file_name, content):
+        file_path = os.path.join(self.directory_path, file_name)
+        with open(file_path, "w") as file:
+            file.write(content)
+        return file_path
+
+    def test_compile_file(self):
+        self.assertIsNone(compile_check.compile_file(self.good_file))
+        error = compile_check.compile_file(self.bad_file)
+        self.assertEqual(self.bad_file, error.file_path)
+        self.assertEqual(4, error.line)
+
+    def test_check_files_writes_pyc(self):
+        errors = compile_check.check_files([self.good_file, self.bad_file], write_pyc=True, max_workers=2)
+
+        self.assertEqual([self.bad_file], [error.file_path for error in errors])
+        self.assertTrue(os.path.isfile(importlib.util.cache_from_source(self.good_file)))
+        self.assertFalse(os.path.exists(importlib.util.cache_from_source(self.bad_file)))
+
+    def test_check_directory_reports_mapper(self):
+        compile_check.register_source_map(
+            self.bad_file,
+            [
+                SnippetLocation(first_line=1, last_line=1, task_id="x", mapper_name="DummyMapper"),
+                SnippetLocation(first_line=2, last_line=5, task_id="y", mapper_name="PigMapper"),
+            ],
+        )
+
+        with self.assertRaises(compile_check.CompileCheckException) as context:
+            compile_check.check_directory(self.directory_path, max_workers=2)
+
+        message = str(context.exception)
+        self.assertIn(f"{self.bad_file}:4:", message)
+        self.assertIn("(in task y generated by PigMapper)", message)
+        self.assertNotIn("good.py", message)
+
+    def test_check_directory(self):
+        os.remove(self.bad_file)
+
+        compile_check.check_directory(self.directory_path, max_workers=2)
+
+    def test_find_snippet_unknown_file(self):
+        self.assertIsNone(compile_check.find_snippet("/unknown.py", 1))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests concurrency limits and pools derived from the workflow graph"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from xml.etree.ElementTree import Element
+
+from converter import concurrency
+from mappers.dummy_mapper import DummyMapper
+from tests.utils.test_nodes import make_nodes
+
+PARAMS = {"dataproc_cluster": "cluster-o2a"}
+
+
+def create_mapper(name):
+    return DummyMapper(oozie_node=Element(name.rstrip("0123456789")), name=name, params=PARAMS)
+
+
+class TestConcurrency(unittest.TestCase):
+    def setUp(self):
+        # fork -> 3 pig + 1 spark branches, one pig branch is followed by a shell action
+        self.nodes = make_nodes(
+            {
+                "fork": ["pig1", "pig2", "pig3", "spark"],
+                "pig1": ["join"],
+                "pig2": ["join"],
+                "pig3": ["shell"],
+                "shell": ["join"],
+                "spark": ["join"],
+                "join": ["end"],
+                "end": [],
+            },
+            create_mapper,
+        )
+
+    def test_get_depths(self):
+        depths = concurrency.get_depths(self.nodes)
+
+        self.assertEqual(0, depths["fork"])
+        self.assertEqual(1, depths["pig1"])
+        self.assertEqual(2, depths["shell"])
+        self.assertEqual(3, depths["join"])
+
+    def test_get_width(self):
+        depths = concurrency.get_depths(self.nodes)
+
+        self.assertEqual(4, concurrency.get_width(depths, self.nodes))
+        self.assertEqual(1, concurrency.get_width(depths, ["shell", "join"]))
+        self.assertEqual(0, concurrency.get_width(depths, []))
+
+    def test_get_pool_name(self):
+        self.assertEqual("o2a_cluster_o2a", concurrency.get_pool_name("cluster-o2a"))
+
+    def test_assign_pools(self):
+        report = concurrency.assign_pools(self.nodes)
+
+        self.assertEqual(
+            {"max_fork_width": 4, "pools": {"o2a_cluster_o2a": 3, "o2a_spark_default": 1}}, report
+        )
+        self.assertEqual("o2a_cluster_o2a", self.nodes["shell"].mapper.pool)
+        self.assertEqual("o2a_spark_default", self.nodes["spark"].mapper.pool)
+        self.assertIsNone(self.nodes["join"].mapper.pool)
+
+    def test_assign_pools_with_slots(self):
+        report = concurrency.assign_pools(self.nodes, pool_slots=10)
+
+        self.assertEqual({"o2a_cluster_o2a": 10, "o2a_spark_default": 10}, report["pools"])
+
+    def test_write_pools_file_merges_slots(self):
+        directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory_path)
+        file_path = os.path.join(directory_path, concurrency.POOLS_FILE_NAME)
+
+        concurrency.write_pools_file(file_path, {"o2a_a": 3, "o2a_b": 1})
+        concurrency.write_pools_file(file_path, {"o2a_a": 2, "o2a_b": 5})
+
+        with open(file_path) as file:
+            pools = json.load(file)
+        self.assertEqual({"o2a_a": 3, "o2a_b": 5}, {name: pool["slots"] for name, pool in pools.items()})
+        self.assertIn("description", pools["o2a_a"])
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests resolution of constant decisions"""
+import unittest
+from xml.etree import ElementTree as ET
+
+from converter import constant_decisions
+from converter.parsed_node import ParsedNode
+from mappers.decision_mapper import DecisionMapper
+from tests.utils.test_nodes import make_nodes
+
+
+def make_decision(name, cases, default, params=None):
+    switch = "".join(f'<case to="{to}">{predicate}</case>' for to, predicate in cases)
+    # language=XML
+    decision_node = ET.fromstring(
+        f'<decision name="{name}"><switch>{switch}<default to="{default}"/></switch></decision>'
+    )
+    node = ParsedNode(DecisionMapper(oozie_node=decision_node, name=name, params=params or {}))
+    for to, _ in cases:
+        node.add_downstream_node_name(to)
+    node.add_downstream_node_name(default)
+    return node
+
+
+class TestConstantDecisions(unittest.TestCase):
+    def test_resolve_decisions(self):
+        # start -> action -> decision -> (big -> end), (small -> join), (default -> end)
+        params = {"size": "20"}
+        decision = make_decision(
+            "decision", [("big", "${size gt 10}"), ("small", "${size le 10}")], "end", params
+        )
+        nodes = make_nodes(
+            {
+                "start": ["action"],
+                "action": ["decision"],
+                "decision": decision,
+                "big": ["end"],
+                "small": ["small_next"],
+                "small_next": ["end"],
+                "end": [],
+                "kill": [],
+            },
+            errors={"action": "kill", "big": "kill", "small": "kill"},
+        )
+
+        self.assertEqual({"decision": "big"}, constant_decisions.resolve_decisions(nodes))
+
+        self.assertEqual(["start", "action", "big", "end", "kill"], list(nodes))
+        self.assertEqual(["big"], nodes["action"].get_downstreams())
+        self.assertEqual("kill", nodes["action"].get_error_downstream_name())
+
+    def test_keep_unreferenced_nodes(self):
+        decision = make_decision("decision", [("first", "true")], "second")
+        nodes = make_nodes(
+            {"start": ["decision"], "decision": decision, "first": [], "second": [], "unreferenced": []}
+        )
+
+        self.assertEqual({"decision": "first"}, constant_decisions.resolve_decisions(nodes))
+
+        self.assertEqual(["start", "first", "unreferenced"], list(nodes))
+        self.assertEqual(["first"], nodes["start"].get_downstreams())
+
+    def test_runtime_decision_kept(self):
+        decision = make_decision("decision", [("first", "${wf:conf('a') eq 'b'}")], "second")
+        nodes = make_nodes({"start": ["decision"], "decision": decision, "first": [], "second": []})
+
+        self.assertEqual({}, constant_decisions.resolve_decisions(nodes))
+
+        self.assertEqual(["start", "decision", "first", "second"], list(nodes))
+
+    def test_chained_decisions(self):
+        first = make_decision("first", [("second", "${flag}")], "end", {"flag": "true"})
+        second = make_decision("second", [("action", "${flag}")], "end", {"flag": "false"})
+        nodes = make_nodes({"start": ["first"], "first": first, "second": second, "action": [], "end": []})
+
+        self.assertEqual({"first": "end", "second": "end"}, constant_decisions.resolve_decisions(nodes))
+
+        self.assertEqual(["start", "end"], list(nodes))
+        self.assertEqual(["end"], nodes["start"].get_downstreams())
+
+    def test_decisions_in_loop_kept(self):
+        first = make_decision("first", [("second", "true")], "end")
+        second = make_decision("second", [("first", "true")], "end")
+        nodes = make_nodes({"start": ["first"], "first": first, "second": second, "end": []})
+
+        self.assertEqual({}, constant_decisions.resolve_decisions(nodes))
+        self.assertEqual(["start", "first", "second", "end"], list(nodes))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests profiling of a corpus of workflows"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from converter import corpus_profiler
+from tests.utils.test_paths import EXAMPLES_PATH
+
+# language=XML
+WORKFLOW = """
+<workflow-app xmlns="uri:oozie:workflow:0.5" name="app">
+    <global><configuration><property><name>a</name><value>${nameNode}</value></property></configuration></global>
+    <start to="fork"/>
+    <fork name="fork">
+        <path start="pig"/>
+        <path start="hive"/>
+        <path start="shell"/>
+    </fork>
+    <action name="pig">
+        <pig><script>${concat(dir, '/id.pig')}</script></pig>
+        <ok to="join"/>
+        <error to="fail"/>
+    </action>
+    <action name="hive">
+        <hive xmlns="uri:oozie:hive-action:0.5"><script>${coord:user() eq}</script></hive>
+        <ok to="join"/>
+        <error to="fail"/>
+    </action>
+    <action name="shell">
+        <shell><exec>${toPropertiesStr(wf:actionData('pig'))}</exec></shell>
+        <ok to="join"/>
+        <error to="fail"/>
+    </action>
+    <join name="join" to="end"/>
+    <kill name="fail"><message>${wf:errorMessage(wf:lastErrorNode())}</message></kill>
+    <end name="end"/>
+</workflow-app>
+"""
+
+
+class TestCorpusProfiler(unittest.TestCase):
+    def setUp(self):
+        self.directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory_path)
+        self.workflow_path = self._write("b/app", WORKFLOW)
+
+    def _write(self, app_path, content):
+        os.makedirs(os.path.join(self.directory_path, app_path))
+        file_path = os.path.join(self.directory_path, app_path, "workflow.xml")
+        with open(file_path, "w") as file:
+            file.write(content)
+        return file_path
+
+    def test_profile_workflow(self):
+        profile = corpus_profiler.profile_workflow(self.workflow_path)
+
+        self.assertEqual(1, profile["workflows"])
+        self.assertEqual({"pig": 1, "hive": 1, "shell": 1}, profile["action_tags"])
+        self.assertEqual({"PigMapper": 1, "DummyMapper": 1, "ShellMapper": 1}, profile["mappers"])
+        self.assertEqual({"start": 1, "fork": 1, "join": 1, "kill": 1, "end": 1}, profile["control_nodes"])
+        self.assertEqual(
+            {
+                "concat": 1,
+                "toPropertiesStr": 1,
+                "wf:actionData": 1,
+                "wf:errorMessage": 1,
+                "wf:lastErrorNode": 1,
+            },
+            profile["el_functions"],
+        )
+        self.assertEqual({8: 1}, profile["node_counts"])
+        self.assertEqual({3: 1}, profile["fork_widths"])
+        self.assertEqual({"hive": 1}, profile["unmapped"]["action_tags"])
+        self.assertEqual({"toPropertiesStr": 1}, profile["unmapped"]["el_functions"])
+        self.assertEqual({"${coord:user() eq}": 1}, profile["unmapped"]["el_expressions"])
+
+    def test_profile_invalid_workflow(self):
+        file_path = self._write("a/broken", "<workflow-app>")
+
+        profile = corpus_profiler.profile_workflow(file_path)
+
+        self.assertEqual(0, profile["workflows"])
+        self.assertIn(file_path, profile["errors"])
+
+    def test_find_workflows(self):
+        file_path = self._write("a/app", WORKFLOW)
+        self._write("a/app/lib", "<not-a-workflow/>").replace("workflow.xml", "other.xml")
+
+        self.assertEqual(
+            [file_path, os.path.join(self.directory_path, "a/app/lib/workflow.xml"), self.workflow_path],
+            corpus_profiler.find_workflows(self.directory_path),
+        )
+
+    def test_profile_directory(self):
+        self._write("a/app", WORKFLOW)
+        self._write("a/broken", "<workflow-app>")
+        output_file_path = os.path.join(self.directory_path, "out", corpus_profiler.PROFILE_FILE_NAME)
+
+        result = corpus_profiler.profile_directory(self.directory_path, output_file_path, max_workers=2)
+
+        with open(output_file_path) as file:
+            self.assertEqual(result, json.load(file))
+        self.assertEqual(2, result["workflows"])
+        self.assertEqual({"8": 2}, result["node_counts"])
+        self.assertEqual({"3": 2}, result["fork_widths"])
+        self.assertEqual({"hive": 2}, result["unmapped"]["action_tags"])
+        self.assertEqual([os.path.join(self.directory_path, "a/broken/workflow.xml")], list(result["errors"]))
+
+    def test_profile_workflows_on_process_pool(self):
+        file_paths = [self.workflow_path] * (corpus_profiler.CHUNK_SIZE + 1)
+
+        profile = corpus_profiler.profile_workflows(file_paths, max_workers=2)
+
+        self.assertEqual(len(file_paths), profile["workflows"])
+        self.assertEqual({3: len(file_paths)}, profile["fork_widths"])
+
+    def test_profile_examples(self):
+        result = corpus_profiler.profile_directory(EXAMPLES_PATH, max_workers=1)
+
+        self.assertEqual(len(corpus_profiler.find_workflows(EXAMPLES_PATH)), result["workflows"])
+        self.assertEqual({}, result["errors"])
+        self.assertIn("wf:user", result["el_functions"])
+        # The most used functions come first
+        counts = list(result["el_functions"].values())
+        self.assertEqual(sorted(counts, reverse=True), counts)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests critical path analysis"""
+import ast
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from xml.etree.ElementTree import Element
+
+from converter import critical_path
+from converter.parsed_node import ParsedNode
+from mappers.action_mapper import ActionMapper
+from mappers.dummy_mapper import DummyMapper
+
+
+class TestCriticalPath(unittest.TestCase):
+    def setUp(self):
+        #  start -> fork -> a -> b -> join -> d -> end
+        #                -> c ------>
+        #  a -(error)-> fail
+        self.nodes = {}
+        for name in ["start", "fork", "join", "end"]:
+            self._add_node(DummyMapper(oozie_node=Element(name), name=name))
+        self._add_node(DummyMapper(oozie_node=Element("kill"), name="fail"))
+        for name in ["a", "b", "c", "d"]:
+            self._add_node(ActionMapper(oozie_node=Element("pig"), name=name))
+        self._connect("start", "fork")
+        self._connect("fork", "a", "c")
+        self._connect("a", "b")
+        self._connect("b", "join")
+        self._connect("c", "join")
+        self._connect("join", "d")
+        self._connect("d", "end")
+        self.nodes["a"].set_error_node_name("fail")
+
+    def _add_node(self, mapper):
+        self.nodes[mapper.name] = ParsedNode(mapper)
+
+    def _connect(self, name, *downstream_names):
+        for downstream_name in downstream_names:
+            self.nodes[name].add_downstream_node_name(downstream_name)
+
+    def test_get_durations(self):
+        hints = {"a": 5, "dag.b": 3, "x.c": 7}
+        durations = critical_path.get_durations(self.nodes, dag_name="dag", hints=hints)
+        self.assertEqual(5, durations["a"])
+        self.assertEqual(3, durations["b"])
+        self.assertEqual(critical_path.DEFAULT_ACTION_DURATION, durations["c"])
+        self.assertEqual(0, durations["fork"])
+
+    def test_get_remaining_durations(self):
+        durations = critical_path.get_durations(self.nodes)
+        remaining = critical_path.get_remaining_durations(self.nodes, durations)
+        self.assertEqual(
+            {"start": 3, "fork": 3, "a": 3, "b": 2, "c": 2, "join": 1, "d": 1, "end": 0, "fail": 0}, remaining
+        )
+
+    def test_assign_priority_weights(self):
+        report = critical_path.assign_priority_weights(self.nodes)
+
+        self.assertEqual({"critical_path": ["a", "b", "d"], "critical_path_duration": 3}, report)
+        self.assertEqual(3, self.nodes["a"].mapper.priority_weight)
+        self.assertEqual(2, self.nodes["c"].mapper.priority_weight)
+        self.assertEqual(1, self.nodes["end"].mapper.priority_weight)
+
+    def test_assign_priority_weights_with_hints(self):
+        report = critical_path.assign_priority_weights(self.nodes, hints={"c": 4.5})
+
+        self.assertEqual({"critical_path": ["c", "d"], "critical_path_duration": 5.5}, report)
+        self.assertEqual(6, self.nodes["c"].mapper.priority_weight)
+        self.assertEqual(3, self.nodes["a"].mapper.priority_weight)
+
+    def test_cycle(self):
+        self._connect("d", "a")
+        with self.assertRaisesRegex(Exception, "cycle"):
+            critical_path.assign_priority_weights(self.nodes)
+
+    def test_priority_weight_rendered(self):
+        mapper = self.nodes["join"].mapper
+        mapper.priority_weight = 7
+
+        text = mapper.convert_to_text()
+
+        ast.parse(text)
+        self.assertIn("priority_weight=7,", text)
+        self.assertIn("weight_rule='absolute',", text)
+
+    def test_load_duration_hints(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        hints_file = os.path.join(directory, "hints.json")
+        with open(hints_file, "w") as file:
+            json.dump({"a": 10, "dag.b": "2.5"}, file)
+
+        self.assertEqual({"a": 10.0, "dag.b": 2.5}, critical_path.load_duration_hints(hints_file))
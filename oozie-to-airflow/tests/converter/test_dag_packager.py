@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests packaging of DAGs into zip files"""
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from converter import dag_packager
+
+
+class TestDagPackager(unittest.TestCase):
+    def setUp(self):
+        self.directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory_path)
+        self.staging_path = os.path.join(self.directory_path, "staging")
+        os.makedirs(os.path.join(self.staging_path, "__pycache__"))
+        self._write("dag.py", "import subdag\n")
+        self._write("subdag.py", "x = 1\n")
+        self._write("script.pig", "A = LOAD 'x';\n")
+        self._write("__pycache__/dag.cpython-36.pyc", "")
+        self.zip_path = os.path.join(self.directory_path, "dag.zip")
+
+    def _write(self, name, content):
+        with open(os.path.join(self.staging_path, name), "w") as file:
+            file.write(content)
+
+    def test_find_files(self):
+        files = dag_packager.find_files(self.staging_path)
+
+        self.assertEqual(["dag.py", "script.pig", "subdag.py"], sorted(files))
+        self.assertEqual(os.path.join(self.staging_path, "dag.py"), files["dag.py"])
+
+    def test_package_directory(self):
+        self.assertTrue(dag_packager.package_directory(self.zip_path, self.staging_path))
+
+        with zipfile.ZipFile(self.zip_path) as archive:
+            self.assertEqual(["dag.py", "subdag.py"], archive.namelist())
+            self.assertEqual(b"import subdag\n", archive.read("dag.py"))
+            self.assertTrue(archive.comment.startswith(dag_packager.DIGEST_PREFIX))
+        self.assertEqual(["dag.zip", "staging"], sorted(os.listdir(self.directory_path)))
+
+    def test_move_assets(self):
+        target_path = os.path.join(self.directory_path, "dags")
+        os.makedirs(os.path.join(self.staging_path, "scripts"))
+        self._write("scripts/other.pig", "B = LOAD 'y';\n")
+
+        dag_packager.move_assets(self.staging_path, target_path)
+
+        self.assertEqual(["script.pig", "scripts"], sorted(os.listdir(target_path)))
+        self.assertEqual(["other.pig"], os.listdir(os.path.join(target_path, "scripts")))
+        self.assertEqual(["dag.py", "subdag.py"], sorted(dag_packager.find_files(self.staging_path)))
+
+    def test_unchanged_package_is_not_rewritten(self):
+        dag_packager.package_directory(self.zip_path, self.staging_path)
+        mtime = os.stat(self.zip_path).st_mtime_ns
+
+        self.assertFalse(dag_packager.package_directory(self.zip_path, self.staging_path))
+        self.assertEqual(mtime, os.stat(self.zip_path).st_mtime_ns)
+
+        self._write("subdag.py", "x = 2\n")
+        self.assertTrue(dag_packager.package_directory(self.zip_path, self.staging_path))
+        with zipfile.ZipFile(self.zip_path) as archive:
+            self.assertEqual(b"x = 2\n", archive.read("subdag.py"))
+
+    def test_package_replaces_broken_file(self):
+        with open(self.zip_path, "w") as file:
+            file.write("not a zip")
+
+        self.assertTrue(dag_packager.package_directory(self.zip_path, self.staging_path))
+        self.assertTrue(zipfile.is_zipfile(self.zip_path))
+
+    def test_digest_depends_on_names(self):
+        files = dag_packager.find_files(self.staging_path)
+        renamed = {"other.py" if name == "subdag.py" else name: path for name, path in files.items()}
+
+        self.assertNotEqual(dag_packager.get_digest(files), dag_packager.get_digest(renamed))
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests running the code of the converted DAGs against fake Airflow modules"""
+
+import os
+import runpy
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from airflow.utils import trigger_rule
+
+from converter.mappers import ACTION_MAP, CONTROL_MAP
+from converter.oozie_converter import OozieConverter
+from converter.primitives import ConversionOptions
+from o2a_libs import el_wf_functions
+from tests.utils.test_paths import EXAMPLES_PATH
+
+
+class FakeDag:
+    current = None
+
+    def __init__(self, dag_id, **kwargs):
+        self.dag_id = dag_id
+        self.kwargs = kwargs
+        self.tasks = {}
+
+    def __enter__(self):
+        FakeDag.current = self
+        return self
+
+    def __exit__(self, *args):
+        FakeDag.current = None
+
+
+class FakeOperator:  # pylint: disable=too-few-public-methods
+    def __init__(self, task_id, **kwargs):
+        self.task_id = task_id
+        self.kwargs = kwargs
+        FakeDag.current.tasks[task_id] = self
+
+    def set_downstream(self, other):
+        pass
+
+
+def make_module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def make_airflow_modules():
+    models = make_module("airflow.models", DAG=FakeDag)
+    python_operator = make_module(
+        "airflow.operators.python_operator", PythonOperator=FakeOperator, BranchPythonOperator=FakeOperator
+    )
+    dates = make_module("airflow.utils.dates", days_ago=lambda days: days)
+    return {
+        "airflow": make_module("airflow", models=models),
+        "airflow.models": models,
+        "airflow.operators": make_module("airflow.operators", python_operator=python_operator),
+        "airflow.operators.python_operator": python_operator,
+        "airflow.utils": make_module("airflow.utils", dates=dates, trigger_rule=trigger_rule),
+        "airflow.utils.dates": dates,
+        "airflow.utils.trigger_rule": trigger_rule,
+    }
+
+
+class TestGeneratedDag(unittest.TestCase):
+    def setUp(self):
+        self.input_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.input_directory_path)
+        self.output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_directory_path)
+
+    def convert_decision(self, options: ConversionOptions) -> str:
+        app_path = os.path.join(self.input_directory_path, "decision")
+        shutil.copytree(os.path.join(EXAMPLES_PATH, "decision"), app_path)
+        shutil.copy(
+            os.path.join(app_path, "configuration-template.properties"),
+            os.path.join(app_path, "configuration.properties"),
+        )
+        with open(os.path.join(app_path, "job.properties"), "a") as file:
+            file.write("\nend=fake\n")
+        OozieConverter(
+            dag_name="decision",
+            input_directory_path=app_path,
+            output_directory_path=self.output_directory_path,
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            user="root",
+            options=options,
+        ).convert()
+        return os.path.join(self.output_directory_path, "decision.py")
+
+    @staticmethod
+    def run_dag(dag_path: str) -> FakeDag:
+        control_operators = make_module("o2a_libs.control_operators", KillOperator=FakeOperator)
+        with mock.patch.dict(sys.modules, make_airflow_modules()), mock.patch(
+            "o2a_libs.control_operators", control_operators, create=True
+        ):
+            dag: FakeDag = runpy.run_path(dag_path)["dag"]
+        return dag
+
+    def test_decision_reads_params_of_dag(self):
+        for options in (ConversionOptions(), ConversionOptions(prune_params=True)):
+            with self.subTest(prune_params=options.prune_params):
+                dag = self.run_dag(self.convert_decision(options))
+                shutil.rmtree(os.path.join(self.input_directory_path, "decision"))
+
+                params = dag.kwargs["params"]
+                self.assertEqual("fake", params["end"])
+                decision = dag.tasks["decision_node"].kwargs["python_callable"]
+                with mock.patch.object(el_wf_functions, "RUNTIME", el_wf_functions.WfRuntime()):
+                    self.assertEqual("fake_end", decision(params=params, dag=dag, run_id="run", dag_run=None))
+                    run_conf = mock.Mock(conf={"end": "real"})
+                    self.assertEqual(
+                        "real_end", decision(params=params, dag=dag, run_id="other", dag_run=run_conf)
+                    )
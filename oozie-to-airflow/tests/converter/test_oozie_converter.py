@@ -14,23 +14,34 @@
 # limitations under the License.
 """Tests Oozie Converter"""
 
+import ast
 import io
+import json
+import os
+import re
+import shutil
+import tempfile
 import unittest
+import zipfile
+from unittest import mock
+from xml.etree import ElementTree as ET
 from xml.etree.ElementTree import Element
 
 import jinja2
+from parameterized import parameterized
 
 import o2a
 from converter.oozie_converter import OozieConverter
 from converter.mappers import CONTROL_MAP, ACTION_MAP
 from converter.parsed_node import ParsedNode
-from converter.primitives import Relation
+from converter.primitives import Asset, ConversionOptions, Relation
 from definitions import TPL_PATH
-from mappers import dummy_mapper
-from tests.utils.test_paths import EXAMPLE_DEMO_PATH
+from mappers import dummy_mapper, shell_mapper
+from tests.utils.test_paths import EXAMPLE_DEMO_PATH, EXAMPLE_PIG_PATH
+from utils import el_utils
 
 
-class TestOozieConverter(unittest.TestCase):
+class TestOozieConverter(unittest.TestCase):  # pylint: disable=too-many-public-methods
     def setUp(self):
         self.converter = OozieConverter(
             dag_name="test_dag",
@@ -54,6 +65,22 @@ class TestOozieConverter(unittest.TestCase):
         args = o2a.parse_args(["-i", input_dir, "-o", output_dir, "-u", user])
         self.assertEqual(args.user, user)
 
+    def test_parse_args_scan(self):
+        args = o2a.parse_args(["-i", "/tmp/corpus", "-o", "/tmp/out/", "--scan", "--scan-workers", "4"])
+        self.assertTrue(args.scan)
+        self.assertEqual(4, args.scan_workers)
+
+    @mock.patch("converter.corpus_profiler.profile_directory")
+    @mock.patch("o2a.OozieConverter")
+    def test_main_scan(self, converter_mock, profile_directory_mock):
+        with mock.patch("sys.argv", ["o2a.py", "-i", "/tmp/corpus", "-o", "/tmp/out", "--scan"]):
+            o2a.main()
+
+        profile_directory_mock.assert_called_once_with(
+            "/tmp/corpus", "/tmp/out/o2a_profile.json", max_workers=None
+        )
+        converter_mock.assert_not_called()
+
     def test_write_operators(self):
         node = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="task1"))
         nodes = {"task1": node}
@@ -104,3 +131,415 @@ class TestOozieConverter(unittest.TestCase):
         expected = template.render(dag_name=dag_name, schedule_interval=1, start_days_ago=1)
 
         self.assertEqual(expected, file.read())
+
+    def test_enable_batch_prepare(self):
+        # language=XML
+        shell_node = ET.fromstring(
+            "<shell><resource-manager>rm</resource-manager><name-node>nn</name-node><exec>ls</exec></shell>"
+        )
+        shell = ParsedNode(shell_mapper.ShellMapper(oozie_node=shell_node, name="shell"))
+        dummy = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="dummy"))
+
+        OozieConverter.enable_batch_prepare({"shell": shell, "dummy": dummy})
+
+        self.assertTrue(shell.mapper.batch_prepare)
+        self.assertFalse(hasattr(dummy.mapper, "batch_prepare"))
+
+    def test_assign_priority_weights_and_write_report(self):
+        output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_directory_path)
+        hints_file = os.path.join(output_directory_path, "hints.json")
+        with open(hints_file, "w") as file:
+            json.dump({"test_dag.second": 10}, file)
+        converter = OozieConverter(
+            dag_name="test_dag",
+            input_directory_path=EXAMPLE_DEMO_PATH,
+            output_directory_path=output_directory_path,
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            options=ConversionOptions(duration_hints_file=hints_file),
+        )
+        first = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="first"))
+        second = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="second"))
+        first.add_downstream_node_name("second")
+
+        self.assertTrue(converter.options.priority_weights)
+        converter.assign_priority_weights({"first": first, "second": second})
+        converter.write_report()
+
+        self.assertEqual(11, first.mapper.priority_weight)
+        self.assertEqual(10, second.mapper.priority_weight)
+        with open(os.path.join(output_directory_path, "test_dag.report.json")) as file:
+            self.assertEqual(
+                {"critical_path": ["first", "second"], "critical_path_duration": 11}, json.load(file)
+            )
+
+    def test_report_folded_expressions(self):
+        folded_before = el_utils.FOLDING_STATISTICS["folded"]
+        el_utils.replace_el_with_var("${concat('a', 'b')}/${trim(' c ')}", params={}, quote=False)
+
+        self.converter.report_folded_expressions(folded_before)
+
+        self.assertEqual({"folded_el_expressions": 2}, self.converter.report)
+
+    def test_report_folded_expressions_skipped_when_none(self):
+        self.converter.report_folded_expressions(el_utils.FOLDING_STATISTICS["folded"])
+
+        self.assertEqual({}, self.converter.report)
+
+    def test_write_report_skipped_when_empty(self):
+        output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_directory_path)
+        self.converter.target_directory_path = output_directory_path
+
+        self.converter.write_report()
+
+        self.assertFalse(os.path.exists(self.converter.output_report_name))
+
+    def test_get_dag_params(self):
+        self.converter.params = {"used": "1", "jinja.key": "2", "unused": "3"}
+        nodes_text = "x = op(arg=PARAMS['used'], params=PARAMS, command='{{ params.jinja.key }}')"
+
+        self.assertEqual(self.converter.params, self.converter.get_dag_params(nodes_text))
+        self.assertEqual({}, self.converter.report)
+
+        self.converter.options = self.converter.options._replace(prune_params=True)
+        self.assertEqual({"used": "1", "jinja.key": "2"}, self.converter.get_dag_params(nodes_text))
+        self.assertEqual({"params": {"total": 3, "emitted": 2}}, self.converter.report)
+
+    def test_get_dag_params_used_as_whole(self):
+        self.converter.params = {"used": "1", "unused": "3"}
+        self.converter.options = self.converter.options._replace(prune_params=True)
+
+        self.assertEqual(self.converter.params, self.converter.get_dag_params("x = op(**PARAMS)"))
+
+    def test_configure_subworkflows(self):
+        self.converter.options = self.converter.options._replace(prune_params=True)
+        self.converter.options = self.converter.options._replace(shared_params={"shared": "1"})
+        subworkflow = ParsedNode(mock.Mock(converter_options=ConversionOptions()))
+        dummy = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="dummy"))
+
+        self.converter.configure_subworkflows({"subworkflow": subworkflow, "dummy": dummy})
+
+        self.assertTrue(subworkflow.mapper.converter_options.prune_params)
+        self.assertFalse(subworkflow.mapper.converter_options.recreate_output_directory)
+        self.assertEqual(self.converter.output_pools_name, subworkflow.mapper.converter_options.pools_file)
+        self.assertEqual({"shared": "1"}, subworkflow.mapper.converter_options.shared_params)
+        self.assertFalse(hasattr(dummy.mapper, "converter_options"))
+
+    @mock.patch("converter.asset_copier.copy_assets", return_value={})
+    def test_copy_assets(self, copy_assets_mock):
+        asset = Asset("id.pig", source_path="/a/id.pig")
+        first = ParsedNode(mock.Mock(**{"get_assets.return_value": [asset]}))
+        second = ParsedNode(mock.Mock(**{"get_assets.return_value": [asset]}))
+
+        self.converter.copy_assets({"first": first, "second": second})
+
+        copy_assets_mock.assert_called_once_with([asset, asset], "/tmp")
+        first.mapper.get_assets.assert_called_once_with(EXAMPLE_DEMO_PATH)
+        first.mapper.copy_extra_assets.assert_called_once_with(
+            input_directory_path=EXAMPLE_DEMO_PATH, output_directory_path="/tmp"
+        )
+        second.mapper.copy_extra_assets.assert_called_once_with(
+            input_directory_path=EXAMPLE_DEMO_PATH, output_directory_path="/tmp"
+        )
+
+    def test_report_inlined_subworkflows(self):
+        inlined = ParsedNode(mock.Mock(**{"sub_parser.get_nodes.return_value": {"a": 1, "b": 2}}))
+        dummy = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="dummy"))
+        nodes = {"inlined": inlined, "dummy": dummy}
+
+        self.converter.report_inlined_subworkflows(nodes)
+        self.assertNotIn("inlined_subworkflows", self.converter.report)
+
+        self.converter.options = self.converter.options._replace(merge_pig_chains=True)
+        self.converter.report_inlined_subworkflows(nodes)
+        self.assertEqual(
+            {"inlined": {"tasks": 2, "not_applied": ["merge_pig_chains"]}},
+            self.converter.report["inlined_subworkflows"],
+        )
+
+    def test_write_params_with_shared_params(self):
+        self.converter.params = {"shared": "1", "local": "2"}
+        self.converter.options = self.converter.options._replace(shared_params={"shared": "1"})
+        file = io.StringIO()
+
+        self.converter.write_params(file, self.converter.params)
+
+        self.assertEqual('PARAMS = o2a_shared.merge_params({\n    "local": "2"\n})\n\n', file.getvalue())
+        self.assertEqual({"a", "import o2a_shared"}, self.converter.get_dag_dependencies({"a"}))
+
+    def test_write_params_missing_shared_params(self):
+        self.converter.params = {"shared": "other", "local": "2"}
+        self.converter.options = self.converter.options._replace(shared_params={"shared": "1"})
+        file = io.StringIO()
+
+        self.converter.write_params(file, self.converter.params)
+
+        self.assertEqual(
+            'PARAMS = {\n    "shared": "other",\n    "local": "2"\n}\n\n', file.getvalue()
+        )
+        self.assertEqual({"a"}, self.converter.get_dag_dependencies({"a"}))
+
+    def test_get_source_map(self):
+        first = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="first"))
+        second = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="second"))
+        file = io.StringIO()
+        file.write("import a\n\n")
+        snippets = self.converter.write_nodes(file=file, nodes={"first": first, "second": second}, indent=0)
+
+        locations = self.converter.get_source_map(file.getvalue(), snippets)
+
+        lines = file.getvalue().split("\n")
+        self.assertEqual(["first", "second"], [location.task_id for location in locations])
+        self.assertEqual("DummyMapper", locations[0].mapper_name)
+        for location in locations:
+            first_index = location.first_line - 1
+            snippet = "\n".join(lines[first_index:location.last_line])
+            self.assertIn(f"{location.task_id} = dummy_operator.DummyOperator(", snippet)
+            self.assertTrue(snippet.endswith(")"))
+
+    def test_create_dag_file_spec_format(self):
+        output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_directory_path)
+        converter = OozieConverter(
+            dag_name="test_dag",
+            input_directory_path=EXAMPLE_DEMO_PATH,
+            output_directory_path=output_directory_path,
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            options=ConversionOptions(output_format="spec"),
+        )
+        first = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="first"))
+        second = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="second"))
+
+        converter.create_dag_file(
+            nodes={"first": first, "second": second},
+            depends={
+                "from airflow import models",
+                "from airflow.operators import dummy_operator",
+                "from airflow.utils import dates",
+            },
+            relations={Relation(from_task_id="first", to_task_id="second")},
+        )
+
+        self.assertEqual(
+            ["o2a_spec_dags.py", "test_dag.spec.json"], sorted(os.listdir(output_directory_path))
+        )
+        with open(os.path.join(output_directory_path, "test_dag.spec.json")) as file:
+            spec = json.load(file)
+        self.assertEqual(["test_dag"], spec["dag"]["args"])
+        self.assertEqual(["first", "second"], [task["name"] for task in spec["objects"]])
+        self.assertEqual([["first", "second"]], spec["edges"])
+
+    def test_create_dag_file_spec_format_falls_back_to_code(self):
+        output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_directory_path)
+        converter = OozieConverter(
+            dag_name="test_dag",
+            input_directory_path=EXAMPLE_DEMO_PATH,
+            output_directory_path=output_directory_path,
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            options=ConversionOptions(output_format="spec"),
+        )
+        first = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="first"))
+
+        with self.assertLogs(level="WARNING") as logs:
+            converter.create_dag_file(
+                nodes={"first": first},
+                depends={"from airflow.operators import dummy_operator", "import os"},
+                relations=set(),
+            )
+
+        self.assertIn("Import of os", logs.output[0])
+        self.assertEqual(["test_dag.py"], os.listdir(output_directory_path))
+
+    def test_options_implied_by_their_values(self):
+        converter = OozieConverter(
+            dag_name="test_dag",
+            input_directory_path=EXAMPLE_DEMO_PATH,
+            output_directory_path="/tmp",
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            options=ConversionOptions(pool_slots=2),
+        )
+
+        self.assertTrue(converter.options.concurrency_limits)
+        self.assertFalse(converter.options.priority_weights)
+        self.assertEqual(2, converter.options.pool_slots)
+
+    def test_unknown_output_format(self):
+        with self.assertRaisesRegex(Exception, "Unknown output format"):
+            OozieConverter(
+                dag_name="test_dag",
+                input_directory_path=EXAMPLE_DEMO_PATH,
+                output_directory_path="/tmp",
+                action_mapper=ACTION_MAP,
+                control_mapper=CONTROL_MAP,
+                options=ConversionOptions(output_format="yaml"),
+            )
+
+    def test_convert_package(self):
+        output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_directory_path)
+        converter = OozieConverter(
+            dag_name="test_dag",
+            input_directory_path=EXAMPLE_DEMO_PATH,
+            output_directory_path=output_directory_path,
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            options=ConversionOptions(package=True),
+        )
+        staging_path = converter.output_directory_path
+        first = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="first"))
+        depends = {"from airflow.operators import dummy_operator"}
+
+        with mock.patch.object(converter.parser, "parse_workflow"), mock.patch.object(
+            converter.parser, "get_nodes", return_value={"first": first}
+        ), mock.patch.object(converter.parser, "get_dependencies", return_value=depends):
+            converter.convert()
+
+        self.assertNotEqual(output_directory_path, staging_path)
+        self.assertFalse(os.path.exists(staging_path))
+        self.assertEqual(["test_dag.zip"], os.listdir(output_directory_path))
+        with zipfile.ZipFile(os.path.join(output_directory_path, "test_dag.zip")) as archive:
+            self.assertEqual(["test_dag.py"], archive.namelist())
+            self.assertIn("first = dummy_operator.DummyOperator(", archive.read("test_dag.py").decode())
+
+    def test_convert_package_keeps_assets_next_to_package(self):
+        input_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, input_directory_path)
+        output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_directory_path)
+        app_path = os.path.join(input_directory_path, "pig")
+        shutil.copytree(EXAMPLE_PIG_PATH, app_path)
+        shutil.copy(
+            os.path.join(app_path, "configuration-template.properties"),
+            os.path.join(app_path, "configuration.properties"),
+        )
+        converter = OozieConverter(
+            dag_name="pig",
+            input_directory_path=app_path,
+            output_directory_path=output_directory_path,
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            options=ConversionOptions(package=True),
+        )
+
+        converter.convert()
+
+        with zipfile.ZipFile(os.path.join(output_directory_path, "pig.zip")) as archive:
+            self.assertEqual(["pig.py"], archive.namelist())
+            code = archive.read("pig.py").decode()
+        # The jobs read the scripts from gcp_uri_prefix, which is the DAGs folder the package is written to
+        query_uri = re.search(r"query_uri='{}/{}'\.format\(PARAMS\['gcp_uri_prefix'\], '(.+?)'\)", code)
+        self.assertIsNotNone(query_uri)
+        self.assertTrue(os.path.isfile(os.path.join(output_directory_path, query_uri.group(1))))
+
+    def test_package_requires_python_output(self):
+        with self.assertRaisesRegex(Exception, "Only python DAG files can be packaged"):
+            OozieConverter(
+                dag_name="test_dag",
+                input_directory_path=EXAMPLE_DEMO_PATH,
+                output_directory_path="/tmp",
+                action_mapper=ACTION_MAP,
+                control_mapper=CONTROL_MAP,
+                options=ConversionOptions(output_format="spec", package=True),
+            )
+
+    def test_write_dag_header_with_concurrency(self):
+        file = io.StringIO()
+
+        OozieConverter.write_dag_header(
+            file, "dag_name", schedule_interval=None, start_days_ago=0, dag_concurrency=4, max_active_runs=1
+        )
+
+        content = file.getvalue()
+        self.assertIn(
+            "    concurrency=4,\n    max_active_runs=1,\n    params=PARAMS,\n    start_date=", content
+        )
+        ast.parse(content + "    pass\n")
+
+    def test_write_dag_header_with_user_defined_macros(self):
+        file = io.StringIO()
+
+        OozieConverter.write_dag_header(
+            file,
+            "dag_name",
+            schedule_interval=None,
+            start_days_ago=0,
+            user_defined_macros=OozieConverter.get_user_defined_macros("command='{{ wf_id() }}'"),
+        )
+
+        content = file.getvalue()
+        self.assertIn("    user_defined_macros=el_wf_functions.MACROS,\n    start_date=", content)
+        ast.parse(content + "    pass\n")
+
+    def test_get_user_defined_macros(self):
+        self.assertEqual(
+            "el_wf_functions.MACROS",
+            OozieConverter.get_user_defined_macros("command='ls {{ params.dir }}/{{ wf_user() }}'"),
+        )
+        self.assertIsNone(OozieConverter.get_user_defined_macros("if el_wf_functions.wf_id():"))
+        self.assertIsNone(OozieConverter.get_user_defined_macros("command='{{ params.wf_id }}'"))
+
+    def test_get_user_defined_macros_with_operators(self):
+        self.assertEqual(
+            "dict(el_operators=el_operators)",
+            OozieConverter.get_user_defined_macros("command='{{ el_operators.add(params.a, 1) }}'"),
+        )
+        self.assertEqual(
+            "dict(el_wf_functions.MACROS, el_operators=el_operators)",
+            OozieConverter.get_user_defined_macros("command='{{ el_operators.add(wf_conf(\"a\"), 1) }}'"),
+        )
+        self.assertIsNone(OozieConverter.get_user_defined_macros("if el_operators.to_boolean(x):"))
+
+    def test_get_dag_dependencies_with_wf_macros(self):
+        self.assertEqual(
+            {"a", "from o2a_libs import el_wf_functions"},
+            self.converter.get_dag_dependencies({"a"}, "command='{{ wf_id() }}'"),
+        )
+        self.assertEqual({"a"}, self.converter.get_dag_dependencies({"a"}, "command='{{ params.id }}'"))
+
+    def test_get_dag_dependencies_with_operators(self):
+        self.assertEqual(
+            {"a", "from o2a_libs import el_operators"},
+            self.converter.get_dag_dependencies({"a"}, "if el_operators.to_boolean(x):"),
+        )
+        self.assertEqual({"a"}, self.converter.get_dag_dependencies({"a"}, "my_el_operators.add(x)"))
+
+    def test_assign_concurrency_limits(self):
+        self.converter.params["dataproc_cluster"] = "cluster"
+        fork = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("fork"), name="fork"))
+        first = ParsedNode(
+            dummy_mapper.DummyMapper(oozie_node=Element("shell"), name="first", params=self.converter.params)
+        )
+        second = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="second"))
+        fork.add_downstream_node_name("first")
+        fork.add_downstream_node_name("second")
+
+        self.converter.assign_concurrency_limits({"fork": fork, "first": first, "second": second})
+
+        self.assertIsNone(self.converter.concurrency_limit)
+        self.assertEqual({"o2a_cluster": 1}, self.converter.pools)
+        self.assertEqual("o2a_cluster", first.mapper.pool)
+        self.assertEqual(
+            {"max_fork_width": 2, "pools": {"o2a_cluster": 1}}, self.converter.report["concurrency"]
+        )
+
+    @parameterized.expand([(None, 3, 6), (4, 3, 4), (4, None, 4)])
+    def test_assign_concurrency_limits_dag_concurrency(self, dag_concurrency, max_active_runs, expected):
+        self.converter.options = self.converter.options._replace(
+            dag_concurrency=dag_concurrency, max_active_runs=max_active_runs
+        )
+        fork = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("fork"), name="fork"))
+        first = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="first"))
+        second = ParsedNode(dummy_mapper.DummyMapper(oozie_node=Element("test"), name="second"))
+        fork.add_downstream_node_name("first")
+        fork.add_downstream_node_name("second")
+
+        self.converter.assign_concurrency_limits({"fork": fork, "first": first, "second": second})
+
+        self.assertEqual(expected, self.converter.concurrency_limit)
+        self.assertEqual(expected, self.converter.report["concurrency"]["dag_concurrency"])
@@ -369,18 +369,20 @@ class TestOozieParser(unittest.TestCase):
         self.assertIn("fork_node", self.parser.workflow.nodes)
         self.assertIn("pig_node", self.parser.workflow.nodes)
         self.assertIn("fail", self.parser.workflow.nodes)
+        # The predicate of the decision is constant
+        self.assertNotIn("decision_node", self.parser.workflow.nodes)
+        self.assertEqual({"decision_node": "hdfs_node"}, self.parser.resolved_decisions)
 
         self.assertEqual(
             self.parser.workflow.relations,
             {
                 Relation(from_task_id="cleanup_node", to_task_id="fail"),
                 Relation(from_task_id="cleanup_node", to_task_id="fork_node"),
-                Relation(from_task_id="decision_node", to_task_id="hdfs_node"),
                 Relation(from_task_id="fork_node", to_task_id="pig_node_prepare"),
                 Relation(from_task_id="fork_node", to_task_id="streaming_node"),
                 Relation(from_task_id="hdfs_node", to_task_id="fail"),
                 Relation(from_task_id="join_node", to_task_id="mr_node"),
-                Relation(from_task_id="mr_node", to_task_id="decision_node"),
+                Relation(from_task_id="mr_node", to_task_id="hdfs_node"),
                 Relation(from_task_id="mr_node", to_task_id="fail"),
                 Relation(from_task_id="pig_node", to_task_id="fail"),
                 Relation(from_task_id="pig_node", to_task_id="join_node"),
@@ -390,3 +392,18 @@ class TestOozieParser(unittest.TestCase):
         )
 
         on_parse_finish_mock.assert_called()
+
+    @mock.patch("uuid.uuid4", return_value="1234")
+    @mock.patch("mappers.base_mapper.BaseMapper.on_parse_finish", wraps=None)
+    def test_parse_workflow_with_task_id_prefix(self, _, _on_parse_finish):
+        self.parser.task_id_prefix = "sub_"
+        self.parser.workflow_file = os.path.join(ROOT_DIR, "examples/demo/workflow.xml")
+        self.parser.parse_workflow()
+
+        self.assertIn("sub_start_node_1234", self.parser.workflow.nodes)
+        self.assertIn("sub_cleanup_node", self.parser.workflow.nodes)
+        self.assertIn("sub_fail", self.parser.workflow.nodes)
+        self.assertNotIn("cleanup_node", self.parser.workflow.nodes)
+        relations = self.parser.workflow.relations
+        self.assertIn(Relation(from_task_id="sub_fork_node", to_task_id="sub_pig_node_prepare"), relations)
+        self.assertIn(Relation(from_task_id="sub_pig_node", to_task_id="sub_fail"), relations)
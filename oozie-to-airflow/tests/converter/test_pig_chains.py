@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests merging of Pig action chains"""
+import unittest
+from xml.etree import ElementTree as ET
+
+from converter import pig_chains
+from mappers.pig_chain_mapper import PigChainMapper
+from mappers.pig_mapper import PigMapper
+from tests.utils import test_nodes
+
+# language=XML
+PIG_NODE_STR = """
+<pig>
+    <resource-manager>localhost:8032</resource-manager>
+    <name-node>hdfs://</name-node>
+    <script>id.pig</script>
+</pig>
+"""
+
+
+def create_mapper(name):
+    if name.startswith("pig"):
+        return PigMapper(oozie_node=ET.fromstring(PIG_NODE_STR), name=name)
+    return test_nodes.create_dummy_mapper(name)
+
+
+def make_nodes(graph, errors=None):
+    # Every Pig action has an error transition, to "kill" unless given
+    errors = {**{name: "kill" for name in graph if name.startswith("pig")}, **(errors or {})}
+    return test_nodes.make_nodes(graph, create_mapper=create_mapper, errors=errors)
+
+
+class TestPigChains(unittest.TestCase):
+    def test_find_chains(self):
+        # pig1 -> pig2 -> pig3 -> fork -> (pig4 -> pig5), (pig6) -> join -> pig7 -> end
+        nodes = make_nodes(
+            {
+                "start": ["pig1"],
+                "pig1": ["pig2"],
+                "pig2": ["pig3"],
+                "pig3": ["fork"],
+                "fork": ["pig4", "pig6"],
+                "pig4": ["pig5"],
+                "pig5": ["join"],
+                "pig6": ["join"],
+                "join": ["pig7"],
+                "pig7": ["end"],
+                "end": [],
+                "kill": [],
+            }
+        )
+
+        self.assertEqual([["pig1", "pig2", "pig3"], ["pig4", "pig5"]], pig_chains.find_chains(nodes))
+
+    def test_find_chains_stops_at_fan_in_and_other_error_transition(self):
+        nodes = make_nodes(
+            {
+                "start": ["pig1"],
+                "pig1": ["pig2"],
+                "pig2": ["pig3"],
+                "pig3": ["pig4"],
+                "pig4": ["end"],
+                "decision": ["pig2"],
+                "end": [],
+                "kill": [],
+                "other_kill": [],
+            },
+            errors={"pig4": "other_kill"},
+        )
+
+        self.assertEqual([["pig2", "pig3"]], pig_chains.find_chains(nodes))
+
+    def test_find_chains_stops_at_different_configuration(self):
+        nodes = make_nodes({"pig1": ["pig2"], "pig2": ["pig3"], "pig3": [], "kill": []})
+        nodes["pig3"].mapper.properties = {"mapred.job.queue.name": "other"}
+
+        self.assertEqual([["pig1", "pig2"]], pig_chains.find_chains(nodes))
+
+    def test_merge_chains(self):
+        nodes = make_nodes(
+            {"start": ["pig1"], "pig1": ["pig2"], "pig2": ["pig3"], "pig3": ["end"], "end": [], "kill": []}
+        )
+
+        self.assertEqual([["pig1", "pig2", "pig3"]], pig_chains.merge_chains(nodes))
+
+        self.assertEqual(["start", "pig1", "end", "kill"], list(nodes))
+        merged = nodes["pig1"]
+        self.assertIsInstance(merged.mapper, PigChainMapper)
+        self.assertEqual(["pig1", "pig2", "pig3"], merged.mapper.step_names)
+        self.assertEqual(["end"], merged.get_downstreams())
+        self.assertEqual("kill", merged.get_error_downstream_name())
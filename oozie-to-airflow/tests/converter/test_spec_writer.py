@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests conversion of the generated DAG code into a declarative spec"""
+
+import ast
+import json
+import os
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from converter import spec_writer
+
+# language=python
+DAG_CODE = """
+import datetime
+from airflow import models
+from airflow.operators import bash_operator, dummy_operator, python_operator
+from o2a_libs import el_wf_functions
+import o2a_shared
+
+PARAMS = o2a_shared.merge_params({"user.name": "root"})
+
+with models.DAG(
+    "test_dag",
+    schedule_interval=None,
+    start_date=datetime.datetime(2019, 1, 1),
+) as dag:
+
+    first = bash_operator.BashOperator(
+        task_id="first", bash_command="echo {}".format(PARAMS["user.name"]), retries=2
+    )
+
+    def decision_node_decision(**context):
+        el_wf_functions.bind_context(context)
+        if el_wf_functions.wf_conf("end") == "first":
+            return "first"
+        else:
+            return "second"
+
+    decision_node = python_operator.BranchPythonOperator(
+        task_id="decision_node", python_callable=decision_node_decision, provide_context=True
+    )
+    second = dummy_operator.DummyOperator(task_id="second", params={"ref": "x"})
+    second.set_downstream(first)
+    first.set_downstream(second)
+"""
+
+IMPORTS = {"dates": ["airflow.utils", "dates"], "el_operators": ["o2a_libs", "el_operators"]}
+
+
+class TestSpecWriter(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("'text'", "text"),
+            ("[1, None, True]", [1, None, True]),
+            ("{'a': {'b': 1.5}}", {"a": {"b": 1.5}}),
+            ("{'ref': 'x'}", {"value": {"ref": "x"}}),
+            ("[{'call': 1, 'args': [], 'kwargs': {}}]", {"value": [{"call": 1, "args": [], "kwargs": {}}]}),
+            ("(1, 2)", {"tuple": [1, 2]}),
+            ("[x, {'k': y}]", {"list": [{"ref": "x"}, {"dict": [["k", {"ref": "y"}]]}]}),
+            ("PARAMS['a']", {"param": "a"}),
+            ("PARAMS", {"ref": "PARAMS"}),
+            (
+                "dates.days_ago(0)",
+                {"call": {"import": ["airflow.utils", "dates", "days_ago"]}, "args": [0], "kwargs": {}},
+            ),
+            ("dag.dag_id", {"attr": [{"ref": "dag"}, "dag_id"]}),
+            ("context['run_id']", {"item": [{"ref": "context"}, "run_id"]}),
+            (
+                "'{}/{}'.format(PARAMS['b'], 'id.pig')",
+                {"call": {"attr": ["{}/{}", "format"]}, "args": [{"param": "b"}, "id.pig"], "kwargs": {}},
+            ),
+            (
+                "a and not b or c",
+                {"or": [{"and": [{"ref": "a"}, {"not": {"ref": "b"}}]}, {"ref": "c"}]},
+            ),
+            ("a if b else 'c'", {"if": [{"ref": "b"}, {"ref": "a"}, "c"]}),
+            ("a is not None", {"compare": [{"ref": "a"}, "is not", None]}),
+            ("a + 2 * b", {"binary": [{"ref": "a"}, "+", {"binary": [2, "*", {"ref": "b"}]}]}),
+        ]
+    )
+    def test_describe_value(self, expression, expected):
+        self.assertEqual(
+            expected, spec_writer.describe_value(ast.parse(expression, mode="eval").body, IMPORTS)
+        )
+
+    @parameterized.expand(
+        [
+            ("lambda: 1",),
+            ("a(*b)",),
+            ("a(**b)",),
+            ("{**a}",),
+            ("a[1:2]",),
+            ("a < b < c",),
+            ("a @ b",),
+            ("{a}",),
+            ("-a",),
+        ]
+    )
+    def test_describe_value_unsupported(self, expression):
+        with self.assertRaises(spec_writer.UnsupportedExpressionException):
+            spec_writer.describe_value(ast.parse(expression, mode="eval").body, IMPORTS)
+
+    @parameterized.expand(
+        [
+            ("import datetime", {"datetime": ["datetime"]}),
+            ("import airflow.utils.dates", {"airflow": ["airflow"]}),
+            ("import airflow.utils.dates as dates", {"dates": ["airflow.utils.dates"]}),
+            (
+                "from airflow.operators import bash_operator, dummy_operator as dummy",
+                {
+                    "bash_operator": ["airflow.operators", "bash_operator"],
+                    "dummy": ["airflow.operators", "dummy_operator"],
+                },
+            ),
+            ("from subdag_test import sub_dag", {"sub_dag": ["subdag_test", "sub_dag"]}),
+        ]
+    )
+    def test_add_import(self, statement, expected):
+        imports = {}
+        spec_writer.add_import(ast.parse(statement).body[0], imports)
+        self.assertEqual(expected, imports)
+
+    @parameterized.expand(
+        [("import os",), ("from subprocess import call",), ("from . import x",), ("from airflow import *",)]
+    )
+    def test_add_import_unsupported(self, statement):
+        with self.assertRaises(spec_writer.UnsupportedExpressionException):
+            spec_writer.add_import(ast.parse(statement).body[0], {})
+
+    def test_dag_code_to_spec(self):
+        spec = spec_writer.dag_code_to_spec(DAG_CODE)
+
+        self.assertEqual(2, spec["version"])
+        self.assertEqual(
+            {
+                "call": {"import": ["o2a_shared", "merge_params"]},
+                "args": [{"user.name": "root"}],
+                "kwargs": {},
+            },
+            spec["params"],
+        )
+        self.assertEqual(
+            {
+                "callable": ["airflow", "models", "DAG"],
+                "args": ["test_dag"],
+                "kwargs": {
+                    "schedule_interval": None,
+                    "start_date": {
+                        "call": {"import": ["datetime", "datetime"]},
+                        "args": [2019, 1, 1],
+                        "kwargs": {},
+                    },
+                },
+            },
+            spec["dag"],
+        )
+        first, decision, decision_node, second = spec["objects"]  # pylint: disable=unbalanced-tuple-unpacking
+        self.assertEqual(
+            {
+                "name": "first",
+                "callable": ["airflow.operators", "bash_operator", "BashOperator"],
+                "args": [],
+                "kwargs": {
+                    "task_id": "first",
+                    "bash_command": {
+                        "call": {"attr": ["echo {}", "format"]},
+                        "args": [{"param": "user.name"}],
+                        "kwargs": {},
+                    },
+                    "retries": 2,
+                },
+            },
+            first,
+        )
+        wf_conf = {
+            "call": {"import": ["o2a_libs", "el_wf_functions", "wf_conf"]},
+            "args": ["end"],
+            "kwargs": {},
+        }
+        self.assertEqual(
+            {
+                "name": "decision_node_decision",
+                "decision": {
+                    "steps": [
+                        {
+                            "call": {"import": ["o2a_libs", "el_wf_functions", "bind_context"]},
+                            "args": [{"ref": "context"}],
+                            "kwargs": {},
+                        }
+                    ],
+                    "cases": [[{"compare": [wf_conf, "==", "first"]}, "first"]],
+                    "default": "second",
+                },
+            },
+            decision,
+        )
+        self.assertEqual({"ref": "decision_node_decision"}, decision_node["kwargs"]["python_callable"])
+        self.assertEqual({"task_id": "second", "params": {"value": {"ref": "x"}}}, second["kwargs"])
+        self.assertEqual([["first", "second"], ["second", "first"]], spec["edges"])
+
+    @parameterized.expand(
+        [
+            ("def decision(task):\n    return 'a'",),
+            ("def decision(**kwargs):\n    return 'a'",),
+            ("def decision():\n    x = 1\n    return 'a'",),
+            ("def decision():\n    if a:\n        return 'a'",),
+            ("def decision():\n    if a:\n        return 'a'\n    return b",),
+        ]
+    )
+    def test_describe_decision_unsupported(self, code):
+        with self.assertRaises(spec_writer.UnsupportedExpressionException):
+            spec_writer.describe_decision(ast.parse(code).body[0], {})
+
+    @parameterized.expand(
+        [
+            ("from airflow import models\n", "does not define a DAG"),
+            ("import os\n", "os"),
+            ("from airflow import models\nprint(1)\n", "Expr statement in the module"),
+            ("from airflow import models\nwith models.DAG('a') as dag:\n    x = 1\n", "Constant|Num"),
+            ("from airflow import models\nwith models.DAG('a') as dag:\n    x = foo(1)\n", "not imported"),
+        ]
+    )
+    def test_dag_code_to_spec_unsupported(self, code, message):
+        with self.assertRaisesRegex(spec_writer.UnsupportedExpressionException, message):
+            spec_writer.dag_code_to_spec(code)
+
+    def test_write_spec(self):
+        spec = spec_writer.dag_code_to_spec(DAG_CODE)
+        with tempfile.TemporaryDirectory() as directory_path:
+            file_path = os.path.join(directory_path, "test_dag.spec.json")
+            spec_writer.write_spec(file_path, spec)
+            with open(file_path) as file:
+                content = file.read()
+        self.assertEqual(spec, json.loads(content))
+        self.assertEqual(json.dumps(spec, separators=(",", ":")) + "\n", content)
@@ -15,10 +15,14 @@
 """Tests decision_mapper"""
 import ast
 import unittest
+from unittest import mock
 
 from xml.etree import ElementTree as ET
 from airflow.utils.trigger_rule import TriggerRule
+from parameterized import parameterized
+
 from mappers import decision_mapper
+from o2a_libs import el_operators
 
 
 class TestDecisionMapper(unittest.TestCase):
@@ -56,8 +60,160 @@ class TestDecisionMapper(unittest.TestCase):
         res = mapper.convert_to_text()
         ast.parse(res)
 
-    # pylint: disable=no-self-use
     def test_required_imports(self):
-        imps = decision_mapper.DecisionMapper.required_imports()
+        mapper = decision_mapper.DecisionMapper(oozie_node=self.decision_node, name="test_id")
+        imps = mapper.required_imports()
         imp_str = "\n".join(imps)
         ast.parse(imp_str)
+        self.assertEqual(
+            {
+                "from airflow.operators import python_operator",
+                "from airflow.utils import dates",
+                "from o2a_libs.el_basic_functions import first_not_null",
+            },
+            imps,
+        )
+
+    def test_required_imports_of_functions(self):
+        # language=XML
+        decision_node = ET.fromstring("""
+<decision name="decision">
+    <switch>
+        <case to="big">${fs:fileSize(concat(dir, '/x')) gt 10}</case>
+        <case to="end">${wf:conf('skip') eq 'true'}</case>
+        <default to="missing" />
+    </switch>
+</decision>
+""")
+        mapper = decision_mapper.DecisionMapper(oozie_node=decision_node, name="test_id")
+
+        self.assertEqual(
+            {
+                "from airflow.operators import python_operator",
+                "from airflow.utils import dates",
+                "from o2a_libs.el_basic_functions import concat",
+                "from o2a_libs import el_fs_functions",
+                "from o2a_libs import el_wf_functions",
+            },
+            mapper.required_imports(),
+        )
+
+    def test_empty_case(self):
+        # language=XML
+        decision_node = ET.fromstring("""
+<decision name="decision">
+    <switch>
+        <case to="first" />
+        <default to="second" />
+    </switch>
+</decision>
+""")
+        mapper = decision_mapper.DecisionMapper(oozie_node=decision_node, name="test_id")
+
+        self.assertEqual({"''": "first", "default": "second"}, dict(mapper.case_dict))
+        self.assertEqual("second", mapper.resolved_transition)
+
+    def test_fs_functions(self):
+        # language=XML
+        decision_node = ET.fromstring("""
+<decision name="decision">
+    <switch>
+        <case to="big">${fs:fileSize(dir) gt 10 * KB}</case>
+        <case to="done">${fs:exists(dir) and fs:isDir(output)}</case>
+        <default to="missing" />
+    </switch>
+</decision>
+""")
+        mapper = decision_mapper.DecisionMapper(oozie_node=decision_node, name="test_id")
+
+        self.assertEqual(['PARAMS["dir"]', 'PARAMS["output"]'], mapper.fs_paths)
+        self.assertEqual(
+            'el_operators.greater_than(el_fs_functions.fs_file_size(PARAMS["dir"]), '
+            "el_operators.multiply(10, 1024))",
+            next(iter(mapper.case_dict)),
+        )
+        code = mapper.convert_to_text()
+        self.assertIn(
+            'el_fs_functions.prefetch([PARAMS["dir"], PARAMS["output"]], run_id=context.get("run_id"))', code
+        )
+        self.assertIn("provide_context=True", code)
+
+        fs_functions = mock.Mock(
+            fs_file_size=mock.Mock(return_value=1), fs_exists=mock.Mock(return_value=True)
+        )
+        namespace = {
+            "PARAMS": {"dir": "/dir", "output": "/output"},
+            "el_fs_functions": fs_functions,
+            "el_operators": el_operators,
+            "python_operator": mock.Mock(),
+        }
+        exec(code, namespace)  # pylint: disable=exec-used
+
+        self.assertEqual("done", namespace["test_id_decision"](run_id="run_1"))
+        fs_functions.prefetch.assert_called_once_with(["/dir", "/output"], run_id="run_1")
+        fs_functions.fs_is_dir.assert_called_once_with("/output")
+
+    def test_wf_functions(self):
+        # language=XML
+        decision_node = ET.fromstring("""
+<decision name="decision">
+    <switch>
+        <case to="retry">${wf:lastErrorNode() eq 'pig'}</case>
+        <case to="end">${wf:conf('skip') eq 'true'}</case>
+        <default to="fail" />
+    </switch>
+</decision>
+""")
+        mapper = decision_mapper.DecisionMapper(oozie_node=decision_node, name="test_id")
+
+        self.assertTrue(mapper.uses_wf_functions)
+        code = mapper.convert_to_text()
+        self.assertIn("el_wf_functions.bind_context(context)", code)
+        self.assertIn("provide_context=True", code)
+
+        wf_functions = mock.Mock(
+            wf_last_error_node=mock.Mock(return_value="shell"), wf_conf=mock.Mock(return_value="true")
+        )
+        namespace = {
+            "el_wf_functions": wf_functions,
+            "el_operators": el_operators,
+            "python_operator": mock.Mock(),
+        }
+        exec(code, namespace)  # pylint: disable=exec-used
+
+        self.assertEqual("end", namespace["test_id_decision"](run_id="run_1"))
+        wf_functions.bind_context.assert_called_once_with({"run_id": "run_1"})
+        wf_functions.wf_conf.assert_called_once_with("skip")
+
+    @parameterized.expand(
+        [
+            ({"flag": "true"}, "${flag}", "${missing}", "task1"),
+            ({"flag": "false", "size": "20"}, "${flag}", "${size gt 10 and flag ne 'x'}", "task2"),
+            ({"flag": "false"}, "${flag}", "${concat(flag, 'x') eq 'falsex'}", "task2"),
+            ({"flag": "false"}, "${flag}", "False", "task3"),
+            ({"flag": "false"}, "${flag}", "${wf:conf('a')}", None),
+            ({}, "${flag}", "True", None),
+            ({"dir": "/tmp"}, "${fs:exists(dir)}", "True", None),
+        ]
+    )
+    def test_resolved_transition(self, params, first_predicate, second_predicate, expected):
+        # language=XML
+        decision_node = ET.fromstring(f"""
+<decision name="decision">
+    <switch>
+        <case to="task1">{first_predicate}</case>
+        <case to="task2">{second_predicate}</case>
+        <default to="task3" />
+    </switch>
+</decision>
+""")
+        mapper = decision_mapper.DecisionMapper(oozie_node=decision_node, name="test_id", params=params)
+
+        self.assertEqual(expected, mapper.resolved_transition)
+
+    def test_no_fs_functions(self):
+        mapper = decision_mapper.DecisionMapper(oozie_node=self.decision_node, name="test_id")
+
+        self.assertEqual([], mapper.fs_paths)
+        self.assertFalse(mapper.uses_wf_functions)
+        self.assertNotIn("provide_context", mapper.convert_to_text())
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for inline subworkflow mapper"""
+import ast
+from unittest import mock, TestCase
+from xml.etree import ElementTree as ET
+
+from airflow.utils.trigger_rule import TriggerRule
+
+from converter.mappers import CONTROL_MAP, ACTION_MAP
+from mappers import inline_subworkflow_mapper
+from tests.utils.test_paths import EXAMPLE_SUBWORKFLOW_PATH, EXAMPLE_PIG_PATH
+
+INLINE_ACTION_MAP = {**ACTION_MAP, "sub-workflow": inline_subworkflow_mapper.InlineSubworkflowMapper}
+
+
+class TestInlineSubworkflowMapper(TestCase):
+
+    main_params = {
+        "examplesRoot": "examples",
+        "nameNode": "hdfs://",
+        "resourceManager": "localhost:8032",
+        "queueName": "default",
+        "dataproc_cluster": "cluster-o2a",
+        "gcp_conn_id": "google_cloud_default",
+        "gcp_region": "europe-west3",
+        "gcp_uri_prefix": "gs://test_bucket/dags",
+    }
+
+    def setUp(self):
+        # language=XML
+        subworkflow_node_str = """
+<sub-workflow>
+    <app-path>${nameNode}/user/${wf:user()}/${examplesRoot}/pig</app-path>
+    <propagate-configuration />
+    <configuration>
+        <property>
+            <name>queueName</name>
+            <value>subworkflow_queue</value>
+        </property>
+    </configuration>
+</sub-workflow>"""
+        self.subworkflow_node = ET.fromstring(subworkflow_node_str)
+
+    def _create_mapper(self):
+        return inline_subworkflow_mapper.InlineSubworkflowMapper(
+            oozie_node=self.subworkflow_node,
+            name="test_id",
+            dag_name="test",
+            input_directory_path=EXAMPLE_SUBWORKFLOW_PATH,
+            output_directory_path="/tmp",
+            action_mapper=INLINE_ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            trigger_rule=TriggerRule.ONE_FAILED,
+            params=self.main_params,
+        )
+
+    def test_create_mapper(self):
+        mapper = self._create_mapper()
+
+        self.assertEqual(EXAMPLE_PIG_PATH, mapper.app_path)
+        nodes = mapper.sub_parser.get_nodes()
+        self.assertIn("test_id_pig_node", nodes)
+        self.assertIn("test_id_fail", nodes)
+        self.assertIn("test_id_end", nodes)
+        self.assertEqual("test_id_pig_node_prepare", mapper.first_task_id)
+        self.assertEqual("test_id_end", mapper.last_task_id)
+        # Propagated configuration overrides parent params
+        self.assertEqual("subworkflow_queue", nodes["test_id_pig_node"].mapper.params["queueName"])
+
+    def test_convert_to_text(self):
+        mapper = self._create_mapper()
+
+        text = mapper.convert_to_text()
+
+        ast.parse(text)
+        self.assertNotIn("SubDagOperator", text)
+        self.assertIn("test_id_pig_node = dataproc_operator.DataProcPigOperator(", text)
+        self.assertIn("test_id_end = dummy_operator.DummyOperator(", text)
+        self.assertIn("test_id_pig_node.set_downstream(test_id_end)", text)
+
+    def test_entry_task_follows_trigger_rule(self):
+        mapper = self._create_mapper()
+
+        # The entry task follows the trigger rule of the sub-workflow action
+        self.assertEqual(TriggerRule.ONE_FAILED, mapper.entry_node.mapper.trigger_rule)
+        mapper.trigger_rule = TriggerRule.ALL_SUCCESS
+        self.assertEqual(TriggerRule.ALL_SUCCESS, mapper.entry_node.mapper.trigger_rule)
+        mapper.convert_to_text()
+        self.assertEqual(TriggerRule.ALL_SUCCESS, mapper.entry_node.mapper.trigger_rule)
+
+    def test_convert_to_text_resolves_subworkflow_params(self):
+        # language=XML
+        property_str = "<property><name>dataproc_cluster</name><value>child-cluster</value></property>"
+        self.subworkflow_node.find("configuration").append(ET.fromstring(property_str))
+        mapper = self._create_mapper()
+
+        text = mapper.convert_to_text()
+
+        ast.parse(text)
+        self.assertEqual("child-cluster", mapper.sub_params["dataproc_cluster"])
+        self.assertNotIn("gcp_region", mapper.sub_params)
+        self.assertIn("cluster_name='child-cluster',", text)
+        self.assertIn("region=PARAMS['gcp_region'],", text)
+
+    def test_on_parse_finish_adds_dependencies(self):
+        mapper = self._create_mapper()
+        workflow = mock.Mock(dependencies=set())
+
+        mapper.on_parse_finish(workflow)
+
+        self.assertIn("from airflow.contrib.operators import dataproc_operator", workflow.dependencies)
+        self.assertIn("from airflow.operators import dummy_operator", workflow.dependencies)
+
+    @mock.patch("mappers.inline_subworkflow_mapper.InlineSubworkflowMapper._get_app_path")
+    def test_nested_subworkflow(self, get_app_path):
+        get_app_path.side_effect = [EXAMPLE_SUBWORKFLOW_PATH, EXAMPLE_PIG_PATH]
+
+        mapper = self._create_mapper()
+
+        nested = mapper.sub_parser.get_nodes()["test_id_subworkflow_node"].mapper
+        self.assertIsInstance(nested, inline_subworkflow_mapper.InlineSubworkflowMapper)
+        self.assertEqual("test_id_subworkflow_node_pig_node_prepare", mapper.first_task_id)
+        self.assertEqual("test_id_end", mapper.last_task_id)
+        text = mapper.convert_to_text()
+        ast.parse(text)
+        self.assertIn("test_id_subworkflow_node_pig_node = dataproc_operator.DataProcPigOperator(", text)
+        self.assertIn("test_id_subworkflow_node_end.set_downstream(test_id_end)", text)
+
+    # pylint: disable=no-self-use
+    def test_required_imports(self):
+        imps = inline_subworkflow_mapper.InlineSubworkflowMapper.required_imports()
+        imp_str = "\n".join(imps)
+        ast.parse(imp_str)
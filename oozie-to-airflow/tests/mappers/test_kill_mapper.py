@@ -15,6 +15,7 @@
 """Tests Kill Mapper"""
 import ast
 import unittest
+from xml.etree import ElementTree as ET
 from xml.etree.ElementTree import Element
 from airflow.utils.trigger_rule import TriggerRule
 
@@ -40,6 +41,44 @@ class TestKillMapper(unittest.TestCase):
         # Throws a syntax error if doesn't parse correctly
         ast.parse(mapper.convert_to_text())
 
+    def test_convert_to_text_with_message(self):
+        # language=XML
+        kill_str = "<kill name='fail'><message>Failed [${wf:lastErrorNode()}]</message></kill>"
+        kill_node = ET.fromstring(kill_str)
+        mapper = kill_mapper.KillMapper(
+            oozie_node=kill_node, name="fail", trigger_rule=TriggerRule.ONE_FAILED
+        )
+
+        self.assertEqual("Failed [${wf:lastErrorNode()}]", mapper.get_message())
+        self.assertIn("control_operators.KillOperator(", mapper.convert_to_text())
+        ast.parse(mapper.convert_to_text())
+
+    def test_convert_to_text_with_wf_functions(self):
+        # language=XML
+        kill_str = (
+            "<kill name='fail'><message>Failed [${wf:errorMessage(wf:lastErrorNode())}]</message></kill>"
+        )
+        mapper = kill_mapper.KillMapper(
+            oozie_node=ET.fromstring(kill_str), name="fail", trigger_rule=TriggerRule.ONE_FAILED
+        )
+
+        self.assertIn(
+            "message='Failed [{{ wf_error_message(wf_last_error_node()) }}]',", mapper.convert_to_text()
+        )
+
+    def test_convert_to_text_with_params(self):
+        # language=XML
+        kill_str = "<kill name='fail'><message>Can't run ${queueName}</message></kill>"
+        mapper = kill_mapper.KillMapper(
+            oozie_node=ET.fromstring(kill_str),
+            name="fail",
+            trigger_rule=TriggerRule.ONE_FAILED,
+            params={"queueName": "default"},
+        )
+
+        self.assertIn('message="Can\'t run default",', mapper.convert_to_text())
+        ast.parse(mapper.convert_to_text())
+
     # pylint: disable=no-self-use
     def test_required_imports(self):
         imps = kill_mapper.KillMapper.required_imports()
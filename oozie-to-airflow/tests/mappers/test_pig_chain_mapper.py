@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests pig chain mapper"""
+import ast
+import os
+import shutil
+import tempfile
+import unittest
+from xml.etree import ElementTree as ET
+
+from converter.primitives import Asset
+from mappers import pig_chain_mapper
+from mappers.pig_mapper import PigMapper
+
+PARAMS = {"dataproc_cluster": "my-cluster", "gcp_region": "europe-west3", "nameNode": "hdfs://"}
+
+
+def make_pig_mapper(name, script, prepare="", params=""):
+    # language=XML
+    pig_node_str = f"""
+<pig>
+    <resource-manager>localhost:8032</resource-manager>
+    <name-node>hdfs://</name-node>
+    {prepare}
+    <script>{script}</script>
+    {params}
+</pig>
+"""
+    return PigMapper(oozie_node=ET.fromstring(pig_node_str), name=name, params=PARAMS)
+
+
+class TestNamespaceParams(unittest.TestCase):
+    def test_namespace_params(self):
+        script = (
+            "%default LIMIT 10\n"
+            "A = LOAD '$INPUT' AS (a, b);\n"
+            "B = FOREACH A GENERATE $0, $1;\n"
+            "C = LIMIT B $LIMIT;\n"
+            "STORE C INTO '$INPUT_COPY';\n"
+        )
+
+        self.assertEqual(
+            "%default step_LIMIT 10\n"
+            "A = LOAD '$step_INPUT' AS (a, b);\n"
+            "B = FOREACH A GENERATE $0, $1;\n"
+            "C = LIMIT B $step_LIMIT;\n"
+            "STORE C INTO '$step_INPUT_COPY';\n",
+            pig_chain_mapper.namespace_params(script, {"INPUT", "INPUT_COPY"}, "step_"),
+        )
+
+
+class TestPigChainMapper(unittest.TestCase):
+    def setUp(self):
+        self.input_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.input_directory_path)
+        with open(os.path.join(self.input_directory_path, "first.pig"), "w") as file:
+            file.write("A = LOAD '$INPUT';\nSTORE A INTO '$OUTPUT';\n")
+        with open(os.path.join(self.input_directory_path, "second.pig"), "w") as file:
+            file.write("A = LOAD '$INPUT';\nSTORE A INTO '$OUTPUT';")
+        self.mapper = pig_chain_mapper.PigChainMapper(
+            steps=[
+                make_pig_mapper(
+                    "first",
+                    "first.pig",
+                    prepare='<prepare><delete path="${nameNode}/out/first"/></prepare>',
+                    params="<param>INPUT=/in</param><param>OUTPUT=/out/first</param>",
+                ),
+                make_pig_mapper(
+                    "second",
+                    "second.pig",
+                    prepare='<prepare><mkdir path="${nameNode}/out/tmp"/></prepare>',
+                    params="<param>INPUT=/out/first</param><param>OUTPUT=/out/second</param>",
+                ),
+            ]
+        )
+
+    def test_create_mapper(self):
+        self.assertEqual("first", self.mapper.name)
+        self.assertEqual("first", self.mapper.first_task_id)
+        self.assertEqual("first", self.mapper.last_task_id)
+        self.assertEqual(["first", "second"], self.mapper.step_names)
+        self.assertEqual("first_chain.pig", self.mapper.script_file_name)
+        self.assertEqual(
+            {
+                "first_INPUT": "/in",
+                "first_OUTPUT": "/out/first",
+                "second_INPUT": "/out/first",
+                "second_OUTPUT": "/out/second",
+            },
+            self.mapper.params_dict,
+        )
+
+    def test_get_script(self):
+        self.assertEqual(
+            "sh echo o2a-step 1/2 first;\n"
+            "fs -rm -r -f /out/first;\n"
+            "A = LOAD '$first_INPUT';\n"
+            "STORE A INTO '$first_OUTPUT';\n"
+            "exec;\n"
+            "sh echo o2a-step 2/2 second;\n"
+            "fs -mkdir -p /out/tmp;\n"
+            "A = LOAD '$second_INPUT';\n"
+            "STORE A INTO '$second_OUTPUT';\n",
+            self.mapper.get_script(self.input_directory_path),
+        )
+
+    def test_get_assets(self):
+        script = self.mapper.get_script(self.input_directory_path)
+
+        self.assertEqual(
+            [Asset(destination_name="first_chain.pig", content=script)],
+            self.mapper.get_assets(self.input_directory_path),
+        )
+
+    def test_convert_to_text(self):
+        text = self.mapper.convert_to_text()
+
+        ast.parse(text)
+        self.assertIn("first = dataproc_operator.DataProcPigOperator(", text)
+        self.assertIn("'first_chain.pig'", text)
+        self.assertIn("'second_OUTPUT': '/out/second'", text)
+        self.assertNotIn("_prepare", text)
+
+    # pylint: disable=no-self-use
+    def test_required_imports(self):
+        ast.parse("\n".join(pig_chain_mapper.PigChainMapper.required_imports()))
@@ -14,11 +14,13 @@
 # limitations under the License.
 """Tests pig mapper"""
 import ast
+import os
 import unittest
 from xml.etree import ElementTree as ET
 
 from airflow.utils.trigger_rule import TriggerRule
 
+from converter.primitives import Asset
 from mappers import pig_mapper
 
 
@@ -109,6 +111,50 @@ class TestPigMapper(unittest.TestCase):
         # Throws a syntax error if doesn't parse correctly
         ast.parse(mapper.convert_to_text())
 
+    def test_convert_to_text_with_dataproc_cluster(self):
+        mapper = pig_mapper.PigMapper(
+            oozie_node=self.pig_node,
+            name="test_id",
+            trigger_rule=TriggerRule.DUMMY,
+            params={"dataproc_cluster": "my-cluster", "gcp_region": "europe-west3"},
+        )
+        mapper.dataproc_cluster = "other-cluster"
+
+        text = mapper.convert_to_text()
+
+        ast.parse(text)
+        self.assertIn("cluster_name='other-cluster',", text)
+        self.assertIn("prepare.sh -c other-cluster -r europe-west3", text)
+        self.assertNotIn("my-cluster", text)
+
+    def test_get_assets(self):
+        mapper = pig_mapper.PigMapper(oozie_node=self.pig_node, name="test_id")
+
+        self.assertEqual(
+            [Asset(destination_name="id.pig", source_path=os.path.join("/app", "id.pig"), header="")],
+            mapper.get_assets("/app"),
+        )
+
+    def test_get_assets_with_files(self):
+        mapper = pig_mapper.PigMapper(
+            oozie_node=self.pig_node,
+            name="test_id",
+            params={"nameNode": "hdfs://", "oozie.wf.application.path": "hdfs:///app"},
+        )
+        mapper.add_file("/lib/udf.jar")
+
+        (asset,) = mapper.get_assets("/app")
+
+        self.assertEqual(
+            "set mapred.create.symlink yes;\nset mapred.cache.file hdfs:///lib/udf.jar;\n", asset.header
+        )
+
+    def test_get_assets_without_input_directory(self):
+        mapper = pig_mapper.PigMapper(oozie_node=self.pig_node, name="test_id")
+
+        with self.assertRaises(Exception):
+            mapper.get_assets("")
+
     # pylint: disable=no-self-use
     def test_required_imports(self):
         imps = pig_mapper.PigMapper.required_imports()
@@ -51,6 +51,32 @@ class TestPrepareMixin(unittest.TestCase):
             prepare,
         )
 
+    def test_with_prepare_batch(self):
+        cluster = "my-cluster"
+        region = "europe-west3"
+        # language=XML
+        pig_node_prepare_str = """
+<pig>
+    <name-node>hdfs://</name-node>
+    <prepare>
+        <delete path="${nameNode}/examples/output-data/demo/pig-node" />
+        <mkdir path="${nameNode}/examples/input-data/demo/pig-node" />
+    </prepare>
+</pig>
+"""
+        pig_node_prepare = ET.fromstring(pig_node_prepare_str)
+        mixin = prepare_mixin.PrepareMixin()
+        mixin.batch_prepare = True
+        prepare = mixin.get_prepare_command(
+            oozie_node=pig_node_prepare, params={"dataproc_cluster": cluster, "gcp_region": region}
+        )
+        self.assertEqual(
+            '$DAGS_FOLDER/../data/prepare.sh -c {0} -r {1} -b -d "{2}" -m "{3}"'.format(
+                cluster, region, self.delete_path1, self.mkdir_path1
+            ),
+            prepare,
+        )
+
     def test_no_prepare(self):
         cluster = "my-cluster"
         region = "europe-west3"
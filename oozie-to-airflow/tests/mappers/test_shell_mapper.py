@@ -14,14 +14,26 @@
 # limitations under the License.
 """Tests shell mapper"""
 import ast
+import types
 import unittest
 from xml.etree import ElementTree as ET
 
+import jinja2
 from airflow.utils.trigger_rule import TriggerRule
 
 from mappers import shell_mapper
 
 
+class FakeOperator:  # pylint: disable=too-few-public-methods
+    """Records the arguments the task is created with"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def set_downstream(self, other):
+        pass
+
+
 class TestShellMapper(unittest.TestCase):
     def setUp(self):
         # language=XML
@@ -98,6 +110,46 @@ class TestShellMapper(unittest.TestCase):
         # Throws a syntax error if doesn't parse correctly
         ast.parse(mapper.convert_to_text())
 
+    def test_convert_to_text_creates_pig_sh_task(self):
+        mapper = shell_mapper.ShellMapper(
+            oozie_node=self.shell_node,
+            name="test_id",
+            trigger_rule=TriggerRule.DUMMY,
+            params={"dataproc_cluster": "my-cluster", "gcp_region": "europe-west3"},
+        )
+        namespace = {
+            "bash_operator": types.SimpleNamespace(BashOperator=FakeOperator),
+            "dataproc_operator": types.SimpleNamespace(DataProcPigOperator=FakeOperator),
+            "PARAMS": {"dataproc_cluster": "my-cluster", "gcp_region": "europe-west3", "gcp_conn_id": "gcp"},
+        }
+
+        exec(mapper.convert_to_text(), namespace)  # pylint: disable=exec-used
+        kwargs = namespace["test_id"].kwargs
+
+        self.assertEqual("test_id", kwargs["task_id"])
+        self.assertEqual("sh echo arg1 arg2", kwargs["query"])
+        self.assertEqual("my-cluster", kwargs["cluster_name"])
+        self.assertEqual("europe-west3", kwargs["region"])
+        self.assertEqual("gcp", kwargs["gcp_conn_id"])
+
+    def test_convert_to_text_with_quotes_and_braces_in_params(self):
+        self.shell_node.find("exec").text = "echo ${msg}"
+        params = {"msg": 'say "hi" {{ ds }}', "dataproc_cluster": "my-cluster", "gcp_region": "europe-west3"}
+        mapper = shell_mapper.ShellMapper(
+            oozie_node=self.shell_node, name="test_id", trigger_rule=TriggerRule.DUMMY, params=params
+        )
+        namespace = {
+            "bash_operator": types.SimpleNamespace(BashOperator=FakeOperator),
+            "dataproc_operator": types.SimpleNamespace(DataProcPigOperator=FakeOperator),
+            "PARAMS": dict(params, gcp_conn_id="gcp"),
+        }
+
+        exec(mapper.convert_to_text(), namespace)  # pylint: disable=exec-used
+        query = namespace["test_id"].kwargs["query"]
+
+        self.assertEqual("sh echo {{ params.msg }} arg1 arg2", query)
+        self.assertEqual('sh echo say "hi" {{ ds }} arg1 arg2', jinja2.Template(query).render(params=params))
+
     # pylint: disable=no-self-use
     def test_required_imports(self):
         imps = shell_mapper.ShellMapper.required_imports()
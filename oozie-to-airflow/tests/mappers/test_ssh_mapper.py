@@ -17,7 +17,10 @@ import ast
 import unittest
 
 from xml.etree import ElementTree as ET
+
+import jinja2
 from airflow.utils.trigger_rule import TriggerRule
+
 from mappers import ssh_mapper
 
 
@@ -70,6 +73,20 @@ class TestSSHMapper(unittest.TestCase):
         # Throws a syntax error if doesn't parse correctly
         ast.parse(mapper.convert_to_text())
 
+    def test_convert_to_text_with_quotes_and_braces_in_params(self):
+        self.ssh_node.find("command").text = "echo ${msg} ${dir}"
+        params = {"msg": "it's {{ ds }}", "dir": "/tmp"}
+        mapper = ssh_mapper.SSHMapper(
+            oozie_node=self.ssh_node, name="test_id", trigger_rule=TriggerRule.DUMMY, params=params
+        )
+
+        ast.parse(mapper.convert_to_text())
+        self.assertEqual("'echo {{ params.msg }} /tmp -l -a'", mapper.command)
+        self.assertEqual(
+            "echo it's {{ ds }} /tmp -l -a",
+            jinja2.Template(ast.literal_eval(mapper.command)).render(params=params),
+        )
+
     # pylint: disable=no-self-use
     def test_required_imports(self):
         imps = ssh_mapper.SSHMapper.required_imports()
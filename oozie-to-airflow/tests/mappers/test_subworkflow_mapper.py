@@ -15,15 +15,17 @@
 """Tests for subworkflow mapper"""
 import ast
 import os
-from contextlib import suppress
+import shutil
+import tempfile
 from unittest import mock, TestCase
 from xml.etree import ElementTree as ET
 
 from airflow.utils.trigger_rule import TriggerRule
 
 from converter.mappers import CONTROL_MAP, ACTION_MAP
+from converter.primitives import ConversionOptions
 from mappers import subworkflow_mapper
-from tests.utils.test_paths import EXAMPLE_SUBWORKFLOW_PATH
+from tests.utils.test_paths import EXAMPLE_SUBWORKFLOW_PATH, EXAMPLES_PATH
 
 
 class TestSubworkflowMapper(TestCase):
@@ -63,9 +65,6 @@ class TestSubworkflowMapper(TestCase):
     def test_create_mapper_jinja(self, parse_els):
         # Given
         parse_els.return_value = self.subworkflow_params
-        # Removing subdag
-        with suppress(OSError):
-            os.remove("/tmp/test.test_id.py")
         # When
         mapper = subworkflow_mapper.SubworkflowMapper(
             oozie_node=self.subworkflow_node,
@@ -87,15 +86,13 @@ class TestSubworkflowMapper(TestCase):
         self.assertEqual("subwf.tpl", mapper.template)
         # Propagate config node is present, should forward config properties
         self.assertEqual({"resourceManager": "localhost:8032"}, mapper.get_config_properties())
-        self.assertTrue(os.path.isfile("/tmp/test.test_id.py"))
+        self.assertEqual(os.path.join(EXAMPLES_PATH, "pig"), mapper.app_path)
+        self.assertRegex(mapper.subdag_module, r"^subdag_pig_[0-9a-f]{8}$")
 
     @mock.patch("utils.el_utils.parse_els")
     def test_create_mapper_jinja_no_propagate(self, parse_els):
         # Given
         parse_els.return_value = self.subworkflow_params
-        # Removing subdag
-        with suppress(OSError):
-            os.remove("/tmp/test.test_id.py")
         # Removing the propagate-configuration node
         propagate_configuration = self.subworkflow_node.find("propagate-configuration")
         self.subworkflow_node.remove(propagate_configuration)
@@ -121,7 +118,7 @@ class TestSubworkflowMapper(TestCase):
         self.assertEqual("subwf.tpl", mapper.template)
         # Propagate config node is missing, should NOT forward config properties
         self.assertEqual({}, mapper.get_config_properties())
-        self.assertTrue(os.path.isfile("/tmp/test.test_id.py"))
+        self.assertRegex(mapper.subdag_module, r"^subdag_pig_[0-9a-f]{8}$")
 
     @mock.patch("utils.el_utils.parse_els")
     def test_convert_to_text(self, parse_els):
@@ -143,6 +140,88 @@ class TestSubworkflowMapper(TestCase):
         # Then
         # Throws a syntax error if doesn't parse correctly
         ast.parse(mapper.convert_to_text())
+        self.assertIn(f"subdag={mapper.subdag_module}.sub_dag(", mapper.convert_to_text())
+
+    @mock.patch("utils.el_utils.parse_els")
+    def test_copy_extra_assets_generates_module(self, parse_els):
+        parse_els.return_value = self.subworkflow_params
+        output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_directory_path)
+        mapper = self._create_mapper()
+
+        mapper.copy_extra_assets(
+            input_directory_path=EXAMPLE_SUBWORKFLOW_PATH, output_directory_path=output_directory_path
+        )
+
+        subdag_file = os.path.join(output_directory_path, mapper.subdag_module + ".py")
+        with open(subdag_file) as file:
+            content = file.read()
+        ast.parse(content)
+        self.assertIn("def sub_dag(parent_dag_name, child_dag_name, start_date, schedule_interval):", content)
+
+    @mock.patch("utils.el_utils.parse_els")
+    @mock.patch("converter.subworkflow_converter.OozieSubworkflowConverter.convert")
+    def test_copy_extra_assets_converts_once(self, convert, parse_els):
+        parse_els.return_value = self.subworkflow_params
+        output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_directory_path)
+
+        def write_module():
+            open(os.path.join(output_directory_path, first.subdag_module + ".py"), "w").close()
+
+        convert.side_effect = write_module
+        first = self._create_mapper(name="first")
+        second = self._create_mapper(name="second")
+
+        first.copy_extra_assets(EXAMPLE_SUBWORKFLOW_PATH, output_directory_path)
+        second.copy_extra_assets(EXAMPLE_SUBWORKFLOW_PATH, output_directory_path)
+
+        self.assertEqual(first.subdag_module, second.subdag_module)
+        convert.assert_called_once_with()
+
+    @mock.patch("utils.el_utils.parse_els")
+    def test_module_name_depends_on_config(self, parse_els):
+        parse_els.return_value = self.subworkflow_params
+        first = self._create_mapper()
+        self.subworkflow_node.find("configuration/property/value").text = "other:8032"
+        second = self._create_mapper()
+
+        self.assertNotEqual(first.subdag_module, second.subdag_module)
+
+    @mock.patch("utils.el_utils.parse_els")
+    @mock.patch("mappers.subworkflow_mapper.OozieSubworkflowConverter")
+    def test_copy_extra_assets_passes_converter_options(self, converter, parse_els):
+        parse_els.return_value = self.subworkflow_params
+        output_directory_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_directory_path)
+        mapper = self._create_mapper()
+        mapper.converter_options = ConversionOptions(prune_params=True)
+
+        mapper.copy_extra_assets(EXAMPLE_SUBWORKFLOW_PATH, output_directory_path)
+
+        self.assertTrue(converter.call_args[1]["options"].prune_params)
+        self.assertEqual(mapper.subdag_module, converter.call_args[1]["dag_name"])
+        converter.return_value.convert.assert_called_once_with()
+
+    def test_on_parse_finish_adds_module_import(self):
+        mapper = self._create_mapper()
+        workflow = mock.Mock(dependencies=set())
+
+        mapper.on_parse_finish(workflow)
+
+        self.assertEqual({f"import {mapper.subdag_module}"}, workflow.dependencies)
+
+    def _create_mapper(self, name="test_id"):
+        return subworkflow_mapper.SubworkflowMapper(
+            oozie_node=self.subworkflow_node,
+            name=name,
+            dag_name="test",
+            input_directory_path=EXAMPLE_SUBWORKFLOW_PATH,
+            output_directory_path="/tmp",
+            action_mapper=ACTION_MAP,
+            control_mapper=CONTROL_MAP,
+            params=self.main_params,
+        )
 
     # pylint: disable=no-self-use
     def test_required_imports(self):
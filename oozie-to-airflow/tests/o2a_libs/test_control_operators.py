@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests control operators"""
+import unittest
+
+from airflow.exceptions import AirflowException
+
+from o2a_libs import control_operators
+
+
+class TestKillOperator(unittest.TestCase):
+    def test_execute_fails_with_message(self):
+        operator = control_operators.KillOperator(task_id="kill", message="Sub workflow failed")
+        with self.assertRaisesRegex(AirflowException, "Sub workflow failed"):
+            operator.execute(context={})
+
+    def test_message_is_templated(self):
+        self.assertIn("message", control_operators.KillOperator.template_fields)
@@ -13,11 +13,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests for all EL basic functions"""
+import datetime
 import unittest
 
 from parameterized import parameterized
 
-from o2a_libs.el_basic_functions import first_not_null, concat, replace_all, append_all, trim, url_encode
+from o2a_libs import el_basic_functions
+from o2a_libs.el_basic_functions import (
+    first_not_null,
+    concat,
+    replace_all,
+    append_all,
+    trim,
+    url_encode,
+    timestamp,
+    to_json_str,
+)
 
 
 class TestElBasicFunctions(unittest.TestCase):
@@ -79,3 +90,20 @@ class TestElBasicFunctions(unittest.TestCase):
     @parameterized.expand([(" ", "%20"), ("?", "%3F"), ("", ""), (None, "")])
     def test_urlencode(self, src_str, expected):
         self.assertEqual(expected, url_encode(src_str))
+
+    def test_replace_all_compiles_regex_once(self):
+        el_basic_functions.compile_regex.cache_clear()
+
+        for _ in range(3):
+            self.assertEqual("faabar", replace_all("foobar", "[o]", "a"))
+
+        cache_info = el_basic_functions.compile_regex.cache_info()
+        self.assertEqual((1, 2), (cache_info.misses, cache_info.hits))
+
+    def test_timestamp(self):
+        value = datetime.datetime.strptime(timestamp(), "%Y-%m-%dT%H:%M:%S.%f%z")
+
+        self.assertEqual(datetime.timedelta(0), value.utcoffset())
+
+    def test_to_json_str(self):
+        self.assertEqual('{"a": ["b"]}', to_json_str({"a": ["b"]}))
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for all EL fs functions"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from parameterized import parameterized
+
+from o2a_libs import el_fs_functions
+from o2a_libs.el_fs_functions import (
+    LocalFileSystem,
+    fs_block_size,
+    fs_dir_size,
+    fs_exists,
+    fs_file_size,
+    fs_is_dir,
+)
+
+
+class TestElFsFunctions(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.root, "data", "nested"))
+        for file_name, size in [("data/a", 10), ("data/b", 5), ("data/nested/c", 100)]:
+            with open(os.path.join(self.root, file_name), "wb") as file:
+                file.write(b"x" * size)
+        self.file_system = LocalFileSystem(root=self.root)
+        el_fs_functions.set_file_system(self.file_system)
+        self.addCleanup(el_fs_functions.set_file_system, None)
+
+    def test_to_local_path(self):
+        self.assertEqual(
+            os.path.join(self.root, "nn/data/a"), self.file_system.to_local_path("hdfs://nn:8020/data/a")
+        )
+        self.assertEqual(
+            os.path.join(self.root, "bucket/data/a"), self.file_system.to_local_path("gs://bucket/data/a")
+        )
+        self.assertEqual(os.path.join(self.root, "data/a"), self.file_system.to_local_path("/data/a"))
+        self.assertEqual("/data/a", LocalFileSystem().to_local_path("/data/a"))
+        self.assertEqual("/data/a", LocalFileSystem().to_local_path("file:///data/a"))
+
+    def test_to_local_path_of_remote_uri_without_root(self):
+        with self.assertRaises(el_fs_functions.FsFunctionsException):
+            LocalFileSystem().to_local_path("gs://bucket/data/a")
+
+    def test_no_file_system_set(self):
+        el_fs_functions.set_file_system(None)
+
+        with self.assertRaises(el_fs_functions.FsFunctionsException):
+            el_fs_functions.prefetch(["/data"], run_id="run_1")
+        with self.assertRaises(el_fs_functions.FsFunctionsException):
+            fs_exists("/data")
+
+    @parameterized.expand(
+        [
+            ("hdfs:///data", True, True, 15, -1, -1),
+            ("hdfs:///data/a", True, False, -1, 10, "block"),
+            ("hdfs:///missing", False, False, -1, -1, -1),
+        ]
+    )
+    def test_functions(self, path, exists, is_dir, dir_size, file_size, block_size):
+        self.assertEqual(exists, fs_exists(path))
+        self.assertEqual(is_dir, fs_is_dir(path))
+        self.assertEqual(dir_size, fs_dir_size(path))
+        self.assertEqual(file_size, fs_file_size(path))
+        if block_size == "block":
+            self.assertEqual(os.stat(os.path.join(self.root, "data/a")).st_blksize, fs_block_size(path))
+        else:
+            self.assertEqual(block_size, fs_block_size(path))
+
+    def test_prefetch_stats_paths_in_one_call(self):
+        with mock.patch.object(
+            self.file_system, "stat_paths", wraps=self.file_system.stat_paths
+        ) as stat_paths:
+            el_fs_functions.prefetch(["/data", "/data/a", "/data"], run_id="run_1")
+            fs_file_size("/data/a")
+            fs_dir_size("/data")
+            fs_is_dir("/data")
+
+        stat_paths.assert_called_once_with(["/data", "/data/a"])
+
+    def test_prefetch_only_missing_paths(self):
+        el_fs_functions.prefetch(["/data"], run_id="run_1")
+        with mock.patch.object(
+            self.file_system, "stat_paths", wraps=self.file_system.stat_paths
+        ) as stat_paths:
+            el_fs_functions.prefetch(["/data", "/data/b"], run_id="run_1")
+
+        stat_paths.assert_called_once_with(["/data/b"])
+
+    def test_statuses_cached_per_run(self):
+        el_fs_functions.prefetch(["/data/a"], run_id="run_1")
+        os.remove(os.path.join(self.root, "data/a"))
+
+        self.assertTrue(fs_exists("/data/a"))
+        el_fs_functions.prefetch(["/data/a"], run_id="run_2")
+        self.assertFalse(fs_exists("/data/a"))
+
+    def test_function_outside_prefetch(self):
+        with mock.patch.object(
+            self.file_system, "stat_paths", wraps=self.file_system.stat_paths
+        ) as stat_paths:
+            fs_file_size("/data/b")
+            fs_exists("/data/b")
+
+        stat_paths.assert_called_once_with(["/data/b"])
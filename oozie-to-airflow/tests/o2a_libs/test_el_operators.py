@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the EL operators"""
+import unittest
+
+from parameterized import parameterized
+
+from o2a_libs import el_operators
+
+
+class TestElOperators(unittest.TestCase):
+    @parameterized.expand(
+        [
+            (None, 0),
+            ("", 0),
+            ("12", 12),
+            (" 1.5 ", 1.5),
+            (3, 3),
+        ]
+    )
+    def test_to_number(self, value, expected):
+        self.assertEqual(expected, el_operators.to_number(value))
+
+    def test_to_number_invalid(self):
+        with self.assertRaises(ValueError):
+            el_operators.to_number("abc")
+        with self.assertRaises(ValueError):
+            el_operators.to_number(True)
+
+    @parameterized.expand(
+        [("true", True), (" TRUE ", True), ("false", False), ("yes", False), (1, True), (None, False)]
+    )
+    def test_to_boolean(self, value, expected):
+        self.assertEqual(expected, el_operators.to_boolean(value))
+
+    @parameterized.expand([(None, ""), (True, "true"), (False, "false"), (2, "2"), ("a", "a")])
+    def test_to_string(self, value, expected):
+        self.assertEqual(expected, el_operators.to_string(value))
+
+    @parameterized.expand(
+        [
+            (el_operators.greater_than, "6", 5, True),
+            (el_operators.less_than, "10", 9, False),
+            (el_operators.greater_equal, "abc", "abd", False),
+            (el_operators.less_equal, 2, " 2 ", True),
+            (el_operators.equals, "1", 1.0, True),
+            (el_operators.equals, "TRUE", True, True),
+            (el_operators.equals, None, None, True),
+            (el_operators.not_equals, "a", None, True),
+            (el_operators.greater_than, None, 0, False),
+        ]
+    )
+    def test_comparisons(self, operator, left, right, expected):
+        self.assertEqual(expected, operator(left, right))
+
+    @parameterized.expand(
+        [
+            (el_operators.add, "1", "2", 3),
+            (el_operators.subtract, "1.5", None, 1.5),
+            (el_operators.multiply, "3", 2, 6),
+            (el_operators.divide, "3", "2", 1.5),
+            (el_operators.remainder, "-7", "2", -1),
+        ]
+    )
+    def test_arithmetic(self, operator, left, right, expected):
+        self.assertEqual(expected, operator(left, right))
+
+    def test_unary_operators(self):
+        self.assertEqual(-3, el_operators.negate("3"))
+        self.assertTrue(el_operators.logical_not("false"))
+        self.assertFalse(el_operators.logical_not("true"))
+        self.assertTrue(el_operators.is_empty(""))
+        self.assertTrue(el_operators.is_empty(None))
+        self.assertFalse(el_operators.is_empty(0))
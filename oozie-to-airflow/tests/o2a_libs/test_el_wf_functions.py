@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for all EL wf functions"""
+import datetime
+import unittest
+from unittest import mock
+
+import jinja2
+
+from o2a_libs import el_wf_functions
+from o2a_libs.el_wf_functions import WfContextException, WfRuntime
+
+
+def create_task_instance(task_id, state, end_date=None):
+    return mock.Mock(task_id=task_id, state=state, end_date=end_date)
+
+
+class TestElWfFunctions(unittest.TestCase):
+    def setUp(self):
+        self.xcoms = {
+            ("decision", "return_value"): "end",
+            ("failed", "error_code"): "JA018",
+            ("failed", "error_message"): "Output directory exists",
+            ("pig", "return_value"): "rows=10\n# comment\nstatus: OK\n",
+            ("pig", "external_id"): "job_1",
+        }
+        self.dag_run = mock.Mock(conf={"queue": "high"})
+        self.dag_run.get_task_instances.return_value = [
+            create_task_instance("decision", "success"),
+            create_task_instance("pig", "success"),
+            create_task_instance("failed", "failed", datetime.datetime(2019, 1, 1, 12)),
+            create_task_instance("first_failed", "failed", datetime.datetime(2019, 1, 1, 10)),
+            create_task_instance("running", "running"),
+            create_task_instance("end", None),
+        ]
+        self.task_instance = mock.Mock(try_number=2)
+        self.task_instance.xcom_pull.side_effect = lambda task_ids, key: self.xcoms.get((task_ids, key))
+        dag = mock.Mock(dag_id="test_dag")
+        self.context = {
+            "dag": dag,
+            "run_id": "run_1",
+            "dag_run": self.dag_run,
+            "ti": self.task_instance,
+            "params": {"user.name": "airflow", "queue": "low", "oozie.wf.application.path": "hdfs:///app"},
+        }
+        el_wf_functions.RUNTIME = WfRuntime()
+        self.addCleanup(setattr, el_wf_functions, "RUNTIME", el_wf_functions.RUNTIME)
+        el_wf_functions.bind_context(self.context)
+
+    def test_job_functions(self):
+        self.assertEqual("run_1", el_wf_functions.wf_id())
+        self.assertEqual("test_dag", el_wf_functions.wf_name())
+        self.assertEqual("airflow", el_wf_functions.wf_user())
+        self.assertEqual("", el_wf_functions.wf_group())
+        self.assertEqual("hdfs:///app", el_wf_functions.wf_app_path())
+        self.assertEqual(1, el_wf_functions.wf_run())
+        self.assertEqual("", el_wf_functions.wf_callback("OK"))
+
+    def test_wf_conf(self):
+        self.assertEqual("high", el_wf_functions.wf_conf("queue"))
+        self.assertEqual("airflow", el_wf_functions.wf_conf("user.name"))
+        self.assertEqual("", el_wf_functions.wf_conf("missing"))
+
+    def test_error_functions(self):
+        self.assertEqual("failed", el_wf_functions.wf_last_error_node())
+        self.assertEqual("JA018", el_wf_functions.wf_error_code("failed"))
+        self.assertEqual("ERROR", el_wf_functions.wf_error_code("first_failed"))
+        self.assertEqual("", el_wf_functions.wf_error_code("pig"))
+        self.assertEqual("Output directory exists", el_wf_functions.wf_error_message("failed"))
+        self.assertEqual("", el_wf_functions.wf_error_message("first_failed"))
+        self.assertEqual("", el_wf_functions.wf_error_message("pig"))
+
+    def test_no_error(self):
+        self.dag_run.get_task_instances.return_value = [create_task_instance("pig", "success")]
+
+        self.assertEqual("", el_wf_functions.wf_last_error_node())
+
+    def test_wf_transition(self):
+        self.assertEqual("end", el_wf_functions.wf_transition("decision"))
+        self.assertEqual("", el_wf_functions.wf_transition("pig"))
+        self.assertEqual("", el_wf_functions.wf_transition("running"))
+        self.assertEqual("", el_wf_functions.wf_transition("missing"))
+
+    def test_action_functions(self):
+        self.assertEqual({"rows": "10", "status": "OK"}, el_wf_functions.wf_action_data("pig"))
+        self.assertEqual({}, el_wf_functions.wf_action_data("failed"))
+        self.assertEqual("job_1", el_wf_functions.wf_action_external_id("pig"))
+        self.assertEqual("", el_wf_functions.wf_action_tracker_uri("pig"))
+        self.assertEqual("", el_wf_functions.wf_action_external_status("pig"))
+
+    def test_action_data_dict(self):
+        self.xcoms[("pig", "return_value")] = {"rows": 10}
+
+        self.assertEqual({"rows": "10"}, el_wf_functions.wf_action_data("pig"))
+
+    def test_memoized_per_run(self):
+        for _ in range(3):
+            el_wf_functions.wf_last_error_node()
+            el_wf_functions.wf_error_code("failed")
+            el_wf_functions.wf_transition("decision")
+            el_wf_functions.bind_context(dict(self.context))
+
+        self.dag_run.get_task_instances.assert_called_once_with()
+        self.assertEqual(2, self.task_instance.xcom_pull.call_count)
+
+        el_wf_functions.bind_context({**self.context, "run_id": "run_2"})
+        el_wf_functions.wf_last_error_node()
+
+        self.assertEqual(2, self.dag_run.get_task_instances.call_count)
+
+    def test_not_bound(self):
+        el_wf_functions.RUNTIME = WfRuntime()
+
+        with self.assertRaises(WfContextException):
+            el_wf_functions.wf_id()
+
+    def test_macros(self):
+        el_wf_functions.RUNTIME = WfRuntime()
+        template = jinja2.Template(
+            "{{ wf_id() }}/{{ wf_user() }}/{{ wf_error_message(wf_last_error_node()) }}"
+        )
+        template.globals.update(el_wf_functions.MACROS)
+
+        self.assertEqual("run_1/airflow/Output directory exists", template.render(**self.context))
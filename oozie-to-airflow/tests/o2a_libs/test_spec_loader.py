@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests building DAGs from declarative specs"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from parameterized import parameterized
+
+from o2a_libs import spec_loader
+
+MODULE_PATH = __name__.split(".")
+
+
+class FakeDag:
+    current = None
+
+    def __init__(self, dag_id, **kwargs):
+        self.dag_id = dag_id
+        self.kwargs = kwargs
+        self.tasks = []
+
+    def __enter__(self):
+        FakeDag.current = self
+        return self
+
+    def __exit__(self, *args):
+        FakeDag.current = None
+
+
+class FakeOperator:  # pylint: disable=too-few-public-methods
+    def __init__(self, task_id, **kwargs):
+        self.task_id = task_id
+        self.kwargs = kwargs
+        self.downstream = []
+        FakeDag.current.tasks.append(self)
+
+    def set_downstream(self, other):
+        self.downstream.append(other.task_id)
+
+
+def call(function, *args, **kwargs):
+    return {"call": function, "args": list(args), "kwargs": kwargs}
+
+
+def make_spec(dag_id):
+    fake_operator = [".".join(MODULE_PATH[:-1]), MODULE_PATH[-1], "FakeOperator"]
+    return {
+        "version": spec_loader.SPEC_VERSION,
+        "params": {"user.name": "root", "end": "second"},
+        "dag": {
+            "callable": [__name__, "FakeDag"],
+            "args": [dag_id],
+            "kwargs": {"schedule_interval": None, "params": {"ref": "PARAMS"}},
+        },
+        "objects": [
+            {
+                "name": "first",
+                "callable": fake_operator,
+                "args": [],
+                "kwargs": {"task_id": "first", "command": {"binary": [{"param": "user.name"}, "+", "!"]}},
+            },
+            {
+                "name": "second_decision",
+                "decision": {
+                    "steps": [call({"attr": [{"ref": "context"}, "update"]}, {"dict": [["seen", True]]})],
+                    "cases": [
+                        [{"compare": [{"item": [{"ref": "context"}, "end"]}, "==", "first"]}, "first"],
+                        [{"and": [{"ref": "context"}, {"item": [{"ref": "context"}, "seen"]}]}, "second"],
+                    ],
+                    "default": "first",
+                },
+            },
+            {
+                "name": "second",
+                "callable": fake_operator,
+                "args": [],
+                "kwargs": {"task_id": "second", "python_callable": {"ref": "second_decision"}},
+            },
+        ],
+        "edges": [["first", "second"]],
+    }
+
+
+class TestSpecLoader(unittest.TestCase):
+    def setUp(self):
+        self.dags_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dags_folder)
+        self.addCleanup(spec_loader.SPEC_CACHE.clear)
+        self.addCleanup(spec_loader.resolve_import.cache_clear)
+        trusted_modules = spec_loader.TRUSTED_MODULES | {MODULE_PATH[0]}
+        patcher = mock.patch.object(spec_loader, "TRUSTED_MODULES", trusted_modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write_spec(self, name, spec):
+        spec_path = os.path.join(self.dags_folder, name + spec_loader.SPEC_FILE_SUFFIX)
+        with open(spec_path, "w") as file:
+            json.dump(spec, file)
+        return spec_path
+
+    def test_build_dag(self):
+        dag = spec_loader.build_dag(make_spec("test_dag"))
+
+        self.assertEqual("test_dag", dag.dag_id)
+        self.assertEqual(
+            {"schedule_interval": None, "params": {"user.name": "root", "end": "second"}}, dag.kwargs
+        )
+        first, second = dag.tasks
+        self.assertEqual("root!", first.kwargs["command"])
+        self.assertEqual(["second"], first.downstream)
+        decide = second.kwargs["python_callable"]
+        self.assertEqual("second_decision", decide.__name__)
+        self.assertEqual("first", decide(end="first"))
+        self.assertEqual("second", decide(end="second"))
+
+    def test_build_dag_other_version(self):
+        spec = make_spec("test_dag")
+        spec["version"] = 1
+        with self.assertRaisesRegex(spec_loader.SpecException, "version 1"):
+            spec_loader.build_dag(spec)
+
+    @parameterized.expand(
+        [
+            ({"param": "a"}, 1),
+            ({"ref": "x"}, [1, 2]),
+            ({"import": ["o2a_libs", "el_basic_functions", "first_not_null"]}, "first_not_null"),
+            ({"attr": ["text", "upper"]}, "upper"),
+            ({"item": [{"ref": "x"}, 1]}, 2),
+            (call({"attr": ["{}-{b}", "format"]}, {"param": "a"}, b=2), "1-2"),
+            ({"list": [{"param": "a"}, 2]}, [1, 2]),
+            ({"tuple": [{"param": "a"}, 2]}, (1, 2)),
+            ({"dict": [[{"param": "b"}, {"param": "a"}]]}, {"B": 1}),
+            ({"and": [{"param": "a"}, 0, 3]}, 0),
+            ({"or": [0, {"param": "b"}, 3]}, "B"),
+            ({"not": {"param": "a"}}, False),
+            ({"if": [0, "yes", "no"]}, "no"),
+            ({"compare": [2, "in", {"ref": "x"}]}, True),
+            ({"compare": [{"param": "a"}, "is not", None]}, True),
+            ({"binary": [7, "//", 2]}, 3),
+            ({"value": {"ref": "x"}}, {"ref": "x"}),
+            ({"ref": "x", "other": 1}, {"ref": "x", "other": 1}),
+            ([{"ref": "x"}], [{"ref": "x"}]),
+        ]
+    )
+    def test_evaluate(self, value, expected):
+        namespace = {"PARAMS": {"a": 1, "b": "B"}, "x": [1, 2]}
+        result = spec_loader.evaluate(value, namespace)
+        if callable(result):
+            result = result.__name__
+        self.assertEqual(expected, result)
+
+    @parameterized.expand(
+        [
+            ({"import": ["os", "system"]}, "not allowed"),
+            ({"import": ["o2a_libs", "_private"]}, "Private name"),
+            ({"import": ["o2a_libs", "el_basic_functions", "missing"]}, "Cannot import"),
+            ({"attr": [{"ref": "x"}, "__class__"]}, "Private attribute"),
+            ({"ref": "missing"}, "Unknown name"),
+        ]
+    )
+    def test_evaluate_rejected(self, value, message):
+        with self.assertRaisesRegex(spec_loader.SpecException, message):
+            spec_loader.evaluate(value, {"x": 1})
+
+    def test_load_spec_is_cached_until_modified(self):
+        spec_path = self._write_spec("test_dag", make_spec("test_dag"))
+        spec = spec_loader.load_spec(spec_path)
+        self.assertIs(spec, spec_loader.load_spec(spec_path))
+
+        self._write_spec("test_dag", make_spec("changed_dag"))
+        mtime = os.stat(spec_path).st_mtime_ns + 1
+        os.utime(spec_path, ns=(mtime, mtime))
+        self.assertEqual(["changed_dag"], spec_loader.load_spec(spec_path)["dag"]["args"])
+
+    def test_load_dags_raises_broken_specs(self):
+        self._write_spec("good-dag", make_spec("good-dag"))
+        broken_spec = make_spec("broken")
+        broken_spec["objects"][0]["callable"] = ["os", "system"]
+        self._write_spec("broken", broken_spec)
+        module_globals = {}
+
+        with self.assertRaisesRegex(spec_loader.SpecException, r"broken\.spec\.json: SpecException: .* os"):
+            spec_loader.load_dags(self.dags_folder, module_globals)
+
+        self.assertEqual(["dag_good_dag"], list(module_globals))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests prepare.sh script against a stand-in gcloud"""
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from definitions import ROOT_DIR
+
+PREPARE_SCRIPT = os.path.join(ROOT_DIR, "scripts", "prepare.sh")
+
+# language=bash
+FAKE_GCLOUD = """#!/usr/bin/env bash
+echo "$@" >> "${GCLOUD_LOG}"
+"""
+
+
+class TestPrepareScript(unittest.TestCase):
+    def setUp(self):
+        self.bin_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.bin_dir, "gcloud.log")
+        fake_gcloud_path = os.path.join(self.bin_dir, "gcloud")
+        with open(fake_gcloud_path, "w") as fake_gcloud:
+            fake_gcloud.write(FAKE_GCLOUD)
+        os.chmod(fake_gcloud_path, 0o755)
+
+    def tearDown(self):
+        shutil.rmtree(self.bin_dir)
+
+    def run_prepare(self, *args):
+        env = dict(os.environ, PATH=self.bin_dir + os.pathsep + os.environ["PATH"], GCLOUD_LOG=self.log_file)
+        subprocess.run(
+            ["bash", PREPARE_SCRIPT, "-c", "my-cluster", "-r", "europe-west3", *args],
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if not os.path.exists(self.log_file):
+            return []
+        with open(self.log_file) as log:
+            return log.read().splitlines()
+
+    def test_one_job_per_path(self):
+        invocations = self.run_prepare("-d", "/out1 /out2", "-m", "/in1")
+        self.assertEqual(5, len(invocations))
+        self.assertIn("--execute fs -test -d /out1", invocations[0])
+        self.assertIn("--execute fs -rm -r /out1", invocations[1])
+        self.assertIn("--execute fs -mkdir -p /in1", invocations[4])
+
+    def test_batch_single_job(self):
+        invocations = self.run_prepare("-b", "-d", "/out1 /out2", "-m", "/in1 /in2")
+        self.assertEqual(
+            [
+                "dataproc jobs submit pig --cluster=my-cluster --region=europe-west3 --execute "
+                "fs -rm -r -f /out1;fs -rm -r -f /out2;fs -mkdir -p /in1;fs -mkdir -p /in2;"
+            ],
+            invocations,
+        )
+
+    def test_batch_no_paths(self):
+        invocations = self.run_prepare("-b")
+        self.assertEqual([], invocations)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests EL parser"""
+import unittest
+
+import jinja2
+from parameterized import parameterized
+
+from o2a_libs import el_basic_functions, el_operators
+from utils import el_parser
+from utils.el_parser import BinaryOperation, Conditional, FunctionCall, Identifier, Literal, UnaryOperation
+
+FUNCTIONS = {"concat": el_basic_functions.concat, "trim": el_basic_functions.trim}
+
+
+def parse_expression(expression):
+    return el_parser.parse(expression)[0].body
+
+
+class TestTokenize(unittest.TestCase):
+    def test_tokenize(self):
+        tokens, end = el_parser.tokenize("${wf:conf('a.b') gt 1.5 && !x}tail", 2)
+
+        self.assertEqual(
+            [
+                ("name", "wf"),
+                ("operator", ":"),
+                ("name", "conf"),
+                ("operator", "("),
+                ("string", "a.b"),
+                ("operator", ")"),
+                ("operator", ">"),
+                ("number", 1.5),
+                ("operator", "and"),
+                ("operator", "not"),
+                ("name", "x"),
+                ("end", "}"),
+            ],
+            [(token.kind, token.value) for token in tokens],
+        )
+        self.assertEqual(len("${wf:conf('a.b') gt 1.5 && !x}"), end)
+
+    def test_tokenize_string_escapes(self):
+        tokens, _ = el_parser.tokenize(r"""'it\'s' "say \"hi\"" '\\'}""")
+
+        self.assertEqual(["it's", 'say "hi"', "\\"], [token.value for token in tokens[:-1]])
+
+    def test_tokenize_keyword_literals(self):
+        tokens, _ = el_parser.tokenize("true false null 10 1e3}")
+
+        self.assertEqual([True, False, None, 10, 1000.0], [token.value for token in tokens[:-1]])
+
+    def test_tokenize_unterminated(self):
+        with self.assertRaises(el_parser.ELParserException):
+            el_parser.tokenize("${concat('a', 'b')", 2)
+
+    def test_tokenize_unknown_character(self):
+        with self.assertRaises(el_parser.ELParserException):
+            el_parser.tokenize("a # b}")
+
+
+class TestParse(unittest.TestCase):
+    def test_parse_text(self):
+        parts = el_parser.parse("${nameNode}/user/${ wf:user() }")
+
+        self.assertEqual(3, len(parts))
+        self.assertEqual("${nameNode}", parts[0].source)
+        self.assertEqual(Identifier("nameNode"), parts[0].body)
+        self.assertEqual("/user/", parts[1])
+        self.assertEqual(FunctionCall("wf:user", ()), parts[2].body)
+
+    def test_parse_without_expressions(self):
+        self.assertEqual(("no_el_here",), el_parser.parse("no_el_here"))
+        self.assertEqual((), el_parser.parse(""))
+
+    def test_parse_nested_calls(self):
+        self.assertEqual(
+            FunctionCall("wf:errorMessage", (FunctionCall("wf:lastErrorNode", ()),)),
+            parse_expression("${wf:errorMessage(wf:lastErrorNode())}"),
+        )
+
+    def test_parse_precedence(self):
+        self.assertEqual(
+            BinaryOperation(
+                "or",
+                BinaryOperation("==", Identifier("a"), Literal(1)),
+                BinaryOperation(
+                    "and",
+                    UnaryOperation("not", Identifier("b")),
+                    BinaryOperation(
+                        ">",
+                        BinaryOperation("+", Identifier("c"), BinaryOperation("*", Literal(2), Literal(3))),
+                        Identifier("GB"),
+                    ),
+                ),
+            ),
+            parse_expression("${a eq 1 || not b and c + 2 * 3 gt GB}"),
+        )
+
+    def test_parse_conditional_without_namespace(self):
+        self.assertEqual(
+            Conditional(Identifier("a"), Identifier("b"), Identifier("c")), parse_expression("${a ? b:c}")
+        )
+
+    def test_parse_dotted_identifier(self):
+        self.assertEqual(
+            Identifier("oozie.wf.application.path"), parse_expression("${oozie.wf.application.path}")
+        )
+
+    def test_parse_errors(self):
+        for expression in ["${}", "${a b}", "${concat('a',}", "${(a}", "${a ? b}", '${concat("abc, "def")}']:
+            with self.subTest(expression=expression), self.assertRaises(el_parser.ELParserException):
+                el_parser.parse(expression)
+
+
+class TestCompiledEL(unittest.TestCase):
+    def test_variables_and_functions(self):
+        compiled = el_parser.compile_el("${concat(nameNode, '/x')} ${size gt 2 * GB} ${wf:id()}")
+
+        self.assertEqual({"nameNode", "size"}, compiled.variables)
+        self.assertEqual({"concat", "wf:id"}, compiled.functions)
+        self.assertFalse(compiled.is_single_expression)
+
+    def test_evaluate(self):
+        params = {"nameNode": "hdfs://", "size": "3", "flag": "true", "empty_value": ""}
+        cases = [
+            ("${concat(nameNode, 'tmp')}", "hdfs://tmp"),
+            ("${trim(concat(' a', ' '))}", "a"),
+            ("${size + 1}", 4),
+            ("${size * KB}", 3072),
+            ("${7 div 2}", 3.5),
+            ("${-7 mod 2}", -1),
+            ("${size gt 2 and flag}", True),
+            ("${size lt 2 or not flag}", False),
+            ("${size == 3}", True),
+            ("${nameNode ne 'hdfs://'}", False),
+            ("${empty empty_value}", True),
+            ("${empty nameNode ? 'no' : 'yes'}", "yes"),
+            ("${null == missing_allowed}", False),
+            ("dir=${nameNode}/${size + 1}", "dir=hdfs:///4"),
+            ("${flag eq true}-${null}", "true-"),
+        ]
+        params["missing_allowed"] = "x"
+        for expression, expected in cases:
+            with self.subTest(expression=expression):
+                self.assertEqual(expected, el_parser.compile_el(expression).evaluate(params, FUNCTIONS))
+
+    def test_evaluate_unknown(self):
+        with self.assertRaises(KeyError):
+            el_parser.compile_el("${missing}").evaluate({}, FUNCTIONS)
+        with self.assertRaises(KeyError):
+            el_parser.compile_el("${wf:id()}").evaluate({}, FUNCTIONS)
+
+    def test_evaluate_short_circuit(self):
+        compiled = el_parser.compile_el("${false and wf:id()}")
+
+        self.assertFalse(compiled.evaluate({}, FUNCTIONS))
+
+    def test_to_jinja(self):
+        compiled = el_parser.compile_el("ssh ${user.name}@${host} ${retries gt 2 ? 'x' : \"y\"} ${GB}")
+
+        self.assertEqual(
+            "ssh {{ params.user.name }}@{{ params.host }} {{ el_operators.to_string(('x' if "
+            "el_operators.to_boolean(el_operators.greater_than(params.retries, 2)) else \"y\")) }} "
+            "{{ 1073741824 }}",
+            compiled.to_jinja(),
+        )
+
+    def test_to_jinja_function(self):
+        with self.assertRaises(el_parser.ELParserException):
+            el_parser.compile_el("${concat('a', 'b')}").to_jinja()
+
+    def test_to_jinja_macros(self):
+        compiled = el_parser.compile_el("${wf:id()}-${wf:conf('a') eq 'b'}")
+
+        self.assertEqual(
+            "{{ wf_id() }}-{{ el_operators.to_string(el_operators.equals(wf_conf('a'), 'b')) }}",
+            compiled.to_jinja({"wf:id": "wf_id", "wf:conf": "wf_conf"}),
+        )
+        with self.assertRaises(el_parser.ELParserException):
+            compiled.to_jinja({"wf:id": "wf_id"})
+
+    def test_to_python(self):
+        self.assertEqual(
+            "concat(PARAMS[\"nameNode\"], '/x')",
+            el_parser.compile_el("${concat(nameNode, '/x')}").to_python(FUNCTIONS),
+        )
+        self.assertEqual(
+            '"ls " + str(trim(el_operators.logical_not(PARAMS["dir"])))',
+            el_parser.compile_el("ls ${trim(not dir)}").to_python(FUNCTIONS),
+        )
+
+    @parameterized.expand(
+        [
+            ("${a gt 1}", {"a": "2"}),
+            ("${a + b * 2}", {"a": "1", "b": "2"}),
+            ("${a eq 1.0}", {"a": "1"}),
+            ("${not flag}", {"flag": "false"}),
+            ("${flag and a lt 10}", {"flag": "true", "a": "9"}),
+            ("${flag or empty a}", {"flag": "false", "a": ""}),
+            ("${flag ? 'x' : 'y'}", {"flag": "false"}),
+            ("${-a}", {"a": "3"}),
+            ("ls ${a ge 2} ${a div 2}", {"a": "3"}),
+        ]
+    )
+    def test_generated_code_coerces_string_params(self, text, params):
+        compiled = el_parser.compile_el(text)
+        expected = compiled.evaluate(params, FUNCTIONS)
+
+        code = compiled.to_python(FUNCTIONS)
+        value = eval(code, {"PARAMS": params, "el_operators": el_operators})  # pylint: disable=eval-used
+        rendered = jinja2.Template(compiled.to_jinja()).render(params=params, el_operators=el_operators)
+
+        self.assertEqual(expected, value)
+        self.assertEqual(el_operators.to_string(expected), rendered)
+
+    def test_to_python_escaped_literal(self):
+        code = el_parser.compile_el(r"${concat('it\'s', '')}").to_python(FUNCTIONS)
+
+        self.assertEqual("concat(\"it's\", '')", code)
+
+    def test_to_python_unsupported_function(self):
+        with self.assertRaises(KeyError):
+            el_parser.compile_el("${wf:id()}").to_python(FUNCTIONS)
+
+    def test_compile_el_is_cached(self):
+        el_parser.compile_el.cache_clear()
+
+        first = el_parser.compile_el("${nameNode}/cached")
+        second = el_parser.compile_el("${nameNode}/cached")
+
+        self.assertIs(first, second)
+        self.assertEqual(1, el_parser.compile_el.cache_info().hits)
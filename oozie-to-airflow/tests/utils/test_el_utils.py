@@ -13,12 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests EL utils"""
+import ast
+import os
+import shutil
+import tempfile
 import unittest
 import unittest.mock
-from utils import el_utils
 
+import jinja2
 
-class TestELUtils(unittest.TestCase):
+from o2a_libs import el_operators
+from utils import el_utils, properties_utils
+
+
+class TestELUtils(unittest.TestCase):  # pylint: disable=too-many-public-methods
     def test_strip_el(self):
         exp_func = 'concat("abc", "def")'
         exp_var = "hostname"
@@ -42,10 +50,19 @@ class TestELUtils(unittest.TestCase):
         self.assertEqual(replaced, expected)
 
     def test_replace_el_with_var_func_no_quote(self):
-        # functions shouldn't be replaced
+        # functions with constant arguments are evaluated
         params = {}
         el_var = '${concat("abc", "def")}'
-        expected = '${concat("abc", "def")}'
+        expected = "abcdef"
+
+        replaced = el_utils.replace_el_with_var(el_var, params, quote=False)
+        self.assertEqual(replaced, expected)
+
+    def test_replace_el_with_var_func_unknown_no_quote(self):
+        # functions with unknown arguments shouldn't be replaced
+        params = {}
+        el_var = '${concat(abc, "def")}'
+        expected = '${concat(abc, "def")}'
 
         replaced = el_utils.replace_el_with_var(el_var, params, quote=False)
         self.assertEqual(replaced, expected)
@@ -59,14 +76,80 @@ class TestELUtils(unittest.TestCase):
         self.assertEqual(replaced, expected)
 
     def test_replace_el_with_var_func_quote(self):
-        # functions shouldn't be replaced
-        params = {}
-        el_var = '${concat("abc", "def")}'
-        expected = '\'${concat("abc", "def")}\''
+        # runtime functions shouldn't be replaced
+        params = {"prefix": "run-"}
+        el_var = "${concat(prefix, timestamp())}/${wf:id()}"
+        expected = "'${concat(prefix, timestamp())}/${wf:id()}'"
 
         replaced = el_utils.replace_el_with_var(el_var, params, quote=True)
         self.assertEqual(replaced, expected)
 
+    def test_replace_el_with_var_folds_expressions(self):
+        params = {"nameNode": "hdfs://", "x": "banana", "size": "3"}
+        cases = [
+            ("${concat(nameNode, '/user')}/${wf:user()}", "hdfs:///user/${wf:user()}"),
+            ("${replaceAll(x, 'a', 'o')}", "bonono"),
+            ("${size gt 2 * KB}", "false"),
+            ("${nameNode}${size + 1}", "hdfs://4"),
+        ]
+        for el_var, expected in cases:
+            with self.subTest(el_var=el_var):
+                self.assertEqual(expected, el_utils.replace_el_with_var(el_var, params, quote=False))
+
+    def test_replace_el_with_var_counts_folded_expressions(self):
+        params = {"nameNode": "hdfs://"}
+        before = el_utils.FOLDING_STATISTICS["folded"]
+
+        el_utils.replace_el_with_var(
+            "${nameNode}/${concat(nameNode, 'a')}/${trim(' b ')}", params, quote=False
+        )
+
+        self.assertEqual(2, el_utils.FOLDING_STATISTICS["folded"] - before)
+
+    def test_replace_el_with_var_memoized_by_values(self):
+        el_var = "${nameNode}/${concat(dir, '/x')}"
+        params = {"nameNode": "hdfs://", "dir": "a", "unused": "1"}
+
+        self.assertEqual("hdfs:///a/x", el_utils.replace_el_with_var(el_var, params, quote=False))
+        self.assertIn((el_var, ("a", "hdfs://")), el_utils.SUBSTITUTION_CACHE)
+
+        params["unused"] = "2"
+        self.assertEqual("hdfs:///a/x", el_utils.replace_el_with_var(el_var, params, quote=False))
+        params["dir"] = "b"
+        self.assertEqual("hdfs:///b/x", el_utils.replace_el_with_var(el_var, params, quote=False))
+        del params["dir"]
+        self.assertEqual(
+            "hdfs:///${concat(dir, '/x')}", el_utils.replace_el_with_var(el_var, params, quote=False)
+        )
+
+    def test_replace_el_with_var_memoized_counts_folded_expressions(self):
+        before = el_utils.FOLDING_STATISTICS["folded"]
+
+        for _ in range(3):
+            el_utils.replace_el_with_var("${trim(' memoized ')}", {}, quote=False)
+
+        self.assertEqual(3, el_utils.FOLDING_STATISTICS["folded"] - before)
+
+    def test_replace_el_with_var_with_regex(self):
+        params = {"a": "1", "b": "${a}"}
+        el_var = "${a}-${b}-${c}-${"
+
+        self.assertEqual("1-${a}-${c}-${", el_utils.replace_el_with_var(el_var, params, quote=False))
+
+    def test_get_fs_paths(self):
+        el_function = "${fs:exists(concat(dir, '/_SUCCESS')) and fs:fileSize(dir) gt GB and fs:isDir(dir)}"
+
+        self.assertEqual(
+            ["concat(PARAMS[\"dir\"], '/_SUCCESS')", 'PARAMS["dir"]'], el_utils.get_fs_paths(el_function)
+        )
+        self.assertEqual([], el_utils.get_fs_paths("${dir}"))
+        self.assertEqual([], el_utils.get_fs_paths("${"))
+
+    def test_fs_functions_not_folded(self):
+        el_function = "${fs:exists(dir)}"
+
+        self.assertEqual(el_function, el_utils.replace_el_with_var(el_function, {"dir": "/tmp"}, quote=False))
+
     def test_parse_el_func(self):
         test_module = unittest.mock.Mock()
         test_module.__name__ = "test"
@@ -95,6 +178,87 @@ class TestELUtils(unittest.TestCase):
         with self.assertRaises(KeyError):
             el_utils.parse_el_func(el_func, el_func_map)
 
+    def test_parse_el_func_nested(self):
+        el_func = '${concat(trim(dir), "/tmp")}'
+        expected = 'concat(trim(PARAMS["dir"]), "/tmp")'
+
+        self.assertEqual(expected, el_utils.parse_el_func(el_func))
+
+    def test_convert_el_to_jinja_operators(self):
+        el_function = "${retries gt 2 * KB}"
+        expected = (
+            "'{{ el_operators.to_string(el_operators.greater_than(params.retries, "
+            "el_operators.multiply(2, 1024))) }}'"
+        )
+        self.assertEqual(expected, el_utils.convert_el_to_jinja(el_function, quote=True))
+
+    def test_convert_el_to_jinja_unsupported_function(self):
+        # Unsupported functions are left untouched by the regex fallback
+        el_function = "${nameNode}/user/${coord:user()}"
+        expected = "'{{ params.nameNode }}/user/${coord:user()}'"
+        self.assertEqual(expected, el_utils.convert_el_to_jinja(el_function, quote=True))
+
+    def test_convert_el_to_jinja_wf_functions_as_macros(self):
+        el_function = "${nameNode}/user/${wf:user()} ${wf:errorMessage(wf:lastErrorNode())}"
+        expected = "'{{ params.nameNode }}/user/{{ wf_user() }} {{ wf_error_message(wf_last_error_node()) }}'"
+        self.assertEqual(expected, el_utils.convert_el_to_jinja(el_function, quote=True))
+
+    def test_convert_el_to_jinja_wf_functions_as_python(self):
+        self.assertEqual(
+            "el_operators.equals(el_wf_functions.wf_last_error_node(), 'node')",
+            el_utils.convert_el_to_jinja("${wf:lastErrorNode() eq 'node'}", jinja_functions=False),
+        )
+
+    def test_convert_el_to_jinja_compares_conf_values(self):
+        wf_functions = unittest.mock.Mock(wf_conf=unittest.mock.Mock(return_value="6"))
+        code = el_utils.convert_el_to_jinja("${wf:conf('n') gt 5}", jinja_functions=False)
+        template = el_utils.convert_el_to_jinja("${wf:conf('n') gt 5}", quote=False)
+
+        value = eval(  # pylint: disable=eval-used
+            code, {"el_wf_functions": wf_functions, "el_operators": el_operators}
+        )
+        rendered = jinja2.Template(template).render(wf_conf=wf_functions.wf_conf, el_operators=el_operators)
+
+        self.assertTrue(value)
+        self.assertEqual("true", rendered)
+
+    def test_convert_el_to_jinja_wf_functions_mixed_with_other_functions(self):
+        self.assertEqual(
+            "concat(el_wf_functions.wf_id(), '-x')",
+            el_utils.convert_el_to_jinja("${concat(wf:id(), '-x')}", quote=True),
+        )
+
+    def test_evaluate_predicate(self):
+        params = {"flag": "true", "size": "20"}
+
+        self.assertTrue(el_utils.evaluate_predicate("${flag}", params))
+        self.assertTrue(el_utils.evaluate_predicate("${size * 2 gt 30}", params))
+        self.assertFalse(el_utils.evaluate_predicate("${firstNotNull('', '')}", params))
+        self.assertFalse(el_utils.evaluate_predicate("yes", params))
+        self.assertIsNone(el_utils.evaluate_predicate("${missing eq 1}", params))
+        self.assertIsNone(el_utils.evaluate_predicate("${wf:conf('flag')}", params))
+        self.assertIsNone(el_utils.evaluate_predicate("${timestamp() gt 1}", params))
+        self.assertIsNone(el_utils.evaluate_predicate("${toPropertiesStr(flag)}", params))
+        self.assertIsNone(el_utils.evaluate_predicate("${size / 0 gt 1}", params))
+        self.assertIsNone(el_utils.evaluate_predicate("${flag eq}", params))
+
+    def test_uses_wf_functions(self):
+        self.assertTrue(el_utils.uses_wf_functions("${wf:id()}"))
+        self.assertTrue(el_utils.uses_wf_functions("${firstNotNull(wf:conf('a'), 'b')}"))
+        self.assertFalse(el_utils.uses_wf_functions("${fs:exists('/a')}"))
+        self.assertFalse(el_utils.uses_wf_functions("${wf:id(}"))
+
+    def test_converts_to_python(self):
+        self.assertTrue(el_utils.converts_to_python("${concat('a', 'b')}"))
+        self.assertTrue(el_utils.converts_to_python("${wf:id()}", jinja_functions=False))
+        self.assertFalse(el_utils.converts_to_python("${wf:id()}"))
+        self.assertFalse(el_utils.converts_to_python("/user/${name}"))
+
+    def test_fold_el(self):
+        self.assertEqual("/user/test", el_utils.fold_el("/user/${name}", {"name": "test"}))
+        self.assertEqual("/user/${name}", el_utils.fold_el("/user/${name}", {}))
+        self.assertEqual("${wf:id(}", el_utils.fold_el("${wf:id(}", {"name": "test"}))
+
     def test_convert_el_to_jinja_var_no_quote(self):
         el_function = "${hostname}"
         expected = "{{ params.hostname }}"
@@ -115,6 +279,46 @@ class TestELUtils(unittest.TestCase):
         expected = 'concat("ab", "de")'
         self.assertEqual(expected, el_utils.convert_el_to_jinja(el_function, quote=True))
 
+    def test_convert_el_to_jinja_folds_with_params(self):
+        params = {"hostname": "airflow@apache.org", "dir": " /tmp "}
+        before = el_utils.FOLDING_STATISTICS["folded"]
+
+        self.assertEqual(
+            "'ssh airflow@apache.org ls /tmp'",
+            el_utils.convert_el_to_jinja("ssh ${hostname} ls ${trim(dir)}", quote=True, params=params),
+        )
+        self.assertEqual(2, el_utils.FOLDING_STATISTICS["folded"] - before)
+
+    def test_convert_el_to_jinja_partially_folds_with_params(self):
+        params = {"hostname": "airflow@apache.org"}
+        self.assertEqual(
+            "'{{ params.user }}@airflow@apache.org {{ wf_id() }}'",
+            el_utils.convert_el_to_jinja("${user}@${hostname} ${wf:id()}", quote=True, params=params),
+        )
+
+    def test_convert_el_to_jinja_leaves_unsafe_values_to_runtime(self):
+        params = {"user": "it's", "msg": 'say "hi" {{ ds }}', "path": "/tmp"}
+        before = el_utils.FOLDING_STATISTICS["folded"]
+
+        template = el_utils.convert_el_to_jinja("echo ${user} ${msg} ${path}", quote=True, params=params)
+        code = el_utils.convert_el_to_jinja("echo ${concat(msg, path)}", quote=True, params=params)
+        value = eval(  # pylint: disable=eval-used
+            code, {"PARAMS": params, "concat": lambda *args: "".join(args)}
+        )
+
+        self.assertEqual("'echo {{ params.user }} {{ params.msg }} /tmp'", template)
+        self.assertEqual(1, el_utils.FOLDING_STATISTICS["folded"] - before)
+        self.assertEqual(
+            """echo it's say "hi" {{ ds }} /tmp""",
+            jinja2.Template(ast.literal_eval(template)).render(params=params),
+        )
+        self.assertEqual("""echo say "hi" {{ ds }}/tmp""", value)
+
+    def test_is_safe_value(self):
+        self.assertTrue(el_utils.is_safe_value("hdfs://localhost:8020/{a}$b"))
+        for value in ["it's", 'say "hi"', "a\\b", "a\nb", "{{ ds }}", "{% raw %}", "{# x #}", "${a}"]:
+            self.assertFalse(el_utils.is_safe_value(value), value)
+
     def test_convert_el_to_jinja_no_change_no_quote(self):
         el_function = "no_el_here"
         expected = "no_el_here"
@@ -130,8 +334,6 @@ class TestELUtils(unittest.TestCase):
         self.assertEqual(params, el_utils.parse_els(None, params))
 
     def test_parse_els_file(self):
-        import tempfile
-
         prop_file = tempfile.NamedTemporaryFile("w", delete=False)
         prop_file.write("#comment\n" "key=value")
         prop_file.close()
@@ -139,3 +341,44 @@ class TestELUtils(unittest.TestCase):
         params = {"test": "answer"}
         expected = {"test": "answer", "key": "value"}
         self.assertEqual(expected, el_utils.parse_els(prop_file.name, params))
+
+    def test_parse_els_file_java_syntax(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        prop_file = os.path.join(directory, "job.properties")
+        with open(prop_file, "w") as file:
+            file.write(
+                "  # comment\n"
+                "  command = ssh ${host} \\\n"
+                "      ls ${dir}\n"
+                "dir:${root}/data\n"
+                "host=user@google.com\n"
+                "root=${root}/app\n"
+            )
+
+        params = el_utils.parse_els(prop_file, {"root": "/user"})
+
+        self.assertEqual(
+            {
+                "root": "/user/app",
+                "command": "ssh user@google.com ls /user/app/data",
+                "dir": "/user/app/data",
+                "host": "user@google.com",
+            },
+            params,
+        )
+        self.assertEqual(["root", "command", "dir", "host"], list(params))
+
+    def test_resolve_properties_order(self):
+        properties = {"c": "${b}-c", "b": "${a}-b", "a": "a", "d": "${missing}"}
+
+        self.assertEqual(
+            {"c": "a-b-c", "b": "a-b", "a": "a", "d": "${missing}"},
+            el_utils.resolve_properties(properties, {}),
+        )
+
+    def test_resolve_properties_cycle(self):
+        properties = {"a": "${b}", "b": "${concat(c, 'x')}", "c": "${a}", "d": "${a}"}
+
+        with self.assertRaisesRegex(properties_utils.PropertiesException, "job.properties: a -> b -> c -> a"):
+            el_utils.resolve_properties(properties, {}, source="job.properties")
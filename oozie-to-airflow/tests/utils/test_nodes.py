@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Graphs of parsed nodes used by tests"""
+from typing import Callable, Dict, List, Union
+from xml.etree.ElementTree import Element
+
+from converter.parsed_node import ParsedNode
+from mappers.base_mapper import BaseMapper
+from mappers.dummy_mapper import DummyMapper
+
+
+def create_dummy_mapper(name: str) -> BaseMapper:
+    """Returns a dummy mapper tagged with the name of the node without its trailing digits."""
+    return DummyMapper(oozie_node=Element(name.rstrip("0123456789")), name=name)
+
+
+def make_nodes(
+    graph: Dict[str, Union[List[str], ParsedNode]],
+    create_mapper: Callable[[str], BaseMapper] = create_dummy_mapper,
+    errors: Dict[str, str] = None,
+) -> Dict[str, ParsedNode]:
+    """
+    Returns the parsed nodes of the graph.
+
+    :param graph: The "ok" downstream names of each node, or the node itself if it is built by the test.
+    :param create_mapper: Returns the mapper of the node with the given name.
+    :param errors: The error downstream name of the nodes having one.
+    """
+    errors = errors or {}
+    nodes = {}
+    for name, downstream_names in graph.items():
+        if isinstance(downstream_names, ParsedNode):
+            nodes[name] = downstream_names
+            continue
+        nodes[name] = ParsedNode(create_mapper(name))
+        for downstream_name in downstream_names:
+            nodes[name].add_downstream_node_name(downstream_name)
+        if name in errors:
+            nodes[name].set_error_node_name(errors[name])
+    return nodes
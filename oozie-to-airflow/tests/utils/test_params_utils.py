@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests params utils"""
+import ast
+import unittest
+from unittest import mock
+
+import jinja2
+
+from utils import params_utils
+
+
+class TestParamsUtils(unittest.TestCase):
+
+    params = {
+        "dataproc_cluster": "cluster",
+        "gcp_region": "europe-west3",
+        "user.name": "test",
+        "host": "example.com",
+        "queueName": "default",
+        "unused": "value",
+    }
+
+    def test_find_referenced_params(self):
+        # language=python
+        text = """
+task = dataproc_operator.DataProcPigOperator(
+    cluster_name=PARAMS['dataproc_cluster'],
+    region=PARAMS.get("gcp_region", None),
+)
+ssh = ssh_operator.SSHOperator(
+    params=PARAMS,
+    command='ssh {{ params.user.name }}@{{ params["host"] }} {{ params.missing }}',
+)
+"""
+        self.assertEqual(
+            {"dataproc_cluster", "gcp_region", "user.name", "host"},
+            params_utils.find_referenced_params(text, self.params),
+        )
+
+    def test_find_referenced_params_used_as_whole(self):
+        text = "task = python_operator.PythonOperator(op_kwargs=PARAMS, params=PARAMS)"
+        self.assertIsNone(params_utils.find_referenced_params(text, self.params))
+
+    def test_find_referenced_params_of_wf_functions(self):
+        text = """if el_wf_functions.wf_conf("queueName") == 'x' and el_wf_functions.wf_user():"""
+        self.assertEqual({"queueName", "user.name"}, params_utils.find_referenced_params(text, self.params))
+
+    def test_find_referenced_params_wf_conf_computed_key(self):
+        text = "command='{{ wf_conf(params.host) }}'"
+        self.assertIsNone(params_utils.find_referenced_params(text, self.params))
+
+    def test_find_referenced_params_none(self):
+        text = "task = dummy_operator.DummyOperator(task_id='task')"
+        self.assertEqual(set(), params_utils.find_referenced_params(text, self.params))
+
+    def test_resolve_params(self):
+        # language=python
+        text = """
+task = dataproc_operator.DataProcPigOperator(
+    cluster_name=PARAMS['dataproc_cluster'],
+    region=PARAMS['gcp_region'],
+    query="sh ls {{ params.user.name }} {{params.host}}",
+)
+ssh = ssh_operator.SSHOperator(
+    params=PARAMS,
+)
+"""
+        resolved = params_utils.resolve_params(text, {"dataproc_cluster": "other", "user.name": "child"})
+
+        self.assertIn("cluster_name='other',", resolved)
+        self.assertIn("region=PARAMS['gcp_region'],", resolved)
+        self.assertIn('query="sh ls child {{params.host}}",', resolved)
+        self.assertIn('params=dict(PARAMS, **{"dataproc_cluster": "other", "user.name": "child"}),', resolved)
+
+    def test_resolve_params_escapes_values(self):
+        # language=python
+        text = """
+shell = dataproc_operator.DataProcPigOperator(
+    query="sh echo {{ params.msg }}",
+)
+ssh = ssh_operator.SSHOperator(
+    command='echo {{ params.msg }} {{ params.path }}',
+)
+"""
+        params = {"msg": 'it\'s "{{ x }}"', "path": "C:\\dir"}
+
+        resolved = params_utils.resolve_params(text, params)
+
+        self.assertIn('query="sh echo {% raw %}it\'s \\"{{ x }}\\"{% endraw %}",', resolved)
+        self.assertIn("command='echo {% raw %}it\\'s \"{{ x }}\"{% endraw %} C:\\\\dir',", resolved)
+        namespace = {"dataproc_operator": mock.Mock(), "ssh_operator": mock.Mock(), "PARAMS": {}}
+        exec(resolved, namespace)  # pylint: disable=exec-used
+        command = namespace["ssh_operator"].SSHOperator.call_args[1]["command"]
+        self.assertEqual('echo it\'s "{{ x }}" C:\\dir', jinja2.Template(command).render())
+
+    def test_to_string_literal(self):
+        for value in ["it's", 'say "hi"', "a\\b", "line\nbreak"]:
+            for quote in "'\"":
+                self.assertEqual(value, ast.literal_eval(params_utils.to_string_literal(value, quote)))
+
+    def test_resolve_params_none(self):
+        text = "params=PARAMS, cluster_name=PARAMS['dataproc_cluster']"
+
+        self.assertEqual(text, params_utils.resolve_params(text, {}))
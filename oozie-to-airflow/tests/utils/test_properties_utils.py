@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests properties utils"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils import properties_utils
+
+
+class TestParseProperties(unittest.TestCase):
+    def test_parse_properties(self):
+        lines = [
+            "# comment\n",
+            "! another comment\n",
+            "\n",
+            "   \t\n",
+            "plain=value\n",
+            "   indented = spaced value  \n",
+            "colon:value\n",
+            "space separated value\n",
+            "empty=\n",
+            "keyonly\n",
+            "duplicated=first\n",
+            "duplicated=second\n",
+        ]
+
+        self.assertEqual(
+            {
+                "plain": "value",
+                "indented": "spaced value  ",
+                "colon": "value",
+                "space": "separated value",
+                "empty": "",
+                "keyonly": "",
+                "duplicated": "second",
+            },
+            properties_utils.parse_properties(lines),
+        )
+
+    def test_parse_properties_continuation(self):
+        lines = [
+            "fruits = apple, banana, \\\n",
+            "         pear, \\\n",
+            "   # not a comment\n",
+            "path=c:\\\\\n",
+            "last=end\\",
+        ]
+
+        self.assertEqual(
+            {"fruits": "apple, banana, pear, # not a comment", "path": "c:\\", "last": "end"},
+            properties_utils.parse_properties(lines),
+        )
+
+    def test_parse_properties_escapes(self):
+        lines = ["key\\ with\\=separators = caf\\u00e9\\tx\\n\\y\n", "\\#hash=1\n"]
+
+        self.assertEqual(
+            {"key with=separators": "caf\u00e9\tx\ny", "#hash": "1"}, properties_utils.parse_properties(lines)
+        )
+
+    def test_parse_properties_malformed_unicode_escape(self):
+        with self.assertRaises(properties_utils.PropertiesException):
+            properties_utils.parse_properties(["key=\\u12x4\n"])
+
+    def test_split_key_value_separator_in_value(self):
+        self.assertEqual(("key", "= value"), properties_utils.split_key_value("key = = value"))
+        self.assertEqual(
+            ("url", "hdfs://host:8020"), properties_utils.split_key_value("url:hdfs://host:8020")
+        )
+
+
+class TestReadProperties(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.properties_file = os.path.join(directory, "job.properties")
+        self.write("key=value\n")
+
+    def write(self, content, mtime=1000):
+        with open(self.properties_file, "w") as file:
+            file.write(content)
+        os.utime(self.properties_file, (mtime, mtime))
+
+    def test_read_properties_is_cached(self):
+        first = properties_utils.read_properties(self.properties_file)
+        second = properties_utils.read_properties(self.properties_file)
+
+        self.assertEqual({"key": "value"}, first)
+        self.assertIs(first, second)
+
+    def test_read_properties_reparsed_when_modified(self):
+        properties_utils.read_properties(self.properties_file)
+        self.write("key=changed\n", mtime=2000)
+
+        self.assertEqual({"key": "changed"}, properties_utils.read_properties(self.properties_file))
+
+    def test_read_properties_cached_by_real_path(self):
+        link = self.properties_file + ".link"
+        os.symlink(self.properties_file, link)
+
+        self.assertIs(
+            properties_utils.read_properties(self.properties_file), properties_utils.read_properties(link)
+        )
+
+    def test_read_properties_latin1(self):
+        with open(self.properties_file, "wb") as file:
+            file.write(b"name=caf\xe9\nescaped=caf\\u00e9 \\u20ac\n")
+
+        self.assertEqual(
+            {"name": "caf\u00e9", "escaped": "caf\u00e9 \u20ac"},
+            properties_utils.read_properties(self.properties_file),
+        )
@@ -13,4 +13,4 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Various utilities used by converter"""
-__all__ = ["el_utils", "xml_utils"]
+__all__ = ["el_parser", "el_utils", "params_utils", "properties_utils", "xml_utils"]
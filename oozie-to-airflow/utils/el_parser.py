@@ -0,0 +1,612 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Lexer, parser and compiler of the Oozie EL expressions.
+
+A text with EL expressions such as ``${concat(nameNode, '/user')}/${wf:id()}`` is split into
+literal text and expressions, every expression is tokenized and parsed into an AST and the AST
+is compiled once into python closures evaluating it and into code generators rendering it as
+a Jinja or python expression. Compiled texts are cached, so the mappers asking for the same
+``${nameNode}`` on every action parse it only once.
+"""
+import functools
+import json
+import re
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Tuple, Union, cast
+
+from o2a_libs import el_operators
+from o2a_libs.el_operators import to_boolean, to_string
+
+EL_CONSTANTS = {"KB": 1024**1, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4, "PB": 1024**5}
+
+KEYWORD_LITERALS = {"true": True, "false": False, "null": None}
+
+# Keyword and symbolic operators mapped to the operator kept in the AST
+OPERATOR_ALIASES = {
+    "eq": "==",
+    "ne": "!=",
+    "lt": "<",
+    "gt": ">",
+    "le": "<=",
+    "ge": ">=",
+    "div": "/",
+    "mod": "%",
+    "and": "and",
+    "&&": "and",
+    "or": "or",
+    "||": "or",
+    "not": "not",
+    "!": "not",
+    "empty": "empty",
+}
+
+# Precedence of the binary operators, higher binds tighter
+BINARY_PRECEDENCE = {
+    "or": 1,
+    "and": 2,
+    "==": 3,
+    "!=": 3,
+    "<": 4,
+    ">": 4,
+    "<=": 4,
+    ">=": 4,
+    "+": 5,
+    "-": 5,
+    "*": 6,
+    "/": 6,
+    "%": 6,
+}
+
+TOKEN_MATCH = re.compile(
+    r"""\s*(?:
+    (?P<number>(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+|\d+)
+    |(?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    |(?P<name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)
+    |(?P<operator>==|!=|<=|>=|&&|\|\||[-+*/%<>!?:(),}])
+    )""",
+    re.VERBOSE,
+)
+# The most common expression, a single variable such as ${nameNode}, skips the tokenizer
+VARIABLE_MATCH = re.compile(r"\$\{\s*([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)\s*\}")
+ESCAPE_MATCH = re.compile(r"\\(.)")
+
+
+class ELParserException(Exception):
+    pass
+
+
+class Token(NamedTuple):
+    kind: str
+    value: Any
+    position: int
+    source: Optional[str] = None
+
+
+class Literal(NamedTuple):
+    value: Any
+    # Quoted source of string literals, kept so that the generated code quotes them the same way
+    source: Optional[str] = None
+
+
+class Identifier(NamedTuple):
+    name: str
+
+
+class FunctionCall(NamedTuple):
+    name: str
+    args: Tuple
+
+
+class UnaryOperation(NamedTuple):
+    operator: str
+    operand: Any
+
+
+class BinaryOperation(NamedTuple):
+    operator: str
+    left: Any
+    right: Any
+
+
+class Conditional(NamedTuple):
+    condition: Any
+    if_true: Any
+    if_false: Any
+
+
+class Expression(NamedTuple):
+    """A single ${...} of the text with its original source"""
+
+    source: str
+    body: Any
+
+
+def tokenize(text: str, start: int = 0) -> Tuple[List[Token], int]:
+    """
+    Tokenizes the expression starting at the start position of the text up to the closing brace.
+    Returns the tokens and the position after the closing brace.
+    """
+    tokens: List[Token] = []
+    position = start
+    while True:
+        match = TOKEN_MATCH.match(text, position)
+        if not match or match.end() == position:
+            raise ELParserException(f"Unexpected character at position {position} of {text!r}")
+        position = match.end()
+        # Every alternative of the pattern is a named group
+        kind = cast(str, match.lastgroup)
+        value = match.group(kind)
+        token_position = match.start(kind)
+        source = value
+        if kind == "operator" and value == "}":
+            tokens.append(Token("end", value, token_position))
+            return tokens, position
+        if kind == "number":
+            value = float(value) if any(char in value for char in ".eE") else int(value)
+        elif kind == "string":
+            value = ESCAPE_MATCH.sub(r"\1", value[1:-1])
+        elif kind == "name" and value in KEYWORD_LITERALS:
+            kind, value = "literal", KEYWORD_LITERALS[value]
+        elif kind == "name" and value in OPERATOR_ALIASES:
+            kind, value = "operator", OPERATOR_ALIASES[value]
+        elif kind == "operator":
+            value = OPERATOR_ALIASES.get(value, value)
+        tokens.append(Token(kind, value, token_position, source))
+
+
+class _Parser:
+    """Recursive descent parser of the tokens of a single expression"""
+
+    def __init__(self, tokens: List[Token], source: str):
+        self.tokens = tokens
+        self.source = source
+        self.index = 0
+
+    def peek(self, offset: int = 0) -> Token:
+        try:
+            return self.tokens[self.index + offset]
+        except IndexError:
+            return self.tokens[-1]
+
+    def is_operator(self, value: str, offset: int = 0) -> bool:
+        token = self.peek(offset)
+        return token.kind == "operator" and token.value == value
+
+    def next(self) -> Token:
+        token = self.peek()
+        self.index += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        if not self.is_operator(value):
+            self.fail(f"expected '{value}'")
+        self.index += 1
+
+    def fail(self, message: str):
+        token = self.peek()
+        raise ELParserException(
+            f"Invalid EL expression {self.source!r}: {message} at position {token.position}"
+        )
+
+    def parse(self):
+        node = self.parse_conditional()
+        if self.peek().kind != "end":
+            self.fail(f"unexpected {self.peek().value!r}")
+        return node
+
+    def parse_conditional(self):
+        condition = self.parse_binary(1)
+        if not self.is_operator("?"):
+            return condition
+        self.index += 1
+        if_true = self.parse_conditional()
+        self.expect(":")
+        return Conditional(condition, if_true, self.parse_conditional())
+
+    def parse_binary(self, min_precedence: int):
+        node = self.parse_unary()
+        while True:
+            token = self.peek()
+            precedence = BINARY_PRECEDENCE.get(token.value, 0) if token.kind == "operator" else 0
+            if precedence < min_precedence:
+                return node
+            self.index += 1
+            node = BinaryOperation(token.value, node, self.parse_binary(precedence + 1))
+
+    def parse_unary(self):
+        token = self.peek()
+        if token.kind == "operator" and token.value in ("-", "not", "empty"):
+            self.index += 1
+            return UnaryOperation(token.value, self.parse_unary())
+        return self.parse_primary()
+
+    def parse_primary(self):
+        """Parses a literal, a parenthesized expression, a variable or a function call."""
+        token = self.next()
+        if token.kind == "string":
+            return Literal(token.value, token.source)
+        if token.kind in ("number", "literal"):
+            return Literal(token.value)
+        if token.kind == "operator" and token.value == "(":
+            node = self.parse_conditional()
+            self.expect(")")
+            return node
+        if token.kind != "name":
+            self.index -= 1
+            self.fail(f"unexpected {token.value!r}")
+        name = token.value
+        # A namespace prefix is only recognized in front of a call, ${a ? b:c} is a conditional
+        if self.is_operator(":") and self.peek(1).kind == "name" and self.is_operator("(", 2):
+            name = f"{name}:{self.peek(1).value}"
+            self.index += 2
+        if not self.is_operator("("):
+            return Identifier(name)
+        self.index += 1
+        args = []
+        if not self.is_operator(")"):
+            args.append(self.parse_conditional())
+            while self.is_operator(","):
+                self.index += 1
+                args.append(self.parse_conditional())
+        self.expect(")")
+        return FunctionCall(name, tuple(args))
+
+
+def parse(text: str) -> Tuple[Union[str, Expression], ...]:
+    """Splits the text into literal text and parsed ${...} expressions."""
+    parts: List[Union[str, Expression]] = []
+    position = 0
+    while True:
+        start = text.find("${", position)
+        if start == -1:
+            break
+        if start > position:
+            parts.append(text[position:start])
+        variable_match = VARIABLE_MATCH.match(text, start)
+        name = variable_match.group(1) if variable_match else None
+        if variable_match and name not in KEYWORD_LITERALS and name not in OPERATOR_ALIASES:
+            position = variable_match.end()
+            parts.append(Expression(variable_match.group(0), Identifier(variable_match.group(1))))
+            continue
+        tokens, position = tokenize(text, start + 2)
+        source = text[start:position]
+        parts.append(Expression(source, _Parser(tokens, source).parse()))
+    if position < len(text):
+        parts.append(text[position:])
+    return tuple(parts)
+
+
+def walk(node):
+    """Yields the node and all of its descendants."""
+    yield node
+    if isinstance(node, Expression):
+        yield from walk(node.body)
+    elif isinstance(node, FunctionCall):
+        for arg in node.args:
+            yield from walk(arg)
+    elif isinstance(node, UnaryOperation):
+        yield from walk(node.operand)
+    elif isinstance(node, BinaryOperation):
+        yield from walk(node.left)
+        yield from walk(node.right)
+    elif isinstance(node, Conditional):
+        yield from walk(node.condition)
+        yield from walk(node.if_true)
+        yield from walk(node.if_false)
+
+
+BINARY_FUNCTIONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "==": el_operators.equals,
+    "!=": el_operators.not_equals,
+    "<": el_operators.less_than,
+    ">": el_operators.greater_than,
+    "<=": el_operators.less_equal,
+    ">=": el_operators.greater_equal,
+    "+": el_operators.add,
+    "-": el_operators.subtract,
+    "*": el_operators.multiply,
+    "/": el_operators.divide,
+    "%": el_operators.remainder,
+}
+
+UNARY_FUNCTIONS: Dict[str, Callable[[Any], Any]] = {
+    "-": el_operators.negate,
+    "not": el_operators.logical_not,
+    "empty": el_operators.is_empty,
+}
+
+# Name the generated code calls the operator functions through, the module is imported by the DAG
+OPERATORS_MODULE_NAME = el_operators.__name__.rsplit(".", 1)[-1]
+
+# Python functions of the EL functions, the ones mapped to None are not supported
+Functions = Mapping[str, Optional[Callable[..., Any]]]
+# Closure evaluating a compiled AST node against the params and the functions
+Evaluator = Callable[[Mapping[str, Any], Optional[Functions]], Any]
+
+
+def _compile_node(node) -> Evaluator:  # pylint: disable=too-many-return-statements
+    """Compiles the AST node into a closure evaluating it against the params and functions."""
+    if isinstance(node, Literal):
+        value = node.value
+        return lambda params, functions: value
+    if isinstance(node, Identifier):
+        name = node.name
+
+        def evaluate_identifier(params, _functions):
+            if name in params:
+                return params[name]
+            if name in EL_CONSTANTS:
+                return EL_CONSTANTS[name]
+            raise KeyError(name)
+
+        return evaluate_identifier
+    if isinstance(node, FunctionCall):
+        name = node.name
+        args = [_compile_node(arg) for arg in node.args]
+
+        def evaluate_call(params, functions):
+            function = functions.get(name) if functions else None
+            if function is None:
+                raise KeyError(f"{name} EL function not supported.")
+            return function(*[arg(params, functions) for arg in args])
+
+        return evaluate_call
+    if isinstance(node, UnaryOperation):
+        unary_function = UNARY_FUNCTIONS[node.operator]
+        operand = _compile_node(node.operand)
+        return lambda params, functions: unary_function(operand(params, functions))
+    if isinstance(node, BinaryOperation):
+        left = _compile_node(node.left)
+        right = _compile_node(node.right)
+        if node.operator == "and":
+            return lambda params, functions: to_boolean(left(params, functions)) and to_boolean(
+                right(params, functions)
+            )
+        if node.operator == "or":
+            return lambda params, functions: to_boolean(left(params, functions)) or to_boolean(
+                right(params, functions)
+            )
+        binary_function = BINARY_FUNCTIONS[node.operator]
+        return lambda params, functions: binary_function(left(params, functions), right(params, functions))
+    if isinstance(node, Conditional):
+        condition = _compile_node(node.condition)
+        if_true = _compile_node(node.if_true)
+        if_false = _compile_node(node.if_false)
+        return lambda params, functions: (
+            if_true(params, functions)
+            if to_boolean(condition(params, functions))
+            else if_false(params, functions)
+        )
+    raise ELParserException(f"Unknown EL node {node!r}")
+
+
+OPERATION_NODES = (UnaryOperation, BinaryOperation, Conditional)
+
+
+def render_operator(function: Callable, args: List[str]) -> str:
+    """Renders the call of the el_operators function, see generate_code."""
+    return "{}.{}({})".format(OPERATORS_MODULE_NAME, function.__name__, ", ".join(args))
+
+
+def render_string(node, code: str) -> str:
+    """
+    Renders the code of the AST node converted to a string as EL does, operations may evaluate
+    to booleans and numbers which python would not print as EL.
+    """
+    if isinstance(node, OPERATION_NODES):
+        return render_operator(to_string, [code])
+    return code
+
+
+def render_literal(value) -> str:
+    """Renders the value as a python and Jinja literal."""
+    if isinstance(value, str):
+        return json.dumps(value)
+    return repr(value)
+
+
+def generate_code(
+    node, render_identifier: Callable[[str], str], render_call: Callable[[str, List[str]], str]
+) -> str:
+    """
+    Renders the AST node as an expression of python syntax, which is also a valid Jinja expression.
+    Identifiers and function calls are rendered by the given callbacks. Operators are rendered as
+    calls of the el_operators functions, which coerce their operands as EL does.
+    """
+
+    def generate(child) -> str:  # pylint: disable=too-many-return-statements
+        if isinstance(child, Literal):
+            # EL only escapes quotes and backslashes, other quoted sources are valid python strings
+            if child.source and "\\" not in child.source:
+                return child.source
+            return render_literal(child.value)
+        if isinstance(child, Identifier):
+            if child.name in EL_CONSTANTS:
+                return repr(EL_CONSTANTS[child.name])
+            return render_identifier(child.name)
+        if isinstance(child, FunctionCall):
+            return render_call(child.name, [generate(arg) for arg in child.args])
+        if isinstance(child, UnaryOperation):
+            return render_operator(UNARY_FUNCTIONS[child.operator], [generate(child.operand)])
+        if isinstance(child, BinaryOperation):
+            if child.operator in ("and", "or"):
+                return "({} {} {})".format(
+                    render_operator(to_boolean, [generate(child.left)]),
+                    child.operator,
+                    render_operator(to_boolean, [generate(child.right)]),
+                )
+            args = [generate(child.left), generate(child.right)]
+            return render_operator(BINARY_FUNCTIONS[child.operator], args)
+        if isinstance(child, Conditional):
+            condition = render_operator(to_boolean, [generate(child.condition)])
+            return f"({generate(child.if_true)} if {condition} else {generate(child.if_false)})"
+        raise ELParserException(f"Unknown EL node {child!r}")
+
+    return generate(node)
+
+
+def get_inputs(expression: Expression) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Returns the names of the variables and of the functions used by the expression."""
+    nodes = list(walk(expression.body))
+    variables = frozenset(
+        node.name for node in nodes if isinstance(node, Identifier) and node.name not in EL_CONSTANTS
+    )
+    return variables, frozenset(node.name for node in nodes if isinstance(node, FunctionCall))
+
+
+class CompiledEL:
+    """
+    A text with EL expressions compiled once into evaluators and code generators.
+    Use compile_el to get the cached instance.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts = parse(source)
+        self.expressions: Tuple[Expression, ...] = tuple(
+            part for part in self.parts if isinstance(part, Expression)
+        )
+        self._inputs: List[Tuple[FrozenSet[str], FrozenSet[str]]] = [
+            (frozenset(), frozenset()) if isinstance(part, str) else get_inputs(part) for part in self.parts
+        ]
+        self.variables: FrozenSet[str] = frozenset().union(*[inputs[0] for inputs in self._inputs])
+        self.functions: FrozenSet[str] = frozenset().union(*[inputs[1] for inputs in self._inputs])
+        self.variable_names: Tuple[str, ...] = tuple(sorted(self.variables))
+        self._evaluators: List[Evaluator] = [
+            _compile_node(Literal(part) if isinstance(part, str) else part.body) for part in self.parts
+        ]
+
+    @property
+    def is_single_expression(self) -> bool:
+        """True if the whole text is a single ${...} expression."""
+        return len(self.parts) == 1 and bool(self.expressions)
+
+    def evaluate(self, params: Mapping[str, Any], functions: Functions = None) -> Any:
+        """
+        Evaluates the text. A single expression keeps the type of its value, texts with more parts
+        are concatenated into a string. Raises KeyError for unknown variables and functions.
+        """
+        if self.is_single_expression:
+            return self._evaluators[0](params, functions)
+        return "".join(to_string(evaluator(params, functions)) for evaluator in self._evaluators)
+
+    def fold(
+        self,
+        params: Dict[str, Any],
+        functions: Functions,
+        runtime_functions: FrozenSet[str] = frozenset(),
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> Tuple[str, List[Expression]]:
+        """
+        Evaluates the expressions whose every variable is in params and every function is in functions
+        and not in runtime_functions. Returns the text with these expressions replaced by their values
+        and the list of the replaced expressions, the other expressions are left untouched, as well as
+        the expressions whose value is not accepted.
+        """
+        parts = []
+        folded = []
+        for part, inputs, evaluator in zip(self.parts, self._inputs, self._evaluators):
+            if isinstance(part, str):
+                parts.append(part)
+                continue
+            variables, function_names = inputs
+            foldable = all(name in params for name in variables) and all(
+                functions.get(name) is not None and name not in runtime_functions for name in function_names
+            )
+            if not foldable:
+                parts.append(part.source)
+                continue
+            try:
+                value = evaluator(params, functions)
+            except (KeyError, TypeError, ValueError, ArithmeticError, re.error):
+                parts.append(part.source)
+                continue
+            text = to_string(value)
+            if accept is not None and not accept(text):
+                parts.append(part.source)
+                continue
+            parts.append(text)
+            folded.append(part)
+        return "".join(parts), folded
+
+    def to_jinja(self, macros: Dict[str, str] = None) -> str:
+        """
+        Renders the text as a Jinja template reading the variables from params. The EL functions
+        are rendered as calls of the Jinja macros named in macros, others cannot be rendered.
+        """
+
+        def render_call(name, args):
+            if not macros or name not in macros:
+                raise ELParserException(f"EL function {name} cannot be rendered as Jinja in {self.source!r}")
+            return "{}({})".format(macros[name], ", ".join(args))
+
+        def render_identifier(name):
+            return f"params.{name}"
+
+        return "".join(
+            (
+                part
+                if isinstance(part, str)
+                else "{{ "
+                + render_string(part.body, generate_code(part.body, render_identifier, render_call))
+                + " }}"
+            )
+            for part in self.parts
+        )
+
+    def to_python(self, functions: Dict[str, Any], render_name: Callable[[Callable], str] = None) -> str:
+        """
+        Renders the text as a python expression reading the variables from PARAMS and calling
+        the python functions mapped to the EL functions. Raises KeyError for unsupported functions.
+        The functions are called by their names unless render_name is given.
+        """
+        if self.is_single_expression:
+            return self.node_to_python(self.expressions[0].body, functions, render_name)
+        return " + ".join(
+            (
+                render_literal(part)
+                if isinstance(part, str)
+                else self.part_to_python(part.body, functions, render_name)
+            )
+            for part in self.parts
+        )
+
+    @staticmethod
+    def part_to_python(node, functions: Dict[str, Any], render_name: Callable[[Callable], str] = None) -> str:
+        """Renders the AST node of a part of a text with more parts as a python string expression."""
+        code = CompiledEL.node_to_python(node, functions, render_name)
+        if isinstance(node, OPERATION_NODES):
+            return render_string(node, code)
+        return f"str({code})"
+
+    @staticmethod
+    def node_to_python(node, functions: Dict[str, Any], render_name: Callable[[Callable], str] = None) -> str:
+        """Renders the AST node as a python expression, see to_python."""
+
+        def render_call(name, args):
+            if functions.get(name) is None:
+                raise KeyError(f"{name} EL function not supported.")
+            function_name = render_name(functions[name]) if render_name else functions[name].__name__
+            return "{}({})".format(function_name, ", ".join(args))
+
+        def render_identifier(name):
+            return f"PARAMS[{render_literal(name)}]"
+
+        return generate_code(node, render_identifier, render_call)
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_el(source: str) -> CompiledEL:
+    """Returns the compiled text, every distinct text is parsed and compiled once."""
+    return CompiledEL(source)
@@ -13,19 +13,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Utilities used by EL functions"""
+import collections
+import functools
 import os
 import re
 import logging
-from typing import Dict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from o2a_libs import el_basic_functions
+from o2a_libs import el_basic_functions, el_fs_functions, el_wf_functions
+from utils import el_parser, properties_utils
+from utils.el_parser import EL_CONSTANTS  # noqa: F401 pylint: disable=unused-import
 
 FN_MATCH = re.compile(r"\${\s?(\w+)\(([\w\s,\'\"\-]*)\)\s?\}")
 VAR_MATCH = re.compile(r"\${([\w.]+)}")
 
-EL_CONSTANTS = {"KB": 1024 ** 1, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4, "PB": 1024 ** 5}
-
-EL_FUNCTIONS = {
+EL_FUNCTIONS: Dict[str, Optional[Callable[..., Any]]] = {
     "firstNotNull": el_basic_functions.first_not_null,
     "concat": el_basic_functions.concat,
     "replaceAll": el_basic_functions.replace_all,
@@ -38,20 +40,50 @@ EL_FUNCTIONS = {
     "toConfigurationStr": None,
 }
 
-WF_EL_FUNCTIONS = {
-    "wf:id": None,
-    "wf:name": None,
-    "wf:appPath": None,
-    "wf:conf": None,
-    "wf:user": None,
-    "wf:group": None,
-    "wf:callback": None,
-    "wf:transition": None,
-    "wf:lastErrorNode": None,
-    "wf:errorCode": None,
-    "wf:errorMessage": None,
-    "wf:run": None,
+FS_EL_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "fs:exists": el_fs_functions.fs_exists,
+    "fs:isDir": el_fs_functions.fs_is_dir,
+    "fs:dirSize": el_fs_functions.fs_dir_size,
+    "fs:fileSize": el_fs_functions.fs_file_size,
+    "fs:blockSize": el_fs_functions.fs_block_size,
+}
+EL_FUNCTIONS.update(FS_EL_FUNCTIONS)
+
+WF_EL_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "wf:id": el_wf_functions.wf_id,
+    "wf:name": el_wf_functions.wf_name,
+    "wf:appPath": el_wf_functions.wf_app_path,
+    "wf:conf": el_wf_functions.wf_conf,
+    "wf:user": el_wf_functions.wf_user,
+    "wf:group": el_wf_functions.wf_group,
+    "wf:callback": el_wf_functions.wf_callback,
+    "wf:transition": el_wf_functions.wf_transition,
+    "wf:lastErrorNode": el_wf_functions.wf_last_error_node,
+    "wf:errorCode": el_wf_functions.wf_error_code,
+    "wf:errorMessage": el_wf_functions.wf_error_message,
+    "wf:run": el_wf_functions.wf_run,
+    "wf:actionData": el_wf_functions.wf_action_data,
+    "wf:actionExternalId": el_wf_functions.wf_action_external_id,
+    "wf:actionTrackerUri": el_wf_functions.wf_action_tracker_uri,
+    "wf:actionExternalStatus": el_wf_functions.wf_action_external_status,
 }
+EL_FUNCTIONS.update(WF_EL_FUNCTIONS)
+
+# Names of the Jinja macros of the wf: functions, see el_wf_functions.MACROS
+WF_EL_MACROS = {name: function.__name__ for name, function in WF_EL_FUNCTIONS.items()}
+
+# EL functions depending on the time, the file system or the workflow run, never evaluated at conversion
+RUNTIME_EL_FUNCTIONS = frozenset({"timestamp", *FS_EL_FUNCTIONS, *WF_EL_FUNCTIONS})
+
+# Number of the EL expressions evaluated at conversion time, reported by the converter
+FOLDING_STATISTICS = {"folded": 0}
+
+# Values which cannot be spliced into the python string literals and Jinja templates of the generated code
+UNSAFE_VALUE_MATCH = re.compile(r"""['"\\\n\r]|{[{%#]|\${""")
+
+# Results of replace_el_with_var by the text and the values of the variables it uses
+SUBSTITUTION_CACHE: Dict[Tuple[str, Tuple[Any, ...]], Tuple[str, int]] = {}
+MAX_SUBSTITUTION_CACHE_SIZE = 16384
 
 
 def strip_el(el_function):
@@ -65,23 +97,169 @@ def strip_el(el_function):
 
 def replace_el_with_var(el_function, params, quote=True):
     """
-    Only supports a single variable
+    Evaluates at conversion time the EL expressions whose every input is known from the params,
+    e.g. with params {"nameNode": "hdfs://"}:
+        ${nameNode}/user -> hdfs:///user
+        ${concat(nameNode, '/user')} -> hdfs:///user
+
+    Expressions with unknown variables or runtime functions such as wf:id() or timestamp()
+    are left untouched. The text is substituted in a single pass over its compiled parts and
+    the result is memoized by the text and the values of the variables it uses.
     """
+    if "${" not in el_function:
+        jinjafied_el = el_function
+    else:
+        try:
+            compiled_el = el_parser.compile_el(el_function)
+        except el_parser.ELParserException:
+            jinjafied_el = replace_el_with_var_with_regex(el_function, params)
+        else:
+            key = (el_function, tuple(map(params.get, compiled_el.variable_names)))
+            try:
+                jinjafied_el, folded = SUBSTITUTION_CACHE[key]
+            except KeyError:
+                jinjafied_el, folded = _fold_el(compiled_el, params)
+                if len(SUBSTITUTION_CACHE) >= MAX_SUBSTITUTION_CACHE_SIZE:
+                    SUBSTITUTION_CACHE.clear()
+                SUBSTITUTION_CACHE[key] = jinjafied_el, folded
+            except TypeError:  # unhashable value
+                jinjafied_el, folded = _fold_el(compiled_el, params)
+            if folded:
+                FOLDING_STATISTICS["folded"] += folded
+
+    return "'" + jinjafied_el + "'" if quote else jinjafied_el
+
+
+def _fold_el(compiled_el: el_parser.CompiledEL, params: Dict[str, Any]) -> Tuple[str, int]:
+    """
+    Folds the text with the params. Returns the folded text and the number of the evaluated
+    expressions, plain variables have always been replaced and are not counted.
+    """
+    for var in compiled_el.variable_names:
+        if var not in params:
+            logging.info(f"Couldn't replace EL {var}")
+    jinjafied_el, folded = compiled_el.fold(params, EL_FUNCTIONS, RUNTIME_EL_FUNCTIONS)
+    return jinjafied_el, sum(
+        1 for expression in folded if not isinstance(expression.body, el_parser.Identifier)
+    )
+
+
+def evaluate_predicate(el_function: str, params: Dict[str, Any]) -> Optional[bool]:
+    """
+    Evaluates the predicate of a decision case at conversion time, e.g. with params {"flag": "true"}
+    ${flag eq true} -> True. Returns None if the predicate is not constant: it uses variables missing
+    from the params or runtime functions such as wf:conf() or fs:exists(), or it cannot be evaluated.
+    """
+    try:
+        compiled_el = el_parser.compile_el(el_function)
+    except el_parser.ELParserException:
+        return None
+    if any(name not in params for name in compiled_el.variable_names):
+        return None
+    if any(EL_FUNCTIONS.get(name) is None or name in RUNTIME_EL_FUNCTIONS for name in compiled_el.functions):
+        return None
+    try:
+        return el_parser.to_boolean(compiled_el.evaluate(params, EL_FUNCTIONS))
+    except (KeyError, TypeError, ValueError, ArithmeticError, re.error):
+        return None
+
+
+def replace_el_with_var_with_regex(el_function, params):
+    """
+    Replaces the plain variables with their values from params in a single regex pass.
+    """
+
+    def substitute(match):
+        var = match.group(1)
+        if var in params:
+            return params[var]
+        logging.info(f"Couldn't replace EL {var}")
+        return match.group(0)
+
     # Matches oozie EL variables e.g. ${hostname}
-    var_match = VAR_MATCH.findall(el_function)
+    return VAR_MATCH.sub(substitute, el_function)
 
-    jinjafied_el = el_function
-    if var_match:
-        for var in var_match:
-            if var in params:
-                jinjafied_el = jinjafied_el.replace("${" + var + "}", params[var])
-            else:
-                logging.info(f"Couldn't replace EL {var}")
 
-    return "'" + jinjafied_el + "'" if quote else jinjafied_el
+def get_python_function_name(function: Callable) -> str:
+    """
+    Returns the name the generated code calls the function by. The fs: and wf: functions are called
+    through their modules, which the decision mapper imports.
+    """
+    if function.__module__ in (el_fs_functions.__name__, el_wf_functions.__name__):
+        return f"{function.__module__.rsplit('.', 1)[-1]}.{function.__name__}"
+    return function.__name__
+
+
+def uses_wf_functions(el_function: str) -> bool:
+    """Returns true if the EL calls the wf: functions, which need the context of the running task."""
+    try:
+        compiled_el = el_parser.compile_el(el_function)
+    except el_parser.ELParserException:
+        return False
+    return any(name in WF_EL_FUNCTIONS for name in compiled_el.functions)
+
+
+def get_basic_functions(el_function: str) -> List[str]:
+    """
+    Returns the sorted names of the functions of o2a_libs.el_basic_functions called by the python code
+    of the EL, which the generated module imports. Texts the EL parser does not understand are
+    converted with the regex, which only maps their first function.
+    """
+    try:
+        names: Iterable[str] = el_parser.compile_el(el_function).functions
+    except el_parser.ELParserException:
+        names = [name for name, _ in FN_MATCH.findall(el_function)[:1]]
+    functions = [EL_FUNCTIONS.get(name) for name in names]
+    return sorted(
+        function.__name__
+        for function in functions
+        if function is not None and function.__module__ == el_basic_functions.__name__
+    )
+
+
+def get_fs_paths(el_function: str) -> List[str]:
+    """
+    Returns the python code of the paths passed to the fs: functions of the EL, without duplicates,
+    so that the generated code can stat them all at once. Empty if the EL cannot be parsed.
+    """
+    try:
+        compiled_el = el_parser.compile_el(el_function)
+    except el_parser.ELParserException:
+        return []
+    paths: List[str] = []
+    for expression in compiled_el.expressions:
+        for node in el_parser.walk(expression.body):
+            if isinstance(node, el_parser.FunctionCall) and node.name in FS_EL_FUNCTIONS and node.args:
+                try:
+                    path = compiled_el.node_to_python(node.args[0], EL_FUNCTIONS, get_python_function_name)
+                except KeyError:
+                    continue
+                if path not in paths:
+                    paths.append(path)
+    return paths
 
 
 def parse_el_func(el_function, el_func_map=None):
+    """
+    Converts the EL with functions to the python code calling the mapped functions, e.g.
+    ${concat(nameNode, '/user')} -> concat(PARAMS["nameNode"], "/user")
+
+    Returns None if there is no function in the EL. Raises KeyError if a function is not
+    supported. Expressions the EL parser does not understand are converted with the regex.
+    """
+    if el_func_map is None:
+        el_func_map = EL_FUNCTIONS
+    try:
+        compiled_el = el_parser.compile_el(el_function)
+        if not compiled_el.functions:
+            return None
+        return compiled_el.to_python(el_func_map, render_name=get_python_function_name)
+    except (el_parser.ELParserException, KeyError) as ex:
+        logging.debug(f"Falling back to the regex conversion of {el_function!r}: {ex}")
+        return parse_el_func_with_regex(el_function, el_func_map)
+
+
+def parse_el_func_with_regex(el_function, el_func_map=None):
     # Finds things like ${ function(arg1, arg2 } and returns
     # a list like ['function', 'arg1, arg2']
     if el_func_map is None:
@@ -102,17 +280,93 @@ def parse_el_func(el_function, el_func_map=None):
     return "{}({})".format(func_name, fn_match[0][1])
 
 
-def convert_el_to_jinja(oozie_el, quote=True):
+def convert_el_to_jinja(oozie_el, quote=True, params=None, jinja_functions=True):
     """
-    Converts an EL with either a function or a variable to the form:
+    Converts a text with EL expressions to the form:
     Variable:
         ${variable} -> {{ params.variable }}
+        ${variable gt 1} -> {{ (params.variable > 1) }}
         ${func()} -> mapped_func()
 
-    Only supports a single variable or a single EL function.
+    If jinja_functions is true, the texts calling only the wf: functions are rendered as Jinja
+    calling their macros, e.g. /user/${wf:user()} -> /user/{{ wf_user() }}, as they can only
+    be evaluated when the task runs. Otherwise python code is returned as for other functions.
+
+    If params are given, the expressions whose every input is known from them are evaluated
+    at conversion time and replaced with their values, see replace_el_with_var.
 
     If quote is true, returns the string surround in single quotes, unless it
-    is a function, then no quotes are added.
+    has a function, then python code is returned and no quotes are added.
+    Expressions the EL parser does not understand are converted with the regex.
+    """
+    if params:
+        oozie_el = fold_el(oozie_el, params)
+    return _convert_el_to_jinja(oozie_el, quote, jinja_functions)
+
+
+def is_safe_value(value: str) -> bool:
+    """
+    Returns true if the value can be spliced into the string literals and templates of the generated
+    code: it contains no quote, backslash, line break, Jinja markup or EL expression.
+    """
+    return not UNSAFE_VALUE_MATCH.search(value)
+
+
+def fold_el(oozie_el: str, params: Dict[str, str]) -> str:
+    """
+    Returns the text with the expressions whose every input is known from the params replaced with
+    their values. The text is returned unchanged if the EL parser does not understand it.
+
+    The expressions whose values are not safe, see is_safe_value, are left to be evaluated when the
+    task runs, e.g. ${msg} is rendered as {{ params.msg }} rather than breaking the string literal.
+    """
+    try:
+        folded_el, folded = el_parser.compile_el(oozie_el).fold(
+            params, EL_FUNCTIONS, RUNTIME_EL_FUNCTIONS, accept=is_safe_value
+        )
+    except el_parser.ELParserException:
+        return oozie_el
+    if not folded:
+        return oozie_el
+    FOLDING_STATISTICS["folded"] += len(folded)
+    return folded_el
+
+
+def converts_to_python(oozie_el: str, jinja_functions: bool = True) -> bool:
+    """
+    Returns true if convert_el_to_jinja converts the text to python code rather than to a Jinja template,
+    that is when the text calls functions which are not rendered as Jinja macros.
+    """
+    try:
+        compiled_el = el_parser.compile_el(oozie_el)
+    except el_parser.ELParserException:
+        return bool(FN_MATCH.findall(oozie_el))
+    return bool(compiled_el.functions) and not (
+        jinja_functions and all(name in WF_EL_MACROS for name in compiled_el.functions)
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _convert_el_to_jinja(oozie_el, quote, jinja_functions=True):
+    """Converts the text without params, the conversions are cached as the same texts repeat."""
+    try:
+        compiled_el = el_parser.compile_el(oozie_el)
+        if compiled_el.functions and not (
+            jinja_functions and all(name in WF_EL_MACROS for name in compiled_el.functions)
+        ):
+            return compiled_el.to_python(EL_FUNCTIONS, render_name=get_python_function_name)
+        jinjafied_el = compiled_el.to_jinja(WF_EL_MACROS)
+    except (el_parser.ELParserException, KeyError) as ex:
+        logging.debug(f"Falling back to the regex conversion of {oozie_el!r}: {ex}")
+        return convert_el_to_jinja_with_regex(oozie_el, quote)
+
+    return "'" + jinjafied_el + "'" if quote else jinjafied_el
+
+
+def convert_el_to_jinja_with_regex(oozie_el, quote=True):
+    """
+    Converts an EL with either a function or a variable using regular expressions.
+    Only supports a single variable or a single EL function.
     """
     # Matches oozie EL functions e.g. ${concat()}
     fn_match = FN_MATCH.findall(oozie_el)
@@ -122,7 +376,7 @@ def convert_el_to_jinja(oozie_el, quote=True):
     jinjafied_el = oozie_el
 
     if fn_match:
-        jinjafied_el = parse_el_func(oozie_el)
+        jinjafied_el = parse_el_func_with_regex(oozie_el)
         return jinjafied_el
     if var_match:
         for var in var_match:
@@ -131,7 +385,7 @@ def convert_el_to_jinja(oozie_el, quote=True):
     return "'" + jinjafied_el + "'" if quote else jinjafied_el
 
 
-def parse_els(properties_file: str, prop_dict: Dict[str, str] = None):
+def parse_els(properties_file: str, prop_dict: Dict[str, str] = None) -> Dict[str, str]:
     """
     Parses the properties file into a dictionary, if the value has
     and EL function in it, it gets replaced with the corresponding
@@ -146,18 +400,80 @@ def parse_els(properties_file: str, prop_dict: Dict[str, str] = None):
         host: 'user@google.com',
         command='ssh user@google.com',
     }
+
+    The properties may reference each other in any order, see resolve_properties.
     """
     if prop_dict is None:
         prop_dict = {}
     if properties_file:
         if os.path.isfile(properties_file):
-            with open(properties_file, "r") as prop_file:
-                for line in prop_file.readlines():
-                    if line.startswith("#") or line.startswith(" ") or line.startswith("\n"):
-                        continue
-                    else:
-                        props = [x.strip() for x in line.split("=", 1)]
-                        prop_dict[props[0]] = replace_el_with_var(props[1], prop_dict, quote=False)
+            properties = properties_utils.read_properties(properties_file)
+            resolve_properties(properties, prop_dict, source=properties_file)
         else:
             logging.warning(f"The job.properties file is missing: {properties_file}")
     return prop_dict
+
+
+def get_variables(el_function: str) -> Set[str]:
+    """Returns the names of the variables used by the EL expressions of the text."""
+    try:
+        return set(el_parser.compile_el(el_function).variables)
+    except el_parser.ELParserException:
+        return set(VAR_MATCH.findall(el_function))
+
+
+def get_resolution_order(dependencies: Dict[str, Set[str]], source: str = "") -> List[str]:
+    """
+    Returns the keys ordered so that every key follows the keys it depends on, keeping the
+    original order otherwise. Raises PropertiesException if the keys depend on each other in a cycle.
+    """
+    pending = {key: len(key_dependencies) for key, key_dependencies in dependencies.items()}
+    dependents: Dict[str, List[str]] = collections.defaultdict(list)
+    for key, key_dependencies in dependencies.items():
+        for dependency in key_dependencies:
+            dependents[dependency].append(key)
+    ready = collections.deque(key for key, count in pending.items() if not count)
+    order = []
+    while ready:
+        key = ready.popleft()
+        order.append(key)
+        for dependent in dependents[key]:
+            pending[dependent] -= 1
+            if not pending[dependent]:
+                ready.append(dependent)
+    if len(order) < len(dependencies):
+        # Every unresolved key depends on another unresolved key, following them finds a cycle
+        key = next(key for key, count in pending.items() if count)
+        path: List[str] = []
+        while key not in path:
+            path.append(key)
+            key = next(dependency for dependency in sorted(dependencies[key]) if pending[dependency])
+        cycle = path[path.index(key):] + [key]
+        raise properties_utils.PropertiesException(
+            f"Cyclic reference between properties{' of ' + source if source else ''}: {' -> '.join(cycle)}"
+        )
+    return order
+
+
+def resolve_properties(
+    properties: Dict[str, str], prop_dict: Dict[str, str], source: str = ""
+) -> Dict[str, str]:
+    """
+    Resolves the EL of the properties and adds them to prop_dict, which is returned.
+
+    The properties are resolved in the order of their dependencies, so they may reference the
+    properties defined later in the same file. A property referencing itself gets the value
+    already in prop_dict, e.g. from job.properties. Raises PropertiesException on cycles.
+    """
+    dependencies = {
+        key: {var for var in get_variables(value) if var in properties and var != key}
+        for key, value in properties.items()
+    }
+    values: Dict[str, str] = {}
+    lookup = collections.ChainMap(values, prop_dict)
+    for key in get_resolution_order(dependencies, source):
+        values[key] = replace_el_with_var(properties[key], lookup, quote=False)
+    # Keep the order of the file
+    for key in properties:
+        prop_dict[key] = values[key]
+    return prop_dict
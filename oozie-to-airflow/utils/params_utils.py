@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Analysis of PARAMS references in the generated DAG code"""
+import ast
+import json
+import re
+from typing import Dict, Iterable, Optional, Set
+
+from o2a_libs import el_wf_functions
+
+# PARAMS['key'] and PARAMS.get('key') in the python code of the DAG
+PARAMS_ITEM_MATCH = re.compile(r"""\bPARAMS\s*\[\s*(['"])(.+?)\1\s*\]""")
+PARAMS_GET_MATCH = re.compile(r"""\bPARAMS\.get\(\s*(['"])(.+?)\1""")
+# PARAMS passed to an operator, its keys are referenced by the templated fields
+PARAMS_ARGUMENT_MATCH = re.compile(r"\bparams\s*=\s*PARAMS\b")
+PARAMS_NAME_MATCH = re.compile(r"\bPARAMS\b")
+# wf:conf('key') and the other wf: functions reading the params of the DAG at run time
+WF_CONF_MATCH = re.compile(r"""\bwf_conf\(\s*(['"])(.+?)\1\s*\)""")
+WF_CONF_CALL_MATCH = re.compile(r"\bwf_conf\(")
+WF_PARAM_FUNCTION_MATCH = re.compile(r"\b(" + "|".join(el_wf_functions.PARAM_FUNCTIONS) + r")\(")
+# {{ params.key }} and {{ params['key'] }} in the templated fields of the operators
+TEMPLATE_PARAMS_ATTRIBUTE_MATCH = re.compile(r"\bparams\.([A-Za-z_][\w.]*)")
+TEMPLATE_PARAMS_ITEM_MATCH = re.compile(r"""\bparams\s*\[\s*(['"])(.+?)\1\s*\]""")
+# Single and double quoted python string literals of the generated code, without prefixes
+STRING_LITERAL_MATCH = re.compile(r"""(?<![\w'"])('(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")""")
+# Text which Jinja would render as an expression, a statement or a comment
+JINJA_MARKUP_MATCH = re.compile(r"{[{%#]")
+
+
+def _get_dotted_prefixes(path: str) -> Iterable[str]:
+    """
+    Returns "a", "a.b" and "a.b.c" for "a.b.c" - dotted keys like "user.name" are rendered as attributes.
+    """
+    parts = path.split(".")
+    return (".".join(parts[: i + 1]) for i in range(len(parts)))
+
+
+def find_referenced_params(text: str, params: Dict[str, str]) -> Optional[Set[str]]:
+    """
+    Returns the keys of params referenced in the generated code.
+
+    The wf: functions read the params of the DAG when the tasks run, wf:conf('key') references the
+    key and wf:user() references user.name for example.
+
+    Returns None if PARAMS is used in a way that does not reveal the keys used (for example it is
+    passed to a function as a whole, or wf:conf is called with a computed key), then all the params
+    have to be kept.
+    """
+    referenced: Set[str] = set()
+    known_uses = 0
+    for match_type in [PARAMS_ITEM_MATCH, PARAMS_GET_MATCH]:
+        for match in match_type.finditer(text):
+            referenced.add(match.group(2))
+            known_uses += 1
+    known_uses += len(PARAMS_ARGUMENT_MATCH.findall(text))
+    if len(PARAMS_NAME_MATCH.findall(text)) > known_uses:
+        return None
+    wf_conf_keys = [match.group(2) for match in WF_CONF_MATCH.finditer(text)]
+    if len(WF_CONF_CALL_MATCH.findall(text)) > len(wf_conf_keys):
+        return None
+    referenced.update(wf_conf_keys)
+    referenced.update(el_wf_functions.PARAM_FUNCTIONS[name] for name in WF_PARAM_FUNCTION_MATCH.findall(text))
+    for match in TEMPLATE_PARAMS_ITEM_MATCH.finditer(text):
+        referenced.add(match.group(2))
+    for match in TEMPLATE_PARAMS_ATTRIBUTE_MATCH.finditer(text):
+        referenced.update(_get_dotted_prefixes(match.group(1)))
+    return {key for key in referenced if key in params}
+
+
+def to_template_text(value: str) -> str:
+    """Returns the text of a Jinja template rendered as the value, its Jinja markup is not rendered."""
+    if JINJA_MARKUP_MATCH.search(value):
+        return "{% raw %}" + value + "{% endraw %}"
+    return value
+
+
+def to_string_literal(value: str, quote: str) -> str:
+    """Returns the python string literal of the value enclosed in the given quote."""
+    escaped = value.replace("\\", "\\\\").replace(quote, "\\" + quote)
+    return quote + escaped.replace("\n", "\\n").replace("\r", "\\r") + quote
+
+
+def resolve_params(text: str, params: Dict[str, str]) -> str:
+    """
+    Returns the generated code with the references to the given params replaced with their values,
+    so that the code does not depend on the PARAMS of the DAG for those keys.
+
+    PARAMS['key'] is replaced with the python literal of the value, {{ params.key }} with the value
+    itself - escaped for the string literal it is found in and not rendered by Jinja - and PARAMS
+    passed to an operator is updated with the params.
+    """
+    if not params:
+        return text
+
+    def replace_item(match):
+        key = match.group(2)
+        return repr(params[key]) if key in params else match.group(0)
+
+    keys = "|".join(re.escape(key) for key in sorted(params, key=len, reverse=True))
+    template_match = re.compile(r"{{\s*params\.(" + keys + r")\s*}}")
+
+    def replace_literal(match):
+        literal = match.group(0)
+        if not template_match.search(literal):
+            return literal
+        value = ast.literal_eval(literal)
+        value = template_match.sub(lambda key: to_template_text(params[key.group(1)]), value)
+        return to_string_literal(value, literal[0])
+
+    text = PARAMS_ITEM_MATCH.sub(replace_item, text)
+    text = STRING_LITERAL_MATCH.sub(replace_literal, text)
+    params_argument = "params=dict(PARAMS, **" + json.dumps(params, sort_keys=True) + ")"
+    return PARAMS_ARGUMENT_MATCH.sub(lambda _: params_argument, text)
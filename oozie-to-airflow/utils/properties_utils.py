@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Copyright 2019 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Parser of the Java .properties files"""
+import os
+import re
+from typing import Dict, Iterable, Iterator, Tuple
+
+WHITESPACE = " \t\f"
+KEY_TERMINATORS = "=:" + WHITESPACE
+ESCAPE_MATCH = re.compile(r"\\(u[0-9a-fA-F]{4}|u|.)", re.DOTALL)
+ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "f": "\f"}
+
+# Parsed files by their real path, with the modification time and size they were parsed at
+PROPERTIES_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+
+
+class PropertiesException(Exception):
+    pass
+
+
+def _is_continued(line: str) -> bool:
+    """True if the line ends with an odd number of backslashes."""
+    return (len(line) - len(line.rstrip("\\"))) % 2 == 1
+
+
+def iter_logical_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Joins the natural lines into logical lines, skipping blank and comment lines.
+    Leading whitespace is dropped from every natural line, also from the continuation lines.
+    """
+    logical_line = None
+    for line in lines:
+        line = line.rstrip("\r\n").lstrip(WHITESPACE)
+        if logical_line is None:
+            if not line or line[0] in "#!":
+                continue
+            logical_line = ""
+        if _is_continued(line):
+            logical_line += line[:-1]
+            continue
+        yield logical_line + line
+        logical_line = None
+    if logical_line:
+        yield logical_line
+
+
+def _replace_escape(match) -> str:
+    escape: str = match.group(1)
+    if escape[0] == "u":
+        if len(escape) == 1:
+            raise PropertiesException(f"Malformed \\uxxxx encoding in {match.string!r}")
+        return chr(int(escape[1:], 16))
+    return ESCAPES.get(escape, escape)
+
+
+def unescape(text: str) -> str:
+    """Replaces the \\uxxxx, \\t, \\n, \\r, \\f escapes and drops the backslash of the others."""
+    if "\\" not in text:
+        return text
+    return ESCAPE_MATCH.sub(_replace_escape, text)
+
+
+def split_key_value(line: str) -> Tuple[str, str]:
+    """
+    Splits the logical line into the key and the value. The key ends at the first unescaped '=', ':'
+    or whitespace, which is skipped together with the whitespace around it.
+    """
+    index = 0
+    while index < len(line):
+        char = line[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char in KEY_TERMINATORS:
+            break
+        index += 1
+    value = line[index:].lstrip(WHITESPACE)
+    if value[:1] in ("=", ":"):
+        value = value[1:].lstrip(WHITESPACE)
+    return unescape(line[:index]), unescape(value)
+
+
+def parse_properties(lines: Iterable[str]) -> Dict[str, str]:
+    """Parses the lines of a .properties file, the later of the duplicated keys wins."""
+    properties: Dict[str, str] = {}
+    for logical_line in iter_logical_lines(lines):
+        key, value = split_key_value(logical_line)
+        properties[key] = value
+    return properties
+
+
+def read_properties(properties_file: str) -> Dict[str, str]:
+    """
+    Returns the unresolved properties of the file. The files are read as ISO 8859-1, as Java does,
+    other characters are written as \\uxxxx escapes. The files are parsed once while their modification
+    time and size do not change, so the files shared by many applications are parsed only once.
+    The returned dictionary is shared and must not be modified.
+    """
+    path = os.path.realpath(properties_file)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = PROPERTIES_CACHE.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+    with open(path, "r", encoding="iso-8859-1") as file:
+        properties = parse_properties(file)
+    PROPERTIES_CACHE[path] = version, properties
+    return properties